@@ -0,0 +1,37 @@
+"""Scanning a serialized block with wire.skim_block versus decoding a MsgBlock.
+
+    python -m benchmarks.bench_block_skim
+"""
+import io
+import time
+import wire
+from benchmarks.bench_message_io import make_tx
+
+
+def main():
+    block = wire.MsgBlock(header=wire.BlockHeader(version=1, bits=0x1d00ffff, timestamp=0x495fab29),
+                          transactions=[make_tx(i) for i in range(2000)])
+    w = io.BytesIO()
+    block.serialize(w)
+    raw = w.getvalue()
+    count = 20
+
+    start = time.perf_counter()
+    for _ in range(count):
+        msg_block = wire.MsgBlock()
+        msg_block.deserialize_buffer(raw)
+        [tx.tx_hash() for tx in msg_block.transactions]
+    decode = (time.perf_counter() - start) / count
+
+    start = time.perf_counter()
+    for _ in range(count):
+        wire.skim_block(raw)
+    skim = (time.perf_counter() - start) / count
+
+    print("block of %d txs, %d bytes" % (len(block.transactions), len(raw)))
+    print("decode + txids: %.1f ms" % (decode * 1e3))
+    print("skim_block:     %.1f ms" % (skim * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Filtering a block of pay to pubkey hash transactions against BIP0037
+bloom filters: matching one transaction at a time through parse_script and a
+MurmurHash3 call per hash function, against the skim based block match.
+
+    python -m benchmarks.bench_bloom
+"""
+import random
+import time
+import btcutil
+import txscript
+import wire
+from btcutil.bloom import *
+from chainhash import Hash
+
+
+def make_tx(rand, i):
+    def p2pkh():
+        return bytes([0x76, 0xa9, 0x14]) + rand.randbytes(20) + bytes([0x88, 0xac])
+
+    sig_script = bytes([72]) + rand.randbytes(72) + bytes([33]) + rand.randbytes(33)
+    return wire.MsgTx(version=1,
+                      tx_ins=[wire.TxIn(previous_out_point=wire.OutPoint(hash=Hash(rand.randbytes(32)), index=i % 3),
+                                        signature_script=sig_script)],
+                      tx_outs=[wire.TxOut(value=5000, pk_script=p2pkh()), wire.TxOut(value=5000, pk_script=p2pkh())])
+
+
+# naive_match_tx matches a transaction the straightforward way, with the same
+# result as Filter.match_tx_and_update for a filter that is not updated.
+def naive_match_tx(msg_filter_load, tx):
+    num_bits = len(msg_filter_load.filter) * 8
+
+    def matches(data):
+        for i in range(msg_filter_load.hash_funcs):
+            idx = murmur_hash3((i * 0xfba4c795 + msg_filter_load.tweak) & 0xffffffff, data) % num_bits
+            if not msg_filter_load.filter[idx >> 3] & (1 << (idx & 7)):
+                return False
+        return True
+
+    def matches_pushes(script):
+        return any(matches(pop.data) for pop in txscript.parse_script(script) if pop.data)
+
+    msg_tx = tx.get_msg_tx()
+    return matches(tx.hash().to_bytes()) or \
+        any(matches_pushes(tx_out.pk_script) for tx_out in msg_tx.tx_outs) or \
+        any(matches(tx_in.previous_out_point.hash.to_bytes() + tx_in.previous_out_point.index.to_bytes(4, "little"))
+            or matches_pushes(tx_in.signature_script) for tx_in in msg_tx.tx_ins)
+
+
+def main():
+    rand = random.Random(1)
+    num_txs = 2000
+    msg_block = wire.MsgBlock(header=wire.BlockHeader(version=1, bits=0x1d00ffff, timestamp=0x495fab29),
+                              transactions=[make_tx(rand, i) for i in range(num_txs)])
+    block = btcutil.Block.from_bytes(btcutil.Block(msg_block).bytes())
+    block.skim()
+
+    # Filters of an SPV wallet watching 50 addresses with a 0.01% false
+    # positive rate.
+    filters = []
+    for _ in range(10):
+        f = Filter.new_filter(50, rand.getrandbits(32), 0.0001, wire.BloomUpdateType.BloomUpdateNone)
+        for _ in range(50):
+            f.add(rand.randbytes(20))
+        filters.append(f)
+
+    start = time.perf_counter()
+    naive = [[i for i, tx in enumerate(block.get_transactions()) if naive_match_tx(f.get_msg_filter_load(), tx)]
+             for f in filters]
+    naive_elapsed = (time.perf_counter() - start) / len(filters)
+
+    start = time.perf_counter()
+    fast = [f.match_block_and_update(block) for f in filters]
+    fast_elapsed = (time.perf_counter() - start) / len(filters)
+
+    assert naive == fast
+    print("block of %d txs, %d filters" % (num_txs, len(filters)))
+    print("naive:  %7.1f ms/filter" % (naive_elapsed * 1000))
+    print("skim:   %7.1f ms/filter" % (fast_elapsed * 1000))
+
+    start = time.perf_counter()
+    for f in filters:
+        new_merkle_block(block, f)
+    print("merkle block: %7.1f ms/filter" % ((time.perf_counter() - start) / len(filters) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Building BIP0158 basic filters for a range of blocks, as the committed filter
+index catch up does: decoding each block versus skimming it, and with a pool of
+worker processes.
+
+    python -m benchmarks.bench_cf_index
+"""
+import io
+import multiprocessing
+import time
+import blockchain
+import wire
+from btcutil import gcs
+from blockchain.indexers.cf_index import build_basic_filter_bytes
+from chainhash import Hash
+
+
+def p2pkh(i):
+    return bytes([0x76, 0xa9, 0x14]) + i.to_bytes(20, "little") + bytes([0x88, 0xac])
+
+
+def make_block(height, num_txs):
+    txs = [wire.MsgTx(version=1,
+                      tx_ins=[wire.TxIn(previous_out_point=wire.OutPoint(hash=Hash(), index=0xffffffff))],
+                      tx_outs=[wire.TxOut(value=5000000000, pk_script=p2pkh(height))])]
+    for i in range(1, num_txs):
+        n = height * num_txs + i
+        txs.append(wire.MsgTx(version=1,
+                              tx_ins=[wire.TxIn(previous_out_point=wire.OutPoint(hash=Hash(n.to_bytes(32, "little")),
+                                                                                 index=0),
+                                                signature_script=bytes(107))],
+                              tx_outs=[wire.TxOut(value=5000, pk_script=p2pkh(2 * n)),
+                                       wire.TxOut(value=5000, pk_script=p2pkh(2 * n + 1))]))
+    block = wire.MsgBlock(header=wire.BlockHeader(version=1, bits=0x1d00ffff, timestamp=0x495fab29, nonce=height),
+                          transactions=txs)
+    w = io.BytesIO()
+    block.serialize(w)
+
+    stxos = [blockchain.SpentTxOut(amount=5000, pk_script=p2pkh(10 ** 9 + height * num_txs + i), height=1)
+             for i in range(1, num_txs)]
+    return w.getvalue(), blockchain.serialize_spend_journal_entry(stxos)
+
+
+def decode_and_build(item):
+    serialized_block, serialized_stxos = item
+    msg_block = wire.MsgBlock()
+    msg_block.deserialize(io.BytesIO(serialized_block))
+    stxos = blockchain.deserialize_spend_journal_entry(serialized_stxos, msg_block.transactions[1:])
+    return gcs.build_basic_filter(msg_block, [stxo.pk_script for stxo in stxos]).n_bytes()
+
+
+def main():
+    items = [make_block(height, 1000) for height in range(16)]
+
+    start = time.perf_counter()
+    want = [decode_and_build(item) for item in items]
+    decode = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = [build_basic_filter_bytes(item) for item in items]
+    skim = time.perf_counter() - start
+    assert got == want
+
+    start = time.perf_counter()
+    with multiprocessing.Pool() as pool:
+        got = list(pool.imap(build_basic_filter_bytes, items))
+    parallel = time.perf_counter() - start
+    assert got == want
+
+    print("%d blocks of 1000 txs, %d cpus" % (len(items), multiprocessing.cpu_count()))
+    print("decode + build:         %.1f ms/block" % (decode * 1e3 / len(items)))
+    print("skim + build:           %.1f ms/block" % (skim * 1e3 / len(items)))
+    print("skim + build (workers): %.1f ms/block" % (parallel * 1e3 / len(items)))
+
+
+if __name__ == '__main__':
+    main()
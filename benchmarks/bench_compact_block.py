@@ -0,0 +1,48 @@
+"""Reconstructing a block from a compact block and a synthetic mempool.
+
+    python -m benchmarks.bench_compact_block
+"""
+import io
+import random
+import blockchain
+import btcutil
+import wire
+from benchmarks.bench_message_io import make_tx
+from mempool.compact_block import CompactBlockReconstructor
+
+
+def encoded_len(msg):
+    w = io.BytesIO()
+    msg.btc_encode(w, wire.ProtocolVersion, wire.WitnessEncoding)
+    return len(w.getvalue())
+
+
+def main():
+    num_txs = 2000
+    txs = [make_tx(i) for i in range(num_txs)]
+    merkles = blockchain.build_merkle_tree_store([btcutil.Tx(tx) for tx in txs], witness=False)
+    block = wire.MsgBlock(header=wire.BlockHeader(version=1, merkle_root=merkles[-1], bits=0x1d00ffff,
+                                                  timestamp=0x495fab29),
+                          transactions=txs)
+    cmpct = wire.MsgCmpctBlock.from_block(block, nonce=random.getrandbits(64))
+    print("block of %d txs: %d bytes, compact block %d bytes" % (num_txs, encoded_len(block), encoded_len(cmpct)))
+
+    # Mempools holding part of the block plus as many unrelated transactions.
+    unrelated = [btcutil.Tx(make_tx(num_txs + i)) for i in range(num_txs)]
+    for coverage in (1.0, 0.99, 0.9, 0.5):
+        pool = [btcutil.Tx(tx) for tx in random.sample(txs[1:], int((num_txs - 1) * coverage))] + unrelated
+        random.shuffle(pool)
+
+        reconstructor = CompactBlockReconstructor(cmpct)
+        reconstructor.fill_from_pool(pool)
+        get_block_txn = reconstructor.get_block_txn()
+        if get_block_txn is not None:
+            reconstructor.add_block_txn(wire.MsgBlockTxn(
+                block_hash=get_block_txn.block_hash,
+                transactions=[txs[i] for i in get_block_txn.indexes]))
+        reconstructor.block()
+        print("coverage %.2f: %r" % (coverage, reconstructor.stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""double_hash_many against hashing one buffer at a time with double_hash_h,
+for 1k, 10k and 100k transaction sized and large buffers, and a merkle tree
+built a level at a time against node by node.
+
+    python -m benchmarks.bench_double_hash
+"""
+import os
+import time
+import chainhash
+from blockchain.merkle import hash_merkle_branches, next_power_of_two
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    f(*args)
+    return time.perf_counter() - start
+
+
+def loop(buffers):
+    return [chainhash.double_hash_h(b) for b in buffers]
+
+
+# merkle_node_by_node is the previous merkle tree construction of
+# build_merkle_tree_store, over leaf hashes.
+def merkle_node_by_node(hashes):
+    next_pot = next_power_of_two(len(hashes))
+    array_size = 2 * next_pot - 1
+    merkles = hashes + [None] * (array_size - len(hashes))
+    offset = next_pot
+    for i in range(0, array_size - 1, 2):
+        if merkles[i] is None:
+            merkles[offset] = None
+        elif merkles[i + 1] is None:
+            merkles[offset] = hash_merkle_branches(merkles[i], merkles[i])
+        else:
+            merkles[offset] = hash_merkle_branches(merkles[i], merkles[i + 1])
+        offset += 1
+    return merkles
+
+
+def merkle_levels(hashes):
+    level = b''.join(hashes)
+    while len(level) > chainhash.HashSize:
+        if len(level) // chainhash.HashSize % 2 == 1:
+            level += level[-chainhash.HashSize:]
+        level = chainhash.double_hash_pairs(level)
+    return level
+
+
+def main():
+    print("%d CPUs" % (os.cpu_count() or 1))
+    for size in (250, 4096):
+        for count in (1000, 10000, 100000):
+            if size * count > 100 * 1024 * 1024:
+                continue
+            buffers = [os.urandom(size) for _ in range(count)]
+            assert loop(buffers) == chainhash.double_hash_many(buffers)
+            print("%6d x %4d bytes: loop %8.1f ms, double_hash_many %8.1f ms" % (
+                count, size, timed(loop, buffers) * 1000, timed(chainhash.double_hash_many, buffers) * 1000))
+
+    for count in (1000, 10000, 100000):
+        hashes = [chainhash.Hash(os.urandom(32)) for _ in range(count)]
+        assert merkle_node_by_node(hashes)[-1] == merkle_levels(hashes)
+        print("merkle root of %6d: node by node %8.1f ms, levels %8.1f ms" % (
+            count, timed(merkle_node_by_node, hashes) * 1000, timed(merkle_levels, hashes) * 1000))
+
+
+if __name__ == '__main__':
+    main()
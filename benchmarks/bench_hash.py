@@ -0,0 +1,94 @@
+"""chainhash.Hash as a bytes subclass against the previous wrapper class
+holding the bytes in _data: dict inserts and lookups keyed by hash, and
+conversions to and from the display string.
+
+    python -m benchmarks.bench_hash
+"""
+import os
+import timeit
+from chainhash import Hash, HashSize
+
+
+# WrappedHash is the previous implementation of Hash, reduced to what the
+# benchmark uses.
+class WrappedHash:
+    def __init__(self, data=None):
+        if type(data) is bytes:
+            self._data = data
+        elif type(data) is str:
+            self._data = self.str_to_bytes(data)
+        else:
+            self._data = bytes(HashSize)
+
+    def to_str(self):
+        b = bytearray(self._data)
+        for i in range(0, int(HashSize / 2)):
+            b[i], b[HashSize - 1 - i] = b[HashSize - 1 - i], b[i]
+        return b.hex()
+
+    @staticmethod
+    def str_to_bytes(s):
+        if len(s) % 2 != 0:
+            s = '0' + s
+
+        decoded_len = int(len(bytearray(s.encode())) / 2)
+        start_index = HashSize - decoded_len
+
+        reversed_s = bytearray(start_index) + bytearray.fromhex(s)
+
+        result = bytearray(HashSize)
+        for i in range(0, int(HashSize / 2)):
+            result[i], result[HashSize - 1 - i] = reversed_s[HashSize - 1 - i], reversed_s[i]
+        return bytes(result)
+
+    def __eq__(self, other):
+        return type(other) is WrappedHash and self._data == other._data
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash(self._data)
+
+
+def bench(hash_type, raw, repeat=5):
+    hashes = [hash_type(b) for b in raw]
+    lookups = [hash_type(b) for b in raw]
+    strs = [h.to_str() for h in hashes]
+
+    def insert():
+        d = {}
+        for h in hashes:
+            d[h] = None
+        return d
+
+    index = insert()
+
+    def lookup():
+        for h in lookups:
+            index[h]
+
+    def to_str():
+        for h in hashes:
+            h.to_str()
+
+    def from_str():
+        for s in strs:
+            hash_type(s)
+
+    return {name: min(timeit.repeat(f, number=1, repeat=repeat)) / len(raw) * 1e9
+            for name, f in (("dict insert", insert), ("dict lookup", lookup),
+                            ("to_str", to_str), ("from str", from_str))}
+
+
+def main():
+    raw = [os.urandom(HashSize) for _ in range(200000)]
+    old = bench(WrappedHash, raw)
+    new = bench(Hash, raw)
+    print("%-12s %10s %10s" % ("ns/op", "wrapper", "bytes"))
+    for name in old:
+        print("%-12s %10.1f %10.1f  (%.1fx)" % (name, old[name], new[name], old[name] / new[name]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Replying to getheaders from a synthetic best chain, with the headers
+rebuilt from block nodes and encoded one by one against a slice of the
+serialized headers array.
+
+    python -m benchmarks.bench_locate_headers
+"""
+import io
+import time
+import wire
+from blockchain.chain_view import BlockNode, ChainView, HeaderArray
+
+
+def make_chain(num_nodes):
+    nodes = []
+    tip = None
+    for i in range(num_nodes):
+        header = wire.BlockHeader(version=1, bits=0x1d00ffff, timestamp=0x495fab29 + i * 600, nonce=i)
+        if tip is not None:
+            header.prev_block = tip.hash
+        tip = BlockNode.init_from(header, tip)
+        nodes.append(tip)
+    return nodes
+
+
+def encode(msg):
+    w = io.BytesIO()
+    msg.btc_encode(w, wire.ProtocolVersion, wire.BaseEncoding)
+    return w.getvalue()
+
+
+def replies_per_sec(reply, starts, duration=2.0):
+    count = 0
+    begin = time.perf_counter()
+    while time.perf_counter() - begin < duration:
+        for start in starts:
+            reply(start)
+        count += len(starts)
+    return count / (time.perf_counter() - begin)
+
+
+def main():
+    num_nodes = 20000
+    per_msg = wire.MaxBlockHeadersPerMsg
+    nodes = make_chain(num_nodes)
+
+    start = time.perf_counter()
+    view = ChainView.new_from_tip(nodes[-1], header_array=HeaderArray())
+    print("%d headers array built in %.2fs" % (num_nodes, time.perf_counter() - start))
+
+    def from_nodes(height):
+        node = view.node_by_height(height)
+        headers = []
+        for _ in range(per_msg):
+            headers.append(node.header())
+            node = view.next(node)
+        return encode(wire.MsgHeaders(headers=headers))
+
+    def from_array(height):
+        return encode(wire.MsgHeaders.from_entries(view.header_array.entries(height, per_msg)))
+
+    starts = list(range(0, num_nodes - per_msg, per_msg))
+    assert from_nodes(starts[1]) == from_array(starts[1])
+    print("from nodes: %8.1f replies/s" % replies_per_sec(from_nodes, starts))
+    print("from array: %8.1f replies/s" % replies_per_sec(from_array, starts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Throughput of the asyncio message framer (wire.read_message / write_message).
+
+Messages are written and read back over a local socket pair, concurrently.
+
+    python -m benchmarks.bench_message_io
+"""
+import asyncio
+import socket
+import time
+import wire
+from chainhash import Hash
+
+pver = wire.ProtocolVersion
+net = wire.BitcoinNet.MainNet
+
+
+def make_tx(i):
+    return wire.MsgTx(version=1,
+                      tx_ins=[wire.TxIn(previous_out_point=wire.OutPoint(hash=Hash(i.to_bytes(32, "little")), index=0),
+                                        signature_script=bytes(107))],
+                      tx_outs=[wire.TxOut(value=5000, pk_script=bytes(25)), wire.TxOut(value=5000, pk_script=bytes(25))])
+
+
+def make_messages():
+    inv = wire.MsgInv()
+    for i in range(500):
+        inv.add_inv_vect(wire.InvVect(wire.InvType.InvTypeTx, Hash(i.to_bytes(32, "little"))))
+
+    block = wire.MsgBlock(header=wire.BlockHeader(version=1, bits=0x1d00ffff, timestamp=0x495fab29),
+                          transactions=[make_tx(i) for i in range(2000)])
+
+    return [
+        ("inv (500 entries)", inv, 2000),
+        ("tx (1 in, 2 out)", make_tx(1), 5000),
+        ("block (2000 txs)", block, 20),
+    ]
+
+
+async def bench(msg, count):
+    rsock, wsock = socket.socketpair()
+    reader, rwriter = await asyncio.open_connection(sock=rsock)
+    wreader, writer = await asyncio.open_connection(sock=wsock)
+
+    async def write_all():
+        for _ in range(count):
+            await wire.write_message(writer, msg, pver, net)
+
+    start = time.perf_counter()
+    write_task = asyncio.ensure_future(write_all())
+    for _ in range(count):
+        await wire.read_message(reader, pver, net)
+    await write_task
+    elapsed = time.perf_counter() - start
+
+    writer.close()
+    rwriter.close()
+    return elapsed
+
+
+def main():
+    for name, msg, count in make_messages():
+        elapsed = asyncio.run(bench(msg, count))
+        print("{:<20} {:>10.1f} msg/s".format(name, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
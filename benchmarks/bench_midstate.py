@@ -0,0 +1,45 @@
+"""Hashing a block header for a run of nonces, as the CPU miner does: a full
+serialize and double hash per nonce against BlockHeader.hash_with_nonce, which
+reuses the SHA-256 midstate of the first 64 bytes and only hashes the last 16.
+The pure Python finish is shown for reference.
+
+    python -m benchmarks.bench_midstate
+"""
+import timeit
+import wire
+from chainhash import sha256_finish
+from wire.blockheader import blockHeaderTailLayout
+from tests.wire.test_blockheader import mainNetGenesisHash, mainNetGenesisMerkleRoot
+
+
+def main(count=100000, repeat=5):
+    header = wire.BlockHeader(version=1, prev_block=mainNetGenesisHash,
+                              merkle_root=mainNetGenesisMerkleRoot, bits=0x1d00ffff)
+    header.hash_with_nonce(0)
+    m = header._midstate
+
+    def full():
+        for i in range(count):
+            header.nonce = i
+            header.block_hash()
+
+    def with_midstate():
+        for i in range(count):
+            header.hash_with_nonce(i)
+
+    def pure_python():
+        state = m.state()
+        for i in range(count // 100):
+            tail = blockHeaderTailLayout.pack(header.merkle_root[28:], header.timestamp, header.bits, i)
+            sha256_finish(state, tail, wire.MaxBlockHeaderPayload)
+
+    results = (("block_hash", min(timeit.repeat(full, number=1, repeat=repeat)) / count),
+               ("hash_with_nonce", min(timeit.repeat(with_midstate, number=1, repeat=repeat)) / count),
+               ("pure python finish", min(timeit.repeat(pure_python, number=1, repeat=repeat)) / (count // 100)))
+    base = results[0][1]
+    for name, t in results:
+        print("%-20s %10.0f hashes/s  (%.1fx)" % (name, 1 / t, base / t))
+
+
+if __name__ == '__main__':
+    main()
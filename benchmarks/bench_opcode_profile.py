@@ -0,0 +1,57 @@
+"""Executing the scripts of every input of mainnet block 277647 on the generic
+engine, untraced and traced by txscript's opcode profiler, then the profile:
+the opcodes executed and the time they took, by opcode and by the class of
+the script spent.  Signatures are found in a warm signature cache.
+
+    python -m benchmarks.bench_opcode_profile
+"""
+import time
+import txscript
+from tests.blockchain.common import load_blocks, load_utxo_view
+
+
+def run_scripts(txs, view, sig_cache, trace):
+    for tx in txs[1:]:
+        msg_tx = tx.get_msg_tx()
+        for idx, tx_in in enumerate(msg_tx.tx_ins):
+            utxo = view.lookup_entry(tx_in.previous_out_point)
+            vm = txscript.new_engine(utxo.get_pk_script(), msg_tx, idx, txscript.ScriptBip16, sig_cache, None,
+                                     utxo.get_amount(), trace=trace)
+            vm.template_verifier = None
+            vm.execute()
+
+
+def timed(txs, view, sig_cache, trace, count):
+    best = None
+    for _ in range(count):
+        start = time.perf_counter()
+        run_scripts(txs, view, sig_cache, trace)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count=5):
+    txs = load_blocks("277647.dat.bz2")[0].get_transactions()
+    view = load_utxo_view("277647.utxostore.bz2")
+    inputs = sum(len(tx.get_msg_tx().tx_ins) for tx in txs[1:])
+
+    sig_cache = txscript.SigCache(max_entries=2 * inputs)
+    run_scripts(txs, view, sig_cache, None)
+
+    profiler = txscript.OpcodeProfiler()
+    untraced = timed(txs, view, sig_cache, None, count)
+    traced = timed(txs, view, sig_cache, profiler, count)
+
+    # Profile a single run.
+    profiler.reset()
+    run_scripts(txs, view, sig_cache, profiler)
+
+    print("block 277647, %d transactions, %d inputs" % (len(txs), inputs))
+    print("untraced %7.1f ms  profiled %7.1f ms" % (untraced * 1e3, traced * 1e3))
+    print()
+    print(profiler.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Per-object memory of outpoints, inputs and outputs, and outpoint dict lookups.
+
+Memory is measured with tracemalloc while building many objects, so it
+includes the instance, its attribute storage and the cached hash key, but
+not the shared chainhash.Hash / script bytes.
+
+    python -m benchmarks.bench_outpoint_memory
+"""
+import time
+import tracemalloc
+import wire
+from chainhash import Hash
+
+count = 200000
+
+
+def measure(make, items):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [make(item) for item in items]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Remove the list itself from the total.
+    return (after - before - 8 * len(objs)) / len(objs), objs
+
+
+def main():
+    hashes = [Hash(i.to_bytes(32, "little")) for i in range(count)]
+    script = bytes(25)
+
+    per_op, ops = measure(lambda h: wire.OutPoint(hash=h, index=0), hashes)
+    per_in, _ = measure(lambda op: wire.TxIn(previous_out_point=op, signature_script=script), ops)
+    per_out, _ = measure(lambda h: wire.TxOut(value=5000, pk_script=script), hashes)
+    print("OutPoint: %6.1f bytes/object" % per_op)
+    print("TxIn:     %6.1f bytes/object (excluding outpoint)" % per_in)
+    print("TxOut:    %6.1f bytes/object" % per_out)
+
+    entries = {op: None for op in ops}
+    lookups = [wire.OutPoint(hash=h, index=0) for h in hashes]
+    start = time.perf_counter()
+    for op in lookups:
+        entries[op]
+    elapsed = time.perf_counter() - start
+    print("dict lookup: %.0f ns/lookup" % (elapsed / count * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Parsing the public keys and signatures of a block's inputs the way the
+signature checking opcodes do, with and without txscript's parse caches.  The
+block is shaped like real ones with heavy key reuse: a few keys (exchanges,
+pools) spend most of the inputs.
+
+    python -m benchmarks.bench_parse_cache
+"""
+import hashlib
+import random
+import time
+import btcec
+from txscript.parse_cache import ParseCache, defaultPubKeyCacheEntries, defaultSigCacheEntries
+
+
+def make_inputs(count, keys, seed=0):
+    rand = random.Random(seed)
+    privs = [btcec.SigningKey.from_secret_exponent(i + 1, curve=btcec.SECP256k1) for i in range(keys)]
+    # Zipf-like: key i is picked with weight 1 / (i + 1).
+    weights = [1 / (i + 1) for i in range(keys)]
+    inputs = []
+    for i in range(count):
+        priv = rand.choices(privs, weights)[0]
+        point = priv.get_verifying_key().pubkey.point
+        raw_key = bytes([btcec.PubkeyCompressed | (point.y() & 1)]) + point.x().to_bytes(32, 'big')
+        hash = hashlib.sha256(i.to_bytes(4, 'big')).digest()
+        sig = priv.sign_digest_deterministic(hash, hashfunc=hashlib.sha256,
+                                             sigencode=lambda r, s, order: der(r, s))
+        inputs.append((raw_key, sig))
+    return inputs
+
+
+def der(r, s):
+    def encode_int(i):
+        b = i.to_bytes((i.bit_length() + 8) // 8, 'big')
+        return bytes([0x02, len(b)]) + b
+
+    body = encode_int(r) + encode_int(s)
+    return bytes([0x30, len(body)]) + body
+
+
+def main(count=200, keys=30):
+    inputs = make_inputs(count, keys)
+
+    start = time.perf_counter()
+    for raw_key, sig in inputs:
+        btcec.parse_pub_key(raw_key, btcec.s256())
+        btcec.parse_der_signature(sig, btcec.s256())
+    uncached = time.perf_counter() - start
+
+    key_cache = ParseCache(lambda raw: btcec.parse_pub_key(raw, btcec.s256()), defaultPubKeyCacheEntries)
+    sig_cache = ParseCache(lambda raw: btcec.parse_der_signature(raw, btcec.s256()), defaultSigCacheEntries)
+    start = time.perf_counter()
+    for raw_key, sig in inputs:
+        key_cache.parse(raw_key)
+        sig_cache.parse(sig)
+    cached = time.perf_counter() - start
+
+    print("%d inputs, %d distinct keys" % (count, len(set(k for k, _ in inputs))))
+    print("uncached  %8.2f ms/input" % (uncached / count * 1e3))
+    print("cached    %8.2f ms/input  (%.1fx), key hits/misses %d/%d" %
+          ((cached / count * 1e3, uncached / cached) + key_cache.stats()))
+
+
+if __name__ == '__main__':
+    main()
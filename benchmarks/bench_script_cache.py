@@ -0,0 +1,78 @@
+"""The script work of validating a block and of accepting its transactions to
+the mempool, with and without txscript's parsed script cache: signature
+operation counting and running the script engine over every input of mainnet
+block 277647.  Signatures are found in a warm signature cache, as they are for
+a block whose transactions were accepted to the mempool, so the timings are
+those of parsing and inspecting scripts rather than verifying signatures.
+
+    python -m benchmarks.bench_script_cache
+"""
+import time
+import blockchain
+import txscript
+from tests.blockchain.common import load_blocks, load_utxo_view
+
+# Mempool acceptance runs the standard flags, less the low S rule this 2013
+# block predates.
+mempoolFlags = txscript.StandardVerifyFlags & ~txscript.ScriptVerifyLowS
+
+
+def run_scripts(tx, view, flags, sig_cache):
+    msg_tx = tx.get_msg_tx()
+    for idx, tx_in in enumerate(msg_tx.tx_ins):
+        utxo = view.lookup_entry(tx_in.previous_out_point)
+        vm = txscript.new_engine(utxo.get_pk_script(), msg_tx, idx, flags, sig_cache, None, utxo.get_amount())
+        vm.execute()
+
+
+def validate_block(txs, view, sig_cache):
+    for tx in txs:
+        blockchain.count_sig_ops(tx)
+    for tx in txs[1:]:
+        blockchain.get_sig_op_cost(tx, False, view, True, True)
+        run_scripts(tx, view, txscript.ScriptBip16, sig_cache)
+
+
+def accept_to_mempool(txs, view, sig_cache):
+    for tx in txs[1:]:
+        for tx_out in tx.get_msg_tx().tx_outs:
+            txscript.is_unspendabe(tx_out.pk_script)
+        blockchain.get_sig_op_cost(tx, False, view, True, True)
+        run_scripts(tx, view, mempoolFlags, sig_cache)
+
+
+def timed(f, txs, view, sig_cache, count):
+    best = None
+    for _ in range(count):
+        txscript.scriptCache.clear()
+        start = time.perf_counter()
+        f(txs, view, sig_cache)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count=5):
+    txs = load_blocks("277647.dat.bz2")[0].get_transactions()
+    view = load_utxo_view("277647.utxostore.bz2")
+    inputs = sum(len(tx.get_msg_tx().tx_ins) for tx in txs[1:])
+
+    sig_cache = txscript.SigCache(max_entries=2 * inputs)
+    accept_to_mempool(txs, view, sig_cache)
+
+    print("block 277647, %d transactions, %d inputs" % (len(txs), inputs))
+    for name, f in (("block validation", validate_block), ("mempool acceptance", accept_to_mempool)):
+        max_entries = txscript.scriptCache.max_entries
+        txscript.scriptCache.max_entries = 0
+        try:
+            uncached = timed(f, txs, view, sig_cache, count)
+        finally:
+            txscript.scriptCache.max_entries = max_entries
+        cached = timed(f, txs, view, sig_cache, count)
+
+        print("%-18s  uncached %7.1f ms  cached %7.1f ms  (%.2fx)" %
+              (name, uncached * 1e3, cached * 1e3, uncached / cached))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Signing transaction inputs the way a wallet does: python-ecdsa's
+deterministic signing against txscript's RFC6979 signer, then whole
+transactions with sign_tx_batch, in place and over a process pool.
+
+    python -m benchmarks.bench_sign
+"""
+import hashlib
+import os
+import time
+import ecdsa.util
+import btcec
+import chainhash
+import wire
+from txscript import *
+
+
+def make_items(count, inputs_per_tx=2):
+    items = []
+    for i in range(count):
+        tx = wire.MsgTx(version=1, tx_outs=[wire.TxOut(value=1000, pk_script=bytes([OP_TRUE]))])
+        inputs = []
+        for j in range(inputs_per_tx):
+            key = btcec.PrivateKey.from_secret_exponent(i * inputs_per_tx + j + 1, curve=btcec.SECP256k1)
+            point = key.get_verifying_key().pubkey.point
+            raw_key = bytes([btcec.PubkeyCompressed | (point.y() & 1)]) + point.x().to_bytes(32, 'big')
+            if j % 2:
+                pk_script = pay_to_witness_pub_key_hash_script(btcec.hash160(raw_key))
+            else:
+                pk_script = pay_to_pub_key_hash_script(btcec.hash160(raw_key))
+            inputs.append((pk_script, 5000, key))
+            tx.tx_ins.append(wire.TxIn(previous_out_point=wire.OutPoint(
+                hash=chainhash.Hash(hashlib.sha256(bytes([i % 256, j])).digest()), index=j)))
+        items.append((tx, inputs))
+    return items
+
+
+def main(count=40):
+    keys = [btcec.PrivateKey.from_secret_exponent(i + 1, curve=btcec.SECP256k1) for i in range(count)]
+    hashes = [hashlib.sha256(i.to_bytes(4, 'big')).digest() for i in range(count)]
+
+    start = time.perf_counter()
+    for key, hash in zip(keys, hashes):
+        key.sign_digest_deterministic(hash, hashfunc=hashlib.sha256, sigencode=ecdsa.util.sigencode_der_canonize)
+    ecdsa_time = time.perf_counter() - start
+
+    # Build the precomputed table of G before timing.
+    btcec.sign_rfc6979(1, hashes[0])
+    start = time.perf_counter()
+    for key, hash in zip(keys, hashes):
+        btcec.sign_rfc6979(key.privkey.secret_multiplier, hash).serialize()
+    rfc6979_time = time.perf_counter() - start
+
+    print("python-ecdsa  %8.2f ms/sig" % (ecdsa_time / count * 1e3))
+    print("rfc6979       %8.2f ms/sig  (%.1fx)" % (rfc6979_time / count * 1e3, ecdsa_time / rfc6979_time))
+
+    workers = os.cpu_count() or 1
+    for w in sorted({1, workers}):
+        items = make_items(count * 4)
+        start = time.perf_counter()
+        sign_tx_batch(items, workers=w)
+        elapsed = time.perf_counter() - start
+        print("sign_tx_batch workers=%d  %8.2f ms/input" % (w, elapsed / (count * 8) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Running the script engine over every input of mainnet block 277647, all of
+them P2PKH, with txscript's template verifiers and with the generic engine
+alone.  Signatures are found in a warm signature cache, as they are for a
+block whose transactions were accepted to the mempool, so the timings are
+those of executing the scripts rather than verifying signatures.
+
+    python -m benchmarks.bench_template_verify
+"""
+import time
+import txscript
+from tests.blockchain.common import load_blocks, load_utxo_view
+
+# Mempool acceptance runs the standard flags, less the low S rule this 2013
+# block predates.
+mempoolFlags = txscript.StandardVerifyFlags & ~txscript.ScriptVerifyLowS
+
+
+def run_scripts(engines):
+    for vm in engines:
+        vm.execute()
+
+
+def make_engines(txs, view, flags, sig_cache, generic):
+    engines = []
+    for tx in txs[1:]:
+        msg_tx = tx.get_msg_tx()
+        for idx, tx_in in enumerate(msg_tx.tx_ins):
+            utxo = view.lookup_entry(tx_in.previous_out_point)
+            vm = txscript.new_engine(utxo.get_pk_script(), msg_tx, idx, flags, sig_cache, None, utxo.get_amount())
+            if generic:
+                vm.template_verifier = None
+            engines.append(vm)
+    return engines
+
+
+def timed(txs, view, flags, sig_cache, generic, count):
+    best = None
+    for _ in range(count):
+        engines = make_engines(txs, view, flags, sig_cache, generic)
+        start = time.perf_counter()
+        run_scripts(engines)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count=5):
+    txs = load_blocks("277647.dat.bz2")[0].get_transactions()
+    view = load_utxo_view("277647.utxostore.bz2")
+    inputs = sum(len(tx.get_msg_tx().tx_ins) for tx in txs[1:])
+
+    sig_cache = txscript.SigCache(max_entries=2 * inputs)
+    run_scripts(make_engines(txs, view, mempoolFlags, sig_cache, True))
+
+    print("block 277647, %d transactions, %d inputs" % (len(txs), inputs))
+    for name, flags in (("block validation", txscript.ScriptBip16), ("mempool acceptance", mempoolFlags)):
+        generic = timed(txs, view, flags, sig_cache, True, count)
+        template = timed(txs, view, flags, sig_cache, False, count)
+        print("%-18s  generic %7.1f ms  template %7.1f ms  (%.2fx)" %
+              (name, generic * 1e3, template * 1e3, generic / template))
+
+
+if __name__ == '__main__':
+    main()
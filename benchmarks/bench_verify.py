@@ -0,0 +1,41 @@
+"""Signature verifications per second of each btcec verifier backend available
+on the machine.  The in tree Python backend is measured with distinct keys and
+with a single hot key, which gets a precomputed comb.  Set SECP256K1_LIB to the path of libsecp256k1 if it is not
+installed where it can be found.
+
+    python -m benchmarks.bench_verify
+"""
+import time
+import btcec
+from tests.btcec.test_verifier import make_vector
+
+
+def bench(v, vectors, seconds=2.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for hash, sig, pub_key in vectors:
+            v.verify(hash, sig, pub_key)
+        count += len(vectors)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    vectors = [make_vector(i + 1, i.to_bytes(4, 'big')) for i in range(20)]
+    hot_vectors = [make_vector(1, i.to_bytes(4, 'big')) for i in range(20)]
+    runs = [("ecdsa", btcec.EcdsaVerifier(), vectors),
+            ("python", btcec.PythonVerifier(tables=None), vectors),
+            ("python hot key", btcec.PythonVerifier(btcec.KeyTables()), hot_vectors)]
+    v = btcec.load_secp256k1_verifier()
+    if v is not None:
+        runs.append((v.name, v, vectors))
+
+    base = None
+    for name, v, vecs in runs:
+        rate = bench(v, vecs)
+        base = base or rate
+        print("%-16s %10.0f verify/s  (%.1fx)" % (name, rate, rate / base))
+
+
+if __name__ == '__main__':
+    main()
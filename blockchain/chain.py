@@ -102,7 +102,8 @@ class IndexManager:
 class Config:
     def __init__(self, db, chain_params, time_source,
                  interrupt=None, checkpoints=None,
-                 sig_cache=None, index_manager=None, hash_cache=None):
+                 sig_cache=None, index_manager=None, hash_cache=None,
+                 header_array_path=None):
         """
 
         :param database.DB db:
@@ -113,6 +114,7 @@ class Config:
         :param *txscript.SigCache sig_cache:
         :param IndexManager index_manager:
         :param *txscript.HashCache hash_cache:
+        :param str header_array_path:
         """
         # DB defines the database which houses the blocks and will be used to
         # store all metadata created by this package such as the utxo set.
@@ -175,6 +177,13 @@ class Config:
         # signature cache.
         self.hash_cache = hash_cache or None
 
+        # HeaderArrayPath is the file backing the array of serialized best
+        # chain headers that headers replies are sliced from.  The file is
+        # rewritten from the chain state on startup.
+        #
+        # This field can be nil to keep the array in memory.
+        self.header_array_path = header_array_path
+
     # Make a new chain from this config
     def new_block_chain(self):
         # Enforce required config fields
@@ -215,29 +224,33 @@ class Config:
             blocks_per_retarget=target_timespan // target_time_per_block,
             index=BlockIndex(self.db, self.chain_params),
             hash_cache=self.hash_cache,
-            best_chain=ChainView.new_from_tip(tip=None),
+            best_chain=ChainView.new_from_tip(tip=None, header_array=HeaderArray(self.header_array_path)),
             orphans={},
             prev_orphans=defaultdict(list),
             warning_caches=ThresholdStateCache.new_many_caches(vbNumBits),
             deployment_caches=ThresholdStateCache.new_many_caches(chaincfg.DefinedDeployments),
         )
 
-        # Initialize the chain state from the passed database.  When the db
-        # does not yet contain any chain state, both it and the chain state
-        # will be initialized to contain only the genesis block.
-        block_chain._init_chain_state()
+        try:
+            # Initialize the chain state from the passed database.  When the db
+            # does not yet contain any chain state, both it and the chain state
+            # will be initialized to contain only the genesis block.
+            block_chain._init_chain_state()
 
-        # Perform any upgrades to the various chain-specific buckets as needed.
-        block_chain._maybe_upgrade_db_buckets(self.interrupt)
+            # Perform any upgrades to the various chain-specific buckets as needed.
+            block_chain._maybe_upgrade_db_buckets(self.interrupt)
 
-        # Initialize and catch up all of the currently active optional indexes
-        # as needed.
-        if self.index_manager is not None:
-            # self.index_manager.init  # TODO
-            pass
+            # Initialize and catch up all of the currently active optional indexes
+            # as needed.
+            if self.index_manager is not None:
+                # self.index_manager.init  # TODO
+                pass
 
-        # Initialize rule change threshold state caches.
-        block_chain._init_threshold_caches()
+            # Initialize rule change threshold state caches.
+            block_chain._init_threshold_caches()
+        except Exception:
+            block_chain.close()
+            raise
 
         best_node = block_chain.best_chain.tip()
         logger.info("Chain state (height %d, hash %s, totaltx %d, work %s)" % (
@@ -1559,6 +1572,12 @@ class BlockChain:
         if total == 0:
             return None
 
+        # Decode the headers from the serialized best chain headers when they
+        # are kept.  The stop hash alone may name a block off the best chain,
+        # which is not in them.
+        if self.best_chain.header_array is not None and self.best_chain.contains(node):
+            return wire.MsgHeaders.from_entries(self.best_chain.header_array.entries(node.height, total)).headers
+
         # Populate and return the found headers
         headers = []
         for _ in range(total):
@@ -1586,6 +1605,51 @@ class BlockChain:
         self.chain_lock.r_unlock()
         return hashes
 
+    # locateHeadersMsg returns the headers message replying to a getheaders
+    # request with the given locator and stop hash.  When the serialized best
+    # chain headers are kept, the reply is a single slice of them which is
+    # written out as it is, without building or encoding any header.
+    #
+    # This function MUST be called with the chain state lock held (for reads).
+    def _locate_headers_msg(self, locator: BlockLocator, hash_stop: chainhash.Hash,
+                            max_headers: int) -> wire.MsgHeaders:
+        node, total = self._locate_inventory(locator, hash_stop, max_headers)
+        if total == 0:
+            return wire.MsgHeaders()
+
+        header_array = self.best_chain.header_array
+        if header_array is None or not self.best_chain.contains(node):
+            return wire.MsgHeaders(headers=self._locate_headers(locator, hash_stop, max_headers))
+
+        return wire.MsgHeaders.from_entries(header_array.entries(node.height, total))
+
+    # LocateHeadersMsg returns the headers message replying to a getheaders
+    # request, with the same headers LocateHeaders returns.  A request matching
+    # no header yields an empty message.
+    #
+    # This function is safe for concurrent access.
+    def locate_headers_msg(self, locator: BlockLocator, hash_stop: chainhash.Hash) -> wire.MsgHeaders:
+        self.chain_lock.r_lock()
+        msg = self._locate_headers_msg(locator, hash_stop, wire.MaxBlockHeadersPerMsg)
+        self.chain_lock.r_unlock()
+        return msg
+
+    # Close releases the file backing the header array of the best chain, if
+    # any.  Headers replies are built from the block index afterwards, so the
+    # chain stays usable; callers close it once they are done with it, before
+    # closing its database.
+    #
+    # This function is safe for concurrent access.
+    def close(self):
+        self.chain_lock.lock()
+        try:
+            header_array = self.best_chain.header_array
+            if header_array is not None:
+                self.best_chain.header_array = None
+                header_array.close()
+        finally:
+            self.chain_lock.unlock()
+
     # ------------------------------------
     # Methods add from threshold_state
     # ------------------------------------
@@ -2141,6 +2205,48 @@ class BlockChain:
             logger.warning("Exception happens in process block: %s" % e2)
             return False, False
 
+    # CheckHeadersMsg performs the context free checks of the headers of a
+    # headers message received during headers-first sync, before their blocks
+    # are requested: each header must build on the one before it, have a proof
+    # of work within the limits and match the checkpoint at its height when
+    # the parent of the first one is known.  The proof of work of the whole
+    # batch is checked at once, from hashes computed over the received bytes
+    # (see wire.MsgHeaders.block_hashes).  It returns the block hashes.
+    #
+    # The flags modify the behavior of this function as follows:
+    #  - BFNoPoWCheck: The check to ensure the block hashes are less than their
+    #    target difficulty is not performed.
+    #
+    # This function is safe for concurrent access.
+    def check_headers_msg(self, msg: wire.MsgHeaders, flags: BehaviorFlags) -> [chainhash.Hash]:
+        # The hashes are computed before the headers are built from the
+        # message, so they come from its bytes.
+        hashes = msg.block_hashes()
+        headers = msg.headers
+        if len(headers) == 0:
+            return hashes
+
+        check_headers_proof_of_work(headers, hashes, self.chain_params.pow_limit, flags)
+
+        for i in range(1, len(headers)):
+            if headers[i].prev_block != hashes[i - 1]:
+                msg = "header %s does not build on the header %s before it" % (hashes[i], hashes[i - 1])
+                raise RuleError(ErrorCode.ErrPreviousBlockUnknown, msg)
+
+        self.chain_lock.r_lock()
+        try:
+            prev_node = self.index.lookup_node(headers[0].prev_block)
+            if prev_node is not None:
+                for i, hash in enumerate(hashes):
+                    height = prev_node.height + 1 + i
+                    if not self._verify_checkpoint(height, hash):
+                        msg = "block at height %d does not match checkpoint hash" % height
+                        raise RuleError(ErrorCode.ErrBadCheckpoint, msg)
+        finally:
+            self.chain_lock.r_unlock()
+
+        return hashes
+
     # ------------------------------------
     # END
     # ------------------------------------
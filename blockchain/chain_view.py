@@ -1,5 +1,6 @@
 import threading
 from .block_node import *
+from .header_array import *
 
 
 # BlockLocator is used to help locate a specific block.  The algorithm for
@@ -31,19 +32,25 @@ class BlockLocator(list):
 # The chain view for the branch ending in 6a consists of:
 #   genesis -> 1 -> 2 -> 3 -> 4a -> 5a -> 6a
 class ChainView:
-    def __init__(self, lock=None, nodes=None):
+    def __init__(self, lock=None, nodes=None, header_array=None):
         """
 
         :param threading.Lock lock:
         :param []*blockNode nodes:
+        :param HeaderArray header_array:
         """
         self.lock = lock or threading.Lock()
         self.nodes = nodes or []
 
+        # The serialized headers of the nodes of the view, kept in sync on
+        # every tip change when set.
+        self.header_array = header_array
+        self._sync_header_array(0)
+
     @classmethod
-    def new_from_tip(cls, tip: BlockNode or None):
+    def new_from_tip(cls, tip: BlockNode or None, header_array=None):
         # The mutex is intentionally not held since this is a constructor.
-        c = cls()
+        c = cls(header_array=header_array)
         c._set_tip(tip)
         return c
 
@@ -99,6 +106,7 @@ class ChainView:
     def _set_tip(self, node: BlockNode or None):
         if node is None:
             self.nodes = []
+            self._sync_header_array(0)
             return
 
         # Change self.nodes length to fit with node.height
@@ -111,12 +119,31 @@ class ChainView:
 
         # let's fill self.nodes, until we meet some node that right index as we need
         # so we assume it and every node before it is all we need
+        first_changed = needed
         while node is not None and self.nodes[node.height] != node:
             self.nodes[node.height] = node
+            first_changed = node.height
             node = node.parent
 
+        self._sync_header_array(first_changed)
         return
 
+    # syncHeaderArray makes the header array of the view, if any, match its
+    # nodes again after the nodes at and above the given height were replaced
+    # or removed.  The records of the replaced nodes are dropped and the headers
+    # of the new nodes appended in a single write.
+    #
+    # This function MUST be called with the view mutex locked (for writes).
+    def _sync_header_array(self, first_changed: int):
+        header_array = self.header_array
+        if header_array is None:
+            return
+
+        header_array.truncate(first_changed)
+        if len(header_array) < len(self.nodes):
+            header_array.extend(b''.join(header_array_entry(node)
+                                         for node in self.nodes[len(header_array):]))
+
     # SetTip sets the chain view to use the provided block node as the current tip
     # and ensures the view is consistent by populating it with the nodes obtained
     # by walking backwards all the way to genesis block as necessary.  Further
@@ -56,6 +56,14 @@ def compact_to_big(compact: int) -> int:
     return bn
 
 
+# compact_to_big_many converts a sequence of compact values, as found in a
+# batch of headers.  The headers of a batch share very few distinct difficulty
+# bits, so each distinct value is only converted once.
+def compact_to_big_many(compacts) -> [int]:
+    targets = {compact: compact_to_big(compact) for compact in set(compacts)}
+    return [targets[compact] for compact in compacts]
+
+
 def calc_bytes_len(n: int) -> int:
     return max(1, (n.bit_length() + 7) // 8)
 
@@ -0,0 +1,105 @@
+import io
+import mmap
+import wire
+
+# headerArrayEntryLen is the size of one record of a HeaderArray.  Records are
+# stored exactly as they appear in a headers message: the serialized block
+# header followed by the always 0 transaction count.
+headerArrayEntryLen = wire.headersEntryLen
+
+
+# header_array_entry returns the record of the header of the given block node.
+def header_array_entry(node) -> bytes:
+    return wire.pack_block_header(node.header()) + b'\x00'
+
+
+# HeaderArray is an append only array of the serialized headers of a chain,
+# indexed by height.  It is kept in sync with the best chain view so a headers
+# reply for a range of heights is a single slice of it, with no header to
+# rebuild or encode.
+#
+# The records are held in memory, or in the file at path (mapped for reads)
+# when one is given.  The file is rewritten from the chain view on startup, so
+# it never has to be trusted across restarts.
+class HeaderArray:
+    def __init__(self, path=None):
+        self.path = path
+        self.count = 0
+        self._buf = bytearray()
+        self._file = None
+        self._map = None
+        if path is not None:
+            self._file = open(path, 'w+b')
+
+    def __len__(self):
+        return self.count
+
+    # extend appends the given serialized records to the array.
+    def extend(self, entries):
+        if len(entries) % headerArrayEntryLen != 0:
+            raise ValueError("header array entries length %d is not a multiple of %d" %
+                             (len(entries), headerArrayEntryLen))
+
+        if self._file is None:
+            self._buf += entries
+        else:
+            self._file.seek(self.count * headerArrayEntryLen)
+            self._file.write(entries)
+            self._file.flush()
+        self.count += len(entries) // headerArrayEntryLen
+
+    # append appends the record of the header of the given block node, which
+    # must be at height len(self).
+    def append(self, node):
+        if node.height != self.count:
+            raise ValueError("header array append of height %d at height %d" % (node.height, self.count))
+        self.extend(header_array_entry(node))
+
+    # truncate drops the records at and above the given height, which is how a
+    # reorg rewinds the array before the headers of the new branch are appended.
+    def truncate(self, height):
+        if height >= self.count:
+            return
+
+        self.count = max(height, 0)
+        if self._file is None:
+            del self._buf[self.count * headerArrayEntryLen:]
+        else:
+            self._unmap()
+            self._file.truncate(self.count * headerArrayEntryLen)
+
+    # entries returns the records of count headers starting at the given height
+    # as one bytes object.
+    def entries(self, height, count) -> bytes:
+        end = min(height + count, self.count)
+        if height < 0 or height >= end:
+            return b''
+
+        start_offset = height * headerArrayEntryLen
+        end_offset = end * headerArrayEntryLen
+        if self._file is None:
+            return bytes(memoryview(self._buf)[start_offset:end_offset])
+
+        if self._map is None or len(self._map) < end_offset:
+            self._unmap()
+            self._map = mmap.mmap(self._file.fileno(), self.count * headerArrayEntryLen, access=mmap.ACCESS_READ)
+        return self._map[start_offset:end_offset]
+
+    # header returns the block header at the given height, or None when the
+    # array holds no header at it.
+    def header(self, height) -> wire.BlockHeader or None:
+        entry = self.entries(height, 1)
+        if not entry:
+            return None
+        return wire.read_block_header(io.BytesIO(entry), 0)
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def close(self):
+        self._unmap()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -571,15 +571,19 @@ class AddrIndex(Indexer, NeedsInputser):
     # in the passed block and maps each of them to the associated transaction using
     # the passed map.
     def index_block(self, data: WriteIndexData, block: btcutil.Block, stxos: [blockchain.SpentTxOut]):
+        # The input counts and output scripts are read from the skim of the
+        # serialized block, which the connect and disconnect paths also use
+        # for the transaction locations.
+        skim = block.skim()
 
         stox_index = 0
-        for tx_idx, tx in enumerate(block.get_transactions()):
+        for tx_idx in range(skim.num_txs()):
             # Coinbases do not reference any inputs.  Since the block is
             # required to have already gone through full validation, it has
             # already been proven on the first transaction in the block is
             # a coinbase.
             if tx_idx != 0:
-                for _ in tx.get_msg_tx().tx_ins:
+                for _ in skim.tx_in_range(tx_idx):
                     # We'll access the slice of all the
                     # transactions spent in this block properly
                     # ordered to fetch the previous input script.
@@ -590,8 +594,8 @@ class AddrIndex(Indexer, NeedsInputser):
                     # stxo coutner.
                     stox_index += 1
 
-            for tx_out in tx.get_msg_tx().tx_outs:
-                self.index_pk_script(data, tx_out.pk_script, tx_idx)
+            for out_idx in skim.tx_out_range(tx_idx):
+                self.index_pk_script(data, skim.out_script(out_idx), tx_idx)
 
         return
 
@@ -0,0 +1,289 @@
+import multiprocessing
+import database
+import btcutil
+import chainhash
+import chaincfg
+import wire
+import blockchain
+from btcutil import gcs
+from .common import *
+
+# cfIndexName is the human-readable name for the index.
+cfIndexName = "committed filter index"
+
+# Committed filters come in one flavor currently: basic. They are generated
+# and dropped in pairs, and both are indexed by a block's hash.  Besides
+# holding different content, they also live in different buckets.
+
+# cfIndexParentBucketKey is the name of the parent bucket used to house the
+# index. The rest of the buckets live below this bucket.
+cfIndexParentBucketKey = b"cfindexparentbucket"
+
+# cfIndexKeys is an array of db bucket names used to house indexes of
+# block hashes to cfilters.
+cfIndexKeys = [b"cf0byhashidx"]
+
+# cfHeaderKeys is an array of db bucket names used to house indexes of
+# block hashes to cf headers.
+cfHeaderKeys = [b"cf0headerbyhashidx"]
+
+# cfHashKeys is an array of db bucket names used to house indexes of
+# block hashes to cf hashes.
+cfHashKeys = [b"cf0hashbyhashidx"]
+
+maxFilterType = wire.GCSFilterRegular
+
+# catchUpBatchSize is the number of blocks catch_up reads, builds filters for
+# and stores per database transaction.
+catchUpBatchSize = 100
+
+
+# dbFetchFilterIdxEntry retrieves a data blob from the filter index database.
+# An entry's absence is not considered an error.
+def db_fetch_filter_idx_entry(db_tx: database.Tx, key: bytes, h: chainhash.Hash) -> bytes or None:
+    idx = db_tx.metadata().bucket(cfIndexParentBucketKey).bucket(key)
+    return idx.get(h.to_bytes())
+
+
+# dbStoreFilterIdxEntry stores a data blob in the filter index database.
+def db_store_filter_idx_entry(db_tx: database.Tx, key: bytes, h: chainhash.Hash, f: bytes):
+    idx = db_tx.metadata().bucket(cfIndexParentBucketKey).bucket(key)
+    idx.put(h.to_bytes(), f)
+    return
+
+
+# dbDeleteFilterIdxEntry deletes a data blob from the filter index database.
+def db_delete_filter_idx_entry(db_tx: database.Tx, key: bytes, h: chainhash.Hash):
+    idx = db_tx.metadata().bucket(cfIndexParentBucketKey).bucket(key)
+    idx.delete(h.to_bytes())
+    return
+
+
+# build_basic_filter_bytes builds the serialized basic filter of a serialized
+# block from the serialized spend journal entry of the block.  Both are raw
+# bytes and the result only depends on them, so it runs unchanged in the
+# worker processes of CfIndex.catch_up.
+def build_basic_filter_bytes(args) -> bytes:
+    serialized_block, serialized_stxos = args
+    skim = wire.skim_block(serialized_block)
+
+    # The coinbase spends nothing, so the spend journal has an entry for every
+    # other input of the block.
+    num_stxos = skim.num_tx_ins() - len(skim.tx_in_range(0))
+    prev_scripts = blockchain.deserialize_spend_journal_scripts(serialized_stxos, num_stxos)
+    return gcs.build_basic_filter_from_skim(skim, prev_scripts).n_bytes()
+
+
+# CfIndex implements a committed filter (cf) by hash index.
+class CfIndex(Indexer, NeedsInputser):
+    def __init__(self, db: database.DB, chain_params: chaincfg.Params):
+        self.db = db
+        self.chain_params = chain_params
+
+    # NeedsInputs signals that the index requires the referenced inputs in order
+    # to properly create the index.
+    #
+    # This implements the NeedsInputser interface.
+    def need_inputs(self) -> bool:
+        return True
+
+    # Init initializes the hash-based cf index. This is part of the Indexer
+    # interface.
+    def init(self):
+        return
+
+    # Key returns the database key to use for the index as a byte slice. This is
+    # part of the Indexer interface.
+    def key(self) -> bytes:
+        return cfIndexParentBucketKey
+
+    # Name returns the human-readable name of the index. This is part of the
+    # Indexer interface.
+    def name(self) -> str:
+        return cfIndexName
+
+    # Create is invoked when the indexer manager determines the index needs to
+    # be created for the first time. It creates buckets for the two hash-based cf
+    # indexes (regular only currently).
+    def create(self, db_tx: database.Tx):
+        cf_index_parent_bucket = db_tx.metadata().create_bucket(cfIndexParentBucketKey)
+        for key in cfIndexKeys + cfHeaderKeys + cfHashKeys:
+            cf_index_parent_bucket.create_bucket(key)
+        return
+
+    # storeFilter stores a given filter, and performs the steps needed to
+    # generate the filter's header.
+    def store_filter(self, db_tx: database.Tx, block_hash: chainhash.Hash, prev_block: chainhash.Hash,
+                     filter_bytes: bytes, filter_type: int):
+        if filter_type > maxFilterType:
+            raise ValueError("unsupported filter type {}".format(filter_type))
+
+        # Figure out which buckets to use.
+        fkey = cfIndexKeys[filter_type]
+        hkey = cfHeaderKeys[filter_type]
+        hashkey = cfHashKeys[filter_type]
+
+        # Start by storing the filter.
+        db_store_filter_idx_entry(db_tx, fkey, block_hash, filter_bytes)
+
+        # Next store the filter hash.
+        filter_hash = chainhash.double_hash_h(filter_bytes)
+        db_store_filter_idx_entry(db_tx, hashkey, block_hash, filter_hash.to_bytes())
+
+        # Then fetch the previous block's filter header.
+        if prev_block == chainhash.Hash():
+            prev_header = chainhash.Hash()
+        else:
+            pfh = db_fetch_filter_idx_entry(db_tx, hkey, prev_block)
+            if pfh is None:
+                raise database.DBError(database.ErrorCode.ErrCorruption,
+                                       "no filter header for block %s" % prev_block)
+            prev_header = chainhash.Hash(bytes(pfh))
+
+        # Construct the new block's filter header, and store it.
+        fh = gcs.make_header_for_filter_hash(filter_hash, prev_header)
+        db_store_filter_idx_entry(db_tx, hkey, block_hash, fh.to_bytes())
+        return
+
+    # ConnectBlock is invoked by the index manager when a new block has been
+    # connected to the main chain. This indexer adds a hash-to-cf mapping for
+    # every passed block. This is part of the Indexer interface.
+    def connect_block(self, db_tx: database.Tx, block: btcutil.Block, stxos: [blockchain.SpentTxOut]):
+        prev_scripts = [stxo.pk_script for stxo in stxos]
+        f = gcs.build_basic_filter_from_skim(block.skim(), prev_scripts)
+        self.store_filter(db_tx, block.hash(), block.get_msg_block().header.prev_block, f.n_bytes(),
+                          wire.GCSFilterRegular)
+        return
+
+    # DisconnectBlock is invoked by the index manager when a block has been
+    # disconnected from the main chain.  This indexer removes the hash-to-cf
+    # mapping for every passed block. This is part of the Indexer interface.
+    def disconnect_block(self, db_tx: database.Tx, block: btcutil.Block, stxos: [blockchain.SpentTxOut]):
+        for key in cfIndexKeys + cfHeaderKeys + cfHashKeys:
+            db_delete_filter_idx_entry(db_tx, key, block.hash())
+        return
+
+    # catch_up indexes the blocks identified by hashes, in chain order, the
+    # first one being the genesis block or a child of an indexed block.  It is
+    # meant for building the index of an existing chain.
+    #
+    # The serialized blocks and spend journal entries are read in batches and
+    # the filters, which only depend on those bytes, are built by a pool of
+    # processes worker processes (all the cores when None, none at all when 1).
+    # Their headers chain from one block to the next, so they are computed and
+    # stored in order by the calling process.
+    def catch_up(self, hashes: [chainhash.Hash], processes: int = None, batch_size: int = catchUpBatchSize):
+        if processes == 1:
+            self._catch_up(hashes, map, batch_size)
+            return
+
+        with multiprocessing.Pool(processes) as pool:
+            self._catch_up(hashes, pool.imap, batch_size)
+        return
+
+    def _catch_up(self, hashes, map_fn, batch_size):
+        spend_journal_key = blockchain.spendJournalBucketName
+        for i in range(0, len(hashes), batch_size):
+            batch = hashes[i:i + batch_size]
+
+            items = []
+
+            def fetch(db_tx: database.Tx):
+                spend_bucket = db_tx.metadata().bucket(spend_journal_key)
+                for block_hash in batch:
+                    # Copy out of the transaction, the bytes are only valid
+                    # while it is open.
+                    serialized_block = bytes(db_tx.fetch_block(block_hash))
+                    serialized_stxos = bytes(spend_bucket.get(block_hash.to_bytes()) or b"")
+                    items.append((serialized_block, serialized_stxos))
+
+            self.db.view(fetch)
+
+            filters = list(map_fn(build_basic_filter_bytes, items))
+
+            def store(db_tx: database.Tx):
+                for (serialized_block, _), filter_bytes in zip(items, filters):
+                    header = wire.read_block_header(wire.BufferReader(serialized_block), 0)
+                    self.store_filter(db_tx, header.block_hash(), header.prev_block, filter_bytes,
+                                      wire.GCSFilterRegular)
+
+            self.db.update(store)
+        return
+
+    # entryByBlockHash fetches a filter index entry of a particular type
+    # (eg. filter, filter header, etc) for a filter type and block hash.
+    def entry_by_block_hash(self, filter_type_keys: [bytes], filter_type: int, h: chainhash.Hash) -> bytes or None:
+        if filter_type > maxFilterType:
+            raise ValueError("unsupported filter type {}".format(filter_type))
+        key = filter_type_keys[filter_type]
+
+        entry = None
+
+        def fn(db_tx: database.Tx):
+            nonlocal entry
+            entry = db_fetch_filter_idx_entry(db_tx, key, h)
+            if entry is not None:
+                entry = bytes(entry)
+
+        self.db.view(fn)
+        return entry
+
+    # entriesByBlockHashes batch fetches a filter index entry of a particular
+    # type (eg. filter, filter header, etc) for a filter type and slice of block
+    # hashes.
+    def entries_by_block_hashes(self, filter_type_keys: [bytes], filter_type: int,
+                                block_hashes: [chainhash.Hash]) -> [bytes or None]:
+        if filter_type > maxFilterType:
+            raise ValueError("unsupported filter type {}".format(filter_type))
+        key = filter_type_keys[filter_type]
+
+        entries = []
+
+        def fn(db_tx: database.Tx):
+            for block_hash in block_hashes:
+                entry = db_fetch_filter_idx_entry(db_tx, key, block_hash)
+                entries.append(bytes(entry) if entry is not None else None)
+
+        self.db.view(fn)
+        return entries
+
+    # FilterByBlockHash returns the serialized contents of a block's basic or
+    # committed filter.
+    def filter_by_block_hash(self, h: chainhash.Hash, filter_type: int) -> bytes or None:
+        return self.entry_by_block_hash(cfIndexKeys, filter_type, h)
+
+    # FiltersByBlockHashes returns the serialized contents of a block's basic or
+    # committed filter for a set of blocks by hash.
+    def filters_by_block_hashes(self, block_hashes: [chainhash.Hash], filter_type: int) -> [bytes or None]:
+        return self.entries_by_block_hashes(cfIndexKeys, filter_type, block_hashes)
+
+    # FilterHeaderByBlockHash returns the serialized contents of a block's basic
+    # committed filter header.
+    def filter_header_by_block_hash(self, h: chainhash.Hash, filter_type: int) -> bytes or None:
+        return self.entry_by_block_hash(cfHeaderKeys, filter_type, h)
+
+    # FilterHeadersByBlockHashes returns the serialized contents of a block's
+    # basic committed filter header for a set of blocks by hash.
+    def filter_headers_by_block_hashes(self, block_hashes: [chainhash.Hash], filter_type: int) -> [bytes or None]:
+        return self.entries_by_block_hashes(cfHeaderKeys, filter_type, block_hashes)
+
+    # FilterHashByBlockHash returns the serialized contents of a block's basic
+    # committed filter hash.
+    def filter_hash_by_block_hash(self, h: chainhash.Hash, filter_type: int) -> bytes or None:
+        return self.entry_by_block_hash(cfHashKeys, filter_type, h)
+
+    # FilterHashesByBlockHashes returns the serialized contents of a block's basic
+    # committed filter hash for a set of blocks by hash.
+    def filter_hashes_by_block_hashes(self, block_hashes: [chainhash.Hash], filter_type: int) -> [bytes or None]:
+        return self.entries_by_block_hashes(cfHashKeys, filter_type, block_hashes)
+
+
+# NewCfIndex returns a new instance of an indexer that is used to create a
+# mapping of the hashes of all blocks in the blockchain to their respective
+# committed filters.
+#
+# It implements the Indexer interface which plugs into the IndexManager that
+# in turn is used by the blockchain package. This allows the index to be
+# seamlessly maintained along with the chain.
+def new_cf_index(db: database.DB, chain_params: chaincfg.Params) -> CfIndex:
+    return CfIndex(db=db, chain_params=chain_params)
@@ -97,17 +97,24 @@ def build_merkle_tree_store(transactions: [btcutil.Tx], witness: bool) -> [chain
         else:
             merkles[i] = tx.hash()
 
-    # Start the array offset after the last transaction and adjusted to the
-    # next power of two.
+    # Hash the tree a level at a time, starting at the array offset after the
+    # last transaction and adjusted to the next power of two.  Each level is
+    # kept as the concatenation of its nodes, so the next one is hashed from
+    # its 64-byte pairs directly, with the last node paired with itself when
+    # the level has an odd number of them.
+    level = b''.join(merkles[:len(transactions)])
     offset = next_pot
-    for i in range(0, array_size - 1, 2):
-        if merkles[i] is None:
-            merkles[offset] = None
-        elif merkles[i + 1] is None:
-            merkles[offset] = hash_merkle_branches(merkles[i], merkles[i])
-        else:
-            merkles[offset] = hash_merkle_branches(merkles[i], merkles[i + 1])
-        offset += 1
+    width = next_pot // 2
+    while width > 0:
+        if len(level) // chainhash.HashSize % 2 == 1:
+            level += level[-chainhash.HashSize:]
+        level = chainhash.double_hash_pairs(level)
+
+        for i in range(0, len(level), chainhash.HashSize):
+            merkles[offset + i // chainhash.HashSize] = chainhash.Hash(level[i:i + chainhash.HashSize])
+        offset += width
+        width //= 2
+
     return merkles
 
 
@@ -19,11 +19,13 @@ class TxValidateItem:
 
 class TxValidator:
     def __init__(self, utxo_view: UtxoViewpoint, flags: txscript.ScriptFlags,
-                 sig_cache: txscript.SigCache, hash_cache: txscript.HashCache):
+                 sig_cache: txscript.SigCache, hash_cache: txscript.HashCache,
+                 defer_sig_checks: bool = False):
         self.utxo_view = utxo_view
         self.flags = flags
         self.sig_cache = sig_cache
         self.hash_cache = hash_cache
+        self.defer_sig_checks = defer_sig_checks
         # self.validate_chan = None
         # self.quit_chan = None
         # self.result_chan = None
@@ -52,7 +54,8 @@ class TxValidator:
                 self.flags,
                 self.sig_cache,
                 item.sig_hashes,
-                input_amount
+                input_amount,
+                defer_sig_checks=self.defer_sig_checks
             )
         except Exception as e:
             msg = "failed to parse input %s:%d which references output %s - %s (input witness %s, input script bytes %s, prev output script bytes %s)" \
@@ -72,7 +75,9 @@ class TxValidator:
                   )
             raise RuleError(ErrorCode.ErrScriptValidation, msg)
 
-        return
+        # Return the signature checks the engine deferred, along with the
+        # input they come from.
+        return [(item.tx.hash(), item.tx_in_index, check) for check in vm.deferred_checks or []]
 
     def validate(self, items: [TxValidateItem]):
         if len(items) == 0:
@@ -96,8 +101,12 @@ class TxValidator:
             Process(target=worker, args=(self, task_queue, done_queue)).start()
 
         # Get and print results
+        deferred = []
         for _ in range(len(items)):
             result = done_queue.get()  #
+            if isinstance(result, list):
+                deferred.extend(result)
+                continue
 
             # if result is False:
             #     # Tell child processes to stop
@@ -107,7 +116,7 @@ class TxValidator:
             #     raise RuleError(ErrorCode.ErrScriptValidation, desc="Exception happens in validator worker, but cannot gei it now")
 
             # TOCHANGE TOCONSIDER Can't pass exception in queue?
-            if type(result) is Exception:
+            if isinstance(result, Exception):
 
                 # Tell child processes to stop, little ugly
                 for i in range(NUMBER_OF_PROCESSES):
@@ -118,14 +127,22 @@ class TxValidator:
         for _ in range(NUMBER_OF_PROCESSES):
             task_queue.put('STOP')
 
+        # Verify the signature checks deferred by the scripts of all the
+        # inputs in one batch.
+        if deferred:
+            failed = txscript.verify_deferred_checks([check for _, _, check in deferred], self.sig_cache)
+            if failed is not None:
+                tx_hash, tx_in_index = next((h, i) for h, i, check in deferred if check is failed)
+                msg = "failed to validate input %s:%d - %s" % (tx_hash, tx_in_index, failed.error)
+                raise RuleError(ErrorCode.ErrScriptValidation, msg)
+
         return
 
 def worker(self, input_q, output_q):
     for item in iter(input_q.get, 'STOP'):
         try:
             # output_q.put(Exception("hi,exception"))
-            self.validate_handler(item)
-            output_q.put(True)
+            output_q.put(self.validate_handler(item))
         except Exception as e:
             output_q.put(e)  # TOCONDIER # I cannot put exception in queue?
             # output_q.put(False)
@@ -224,7 +241,8 @@ def check_block_scripts(block: btcutil.Block, utxo_view: UtxoViewpoint,
             tx_val_items.append(tx_vi)
 
     # Validate all of the inputs.
-    validator = TxValidator(utxo_view=utxo_view, flags=script_flags, sig_cache=sig_cache, hash_cache=hash_cache)
+    validator = TxValidator(utxo_view=utxo_view, flags=script_flags, sig_cache=sig_cache, hash_cache=hash_cache,
+                            defer_sig_checks=True)
     start = int(time.time())
     validator.validate(tx_val_items)
     elapsed = int(time.time()) - start
@@ -261,6 +261,38 @@ def deserialize_spend_journal_entry(serialized: bytes, txns: [wire.MsgTx]) -> [S
     return reversed(stxos)
 
 
+# deserialize_spend_journal_scripts decodes only the public key scripts of the
+# num_stxos spent txouts of a serialized spend journal entry, in the order they
+# are spent.
+#
+# Since the entries follow each other without any reference to the spending
+# transactions, the number of inputs of the block (for instance from a
+# wire.BlockSkim) is all that is needed, and the block does not have to be
+# decoded.
+def deserialize_spend_journal_scripts(serialized: bytes, num_stxos: int) -> [bytes]:
+    if not serialized:
+        if num_stxos != 0:
+            raise AssertError(
+                "mismatched spend journal serialization - no serialization for expected %d stxos" % num_stxos)
+        return []
+
+    # Slice a view of the entry so that reading each stxo does not copy the
+    # rest of the entry.
+    view = memoryview(serialized)
+    scripts = []
+    offset = 0
+    stxo = SpentTxOut()
+    for _ in range(num_stxos):
+        try:
+            offset += decode_spent_tx_out(view[offset:], stxo)
+        except Exception as e:
+            raise DeserializeError("unable to decode stxo %d: %s" % (len(scripts), e))
+        scripts.append(bytes(stxo.pk_script))
+
+    scripts.reverse()
+    return scripts
+
+
 # serializeSpendJournalEntry serializes all of the passed spent txouts into a
 # single byte slice according to the format described in detail above.
 def serialize_spend_journal_entry(stxos: [SpentTxOut]) -> bytes or None:
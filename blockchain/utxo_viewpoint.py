@@ -89,7 +89,7 @@ class UtxoViewpoint:
             self.entries[outpoint] = entry
 
         entry.amount = tx_out.value
-        entry.pk_script = tx_out.pk_script
+        entry.pk_script = bytes(tx_out.pk_script)
         entry.block_height = block_height
         entry.packed_flags = tfModified
 
@@ -267,7 +267,7 @@ class UtxoViewpoint:
                 if not entry:
                     entry = UtxoEntry(
                         amount=tx_out.value,
-                        pk_script=tx_out.pk_script,
+                        pk_script=bytes(tx_out.pk_script),
                         block_height=block.height(),
                         packed_flags=packed_flags
                     )
@@ -176,16 +176,10 @@ def check_transaction_sanity(tx: btcutil.Tx):
     return
 
 
-# checkProofOfWork ensures the block header bits which indicate the target
-# difficulty is in min/max range and that the block hash is less than the
-# target difficulty as claimed.
-#
-# The flags modify the behavior of this function as follows:
-#  - BFNoPoWCheck: The check to ensure the block hash is less than the target
-#    difficulty is not performed.
-def _check_proof_of_work(header: wire.BlockHeader, pow_limit: int, flags: BehaviorFlags):
+# checkTarget ensures the target difficulty described by the bits of a block
+# header is in min/max range.
+def _check_target(target: int, pow_limit: int):
     # The target difficulty must be larger than zero.
-    target = compact_to_big(header.bits)
     if target <= 0:
         msg = "block target difficulty of %064x is too low" % target
         raise RuleError(ErrorCode.ErrBadTxInput, msg)
@@ -195,15 +189,56 @@ def _check_proof_of_work(header: wire.BlockHeader, pow_limit: int, flags: Behavi
         msg = "block target difficulty of %064x is higher than max of %064x" % (target, pow_limit)
         raise RuleError(ErrorCode.ErrUnexpectedDifficulty, msg)
 
+    return
+
+
+# checkHash ensures the block hash is less than the target difficulty.
+def _check_hash(hash: chainhash.Hash, target: int):
+    hash_num = hash_to_big(hash)
+    if hash_num > target:
+        msg = "block hash of %064x is higher than expected max of %064x" % (hash_num, target)
+        raise RuleError(ErrorCode.ErrHighHash, msg)
+
+    return
+
+
+# checkProofOfWork ensures the block header bits which indicate the target
+# difficulty is in min/max range and that the block hash is less than the
+# target difficulty as claimed.
+#
+# The flags modify the behavior of this function as follows:
+#  - BFNoPoWCheck: The check to ensure the block hash is less than the target
+#    difficulty is not performed.
+def _check_proof_of_work(header: wire.BlockHeader, pow_limit: int, flags: BehaviorFlags):
+    target = compact_to_big(header.bits)
+    _check_target(target, pow_limit)
+
     # The block hash must be less than the claimed target unless the flag
     # to avoid proof of work checks is set.
     if flags & BFNoPoWCheck != BFNoPoWCheck:
+        _check_hash(header.block_hash(), target)
+
+    return
+
+
+# check_headers_proof_of_work performs the checks of checkProofOfWork on a batch
+# of headers, such as the headers of a headers message.  The hashes are passed in
+# so they can be computed in bulk from the raw message (see
+# wire.MsgHeaders.block_hashes), and the targets are computed once per distinct
+# difficulty bits.  The error is raised for the first header failing a check.
+def check_headers_proof_of_work(headers: [wire.BlockHeader], hashes: [chainhash.Hash], pow_limit: int,
+                                flags: BehaviorFlags):
+    if len(hashes) != len(headers):
+        raise ValueError("%d hashes given for %d headers" % (len(hashes), len(headers)))
+
+    check_hash = flags & BFNoPoWCheck != BFNoPoWCheck
+    targets = compact_to_big_many([header.bits for header in headers])
+    for hash, target in zip(hashes, targets):
+        _check_target(target, pow_limit)
+
         # The block hash must be less than the claimed target.
-        hash = header.block_hash()
-        hash_num = hash_to_big(hash)
-        if hash_num > target:
-            msg = "block hash of %064x is higher than expected max of %064x" % (hash_num, target)
-            raise RuleError(ErrorCode.ErrHighHash, msg)
+        if check_hash:
+            _check_hash(hash, target)
 
     return
 
@@ -1,3 +1,5 @@
 from .btcec import *
 from .pubkey import *
 from .signature import *
+from .secp256k1 import *
+from .verifier import *
@@ -1,4 +1,5 @@
 from ecdsa import SigningKey, VerifyingKey, SECP256k1
+from .signature import sign_rfc6979
 
 
 
@@ -8,3 +9,8 @@ class PrivateKey(SigningKey):
 
     def __eq__(self, other):
         return self.to_string() == other.to_string()
+
+    # sign_rfc6979 generates a deterministic low S ECDSA signature of the hash
+    # with the private key, see btcec.sign_rfc6979.
+    def sign_rfc6979(self, hash: bytes):
+        return sign_rfc6979(self.privkey.secret_multiplier, hash)
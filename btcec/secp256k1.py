@@ -0,0 +1,374 @@
+import threading
+from collections import OrderedDict
+
+# curveP is the prime of the field secp256k1 is defined over.
+curveP = 0xfffffffffffffffffffffffffffffffffffffffffffffffffffffffefffffc2f
+
+# curveN is the order of the group of points of secp256k1.
+curveN = 0xfffffffffffffffffffffffffffffffebaaedce6af48a03bbfd25e8cd0364141
+
+# curveGx and curveGy are the coordinates of the generator G.
+curveGx = 0x79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798
+curveGy = 0x483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb10d4b8
+
+# curveBeta is a cube root of unity in the field and curveLambda the matching
+# cube root of unity modulo the order: lambda * (x, y) = (beta * x, y) for
+# every point.  This is the endomorphism GLV decomposition uses to halve the
+# number of doublings of a scalar multiplication.
+curveBeta = 0x7ae96a2b657c07106e64479eac3434e99cf0497512f58995c1396c28719501ee
+curveLambda = 0x5363ad4cc05c30e0a5261c028812645a122e22ea20816678df02967c1b23bd72
+
+# glvA1, glvB1, glvA2 and glvB2 are a short basis of the lattice of (k1, k2)
+# with k1 + k2 * lambda = 0 modulo the order, used to split scalars.
+glvA1 = 0x3086d221a7d46bcde86c90e49284eb15
+glvB1 = -0xe4437ed6010e88286f547fa90abfe4c3
+glvA2 = 0x114ca50f7a8e2f3f657c1108d9d44cfd8
+glvB2 = glvA1
+
+# gCombWindow is the number of bits of a scalar each table of the precomputed
+# comb of G covers, so a multiple of G costs 256 / gCombWindow additions and
+# no doubling.
+gCombWindow = 8
+
+# keyCombWindow is the window of the combs precomputed for hot public keys.
+keyCombWindow = 4
+
+# wnafWindow is the width of the wNAF representation of the halves of a split
+# scalar multiplying a public key with no precomputed comb.
+wnafWindow = 5
+
+# hotKeyThreshold is the number of verifications with a public key after
+# which a comb is precomputed for it.
+hotKeyThreshold = 8
+
+# maxHotKeys is the maximum number of public key combs kept.
+maxHotKeys = 256
+
+# maxKeyUseEntries bounds the number of public keys whose uses are counted.
+maxKeyUseEntries = 20000
+
+
+# Points are kept in Jacobian coordinates (X, Y, Z), standing for the affine
+# point (X / Z^2, Y / Z^3), so additions and doublings need no inversion.
+# None is the point at infinity.  Precomputed tables hold affine (x, y)
+# tuples, added with the cheaper mixed addition.
+
+def _jacobian_double(pt):
+    if pt is None:
+        return None
+    x, y, z = pt
+    if y == 0:
+        return None
+    p = curveP
+    yy = y * y % p
+    s = 4 * x * yy % p
+    m = 3 * x * x % p
+    x3 = (m * m - 2 * s) % p
+    return x3, (m * (s - x3) - 8 * yy * yy) % p, 2 * y * z % p
+
+
+def _jacobian_add_affine(pt, x2, y2):
+    if pt is None:
+        return x2, y2, 1
+    x1, y1, z1 = pt
+    p = curveP
+    zz = z1 * z1 % p
+    h = (x2 * zz - x1) % p
+    r = (y2 * zz * z1 - y1) % p
+    if h == 0:
+        if r == 0:
+            return _jacobian_double(pt)
+        return None
+    hh = h * h % p
+    hhh = h * hh % p
+    v = x1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+    return x3, (r * (v - x3) - y1 * hhh) % p, z1 * h % p
+
+
+def _jacobian_add(pt1, pt2):
+    if pt1 is None:
+        return pt2
+    if pt2 is None:
+        return pt1
+    x1, y1, z1 = pt1
+    x2, y2, z2 = pt2
+    p = curveP
+    z1z1 = z1 * z1 % p
+    z2z2 = z2 * z2 % p
+    u1 = x1 * z2z2 % p
+    s1 = y1 * z2 * z2z2 % p
+    h = (x2 * z1z1 - u1) % p
+    r = (y2 * z1 * z1z1 - s1) % p
+    if h == 0:
+        if r == 0:
+            return _jacobian_double(pt1)
+        return None
+    hh = h * h % p
+    hhh = h * hh % p
+    v = u1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+    return x3, (r * (v - x3) - s1 * hhh) % p, z1 * z2 * h % p
+
+
+# to_affine returns the affine coordinates of a point in Jacobian coordinates,
+# or None for the point at infinity.
+def to_affine(pt):
+    if pt is None:
+        return None
+    x, y, z = pt
+    p = curveP
+    zinv = pow(z, p - 2, p)
+    zinv2 = zinv * zinv % p
+    return x * zinv2 % p, y * zinv2 * zinv % p
+
+
+# _batch_to_affine converts many points with a single inversion (Montgomery's
+# trick).  None of the points may be the point at infinity.
+def _batch_to_affine(pts):
+    p = curveP
+    prefix = []
+    acc = 1
+    for _, _, z in pts:
+        prefix.append(acc)
+        acc = acc * z % p
+
+    inv = pow(acc, p - 2, p)
+    result = [None] * len(pts)
+    for i in range(len(pts) - 1, -1, -1):
+        x, y, z = pts[i]
+        zinv = inv * prefix[i] % p
+        inv = inv * z % p
+        zinv2 = zinv * zinv % p
+        result[i] = (x * zinv2 % p, y * zinv2 * zinv % p)
+    return result
+
+
+# _build_comb returns the comb of the affine point (x, y) for the given window:
+# table i holds j * 2^(window * i) * (x, y) at index j - 1 for j in
+# [1, 2^window).
+def _build_comb(x, y, window):
+    width = (1 << window) - 1
+    pts = []
+    base = (x, y, 1)
+    for _ in range((256 + window - 1) // window):
+        pt = base
+        pts.append(pt)
+        for _ in range(width - 1):
+            pt = _jacobian_add(pt, base)
+            pts.append(pt)
+        for _ in range(window):
+            base = _jacobian_double(base)
+
+    flat = _batch_to_affine(pts)
+    return [flat[i:i + width] for i in range(0, len(flat), width)]
+
+
+# _comb_mult adds k times the point a comb was built for to the point acc.
+def _comb_mult(acc, k, comb, window):
+    mask = (1 << window) - 1
+    add = _jacobian_add_affine
+    for table in comb:
+        digit = k & mask
+        if digit:
+            x, y = table[digit - 1]
+            acc = add(acc, x, y)
+        k >>= window
+        if not k:
+            break
+    return acc
+
+
+_gComb = None
+_gCombLock = threading.Lock()
+
+
+def _g_comb():
+    global _gComb
+    if _gComb is None:
+        with _gCombLock:
+            if _gComb is None:
+                _gComb = _build_comb(curveGx, curveGy, gCombWindow)
+    return _gComb
+
+
+# split_scalar splits k into k1 and k2 of about 128 bits each, and possibly
+# negative, with k = k1 + k2 * lambda modulo the order.
+def split_scalar(k):
+    n = curveN
+    c1 = (glvB2 * k + n // 2) // n
+    c2 = (-glvB1 * k + n // 2) // n
+    k1 = k - c1 * glvA1 - c2 * glvA2
+    k2 = -c1 * glvB1 - c2 * glvB2
+    return k1, k2
+
+
+# wnaf returns the width-w non-adjacent form of the non negative k, least
+# significant digit first.  Non zero digits are odd and less than 2^(w-1) in
+# absolute value, and are followed by at least w - 1 zero digits.
+def wnaf(k, w):
+    digits = []
+    full = 1 << w
+    half = 1 << (w - 1)
+    while k:
+        if k & 1:
+            d = k & (full - 1)
+            if d >= half:
+                d -= full
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
+# _odd_multiples returns the affine points (2i + 1) * (x, y) for i in
+# [0, count).
+def _odd_multiples(x, y, count):
+    pts = [(x, y, 1)]
+    double = _jacobian_double(pts[0])
+    for _ in range(count - 1):
+        pts.append(_jacobian_add(pts[-1], double))
+    return _batch_to_affine(pts)
+
+
+# _strauss_mult adds k * (x, y) to acc, splitting k with the endomorphism and
+# running the two halves through a single chain of doublings (Strauss-Shamir).
+def _strauss_mult(acc, k, x, y):
+    p = curveP
+    k1, k2 = split_scalar(k)
+    table1 = _odd_multiples(x, y, 1 << (wnafWindow - 2))
+    table2 = [(curveBeta * tx % p, ty) for tx, ty in table1]
+    if k1 < 0:
+        k1 = -k1
+        table1 = [(tx, p - ty) for tx, ty in table1]
+    if k2 < 0:
+        k2 = -k2
+        table2 = [(tx, p - ty) for tx, ty in table2]
+
+    naf1 = wnaf(k1, wnafWindow)
+    naf2 = wnaf(k2, wnafWindow)
+    length = max(len(naf1), len(naf2))
+    naf1 += [0] * (length - len(naf1))
+    naf2 += [0] * (length - len(naf2))
+
+    add = _jacobian_add_affine
+    double = _jacobian_double
+    pt = None
+    for i in range(length - 1, -1, -1):
+        pt = double(pt)
+        d = naf1[i]
+        if d > 0:
+            tx, ty = table1[d >> 1]
+            pt = add(pt, tx, ty)
+        elif d < 0:
+            tx, ty = table1[(-d) >> 1]
+            pt = add(pt, tx, p - ty)
+        d = naf2[i]
+        if d > 0:
+            tx, ty = table2[d >> 1]
+            pt = add(pt, tx, ty)
+        elif d < 0:
+            tx, ty = table2[(-d) >> 1]
+            pt = add(pt, tx, p - ty)
+    return _jacobian_add(acc, pt)
+
+
+# KeyTables keeps the combs precomputed for the public keys that are used the
+# most, such as heavily reused addresses, so multiplying them needs no
+# doubling.  A comb is built for a key once it has been used hotKeyThreshold
+# times, and the least recently used combs are dropped past maxHotKeys.
+class KeyTables:
+    def __init__(self, max_keys=maxHotKeys, threshold=hotKeyThreshold):
+        self.max_keys = max_keys
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self._combs = OrderedDict()
+        self._uses = {}
+
+    def __len__(self):
+        return len(self._combs)
+
+    # comb returns the comb of the key (x, y), counting the use, or None when
+    # the key is not hot.
+    def comb(self, x, y):
+        key = (x, y)
+        with self.lock:
+            comb = self._combs.get(key)
+            if comb is not None:
+                self._combs.move_to_end(key)
+                return comb
+
+            uses = self._uses.get(key, 0) + 1
+            if uses < self.threshold:
+                if len(self._uses) >= maxKeyUseEntries:
+                    self._uses.clear()
+                self._uses[key] = uses
+                return None
+            self._uses.pop(key, None)
+
+        return self.precompute(x, y)
+
+    # precompute builds and keeps the comb of the key (x, y).
+    def precompute(self, x, y):
+        comb = _build_comb(x, y, keyCombWindow)
+        with self.lock:
+            self._combs[(x, y)] = comb
+            self._combs.move_to_end((x, y))
+            while len(self._combs) > self.max_keys:
+                self._combs.popitem(last=False)
+        return comb
+
+    def clear(self):
+        with self.lock:
+            self._combs.clear()
+            self._uses.clear()
+
+
+keyTables = KeyTables()
+
+
+# scalar_base_mult returns k * G in affine coordinates, or None for the point
+# at infinity.
+def scalar_base_mult(k):
+    return to_affine(_comb_mult(None, k % curveN, _g_comb(), gCombWindow))
+
+
+# scalar_mult returns k * (x, y) in affine coordinates, or None for the point
+# at infinity.
+def scalar_mult(k, x, y):
+    return to_affine(_strauss_mult(None, k % curveN, x, y))
+
+
+# double_scalar_mult returns u1 * G + u2 * (x, y) in Jacobian coordinates.
+def double_scalar_mult(u1, u2, x, y, tables=keyTables):
+    acc = _comb_mult(None, u1, _g_comb(), gCombWindow)
+    comb = tables.comb(x, y) if tables is not None else None
+    if comb is not None:
+        return _comb_mult(acc, u2, comb, keyCombWindow)
+    return _strauss_mult(acc, u2, x, y)
+
+
+# verify_signature returns whether (r, s) is a valid ECDSA signature of the
+# integer hash by the public key (x, y), which must be on the curve.
+#
+# The check R.x = r modulo the order is done in Jacobian coordinates, as
+# X = r * Z^2 (or (r + n) * Z^2 when that is still less than p), to avoid
+# inverting Z.
+def verify_signature(hash, r, s, x, y, tables=keyTables):
+    n = curveN
+    if not (0 < r < n and 0 < s < n):
+        return False
+
+    w = pow(s, n - 2, n)
+    pt = double_scalar_mult(hash * w % n, r * w % n, x, y, tables)
+    if pt is None:
+        return False
+
+    p = curveP
+    px, _, pz = pt
+    zz = pz * pz % p
+    if px == r * zz % p:
+        return True
+    return r + n < p and px == (r + n) * zz % p
@@ -1,8 +1,12 @@
 from ecdsa.ecdsa import Signature as BaseSignature
 from .error import *
 from .utils import *
+from .verifier import active_verifier
+from .secp256k1 import curveN, scalar_base_mult
 
 import binascii
+import hmac
+import hashlib
 
 
 def binary_to_number(string):
@@ -16,9 +20,34 @@ class Signature(BaseSignature):
     def __eq__(self, other):
         return self.r == other.r and self.s == other.s
 
+    # Verify calls the active verifier backend to verify the signature of the
+    # hash using the public key.  It returns true if the signature is valid,
+    # false otherwise.
     def verify(self, hash, pub_key):
-        number = binary_to_number(hash)
-        return pub_key.pubkey.verifies(number, self)
+        return active_verifier().verify(hash, self, pub_key)
+
+    # Serialize returns the ECDSA signature in the more strict DER format.  Note
+    # that the serialized bytes returned do not include the appended hash type
+    # used in Bitcoin signature scripts.
+    #
+    # encoding/asn1 is broken so we hand roll this output:
+    #
+    # 0x30 <length> 0x02 <length r> r 0x02 <length s> s
+    def serialize(self) -> bytes:
+        # low 'S' malleability breaker
+        sig_s = self.s
+        if sig_s > curveN >> 1:
+            sig_s = curveN - sig_s
+
+        # Ensure the encoded bytes for the r and s values are canonical and
+        # thus suitable for DER encoding.
+        rb = canonicalize_int(self.r)
+        sb = canonicalize_int(sig_s)
+
+        # total length of returned signature is 1 byte for each magic and
+        # length (6 total), plus lengths of r and s
+        length = 6 + len(rb) + len(sb)
+        return bytes([0x30, length - 2, 0x02, len(rb)]) + rb + bytes([0x02, len(sb)]) + sb
 
 
 def _parse_sig(sig_str, curve, der):
@@ -104,7 +133,7 @@ def _parse_sig(sig_str, curve, der):
     s_bytes = sig_str[index: index + s_len]
     if der:
         try:
-            canonical_padding(r_bytes)
+            canonical_padding(s_bytes)
         except ErrNegativeValue:
             raise SigSNegativeErr
         except ErrExcessivelyPaddedValue:
@@ -161,3 +190,84 @@ def canonical_padding(b: bytes):
     else:
         pass
     return
+
+
+# canonicalizeInt returns the bytes for the passed big integer adjusted as
+# necessary to ensure that a big-endian encoded integer can't possibly be
+# misinterpreted as a negative number.  This can happen when the most
+# significant bit is set, so it is padded by a leading zero byte in this case.
+# Also, the returned bytes will have at least a single byte when the passed
+# value is 0.  This is required for DER encoding.
+def canonicalize_int(val: int) -> bytes:
+    b = int_to_bytes(val)
+    if b[0] & 0x80 != 0:
+        b = b'\x00' + b
+    return b
+
+
+# nonceRFC6979 generates an ECDSA nonce (k) deterministically according to
+# RFC 6979.  It takes a 32-byte hash as an input and returns a 32-byte nonce
+# to be used in the ECDSA algorithm.
+def nonce_rfc6979(priv_key: int, hash: bytes) -> int:
+    q = curveN
+    qlen = q.bit_length()
+
+    # bits2octets of the hash
+    z = int.from_bytes(hash, 'big')
+    if len(hash) * 8 > qlen:
+        z >>= len(hash) * 8 - qlen
+    if z >= q:
+        z -= q
+    bx = priv_key.to_bytes(32, 'big') + z.to_bytes(32, 'big')
+
+    # Step B
+    v = b'\x01' * 32
+
+    # Step C (Go zeroes the all allocated memory)
+    k = b'\x00' * 32
+
+    # Step D
+    k = hmac.new(k, v + b'\x00' + bx, hashlib.sha256).digest()
+
+    # Step E
+    v = hmac.new(k, v, hashlib.sha256).digest()
+
+    # Step F
+    k = hmac.new(k, v + b'\x01' + bx, hashlib.sha256).digest()
+
+    # Step G
+    v = hmac.new(k, v, hashlib.sha256).digest()
+
+    # Step H
+    while True:
+        # Step H1 and H2, the hash is as long as the order so a single
+        # round is enough.
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+        # Step H3
+        secret = int.from_bytes(v, 'big')
+        if 1 <= secret < q:
+            return secret
+
+        k = hmac.new(k, v + b'\x00', hashlib.sha256).digest()
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+
+# signRFC6979 generates a deterministic ECDSA signature of the hash with the
+# private key, according to RFC 6979 and BIP 62 (low S).  The nonce point is
+# computed with the precomputed comb of the generator, which makes it much
+# faster than signing through python-ecdsa while giving the same signature.
+def sign_rfc6979(priv_key: int, hash: bytes) -> Signature:
+    n = curveN
+    k = nonce_rfc6979(priv_key, hash)
+    r = scalar_base_mult(k)[0] % n
+    if r == 0:
+        raise RuntimeError("calculated R is zero")
+
+    e = int.from_bytes(hash, 'big')
+    s = pow(k, n - 2, n) * (e + priv_key * r) % n
+    if s == 0:
+        raise RuntimeError("calculated S is zero")
+    if s > n >> 1:
+        s = n - s
+    return Signature(r=r, s=s)
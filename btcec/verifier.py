@@ -0,0 +1,212 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+from ecdsa import SECP256k1
+import pyutil
+from .secp256k1 import verify_signature, keyTables
+
+_logger = logging.getLogger(__name__)
+
+# secp256k1ContextVerify is the flag libsecp256k1 contexts used for
+# verification are created with.
+secp256k1ContextVerify = (1 << 0) | (1 << 8)
+
+# secp256k1LibEnv names the environment variable that, when set, gives the path
+# of the libsecp256k1 shared library to load instead of searching for it.
+secp256k1LibEnv = "SECP256K1_LIB"
+
+# secp256k1LibNames are the shared library names tried when searching for
+# libsecp256k1.
+secp256k1LibNames = ("libsecp256k1.so", "libsecp256k1.so.2", "libsecp256k1.so.1",
+                     "libsecp256k1.so.0", "libsecp256k1.dylib")
+
+
+# Verifier is the interface of the signature verification backends.  verify
+# returns whether sig is a valid signature of the 32-byte hash by pub_key.
+# Backends must agree on every input, including high S signatures, which are
+# valid here and rejected, when asked, by the script engine.
+class Verifier:
+    name = ""
+
+    def verify(self, hash: bytes, sig, pub_key) -> bool:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return "<%s verifier>" % self.name
+
+
+# EcdsaVerifier verifies signatures with the pure Python point arithmetic of
+# python-ecdsa.  It is always available.
+class EcdsaVerifier(Verifier):
+    name = "ecdsa"
+
+    def verify(self, hash: bytes, sig, pub_key) -> bool:
+        return pub_key.pubkey.verifies(int.from_bytes(hash, 'big'), sig)
+
+
+# PythonVerifier verifies signatures with the in tree secp256k1 arithmetic:
+# Jacobian coordinates, a precomputed comb of G and a joint wNAF
+# multiplication of the public key split with the GLV endomorphism, or the
+# comb of the key once it is hot.
+class PythonVerifier(Verifier):
+    name = "python"
+
+    def __init__(self, tables=keyTables):
+        self.tables = tables
+
+    def verify(self, hash: bytes, sig, pub_key) -> bool:
+        point = pub_key.pubkey.point
+        return verify_signature(int.from_bytes(hash, 'big'), sig.r, sig.s,
+                                point.x(), point.y(), self.tables)
+
+
+# Secp256k1Verifier verifies signatures with libsecp256k1, loaded through
+# ctypes from the shared library at path.
+#
+# libsecp256k1 only accepts low S signatures, so signatures are normalized
+# before they are verified to give the same results as EcdsaVerifier.
+class Secp256k1Verifier(Verifier):
+    name = "libsecp256k1"
+
+    def __init__(self, path):
+        self.path = path
+        lib = ctypes.CDLL(path)
+
+        lib.secp256k1_context_create.argtypes = [ctypes.c_uint]
+        lib.secp256k1_context_create.restype = ctypes.c_void_p
+        lib.secp256k1_ec_pubkey_parse.argtypes = [ctypes.c_void_p, ctypes.c_char_p,
+                                                  ctypes.c_char_p, ctypes.c_size_t]
+        lib.secp256k1_ec_pubkey_parse.restype = ctypes.c_int
+        lib.secp256k1_ecdsa_signature_parse_compact.argtypes = [ctypes.c_void_p, ctypes.c_char_p,
+                                                                ctypes.c_char_p]
+        lib.secp256k1_ecdsa_signature_parse_compact.restype = ctypes.c_int
+        lib.secp256k1_ecdsa_signature_normalize.argtypes = [ctypes.c_void_p, ctypes.c_char_p,
+                                                            ctypes.c_char_p]
+        lib.secp256k1_ecdsa_signature_normalize.restype = ctypes.c_int
+        lib.secp256k1_ecdsa_verify.argtypes = [ctypes.c_void_p, ctypes.c_char_p,
+                                               ctypes.c_char_p, ctypes.c_char_p]
+        lib.secp256k1_ecdsa_verify.restype = ctypes.c_int
+
+        self._lib = lib
+        self._ctx = lib.secp256k1_context_create(secp256k1ContextVerify)
+        if not self._ctx:
+            raise OSError("secp256k1_context_create failed")
+
+    def verify(self, hash: bytes, sig, pub_key) -> bool:
+        # libsecp256k1 takes exactly 32 bytes to sign, anything else is left
+        # to the default backend.
+        if len(hash) != 32:
+            return _ecdsaVerifier.verify(hash, sig, pub_key)
+
+        n = SECP256k1.order
+        if not (0 < sig.r < n and 0 < sig.s < n):
+            return False
+
+        lib = self._lib
+        point = pub_key.pubkey.point
+        raw_key = b'\x04' + point.x().to_bytes(32, 'big') + point.y().to_bytes(32, 'big')
+        parsed_key = ctypes.create_string_buffer(64)
+        if not lib.secp256k1_ec_pubkey_parse(self._ctx, parsed_key, raw_key, len(raw_key)):
+            return False
+
+        parsed_sig = ctypes.create_string_buffer(64)
+        compact = sig.r.to_bytes(32, 'big') + sig.s.to_bytes(32, 'big')
+        if not lib.secp256k1_ecdsa_signature_parse_compact(self._ctx, parsed_sig, compact):
+            return False
+        lib.secp256k1_ecdsa_signature_normalize(self._ctx, parsed_sig, parsed_sig)
+
+        return lib.secp256k1_ecdsa_verify(self._ctx, parsed_sig, bytes(hash), parsed_key) == 1
+
+
+# find_secp256k1_lib returns the path of the libsecp256k1 shared library, or
+# None when none can be found on the machine.
+def find_secp256k1_lib():
+    path = os.environ.get(secp256k1LibEnv)
+    if path:
+        return path
+
+    path = ctypes.util.find_library("secp256k1")
+    if path:
+        return path
+
+    for name in secp256k1LibNames:
+        try:
+            ctypes.CDLL(name)
+        except OSError:
+            continue
+        return name
+    return None
+
+
+# load_secp256k1_verifier returns a Secp256k1Verifier for the shared library
+# at path, or for the one found on the machine when path is None.  It returns
+# None when the library can not be found or loaded.
+def load_secp256k1_verifier(path=None):
+    if path is None:
+        path = find_secp256k1_lib()
+        if path is None:
+            return None
+
+    try:
+        return Secp256k1Verifier(path)
+    except (OSError, AttributeError) as e:
+        _logger.warning("Unable to load libsecp256k1 from %s: %s" % (path, e))
+        return None
+
+
+_ecdsaVerifier = EcdsaVerifier()
+_pythonVerifier = PythonVerifier()
+_verifier = _pythonVerifier
+
+
+# active_verifier returns the backend in use for signature verification.
+def active_verifier() -> Verifier:
+    return _verifier
+
+
+# use_verifier makes v the backend used by Signature.verify.
+def use_verifier(v: Verifier):
+    global _verifier
+    _verifier = v
+    _logger.info("Using %s signature verification backend" % v.name)
+
+
+# select_verifier picks the fastest backend available on the machine:
+# libsecp256k1 when it can be loaded, the in tree arithmetic otherwise.
+def select_verifier() -> Verifier:
+    v = load_secp256k1_verifier()
+    use_verifier(v if v is not None else _pythonVerifier)
+    return _verifier
+
+
+# verifyManyChunkSize is the number of signatures verified per task when
+# verify_many spreads the work over a process pool.
+verifyManyChunkSize = 32
+
+
+def _verify_chunk(checks) -> [bool]:
+    v = _verifier
+    return [v.verify(hash, sig, pub_key) for pub_key, hash, sig in checks]
+
+
+# verify_many verifies the signatures of checks, a list of (pub_key, hash,
+# sig), and returns whether each one is valid, in order.
+#
+# Signature verification holds the GIL, so the checks are verified in chunks
+# over a pool of worker processes (as many as the CPUs by default), each
+# using its own verifier backend, when there are enough of them for every
+# worker to get some.  Otherwise they are verified in place with the active
+# backend.
+def verify_many(checks, workers: int = None) -> [bool]:
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers < 2 or len(checks) < 2 * verifyManyChunkSize:
+        return _verify_chunk(checks)
+
+    chunks = [checks[i:i + verifyManyChunkSize] for i in range(0, len(checks), verifyManyChunkSize)]
+    return [valid for results in pyutil.process_pool(workers).map(_verify_chunk, chunks) for valid in results]
+
+
+select_verifier()
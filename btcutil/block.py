@@ -30,6 +30,7 @@ class Block:
         self.block_height = block_height or BlockHeightUnknown
         self.transactions = transactions or []
         self.txns_generated = txns_generated or False
+        self.block_skim = None
 
     @classmethod
     def from_reader(cls, r):
@@ -37,10 +38,14 @@ class Block:
         msg_block.deserialize(r)
         return cls(msg_block=msg_block, block_height=BlockHeightUnknown)
 
+    # from_bytes decodes the block without copying the scripts and witness items
+    # out of serialized_block (see wire.MsgBlock.deserialize_buffer) and keeps the
+    # serialized bytes cached.
     @classmethod
     def from_bytes(cls, serialized_block: bytes):
-        r = io.BytesIO(serialized_block)
-        return cls.from_reader(r)
+        msg_block = wire.MsgBlock()
+        msg_block.deserialize_buffer(serialized_block)
+        return cls(msg_block=msg_block, serialized_block=serialized_block, block_height=BlockHeightUnknown)
 
     @classmethod
     def from_block_and_bytes(cls, msg_block, serialized_block):
@@ -163,16 +168,19 @@ class Block:
         # it has already been generated.
         return tx.hash()
 
+    # Skim returns the wire.BlockSkim of the serialized block: txids, spent
+    # outpoints and output scripts in flat arrays.  It is built from Bytes on
+    # first use and cached.
+    def skim(self) -> wire.BlockSkim:
+        if self.block_skim is None:
+            self.block_skim = wire.skim_block(self.bytes())
+        return self.block_skim
+
     # TxLoc returns the offsets and lengths of each transaction in a raw block.
     # It is used to allow fast indexing into transactions within the raw byte
     # stream.
     def tx_loc(self):
-        raw_msg = self.bytes()
-        rbuf = io.BytesIO(raw_msg)
-
-        mblock = wire.MsgBlock()
-        tx_locs = mblock.deserialize_tx_loc(rbuf)
-        return tx_locs
+        return self.skim().tx_locs()
 
     def height(self):
         return self.block_height
@@ -0,0 +1,3 @@
+from .murmurhash3 import *
+from .filter import *
+from .merkleblock import *
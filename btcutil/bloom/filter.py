@@ -0,0 +1,379 @@
+import math
+import struct
+import threading
+import wire
+import txscript
+from .murmurhash3 import *
+from .murmurhash3 import _murmur_blocks
+
+# ln2Squared is simply the square of the natural log of 2.
+ln2Squared = math.log(2) * math.log(2)
+
+# murmurSeedStep is the step between the seeds of the hash functions of a
+# filter, as defined by BIP0037.
+murmurSeedStep = 0xfba4c795
+
+_outPointIndex = struct.Struct("<I")
+
+
+# minUint32 is a convenience function to return the minimum value of the two
+# passed uint32 values.
+def min_uint32(a: int, b: int) -> int:
+    if a < b:
+        return a
+    return b
+
+
+# Filter defines a bitcoin bloom filter that provides easy manipulation of raw
+# filter data.
+class Filter:
+    def __init__(self, msg_filter_load=None):
+        """
+
+        :param wire.MsgFilterLoad msg_filter_load:
+        """
+        self.lock = threading.Lock()
+        self.msg_filter_load = None
+
+        # The filter bits and the seeds of its hash functions, unpacked from
+        # msg_filter_load for matching.
+        self._bits = None
+        self._num_bits = 0
+        self._seeds = ()
+
+        self._load(msg_filter_load)
+
+    # NewFilter creates a new bloom filter instance, mainly to be used by SPV
+    # clients.  The tweak parameter is a random value added to the seed value.
+    # The false positive rate is the probability of a false positive where 1.0
+    # is "match everything" and zero is unachievable.  Thus, providing any false
+    # positive rates less than 0 or greater than 1 will be adjusted to the valid
+    # range.
+    #
+    # For more information on what values to use for both elements and fprate,
+    # see https://en.wikipedia.org/wiki/Bloom_filter.
+    @classmethod
+    def new_filter(cls, elements: int, tweak: int, fprate: float, flags: wire.BloomUpdateType):
+        # Massage the false positive rate to sane values.
+        if fprate > 1.0:
+            fprate = 1.0
+        if fprate < 1e-9:
+            fprate = 1e-9
+
+        # Calculate the size of the filter in bytes for the given number of
+        # elements and false positive rate.
+        #
+        # Equivalent to m = -(n*ln(p) / ln(2)^2), where m is in bits.
+        # Then clamp it to the maximum filter size and convert to bytes.
+        data_len = int(-1 * elements * math.log(fprate) / ln2Squared)
+        data_len = min_uint32(data_len, wire.MaxFilterLoadFilterSize * 8) // 8
+
+        # Calculate the number of hash functions based on the size of the
+        # filter calculated above and the number of elements.
+        #
+        # Equivalent to k = (m/n) * ln(2)
+        # Then clamp it to the maximum allowed hash funcs.
+        hash_funcs = int(data_len * 8 / elements * math.log(2)) if elements else 0
+        hash_funcs = min_uint32(hash_funcs, wire.MaxFilterLoadHashFuncs)
+
+        return cls(wire.MsgFilterLoad(filter=bytearray(data_len), hash_funcs=hash_funcs,
+                                      tweak=tweak, flags=flags))
+
+    # LoadFilter creates a new Filter instance with the given underlying
+    # wire.MsgFilterLoad.
+    @classmethod
+    def load_filter(cls, msg_filter_load: wire.MsgFilterLoad):
+        return cls(msg_filter_load)
+
+    # _load makes the given wire.MsgFilterLoad, which may be None, the filter
+    # data.
+    #
+    # This function MUST be called with the filter lock held.
+    def _load(self, msg_filter_load):
+        self.msg_filter_load = msg_filter_load
+        if msg_filter_load is None:
+            self._bits = None
+            self._num_bits = 0
+            self._seeds = ()
+            return
+
+        # The filter is updated in place when elements are added.
+        if not isinstance(msg_filter_load.filter, bytearray):
+            msg_filter_load.filter = bytearray(msg_filter_load.filter)
+        self._bits = msg_filter_load.filter
+        self._num_bits = len(self._bits) * 8
+        self._seeds = tuple((i * murmurSeedStep + msg_filter_load.tweak) & 0xffffffff
+                            for i in range(msg_filter_load.hash_funcs))
+
+    # IsLoaded returns true if a filter is loaded, otherwise false.
+    #
+    # This function is safe for concurrent access.
+    def is_loaded(self) -> bool:
+        with self.lock:
+            return self.msg_filter_load is not None
+
+    # Reload loads a new filter replacing any existing filter.
+    #
+    # This function is safe for concurrent access.
+    def reload(self, msg_filter_load: wire.MsgFilterLoad):
+        with self.lock:
+            self._load(msg_filter_load)
+
+    # Unload unloads the bloom filter.
+    #
+    # This function is safe for concurrent access.
+    def unload(self):
+        with self.lock:
+            self._load(None)
+
+    # matches returns true if the bloom filter might contain the passed data and
+    # false if it definitely does not.
+    #
+    # This is MurmurHash3 inlined for all the hash functions at once: the
+    # blocks of the data are read and mixed once, as that part does not depend
+    # on the seed, and the match stops at the first clear bit, which is after
+    # the first hash function for most non matching data.
+    #
+    # This function MUST be called with the filter lock held.
+    def _matches(self, data) -> bool:
+        bits = self._bits
+        num_bits = self._num_bits
+        if not num_bits:
+            return False
+
+        # The rotations below are left unmasked where the result is next
+        # multiplied and masked, as the bits shifted above 32 do not change
+        # the product modulo 2^32.
+        data_len = len(data)
+        num_blocks = data_len // 4
+        blocks = ()
+        if num_blocks:
+            blocks = [((((k << 15) | (k >> 17)) & 0xffffffff) * 0x1b873593) & 0xffffffff
+                      for k in [(k * 0xcc9e2d51) & 0xffffffff
+                                for k in _murmur_blocks(num_blocks).unpack_from(data)]]
+        tail_len = data_len & 3
+        tail = data_len
+        if tail_len:
+            k = (int.from_bytes(data[data_len - tail_len:], "little") * 0xcc9e2d51) & 0xffffffff
+            tail ^= (((k << 15) | (k >> 17)) * 0x1b873593) & 0xffffffff
+
+        for hash in self._seeds:
+            for k in blocks:
+                hash ^= k
+                hash = (((hash << 13) | (hash >> 19)) * 5 + 0xe6546b64) & 0xffffffff
+            hash ^= tail
+            hash ^= hash >> 16
+            hash = (hash * 0x85ebca6b) & 0xffffffff
+            hash ^= hash >> 13
+            hash = (hash * 0xc2b2ae35) & 0xffffffff
+            hash ^= hash >> 16
+
+            idx = hash % num_bits
+            if not bits[idx >> 3] & (1 << (idx & 7)):
+                return False
+
+        return True
+
+    # Matches returns true if the bloom filter might contain the passed data and
+    # false if it definitely does not.
+    #
+    # This function is safe for concurrent access.
+    def matches(self, data) -> bool:
+        with self.lock:
+            return self._matches(data)
+
+    # matchesOutPoint returns true if the bloom filter might contain the passed
+    # outpoint and false if it definitely does not.
+    #
+    # This function MUST be called with the filter lock held.
+    def _matches_out_point(self, outpoint: wire.OutPoint) -> bool:
+        return self._matches(outpoint.hash.to_bytes() + _outPointIndex.pack(outpoint.index))
+
+    # MatchesOutPoint returns true if the bloom filter might contain the passed
+    # outpoint and false if it definitely does not.
+    #
+    # This function is safe for concurrent access.
+    def matches_out_point(self, outpoint: wire.OutPoint) -> bool:
+        with self.lock:
+            return self._matches_out_point(outpoint)
+
+    # add adds the passed byte slice to the bloom filter.
+    #
+    # This function MUST be called with the filter lock held.
+    def _add(self, data):
+        if self.msg_filter_load is None or not self._num_bits:
+            return
+
+        # Adding data to a bloom filter consists of setting all of the bit
+        # offsets which result from hashing the data using each independent
+        # hash function.  The shifts and masks below are a faster equivalent
+        # of:
+        #   arrayIndex := idx / 8     (idx >> 3)
+        #   bitOffset := idx % 8      (idx & 7)
+        #   filter[arrayIndex] |= 1<<bitOffset
+        bits = self._bits
+        for seed in self._seeds:
+            idx = murmur_hash3(seed, data) % self._num_bits
+            bits[idx >> 3] |= 1 << (idx & 7)
+
+    # Add adds the passed byte slice to the bloom filter.
+    #
+    # This function is safe for concurrent access.
+    def add(self, data):
+        with self.lock:
+            self._add(data)
+
+    # AddHash adds the passed chainhash.Hash to the Filter.
+    #
+    # This function is safe for concurrent access.
+    def add_hash(self, hash: wire.Hash):
+        with self.lock:
+            self._add(hash.to_bytes())
+
+    # addOutPoint adds the passed transaction outpoint to the bloom filter.
+    #
+    # This function MUST be called with the filter lock held.
+    def _add_out_point(self, outpoint: wire.OutPoint):
+        self._add(outpoint.hash.to_bytes() + _outPointIndex.pack(outpoint.index))
+
+    # AddOutPoint adds the passed transaction outpoint to the bloom filter.
+    #
+    # This function is safe for concurrent access.
+    def add_out_point(self, outpoint: wire.OutPoint):
+        with self.lock:
+            self._add_out_point(outpoint)
+
+    # maybeAddOutpoint potentially adds the passed outpoint to the bloom filter
+    # depending on the bloom update flags and the type of the passed public key
+    # script.
+    #
+    # This function MUST be called with the filter lock held.
+    def _maybe_add_out_point(self, pk_script, out_hash: bytes, out_idx: int):
+        flags = self.msg_filter_load.flags
+        if flags == wire.BloomUpdateType.BloomUpdateAll:
+            self._add(out_hash + _outPointIndex.pack(out_idx))
+        elif flags == wire.BloomUpdateType.BloomUpdateP2PubkeyOnly:
+            klass = txscript.get_script_class(bytes(pk_script))
+            if klass in (txscript.ScriptClass.PubKeyTy, txscript.ScriptClass.MultiSigTy):
+                self._add(out_hash + _outPointIndex.pack(out_idx))
+
+    # _matches_any_push returns whether the filter matches any of the data
+    # pushed by the script, or None when the script does not parse.
+    #
+    # This function MUST be called with the filter lock held.
+    def _matches_any_push(self, script):
+        try:
+            pushes = txscript.pushed_data_slices(script)
+        except txscript.ScriptError:
+            return None
+
+        for data in pushes:
+            if self._matches(data):
+                return True
+        return False
+
+    # matchTxAndUpdate returns true if the bloom filter matches data within the
+    # passed transaction, otherwise false is returned.  If the filter does match
+    # the passed transaction, it will also update the filter depending on the
+    # bloom update flags set via the loaded filter if needed.
+    #
+    # This function MUST be called with the filter lock held.
+    def _match_tx_and_update(self, tx) -> bool:
+        # Check if the filter matches the hash of the transaction.
+        # This is useful for finding transactions when they appear in a block.
+        tx_hash = tx.hash().to_bytes()
+        matched = self._matches(tx_hash)
+
+        # Check if the filter matches any data elements in the public key
+        # scripts of any of the outputs.  When it does, add the outpoint that
+        # matched so transactions which spend from the matched transaction are
+        # also included in the filter.  This removes the burden of updating the
+        # filter for this scenario from the client.  It is also more efficient
+        # on the network since it avoids the need for another filteradd message
+        # from the client and avoids some potential races that could otherwise
+        # occur.
+        msg_tx = tx.get_msg_tx()
+        for i, tx_out in enumerate(msg_tx.tx_outs):
+            if self._matches_any_push(tx_out.pk_script):
+                matched = True
+                self._maybe_add_out_point(tx_out.pk_script, tx_hash, i)
+
+        # Nothing more to do if a match has already been made.
+        if matched:
+            return True
+
+        # At this point, the transaction and none of the data elements in the
+        # public key scripts of its outputs matched.
+
+        # Check if the filter matches any outpoints this transaction spends or
+        # any data elements in the signature scripts of any of the inputs.
+        for tx_in in msg_tx.tx_ins:
+            if self._matches_out_point(tx_in.previous_out_point):
+                return True
+
+            if self._matches_any_push(tx_in.signature_script):
+                return True
+
+        return False
+
+    # MatchTxAndUpdate returns true if the bloom filter matches data within the
+    # passed transaction, otherwise false is returned.  If the filter does match
+    # the passed transaction, it will also update the filter depending on the
+    # bloom update flags set via the loaded filter if needed.
+    #
+    # This function is safe for concurrent access.
+    def match_tx_and_update(self, tx) -> bool:
+        with self.lock:
+            return self._match_tx_and_update(tx)
+
+    # matchSkimTxAndUpdate is matchTxAndUpdate for the transaction at the
+    # given index of a wire.BlockSkim.  The txid, output scripts and spent
+    # outpoints are read from the flat arrays of the skim, so no transaction
+    # object is built.
+    #
+    # This function MUST be called with the filter lock held.
+    def _match_skim_tx_and_update(self, skim: wire.BlockSkim, tx_idx: int) -> bool:
+        tx_hash = bytes(skim.txids[tx_idx * 32:(tx_idx + 1) * 32])
+        matched = self._matches(tx_hash)
+
+        out_range = skim.tx_out_range(tx_idx)
+        for out_idx in out_range:
+            pk_script = skim.out_script(out_idx)
+            if self._matches_any_push(pk_script):
+                matched = True
+                self._maybe_add_out_point(pk_script, tx_hash, out_idx - out_range.start)
+
+        if matched:
+            return True
+
+        prev_hashes = skim.prev_hashes
+        prev_indexes = skim.prev_indexes
+        for in_idx in skim.tx_in_range(tx_idx):
+            if self._matches(prev_hashes[in_idx * 32:(in_idx + 1) * 32] +
+                             _outPointIndex.pack(prev_indexes[in_idx])):
+                return True
+
+            if self._matches_any_push(skim.in_script(in_idx)):
+                return True
+
+        return False
+
+    # MatchBlockAndUpdate runs MatchTxAndUpdate over every transaction of the
+    # passed block, in order, and returns the indexes of the ones that matched.
+    # The block is read through its wire.BlockSkim, which makes filtering a
+    # block for each of many peers cheap.
+    #
+    # This function is safe for concurrent access.
+    def match_block_and_update(self, block) -> [int]:
+        skim = block.skim()
+        with self.lock:
+            return [tx_idx for tx_idx in range(skim.num_txs())
+                    if self._match_skim_tx_and_update(skim, tx_idx)]
+
+    # MsgFilterLoad returns the underlying wire.MsgFilterLoad for the bloom
+    # filter.
+    #
+    # This function is safe for concurrent access.
+    def get_msg_filter_load(self) -> wire.MsgFilterLoad:
+        with self.lock:
+            return self.msg_filter_load
@@ -0,0 +1,187 @@
+import blockchain
+import wire
+from .filter import *
+
+
+# MerkleBlockErr signifies a merkle block whose partial merkle tree is
+# malformed or does not commit to the merkle root of its header.
+class MerkleBlockErr(Exception):
+    pass
+
+
+# merkleBlock is used to house intermediate information needed to generate a
+# wire.MsgMerkleBlock according to a filter.
+class MerkleBlock:
+    def __init__(self, num_tx=0, all_hashes=None, matched_bits=None):
+        """
+
+        :param uint32 num_tx:
+        :param []*chainhash.Hash all_hashes:
+        :param []byte matched_bits:
+        """
+        self.num_tx = num_tx
+        self.all_hashes = all_hashes or []
+        self.final_hashes = []
+        self.matched_bits = matched_bits or []
+        self.bits = []
+
+    # calcTreeWidth calculates and returns the the number of nodes (width) or a
+    # merkle tree at the given depth-first height.
+    def calc_tree_width(self, height: int) -> int:
+        return (self.num_tx + (1 << height) - 1) >> height
+
+    # calcHash returns the hash for a sub-tree given a depth-first height and
+    # node position.
+    def calc_hash(self, height: int, pos: int) -> wire.Hash:
+        if height == 0:
+            return self.all_hashes[pos]
+
+        left = self.calc_hash(height - 1, pos * 2)
+        if pos * 2 + 1 < self.calc_tree_width(height - 1):
+            right = self.calc_hash(height - 1, pos * 2 + 1)
+        else:
+            right = left
+
+        return blockchain.hash_merkle_branches(left, right)
+
+    # traverseAndBuild builds a partial merkle tree using a recursive depth-first
+    # approach.  As it calculates the hashes, it also saves whether or not each
+    # node is a parent node and a list of final hashes to be included in the
+    # merkle block.
+    def traverse_and_build(self, height: int, pos: int):
+        # Determine whether this node is a parent of a matched node.
+        is_parent = any(self.matched_bits[pos << height:min((pos + 1) << height, self.num_tx)])
+        self.bits.append(is_parent)
+
+        # When the node is a leaf node or not a parent of a matched node,
+        # append the hash to the list that will be part of the final merkle
+        # block.
+        if height == 0 or not is_parent:
+            self.final_hashes.append(self.calc_hash(height, pos))
+            return
+
+        # At this point, the node is an internal node and it is the parent of
+        # of an included leaf node.
+
+        # Descend into the left child and process its sub-tree.
+        self.traverse_and_build(height - 1, pos * 2)
+
+        # Descend into the right child and process its sub-tree if
+        # there is one.
+        if pos * 2 + 1 < self.calc_tree_width(height - 1):
+            self.traverse_and_build(height - 1, pos * 2 + 1)
+
+    # tree_height returns the height of the merkle tree of the transactions.
+    def tree_height(self) -> int:
+        height = 0
+        while self.calc_tree_width(height) > 1:
+            height += 1
+        return height
+
+    # msg_merkle_block returns the wire.MsgMerkleBlock of the partial merkle
+    # tree built by traverse_and_build, for the given block header.
+    def msg_merkle_block(self, header: wire.BlockHeader) -> wire.MsgMerkleBlock:
+        msg = wire.MsgMerkleBlock(header=header, transactions=self.num_tx)
+        for hash in self.final_hashes:
+            msg.add_tx_hash(hash)
+
+        flags = bytearray((len(self.bits) + 7) // 8)
+        for i, bit in enumerate(self.bits):
+            if bit:
+                flags[i // 8] |= 1 << (i % 8)
+        msg.flags = bytes(flags)
+        return msg
+
+
+# NewMerkleBlock returns a new *wire.MsgMerkleBlock and an array of the matched
+# transaction index numbers based on the passed block and filter.
+def new_merkle_block(block, filter: Filter) -> (wire.MsgMerkleBlock, [int]):
+    matched_indices = filter.match_block_and_update(block)
+
+    skim = block.skim()
+    num_tx = skim.num_txs()
+    matched_bits = [False] * num_tx
+    for tx_idx in matched_indices:
+        matched_bits[tx_idx] = True
+
+    m_block = MerkleBlock(num_tx=num_tx,
+                          all_hashes=[skim.tx_hash(tx_idx) for tx_idx in range(num_tx)],
+                          matched_bits=matched_bits)
+
+    # Calculate the number of merkle branches (height) in the tree and build
+    # the depth-first partial merkle tree.
+    m_block.traverse_and_build(m_block.tree_height(), 0)
+
+    return m_block.msg_merkle_block(block.get_msg_block().header), matched_indices
+
+
+# _PartialMerkleTree walks the hashes and flags of a wire.MsgMerkleBlock in the
+# order traverse_and_build produced them, collecting the matched transactions.
+class _PartialMerkleTree:
+    def __init__(self, msg: wire.MsgMerkleBlock):
+        self.m_block = MerkleBlock(num_tx=msg.transactions)
+        self.hashes = msg.hashes
+        self.flags = msg.flags
+        self.num_bits = len(msg.flags) * 8
+        self.bits_used = 0
+        self.hashes_used = 0
+        self.matched_hashes = []
+        self.matched_indices = []
+
+    def traverse_and_extract(self, height: int, pos: int) -> wire.Hash:
+        if self.bits_used >= self.num_bits:
+            raise MerkleBlockErr("merkle block has too few flag bits")
+        is_parent = self.flags[self.bits_used >> 3] & (1 << (self.bits_used & 7))
+        self.bits_used += 1
+
+        if height == 0 or not is_parent:
+            if self.hashes_used >= len(self.hashes):
+                raise MerkleBlockErr("merkle block has too few hashes")
+            hash = self.hashes[self.hashes_used]
+            self.hashes_used += 1
+            if height == 0 and is_parent:
+                self.matched_hashes.append(hash)
+                self.matched_indices.append(pos)
+            return hash
+
+        left = self.traverse_and_extract(height - 1, pos * 2)
+        if pos * 2 + 1 < self.m_block.calc_tree_width(height - 1):
+            right = self.traverse_and_extract(height - 1, pos * 2 + 1)
+
+            # Identical siblings make a different transaction list hash to
+            # the same merkle root (CVE-2012-2459), so they are rejected.
+            if right == left:
+                raise MerkleBlockErr("merkle block has identical sibling hashes")
+        else:
+            right = left
+
+        return blockchain.hash_merkle_branches(left, right)
+
+
+# MerkleBlockMatches verifies the partial merkle tree of the passed merkle
+# block against the merkle root of its header and returns the hashes of the
+# matched transactions along with their indexes in the block.  A malformed
+# tree, one with unused hashes or flag bytes, or one that does not commit to
+# the merkle root raises MerkleBlockErr.
+def merkle_block_matches(msg: wire.MsgMerkleBlock) -> ([wire.Hash], [int]):
+    # A message built without a count holds an empty list in transactions.
+    if not msg.transactions:
+        raise MerkleBlockErr("merkle block has no transactions")
+    if msg.transactions > wire.maxTxPerBlock:
+        raise MerkleBlockErr("merkle block has too many transactions")
+    if len(msg.hashes) > msg.transactions:
+        raise MerkleBlockErr("merkle block has more hashes than transactions")
+    if len(msg.flags) * 8 < len(msg.hashes):
+        raise MerkleBlockErr("merkle block has fewer flag bits than hashes")
+
+    tree = _PartialMerkleTree(msg)
+    merkle_root = tree.traverse_and_extract(tree.m_block.tree_height(), 0)
+
+    if (tree.bits_used + 7) // 8 != len(msg.flags):
+        raise MerkleBlockErr("merkle block has unused flag bytes")
+    if tree.hashes_used != len(msg.hashes):
+        raise MerkleBlockErr("merkle block has unused hashes")
+    if merkle_root != msg.header.merkle_root:
+        raise MerkleBlockErr("merkle block does not match the merkle root of its header")
+
+    return tree.matched_hashes, tree.matched_indices
@@ -0,0 +1,60 @@
+import struct
+
+# The following constants are used by the MurmurHash3 algorithm.
+murmurC1 = 0xcc9e2d51
+murmurC2 = 0x1b873593
+murmurR1 = 15
+murmurR2 = 13
+murmurM = 5
+murmurN = 0xe6546b64
+
+_mask32 = 0xffffffff
+
+# _murmurBlocks caches the layouts reading n 4-byte little endian blocks,
+# keyed by n, so all the blocks of the data are read in a single call.
+_murmurBlocks = {}
+
+
+def _murmur_blocks(n):
+    layout = _murmurBlocks.get(n)
+    if layout is None:
+        layout = struct.Struct("<%dI" % n)
+        _murmurBlocks[n] = layout
+    return layout
+
+
+# MurmurHash3 implements a non-cryptographic hash function using the
+# MurmurHash3 algorithm.  This implementation yields a 32-bit hash value which
+# is suitable for general hash-based lookups.  The seed can be used to
+# effectively randomize the hash function.  This makes it ideal for use in
+# bloom filters which need multiple independent hash functions.
+def murmur_hash3(seed: int, data) -> int:
+    data_len = len(data)
+    hash = seed
+    num_blocks = data_len // 4
+
+    # Mix all complete 4-byte blocks of the data.
+    if num_blocks:
+        for k in _murmur_blocks(num_blocks).unpack_from(data):
+            k = (k * murmurC1) & _mask32
+            k = ((k << murmurR1) | (k >> (32 - murmurR1))) & _mask32
+            hash ^= (k * murmurC2) & _mask32
+            hash = ((hash << murmurR2) | (hash >> (32 - murmurR2))) & _mask32
+            hash = (hash * murmurM + murmurN) & _mask32
+
+    # Handle remaining bytes.
+    tail_len = data_len & 3
+    if tail_len:
+        k = int.from_bytes(data[data_len - tail_len:], "little")
+        k = (k * murmurC1) & _mask32
+        k = ((k << murmurR1) | (k >> (32 - murmurR1))) & _mask32
+        hash ^= (k * murmurC2) & _mask32
+
+    # Finalization.
+    hash ^= data_len
+    hash ^= hash >> 16
+    hash = (hash * 0x85ebca6b) & _mask32
+    hash ^= hash >> 13
+    hash = (hash * 0xc2b2ae35) & _mask32
+    hash ^= hash >> 16
+    return hash
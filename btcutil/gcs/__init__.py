@@ -0,0 +1,2 @@
+from .gcs import *
+from .builder import *
@@ -0,0 +1,62 @@
+import chainhash
+import wire
+from .gcs import *
+
+# DefaultP is the default collision probability (2^-19).
+DefaultP = 19
+
+# DefaultM is the default value used for the hash range.
+DefaultM = 784931
+
+# opReturn is the opcode that marks an output script as provably unspendable.
+# Such outputs are left out of the basic filter.
+opReturn = 0x6a
+
+
+# DeriveKey is a utility function that derives a key from a chainhash.Hash by
+# truncating the bytes of the hash to the appopriate key size.
+def derive_key(block_hash: chainhash.Hash) -> bytes:
+    return block_hash.to_bytes()[:KeySize]
+
+
+# basic_filter_items returns the distinct elements of the basic filter of a
+# block: every output script except empty and OP_RETURN ones, and every
+# non-empty script the block spends.
+def basic_filter_items(out_scripts, prev_out_scripts) -> set:
+    items = {bytes(script) for script in out_scripts if len(script) != 0 and script[0] != opReturn}
+    items.update(bytes(script) for script in prev_out_scripts if len(script) != 0)
+    return items
+
+
+# BuildBasicFilter builds a basic GCS filter from a block. A basic GCS filter
+# will contain all the previous output scripts spent by inputs within a block,
+# as well as the data pushes within all the outputs created within a block.
+def build_basic_filter(block: wire.MsgBlock, prev_out_scripts) -> Filter:
+    out_scripts = [tx_out.pk_script for tx in block.transactions for tx_out in tx.tx_outs]
+    return Filter.build(DefaultP, DefaultM, derive_key(block.block_hash()),
+                        basic_filter_items(out_scripts, prev_out_scripts))
+
+
+# build_basic_filter_from_skim builds the same filter as build_basic_filter
+# from a wire.BlockSkim of the serialized block, without decoding it.
+def build_basic_filter_from_skim(skim: wire.BlockSkim, prev_out_scripts) -> Filter:
+    out_scripts = [skim.out_script(i) for i in range(skim.num_tx_outs())]
+    return Filter.build(DefaultP, DefaultM, derive_key(skim.block_hash()),
+                        basic_filter_items(out_scripts, prev_out_scripts))
+
+
+# GetFilterHash returns the double-SHA256 of the filter.
+def get_filter_hash(filter: Filter) -> chainhash.Hash:
+    return chainhash.double_hash_h(filter.n_bytes())
+
+
+# MakeHeaderForFilter makes a filter chain header for a filter, given the
+# filter and the previous filter chain header.
+def make_header_for_filter(filter: Filter, prev_header: chainhash.Hash) -> chainhash.Hash:
+    return make_header_for_filter_hash(get_filter_hash(filter), prev_header)
+
+
+# make_header_for_filter_hash makes a filter chain header from the hash of the
+# filter and the previous filter chain header.
+def make_header_for_filter_hash(filter_hash: chainhash.Hash, prev_header: chainhash.Hash) -> chainhash.Hash:
+    return chainhash.double_hash_h(filter_hash.to_bytes() + prev_header.to_bytes())
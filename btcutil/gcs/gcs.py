@@ -0,0 +1,201 @@
+import bisect
+import io
+import wire
+from chainhash.siphash import siphash24
+
+# KeySize is the size of the byte array required for key material for the
+# SipHash keyed hash function.
+KeySize = 16
+
+# MaxP is the largest Golomb-Rice parameter a filter may use.
+MaxP = 32
+
+
+# NTooBigErr signifies that the filter can't handle N items.
+class NTooBigErr(Exception):
+    pass
+
+
+# PTooBigErr signifies that the filter can't handle `1/2**P` collision
+# probability.
+class PTooBigErr(Exception):
+    pass
+
+
+# MisserializedErr signifies a filter was misserialized and is missing the
+# N and/or P parameters of a serialized filter.
+class MisserializedErr(Exception):
+    pass
+
+
+# key_halves splits the 16 bytes filter key into the two little endian
+# 64-bit SipHash keys.
+def key_halves(key: bytes) -> (int, int):
+    return int.from_bytes(key[:8], "little"), int.from_bytes(key[8:KeySize], "little")
+
+
+# hashed_values maps every data element to [0, modulus) with SipHash-2-4 and
+# the multiply-and-shift range reduction of BIP0158, and returns the values
+# sorted.
+def hashed_values(key: bytes, data, modulus: int) -> [int]:
+    k0, k1 = key_halves(key)
+    return sorted([(siphash24(k0, k1, item) * modulus) >> 64 for item in data])
+
+
+# golomb_encode returns the Golomb-Rice coding of the differences between the
+# sorted values: for every delta the quotient delta >> p in unary (ones closed
+# by a zero) followed by the low p bits, most significant bit first, padded to
+# a whole number of bytes.
+#
+# The bit stream is assembled as a string of '0' and '1' so a single int()
+# conversion does the packing, instead of shifting bits into a growing int.
+def golomb_encode(values: [int], p: int) -> bytes:
+    mask = (1 << p) - 1
+    remainder_fmt = "0%db" % p
+    bits = []
+    last = 0
+    for value in values:
+        delta = value - last
+        last = value
+        bits.append("1" * (delta >> p) + "0" + (format(delta & mask, remainder_fmt) if p else ""))
+
+    bits = "".join(bits)
+    num_bytes = (len(bits) + 7) // 8
+    if num_bytes == 0:
+        return b""
+    return int(bits.ljust(num_bytes * 8, "0"), 2).to_bytes(num_bytes, "big")
+
+
+# golomb_decode reverses golomb_encode for n values.
+def golomb_decode(data: bytes, n: int, p: int) -> [int]:
+    if n == 0:
+        return []
+
+    bits = format(int.from_bytes(data, "big"), "0%db" % (len(data) * 8))
+    bits_len = len(bits)
+    find = bits.find
+    values = []
+    pos = 0
+    last = 0
+    for _ in range(n):
+        end = find("0", pos)
+        remainder_end = end + 1 + p
+        if end < 0 or remainder_end > bits_len:
+            raise MisserializedErr("filter data ends before its %d values" % n)
+        last += ((end - pos) << p) | (int(bits[end + 1:remainder_end], 2) if p else 0)
+        values.append(last)
+        pos = remainder_end
+    return values
+
+
+# Filter describes an immutable filter that can be built from a set of data
+# elements, serialized, deserialized, and queried in a thread-safe manner. The
+# serialized form is compressed as a Golomb Coded Set (GCS), but does not
+# include N or P to allow the user to encode the metadata separately if
+# necessary. The hash function used is SipHash, a keyed function; the key used
+# in building the filter is required in order to match filter values and is
+# not included in the serialized form.
+class Filter:
+    def __init__(self, n: int, p: int, modulus_np: int, filter_data: bytes, values=None):
+        self._n = n
+        self._p = p
+        self._modulus_np = modulus_np
+        self._filter_data = filter_data
+
+        # The decoded values, sorted, filled on the first match.
+        self._values = values
+
+    # BuildGCSFilter builds a new GCS filter with the collision probability of
+    # `1/(2**P)`, key `key`, and including every `[]byte` in `data` as a member
+    # of the set.
+    @classmethod
+    def build(cls, p: int, m: int, key: bytes, data) -> 'Filter':
+        data = list(data)
+        n = len(data)
+        if n >= 1 << 32:
+            raise NTooBigErr
+        if p > MaxP:
+            raise PTooBigErr
+
+        modulus_np = n * m
+        values = hashed_values(key, data, modulus_np)
+        return cls(n, p, modulus_np, golomb_encode(values, p), values=values)
+
+    # FromBytes deserializes a GCS filter from a known N, P, and serialized
+    # filter as returned by bytes().
+    @classmethod
+    def from_bytes(cls, n: int, p: int, m: int, filter_data: bytes) -> 'Filter':
+        if p > MaxP:
+            raise PTooBigErr
+        return cls(n, p, n * m, bytes(filter_data))
+
+    # FromNBytes deserializes a GCS filter from a known P, and serialized N and
+    # filter as returned by n_bytes().
+    @classmethod
+    def from_n_bytes(cls, p: int, m: int, filter_bytes: bytes) -> 'Filter':
+        if len(filter_bytes) == 0:
+            raise MisserializedErr("filter is missing N")
+
+        s = io.BytesIO(filter_bytes)
+        try:
+            n = wire.read_var_int(s, 0)
+        except Exception:
+            raise MisserializedErr("filter is missing N")
+        if n >= 1 << 32:
+            raise NTooBigErr
+        return cls.from_bytes(n, p, m, filter_bytes[s.tell():])
+
+    def __eq__(self, other):
+        return type(other) is Filter and \
+               self._n == other._n and \
+               self._p == other._p and \
+               self._modulus_np == other._modulus_np and \
+               self._filter_data == other._filter_data
+
+    # Bytes returns the serialized format of the GCS filter, which does not
+    # include N or P (returned by separate methods) or the key used by SipHash.
+    def bytes(self) -> bytes:
+        return self._filter_data
+
+    # NBytes returns the serialized format of the GCS filter with N, which does
+    # not include P (returned by a separate method) or the key used by SipHash.
+    def n_bytes(self) -> bytes:
+        s = io.BytesIO()
+        wire.write_var_int(s, 0, self._n)
+        s.write(self._filter_data)
+        return s.getvalue()
+
+    # P returns the filter's collision probability as a negative power of 2
+    # (that is, a collision probability of `1/2**20` is represented as 20).
+    def p(self) -> int:
+        return self._p
+
+    # N returns the size of the data set used to build the filter.
+    def n(self) -> int:
+        return self._n
+
+    def values(self) -> [int]:
+        if self._values is None:
+            self._values = golomb_decode(self._filter_data, self._n, self._p)
+        return self._values
+
+    # Match checks whether a []byte value is likely (within collision
+    # probability) to be a member of the set represented by the filter.
+    def match(self, key: bytes, data: bytes) -> bool:
+        if self._n == 0:
+            return False
+
+        term = hashed_values(key, [data], self._modulus_np)[0]
+        values = self.values()
+        i = bisect.bisect_left(values, term)
+        return i < len(values) and values[i] == term
+
+    # MatchAny returns checks whether any []byte value is likely (within
+    # collision probability) to be a member of the set represented by the
+    # filter faster than calling Match() for each value individually.
+    def match_any(self, key: bytes, data) -> bool:
+        if self._n == 0:
+            return False
+
+        terms = hashed_values(key, data, self._modulus_np)
+        return not set(self.values()).isdisjoint(terms)
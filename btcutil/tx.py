@@ -38,8 +38,9 @@ class Tx:
 
     @classmethod
     def from_bytes(cls, serialized_tx: bytes):
-        r = io.BytesIO(serialized_tx)
-        return cls.from_reader(r)
+        msg_tx = wire.MsgTx()
+        msg_tx.deserialize_buffer(serialized_tx)
+        return cls(msg_tx=msg_tx, tx_index=TxIndexUnknown)
 
     @classmethod
     def from_msg_tx(cls, msg_tx: wire.MsgTx):
@@ -56,7 +57,9 @@ class Tx:
         if self.tx_hash is not None:
             return self.tx_hash
 
-        hash = self.msg_tx.tx_hash()
+        # Hash the bytes the transaction was decoded from when they are
+        # available, instead of serializing it again.
+        hash = self.msg_tx.decoded_tx_hash() or self.msg_tx.tx_hash()
         self.tx_hash = hash
         return hash
 
@@ -67,7 +70,7 @@ class Tx:
         if self.tx_hash_witness is not None:
             return self.tx_hash_witness
 
-        hash = self.msg_tx.witness_hash()
+        hash = self.msg_tx.decoded_witness_hash() or self.msg_tx.witness_hash()
         self.tx_hash_witness = hash
         return hash
 
@@ -1,2 +1,4 @@
 from .hash import *
-from .hashfuncs import *
\ No newline at end of file
+from .hashfuncs import *
+from .siphash import *
+from .sha256 import *
@@ -1,5 +1,3 @@
-import copy
-
 # HashSize of array used to store hashes.  See Hash.
 HashSize = 32
 
@@ -29,23 +27,37 @@ class HashStrSizeErr(Err):
 #     \                      /
 #       -------->    <-------
 
-class Hash:
-    def __init__(self, data=None):
-        if type(data) is bytes:
-            self._data = data
+# Hash is used in several of the bitcoin messages and common structures.  It
+# typically represents the double sha256 of data.
+#
+# It is an immutable bytes subclass, so hashing and comparing a Hash, e.g. as
+# a dict key, runs entirely in bytes' own C implementation.  A Hash compares
+# equal to the bytes it holds.  The string form is the byte-reversed hex, as
+# bitcoin displays hashes.
+class Hash(bytes):
+    __slots__ = ()
+
+    # A Hash is made from its byte-reversed hex string or from HashSize bytes,
+    # given as any bytes-like object or sequence of ints.  It is the zero hash
+    # only when no data is given.
+    def __new__(cls, data=None):
+        if data is None:
+            data = bytes(HashSize)
         elif type(data) is str:
-            self._data = self.str_to_bytes(data)
+            data = cls.str_to_bytes(data)
+        elif isinstance(data, int):
+            raise TypeError("a hash is not made from an int")
         else:
-            self._data = bytes(HashSize)
+            data = bytes(data)
+            if len(data) != HashSize:
+                raise ValueError("invalid hash length of %d, want %d" % (len(data), HashSize))
+        return bytes.__new__(cls, data)
 
     def to_bytes(self):
-        return self._data
+        return bytes(self)
 
     def to_str(self):
-        b = bytearray(self._data)
-        for i in range(0, int(HashSize / 2)):
-            b[i], b[HashSize - 1 - i] = b[HashSize - 1 - i], b[i]
-        return b.hex()
+        return self[::-1].hex()
 
     @staticmethod
     def str_to_bytes(s):
@@ -55,46 +67,23 @@ class Hash:
         if len(s) % 2 != 0:
             s = '0' + s
 
-        decoded_len = int(len(bytearray(s.encode()))/2)
-        start_index = HashSize - decoded_len
-
-        reversed_s = bytearray(start_index) + bytearray.fromhex(s)
-
-        result = bytearray(HashSize)
-        for i in range(0, int(HashSize / 2)):
-            result[i], result[HashSize - 1 - i] = reversed_s[HashSize - 1 - i], reversed_s[i]
-        return bytes(result)
+        # Hex strings are big endian with the leading zeros possibly stripped,
+        # the hash bytes little endian.
+        return bytes.fromhex(s)[::-1].ljust(HashSize, b'\x00')
 
     @staticmethod
     def bytes_to_str(b):
-        b = bytearray(b)
-        for i in range(0, int(HashSize / 2)):
-            b[i], b[HashSize - 1 - i] = b[HashSize - 1 - i], b[i]
-        return b.hex()
-
-    def __len__(self):
-        return len(self._data)
+        return bytes(b)[::-1].hex()
 
     def __str__(self):
         return self.to_str()
 
     def __repr__(self):
-        return self._data.hex()
-
-    def __eq__(self, other: 'Hash') -> bool:
-        return type(other) is Hash and self._data == other._data
-
-    def __ne__(self, other):
-        return not(self == other)
-
-    def __hash__(self):
-        return hash(self._data)
+        return self.hex()
 
     def copy_bytes(self):
-        return copy.deepcopy(self._data)
-
-    def set_bytes(self, b):
-        self._data = copy.deepcopy(b)
+        return bytes(self)
 
+    # copy returns the hash itself, as a Hash is immutable.
     def copy(self):
-        return Hash(self.copy_bytes())
+        return self
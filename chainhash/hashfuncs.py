@@ -1,4 +1,6 @@
 import hashlib
+import os
+import pyutil
 from .hash import Hash
 
 
@@ -28,3 +30,74 @@ def double_hash_b(b: bytes) -> bytes:
 # Hash.
 def double_hash_h(b: bytes) -> Hash:
     return Hash(double_hash_b(b))
+
+
+# DoubleHashPartsH calculates hash(hash(b)) where b is the concatenation of
+# parts, without building b, and returns the resulting bytes as a Hash.
+def double_hash_parts_h(parts) -> Hash:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part)
+    return Hash(hash_b(h.digest()))
+
+
+# hashlibGILReleaseSize is the size of data from which hashlib releases the
+# GIL while hashing, so threads can hash buffers that large in parallel.
+hashlibGILReleaseSize = 2048
+
+# doubleHashManyChunkSize is the number of buffers hashed per task when
+# double_hash_many spreads the work over a pool.
+doubleHashManyChunkSize = 2048
+
+# doubleHashManyProcessMin is the number of buffers from which
+# double_hash_many spreads buffers smaller than hashlibGILReleaseSize over a
+# process pool.  Below it, sending the buffers to other processes costs more
+# than hashing them in place.
+doubleHashManyProcessMin = 100000
+
+
+def _double_hash_chunk(buffers) -> [bytes]:
+    sha256 = hashlib.sha256
+    return [sha256(sha256(b).digest()).digest() for b in buffers]
+
+
+# DoubleHashManyB calculates hash(hash(b)) of every buffer and returns the
+# resulting bytes, in order.
+#
+# Few buffers are hashed in a plain loop.  Otherwise the buffers are hashed in
+# chunks over the workers (all the CPUs by default): in threads when they are
+# large enough for hashlib to release the GIL, in processes when there are at
+# least doubleHashManyProcessMin smaller ones, and in a plain loop when neither
+# would pay off.
+def double_hash_many_b(buffers, workers: int = None) -> [bytes]:
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    num_buffers = len(buffers)
+    if workers < 2 or num_buffers < 2 * doubleHashManyChunkSize:
+        return _double_hash_chunk(buffers)
+
+    if sum(len(b) for b in buffers) >= num_buffers * hashlibGILReleaseSize:
+        pool = pyutil.thread_pool(workers)
+    elif num_buffers >= doubleHashManyProcessMin:
+        pool = pyutil.process_pool(workers)
+        buffers = [bytes(b) for b in buffers]
+    else:
+        return _double_hash_chunk(buffers)
+
+    chunks = [buffers[i:i + doubleHashManyChunkSize] for i in range(0, num_buffers, doubleHashManyChunkSize)]
+    return [digest for digests in pool.map(_double_hash_chunk, chunks) for digest in digests]
+
+
+# DoubleHashMany calculates hash(hash(b)) of every buffer and returns the
+# resulting bytes as Hashes, in order.  See double_hash_many_b.
+def double_hash_many(buffers, workers: int = None) -> [Hash]:
+    return [Hash(digest) for digest in double_hash_many_b(buffers, workers)]
+
+
+# DoubleHashPairs hashes one level of a merkle tree into the next.  The level
+# is the concatenation of its 32-byte nodes, an even number of them, and the
+# result is the concatenation of hash(hash(left + right)) of each 64-byte pair.
+def double_hash_pairs(level, workers: int = None) -> bytes:
+    view = memoryview(level)
+    return b''.join(double_hash_many_b([view[i:i + 64] for i in range(0, len(view), 64)], workers))
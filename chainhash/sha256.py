@@ -0,0 +1,107 @@
+import hashlib
+import struct
+
+# sha256BlockSize is the size of the blocks SHA-256 compresses a message in.
+sha256BlockSize = 64
+
+# sha256IV is the initial SHA-256 state.
+sha256IV = (0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+            0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19)
+
+# sha256K are the SHA-256 round constants.
+sha256K = (
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+)
+
+_mask32 = 0xffffffff
+_sha256Words = struct.Struct(">16I")
+_sha256State = struct.Struct(">8I")
+
+
+# SHA256Compress runs the SHA-256 compression function over one 64-byte block
+# of a message and returns the state that follows the passed one.
+def sha256_compress(state, block) -> tuple:
+    w = list(_sha256Words.unpack(block))
+    for i in range(16, 64):
+        x = w[i - 15]
+        y = w[i - 2]
+        s0 = ((x >> 7) | (x << 25)) ^ ((x >> 18) | (x << 14)) ^ (x >> 3)
+        s1 = ((y >> 17) | (y << 15)) ^ ((y >> 19) | (y << 13)) ^ (y >> 10)
+        w.append((w[i - 16] + s0 + w[i - 7] + s1) & _mask32)
+
+    a, b, c, d, e, f, g, h = state
+    for i in range(64):
+        s1 = (((e >> 6) | (e << 26)) ^ ((e >> 11) | (e << 21)) ^ ((e >> 25) | (e << 7))) & _mask32
+        t1 = h + s1 + ((e & f) ^ (~e & g)) + sha256K[i] + w[i]
+        s0 = (((a >> 2) | (a << 30)) ^ ((a >> 13) | (a << 19)) ^ ((a >> 22) | (a << 10))) & _mask32
+        t2 = s0 + ((a & b) ^ (a & c) ^ (b & c))
+        h = g
+        g = f
+        f = e
+        e = (d + t1) & _mask32
+        d = c
+        c = b
+        b = a
+        a = (t1 + t2) & _mask32
+
+    return tuple((x + y) & _mask32 for x, y in zip(state, (a, b, c, d, e, f, g, h)))
+
+
+# SHA256Finish completes the SHA-256 of a message from the state after its
+# first blocks and the remaining tail bytes, and returns the digest.  msg_len
+# is the length of the whole message, which the padding encodes.
+def sha256_finish(state, tail, msg_len: int) -> bytes:
+    tail = bytes(tail) + b'\x80'
+    tail += bytes(-(len(tail) + 8) % sha256BlockSize) + (msg_len * 8).to_bytes(8, "big")
+    for i in range(0, len(tail), sha256BlockSize):
+        state = sha256_compress(state, tail[i:i + sha256BlockSize])
+    return _sha256State.pack(*state)
+
+
+# Midstate is the SHA-256 state after the first 64-byte block of a message.
+#
+# Finishing a message from it is done by a copy of the C state of a hashlib
+# object that has consumed the block, which is what makes reusing a midstate
+# cheaper than hashing the whole message again.  The state words themselves,
+# as exchanged by mining protocols, are computed by the pure Python
+# compression function on first use.
+class Midstate:
+    __slots__ = ('block', '_sha256', '_state')
+
+    def __init__(self, block):
+        if len(block) != sha256BlockSize:
+            raise ValueError("midstate block must be %d bytes, got %d" % (sha256BlockSize, len(block)))
+        self.block = bytes(block)
+        self._sha256 = hashlib.sha256(self.block)
+        self._state = None
+
+    # state returns the eight 32-bit words of the SHA-256 state.
+    def state(self) -> tuple:
+        if self._state is None:
+            self._state = sha256_compress(sha256IV, self.block)
+        return self._state
+
+    # to_bytes returns the state words serialized big endian.
+    def to_bytes(self) -> bytes:
+        return _sha256State.pack(*self.state())
+
+
+# midstate returns the SHA-256 midstate of the first 64 bytes of a message.
+def midstate(first_64_bytes) -> Midstate:
+    return Midstate(first_64_bytes)
+
+
+# finish returns hash(hash(b)) of the message made of the first 64 bytes the
+# midstate was computed from followed by the tail bytes, such as the last 16
+# bytes of a block header.
+def finish(m: Midstate, tail) -> bytes:
+    sha256 = m._sha256.copy()
+    sha256.update(tail)
+    return hashlib.sha256(sha256.digest()).digest()
@@ -0,0 +1,72 @@
+import struct
+
+_mask64 = 0xffffffffffffffff
+
+# _sipWords caches the layouts reading n message words, 8 bytes little endian
+# each, keyed by n.
+_sipWords = {}
+
+
+def _sip_words(n):
+    layout = _sipWords.get(n)
+    if layout is None:
+        layout = struct.Struct("<%dQ" % n)
+        _sipWords[n] = layout
+    return layout
+
+
+# SipHash24 computes SipHash-2-4 of data keyed with the two 64-bit halves of
+# the key (k0 is the first 8 bytes of the 128-bit key read little endian, k1
+# the last 8) and returns the 64-bit result as an int.
+#
+# It is used for the BIP0152 compact block short transaction ids and the
+# BIP0158 filter hashes, both of which derive k0 and k1 from a block hash.
+def siphash24(k0: int, k1: int, data: bytes) -> int:
+    v0 = k0 ^ 0x736f6d6570736575
+    v1 = k1 ^ 0x646f72616e646f6d
+    v2 = k0 ^ 0x6c7967656e657261
+    v3 = k1 ^ 0x7465646279746573
+
+    n = len(data)
+    full = n // 8
+    tail = data[full * 8:]
+    words = list(_sip_words(full).unpack_from(data)) if full else []
+    words.append(((n & 0xff) << 56) | int.from_bytes(tail, "little"))
+
+    for m in words:
+        v3 ^= m
+        for _ in range(2):
+            v0 = (v0 + v1) & _mask64
+            v1 = ((v1 << 13) | (v1 >> 51)) & _mask64
+            v1 ^= v0
+            v0 = ((v0 << 32) | (v0 >> 32)) & _mask64
+            v2 = (v2 + v3) & _mask64
+            v3 = ((v3 << 16) | (v3 >> 48)) & _mask64
+            v3 ^= v2
+            v0 = (v0 + v3) & _mask64
+            v3 = ((v3 << 21) | (v3 >> 43)) & _mask64
+            v3 ^= v0
+            v2 = (v2 + v1) & _mask64
+            v1 = ((v1 << 17) | (v1 >> 47)) & _mask64
+            v1 ^= v2
+            v2 = ((v2 << 32) | (v2 >> 32)) & _mask64
+        v0 ^= m
+
+    v2 ^= 0xff
+    for _ in range(4):
+        v0 = (v0 + v1) & _mask64
+        v1 = ((v1 << 13) | (v1 >> 51)) & _mask64
+        v1 ^= v0
+        v0 = ((v0 << 32) | (v0 >> 32)) & _mask64
+        v2 = (v2 + v3) & _mask64
+        v3 = ((v3 << 16) | (v3 >> 48)) & _mask64
+        v3 ^= v2
+        v0 = (v0 + v3) & _mask64
+        v3 = ((v3 << 21) | (v3 >> 43)) & _mask64
+        v3 ^= v0
+        v2 = (v2 + v1) & _mask64
+        v1 = ((v1 << 17) | (v1 >> 47)) & _mask64
+        v1 ^= v2
+        v2 = ((v2 << 32) | (v2 >> 32)) & _mask64
+
+    return v0 ^ v1 ^ v2 ^ v3
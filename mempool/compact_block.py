@@ -0,0 +1,169 @@
+import time
+import btcutil
+import blockchain
+import wire
+from .error import *
+
+
+# ReconstructStats records how a compact block was reconstructed.  hit_rate
+# is the share of the transactions that were not prefilled which were found
+# in the mempool, and elapsed the seconds between receiving the compact block
+# and having the full block.
+class ReconstructStats:
+    def __init__(self):
+        self.num_txs = 0
+        self.num_prefilled = 0
+        self.num_from_pool = 0
+        self.num_requested = 0
+        self.num_collisions = 0
+        self.elapsed = 0.0
+
+    def hit_rate(self) -> float:
+        num_short_ids = self.num_txs - self.num_prefilled
+        if num_short_ids == 0:
+            return 1.0
+        return self.num_from_pool / num_short_ids
+
+    def __repr__(self):
+        return "ReconstructStats(txs={}, prefilled={}, from_pool={}, requested={}, collisions={}, " \
+               "hit_rate={:.3f}, elapsed={:.6f})".format(self.num_txs, self.num_prefilled, self.num_from_pool,
+                                                         self.num_requested, self.num_collisions,
+                                                         self.hit_rate(), self.elapsed)
+
+
+# CompactBlockReconstructor rebuilds a block announced with a BIP0152
+# cmpctblock message from the transactions the node already has.
+#
+# The prefilled transactions are placed first, then fill_from_pool matches the
+# short ids against the given transactions (usually the mempool, see
+# TxPool.fill_compact_block).  Transactions still missing are requested with
+# get_block_txn, and once add_block_txn has been handed the answer, block
+# returns the full block.  When two candidate transactions share a short id,
+# neither is used and the index is requested instead.
+class CompactBlockReconstructor:
+    def __init__(self, cmpct: wire.MsgCmpctBlock, use_wtxid=True):
+        self.start = time.perf_counter()
+        self.cmpct = cmpct
+        self.use_wtxid = use_wtxid
+        self.k0, self.k1 = cmpct.short_id_keys()
+
+        self.stats = ReconstructStats()
+        self.stats.num_txs = num_txs = cmpct.total_txs()
+        self.stats.num_prefilled = len(cmpct.prefilled_txs)
+
+        self.txs = [None] * num_txs
+        for prefilled in cmpct.prefilled_txs:
+            if prefilled.index >= num_txs:
+                raise CompactBlockErr("prefilled transaction index {} out of range".format(prefilled.index))
+            self.txs[prefilled.index] = prefilled.tx
+
+        # Map every short id to the index it stands for, in the order the
+        # short ids fill the indexes left free by the prefilled transactions.
+        # When the block itself has two transactions with the same short id
+        # neither can be told apart, so both are left to be requested.
+        self.short_id_indexes = {}
+        self.collided = set()
+        duplicates = set()
+        free_indexes = [index for index, tx in enumerate(self.txs) if tx is None]
+        for index, sid in zip(free_indexes, cmpct.short_ids):
+            if sid in self.short_id_indexes:
+                duplicates.add(sid)
+                self.collided.add(index)
+                self.stats.num_collisions += 1
+            else:
+                self.short_id_indexes[sid] = index
+        for sid in duplicates:
+            self.collided.add(self.short_id_indexes.pop(sid))
+
+        self.requested = []
+
+    def _tx_hash(self, msg_tx):
+        return msg_tx.witness_hash() if self.use_wtxid else msg_tx.tx_hash()
+
+    # fill_from_pool matches the short ids of the block against the passed
+    # transactions (btcutil.Tx or wire.MsgTx) and returns the indexes still
+    # missing.
+    def fill_from_pool(self, pool_txs) -> [int]:
+        k0, k1 = self.k0, self.k1
+        short_id_indexes = self.short_id_indexes
+        txs = self.txs
+        collided = self.collided
+
+        for tx in pool_txs:
+            if not short_id_indexes:
+                break
+
+            if isinstance(tx, btcutil.Tx):
+                tx_hash = tx.witness_hash() if self.use_wtxid else tx.hash()
+                msg_tx = tx.get_msg_tx()
+            else:
+                tx_hash = self._tx_hash(tx)
+                msg_tx = tx
+
+            sid = wire.short_id(k0, k1, tx_hash)
+            index = short_id_indexes.get(sid)
+            if index is None:
+                continue
+
+            if txs[index] is None:
+                txs[index] = msg_tx
+                self.stats.num_from_pool += 1
+            elif self._tx_hash(txs[index]) != tx_hash:
+                # Two mempool transactions share the short id of the block
+                # transaction: drop the guess and request it.
+                txs[index] = None
+                del short_id_indexes[sid]
+                collided.add(index)
+                self.stats.num_from_pool -= 1
+                self.stats.num_collisions += 1
+
+        return self.missing_indexes()
+
+    # missing_indexes returns the indexes of the transactions of the block that
+    # are neither prefilled nor found in the mempool.
+    def missing_indexes(self) -> [int]:
+        return [index for index, tx in enumerate(self.txs) if tx is None]
+
+    # get_block_txn returns the getblocktxn message requesting the missing
+    # transactions, or None when the block is complete.
+    def get_block_txn(self):
+        self.requested = self.missing_indexes()
+        self.stats.num_requested = len(self.requested)
+        if not self.requested:
+            return None
+        return wire.MsgGetBlockTxn(block_hash=self.cmpct.block_hash(), indexes=self.requested)
+
+    # add_block_txn fills the transactions requested with get_block_txn from
+    # the blocktxn answer.
+    def add_block_txn(self, msg: wire.MsgBlockTxn):
+        if msg.block_hash != self.cmpct.block_hash():
+            raise CompactBlockErr("blocktxn for block {} does not match {}".format(
+                msg.block_hash, self.cmpct.block_hash()))
+        if len(msg.transactions) != len(self.requested):
+            raise CompactBlockErr("blocktxn has {} transactions, {} were requested".format(
+                len(msg.transactions), len(self.requested)))
+
+        for index, tx in zip(self.requested, msg.transactions):
+            self.txs[index] = tx
+        self.requested = []
+        return
+
+    def is_complete(self) -> bool:
+        return all(tx is not None for tx in self.txs)
+
+    # block returns the reconstructed block after checking its transactions
+    # against the merkle root of the header.  A mismatch means a short id
+    # matched the wrong mempool transaction; the caller should then request
+    # the full block.
+    def block(self) -> wire.MsgBlock:
+        if not self.is_complete():
+            raise CompactBlockErr("compact block is missing {} transactions".format(len(self.missing_indexes())))
+
+        txs = [btcutil.Tx(msg_tx) for msg_tx in self.txs]
+        merkles = blockchain.build_merkle_tree_store(txs, witness=False)
+        if merkles[-1] != self.cmpct.header.merkle_root:
+            raise CompactBlockErr("reconstructed block does not match merkle root {}".format(
+                self.cmpct.header.merkle_root))
+
+        self.stats.elapsed = time.perf_counter() - self.start
+        return wire.MsgBlock(header=self.cmpct.header, transactions=list(self.txs))
@@ -48,3 +48,16 @@ def chain_rule_error(chain_err: blockchain.RuleError) -> RuleError:
 # TODO
 def extract_reject_code(err: Exception) -> (wire.RejectCode, bool):
     pass
+
+
+# CompactBlockErr identifies a compact block that can not be reconstructed:
+# its prefilled transactions are out of range, the transactions sent to fill
+# it do not match the request, or the reconstructed block does not match the
+# merkle root of its header.  The caller is expected to fall back to
+# requesting the full block.
+class CompactBlockErr(Exception):
+    def __init__(self, description):
+        self.description = description
+
+    def __repr__(self):
+        return "CompactBlockErr:" + self.description
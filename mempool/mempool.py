@@ -425,6 +425,31 @@ class TxPool:
         self.mtx.r_unlock()
         return have_tx
 
+    # HaveTransactions returns, for each of the passed transaction hashes,
+    # whether or not the transaction already exists in the main pool or in the
+    # orphan pool.  It takes the mempool lock once for the whole batch, which
+    # is what answering an inv message with many entries needs.
+    #
+    # This function is safe for concurrent access.
+    def have_transactions(self, hashes: [chainhash.Hash]) -> [bool]:
+        self.mtx.r_lock()
+        pool = self.pool
+        orphans = self.orphans
+        have_txs = [hash in pool or hash in orphans for hash in hashes]
+        self.mtx.r_unlock()
+        return have_txs
+
+    # FillCompactBlock matches the short ids of a compact block being
+    # reconstructed against the transactions in the pool and returns the
+    # indexes of the block transactions that are still missing.
+    #
+    # This function is safe for concurrent access.
+    def fill_compact_block(self, reconstructor) -> [int]:
+        self.mtx.r_lock()
+        missing = reconstructor.fill_from_pool(desc.tx for desc in self.pool.values())
+        self.mtx.r_unlock()
+        return missing
+
     # removeTransaction is the internal function which implements the public
     # RemoveTransaction.  See the comment for RemoveTransaction for more details.
     #
@@ -308,9 +308,10 @@ class CPUMiner:
                 # Update the nonce and hash the block header.  Each
                 # hash is actually a double sha256 (two hashes), so
                 # increment the number of hashes completed for each
-                # attempt accordingly.
+                # attempt accordingly.  The midstate of the header is
+                # reused across nonces until the merkle root changes.
                 header.nonce = i
-                hash = header.block_hash()
+                hash = header.hash_with_nonce(i)
                 hashes_completed += 2
 
                 # The block is solved when the new block hash is less
@@ -591,7 +591,7 @@ class BlkTmplGenerator:
                 value=0,
                 pk_script=witness_script
             )
-            coinbase_tx.get_msg_tx().tx_outs.append(commitment_output)
+            coinbase_tx.get_msg_tx().add_tx_out(commitment_output)
 
         # Calculate the required difficulty for the block.  The timestamp
         # is potentially adjusted to ensure it comes after the median time of
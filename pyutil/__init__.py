@@ -5,3 +5,4 @@ from .hash import *
 from .converter import *
 from .bytes import *
 from .time import *
+from .pool import *
@@ -0,0 +1,42 @@
+import atexit
+import concurrent.futures
+import threading
+
+# The executors handed out by thread_pool and process_pool, keyed by executor
+# type and number of workers and created on first use.
+_pools = {}
+_poolsLock = threading.Lock()
+
+
+def _pool(kind, workers):
+    key = (kind, workers)
+    with _poolsLock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = kind(max_workers=workers)
+            _pools[key] = pool
+        return pool
+
+
+# thread_pool returns the shared pool of workers threads.
+def thread_pool(workers: int) -> concurrent.futures.ThreadPoolExecutor:
+    return _pool(concurrent.futures.ThreadPoolExecutor, workers)
+
+
+# process_pool returns the shared pool of workers processes.
+def process_pool(workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    return _pool(concurrent.futures.ProcessPoolExecutor, workers)
+
+
+# shutdown_pools shuts down every shared pool and waits for its workers to
+# exit.  It runs at interpreter exit; thread_pool and process_pool start new
+# pools when they are called afterwards.
+def shutdown_pools():
+    with _poolsLock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown_pools)
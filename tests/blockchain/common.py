@@ -80,7 +80,7 @@ def is_supported_db_type(db_type: str) -> bool:
 # chainSetup is used to create a new db and chain instance with the genesis
 # block already inserted.  In addition to the new chain instance, it returns
 # a teardown function the caller should invoke when done testing to clean up.
-def chain_setup(db_name: str, params: chaincfg.Params) -> (BlockChain, Callable):
+def chain_setup(db_name: str, params: chaincfg.Params, header_array_path=None) -> (BlockChain, Callable):
     if not is_supported_db_type(testDbType):
         raise Exception("unsupported db type %s" % testDbType)
 
@@ -135,7 +135,8 @@ def chain_setup(db_name: str, params: chaincfg.Params) -> (BlockChain, Callable)
             chain_params=params_copy,
             checkpoints=None,
             time_source=MedianTime(),
-            sig_cache=SigCache()
+            sig_cache=SigCache(),
+            header_array_path=header_array_path
         ).new_block_chain()
     except Exception as e:
         teardown()
@@ -479,7 +480,7 @@ def new_fake_chain(params: chaincfg.Params) -> BlockChain:
         max_retarget_timespan=target_timespan * adjustment_factor,
         blocks_per_retarget=target_timespan // target_time_per_block,
         index=index,
-        best_chain=ChainView.new_from_tip(tip=node),
+        best_chain=ChainView.new_from_tip(tip=node, header_array=HeaderArray()),
         warning_caches=ThresholdStateCache.new_many_caches(vbNumBits),
         deployment_caches=ThresholdStateCache.new_many_caches(chaincfg.DefinedDeployments)
     )
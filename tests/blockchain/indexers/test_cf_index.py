@@ -0,0 +1,147 @@
+import io
+import unittest
+import chaincfg
+import chainhash
+import btcutil
+import blockchain
+import wire
+from btcutil import gcs
+from blockchain.indexers.cf_index import *
+
+# spendJournalEntry is example 2 of the spend journal documentation: two
+# pay-to-pubkey-hash outputs spent by a block.
+spendJournalEntry = bytes.fromhex(
+    "8b99700091f20f006edbc6c4d31bae9f1ccc38538a114bf42de65e868b99700086c64700b2fb57eadf61e106a100a7445a8c3f67898841ec")
+
+
+class MemBucket:
+    def __init__(self):
+        self.values = {}
+        self.buckets = {}
+
+    def bucket(self, key):
+        return self.buckets.get(key)
+
+    def create_bucket(self, key):
+        self.buckets[key] = MemBucket()
+        return self.buckets[key]
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def put(self, key, value):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+# MemDB is the part of database.DB and database.Tx the index uses, in memory.
+class MemDB:
+    def __init__(self):
+        self.meta = MemBucket()
+        self.blocks = {}
+
+    def metadata(self):
+        return self.meta
+
+    def fetch_block(self, block_hash):
+        return self.blocks[block_hash]
+
+    def view(self, fn):
+        fn(self)
+
+    def update(self, fn):
+        fn(self)
+
+
+def serialize_block(msg_block):
+    w = io.BytesIO()
+    msg_block.serialize(w)
+    return w.getvalue()
+
+
+class TestCfIndex(unittest.TestCase):
+    def setUp(self):
+        self.genesis = chaincfg.TestNet3Params.genesis_block
+        coinbase = self.genesis.transactions[0]
+        spend = wire.MsgTx(version=1,
+                           tx_ins=[wire.TxIn(previous_out_point=wire.OutPoint(hash=coinbase.tx_hash(), index=i),
+                                             signature_script=bytes([0x51])) for i in range(2)],
+                           tx_outs=[wire.TxOut(value=1000, pk_script=bytes([0x00, 0x14]) + bytes(20)),
+                                    wire.TxOut(value=0, pk_script=bytes([0x6a, 0x01, 0x01]))],
+                           lock_time=0)
+        self.block1 = wire.MsgBlock(header=wire.BlockHeader(version=1, prev_block=self.genesis.block_hash(),
+                                                            timestamp=self.genesis.header.timestamp + 1),
+                                    transactions=[coinbase, spend])
+        self.stxos = list(blockchain.deserialize_spend_journal_entry(spendJournalEntry, [spend]))
+
+        self.db = MemDB()
+        self.index = new_cf_index(self.db, chaincfg.TestNet3Params)
+        self.index.create(self.db)
+
+    def connect(self, index, db):
+        index.connect_block(db, btcutil.Block(self.genesis), [])
+        index.connect_block(db, btcutil.Block(self.block1), self.stxos)
+
+    def check_index(self, index):
+        genesis_hash = self.genesis.block_hash()
+        block1_hash = self.block1.block_hash()
+        regular = wire.GCSFilterRegular
+
+        # BIP0158 test vector for the testnet3 genesis block.
+        self.assertEqual(index.filter_by_block_hash(genesis_hash, regular), bytes.fromhex("019dfca8"))
+        self.assertEqual(index.filter_header_by_block_hash(genesis_hash, regular),
+                         bytes.fromhex("21584579b7eb08997773e5aeff3a7f932700042d0ed2a6129012b7d7ae81b750")[::-1])
+
+        f1 = gcs.build_basic_filter(self.block1, [stxo.pk_script for stxo in self.stxos])
+        self.assertEqual(index.filter_by_block_hash(block1_hash, regular), f1.n_bytes())
+        self.assertEqual(index.filter_hash_by_block_hash(block1_hash, regular), gcs.get_filter_hash(f1).to_bytes())
+
+        header0 = chainhash.Hash(index.filter_header_by_block_hash(genesis_hash, regular))
+        self.assertEqual(index.filter_headers_by_block_hashes([block1_hash, chainhash.Hash()], regular),
+                         [gcs.make_header_for_filter(f1, header0).to_bytes(), None])
+
+        # The filter matches the created and spent scripts of the block, but
+        # not its OP_RETURN output.
+        key = gcs.derive_key(block1_hash)
+        f = gcs.Filter.from_n_bytes(gcs.DefaultP, gcs.DefaultM, index.filters_by_block_hashes([block1_hash], 0)[0])
+        self.assertTrue(f.match(key, self.block1.transactions[1].tx_outs[0].pk_script))
+        self.assertTrue(f.match(key, self.stxos[1].pk_script))
+        self.assertFalse(f.match(key, self.block1.transactions[1].tx_outs[1].pk_script))
+
+    def test_connect_disconnect(self):
+        self.connect(self.index, self.db)
+        self.check_index(self.index)
+
+        self.index.disconnect_block(self.db, btcutil.Block(self.block1), self.stxos)
+        block1_hash = self.block1.block_hash()
+        self.assertIsNone(self.index.filter_by_block_hash(block1_hash, wire.GCSFilterRegular))
+        self.assertIsNone(self.index.filter_header_by_block_hash(block1_hash, wire.GCSFilterRegular))
+        self.assertIsNone(self.index.filter_hash_by_block_hash(block1_hash, wire.GCSFilterRegular))
+
+        with self.assertRaises(ValueError):
+            self.index.filter_by_block_hash(block1_hash, maxFilterType + 1)
+
+    def test_catch_up(self):
+        # A chain with blocks and spend journal entries, but no index yet.
+        for block in (self.genesis, self.block1):
+            self.db.blocks[block.block_hash()] = serialize_block(block)
+        spend_bucket = self.db.metadata().create_bucket(blockchain.spendJournalBucketName)
+        spend_bucket.put(self.block1.block_hash().to_bytes(), spendJournalEntry)
+
+        hashes = [self.genesis.block_hash(), self.block1.block_hash()]
+        self.index.catch_up(hashes, processes=1, batch_size=1)
+        self.check_index(self.index)
+
+        db = MemDB()
+        db.blocks = self.db.blocks
+        db.meta.buckets[blockchain.spendJournalBucketName] = spend_bucket
+        index = new_cf_index(db, chaincfg.TestNet3Params)
+        index.create(db)
+        index.catch_up(hashes, processes=2)
+        self.check_index(index)
+
+
+if __name__ == '__main__':
+    unittest.main()
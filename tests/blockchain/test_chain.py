@@ -1,3 +1,6 @@
+import io
+import os
+import tempfile
 import unittest
 import btcutil
 from blockchain.chain import *
@@ -79,6 +82,60 @@ class TestChain(unittest.TestCase):
         finally:
             teardown_func()
 
+    # TestCheckHeadersMsg ensures a headers message is checked against the proof
+    # of work, its own linkage and the checkpoints of the chain.
+    def test_check_headers_msg(self):
+        blocks = load_blocks("blk_0_to_4.dat.bz2")
+        headers = [block.get_msg_block().header for block in blocks[1:]]
+        hashes = [block.hash() for block in blocks[1:]]
+
+        chain, teardown_func = chain_setup("checkheadersmsg", chaincfg.MainNetParams)
+        try:
+            w = io.BytesIO()
+            wire.MsgHeaders(headers).btc_encode(w, wire.ProtocolVersion, wire.BaseEncoding)
+            msg = wire.MsgHeaders()
+            msg.btc_decode(io.BytesIO(w.getvalue()), wire.ProtocolVersion, wire.BaseEncoding)
+            self.assertEqual(chain.check_headers_msg(msg, BFNone), hashes)
+
+            # Headers that do not build on each other are rejected.
+            msg = wire.MsgHeaders([headers[0], headers[2]])
+            with self.assertRaises(RuleError) as cm:
+                chain.check_headers_msg(msg, BFNone)
+            self.assertEqual(cm.exception.c, ErrorCode.ErrPreviousBlockUnknown)
+
+            # Headers that build on a known block are checked against the
+            # checkpoints.
+            checkpoint = chaincfg.Checkpoint(height=2, hash=hashes[0])
+            chain.checkpoints = [checkpoint]
+            chain.checkpoints_by_height = {checkpoint.height: checkpoint}
+            with self.assertRaises(RuleError) as cm:
+                chain.check_headers_msg(wire.MsgHeaders(headers), BFNone)
+            self.assertEqual(cm.exception.c, ErrorCode.ErrBadCheckpoint)
+        finally:
+            teardown_func()
+
+    # test_close ensures closing a chain releases the file backing its header
+    # array and leaves headers replies working from the block index.
+    def test_close(self):
+        with tempfile.TemporaryDirectory() as dir:
+            chain, teardown_func = chain_setup("close", chaincfg.MainNetParams,
+                                               header_array_path=os.path.join(dir, "headers"))
+            try:
+                header_array = chain.best_chain.header_array
+                self.assertEqual(len(header_array), 1)
+
+                genesis_hash = chain.chain_params.genesis_hash
+                want = chain.locate_headers_msg([genesis_hash], chainhash.Hash())
+                chain.close()
+                self.assertIsNone(chain.best_chain.header_array)
+                self.assertIsNone(header_array._file)
+                self.assertEqual(chain.locate_headers_msg([genesis_hash], chainhash.Hash()).headers, want.headers)
+
+                # Closing again is a no-op.
+                chain.close()
+            finally:
+                teardown_func()
+
     # TestCalcSequenceLock tests the LockTimeToSequence function, and the
     # CalcSequenceLock method of a Chain instance. The tests exercise several
     # combinations of inputs to the CalcSequenceLock function in order to ensure
@@ -526,7 +583,7 @@ class TestChain(unittest.TestCase):
             {
                 "name": "remote side chain, unknown stop",
                 "locator": remote_view.block_locator(node=None),
-                "hash_stop": chainhash.Hash(bytes([0x01])),
+                "hash_stop": chainhash.Hash(bytes([0x01]).ljust(chainhash.HashSize, b"\x00")),
                 "max_allowed": 0,
                 "headers": node_headers(branch0_nodes, 15, 16, 17),
                 "hashes": node_hashes(branch0_nodes, 15, 16, 17),
@@ -608,7 +665,7 @@ class TestChain(unittest.TestCase):
             {
                 "name": "remote main chain past, unknown stop",
                 "locator": local_view.block_locator(node=branch0_nodes[12]),
-                "hash_stop": chainhash.Hash(bytes([0x01])),
+                "hash_stop": chainhash.Hash(bytes([0x01]).ljust(chainhash.HashSize, b"\x00")),
                 "max_allowed": 0,
                 "headers": node_headers(branch0_nodes, 13, 14, 15, 16, 17),
                 "hashes": node_hashes(branch0_nodes, 13, 14, 15, 16, 17),
@@ -690,7 +747,7 @@ class TestChain(unittest.TestCase):
             {
                 "name": "remote main chain same, unknown stop",
                 "locator": local_view.block_locator(node=None),
-                "hash_stop": chainhash.Hash(bytes([0x01])),
+                "hash_stop": chainhash.Hash(bytes([0x01]).ljust(chainhash.HashSize, b"\x00")),
                 "max_allowed": 0,
                 "headers": None,
                 "hashes": None,
@@ -718,7 +775,7 @@ class TestChain(unittest.TestCase):
             {
                 "name": "remote unrelated chain",
                 "locator": unrelated_view.block_locator(node=None),
-                "hash_stop": chainhash.Hash(bytes()),
+                "hash_stop": chainhash.Hash(),
                 "max_allowed": 0,
                 "headers": node_headers(branch0_nodes, 0, 1, 2, 3, 4, 5, 6,
                                         7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17),
@@ -733,7 +790,7 @@ class TestChain(unittest.TestCase):
             {
                 "name": "remote genesis",
                 "locator": [branch0_nodes[0].hash],
-                "hash_stop": chainhash.Hash(bytes()),
+                "hash_stop": chainhash.Hash(),
                 "max_allowed": 3,
                 "headers": node_headers(branch0_nodes, 1, 2, 3),
                 "hashes": node_hashes(branch0_nodes, 1, 2, 3),
@@ -750,7 +807,7 @@ class TestChain(unittest.TestCase):
             {
                 "name": "weak locator, single known side block",
                 "locator": [branch1_nodes[1].hash],
-                "hash_stop": chainhash.Hash(bytes()),
+                "hash_stop": chainhash.Hash(),
                 "max_allowed": 0,
                 "headers": node_headers(branch0_nodes, 0, 1, 2, 3, 4, 5, 6,
                                         7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17),
@@ -769,7 +826,7 @@ class TestChain(unittest.TestCase):
             {
                 "name": "weak locator, multiple known side blocks",
                 "locator": [branch1_nodes[1].hash, branch1_nodes[0].hash],
-                "hash_stop": chainhash.Hash(bytes()),
+                "hash_stop": chainhash.Hash(),
                 "max_allowed": 0,
                 "headers": node_headers(branch0_nodes, 0, 1, 2, 3, 4, 5, 6,
                                         7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17),
@@ -814,6 +871,19 @@ class TestChain(unittest.TestCase):
             else:
                 self.assertIsNone(headers)
 
+            # Ensure the headers reply sliced from the serialized headers
+            # holds and encodes the same headers.
+            chain.chain_lock.r_lock()
+            msg = chain._locate_headers_msg(test['locator'], test['hash_stop'],
+                                            test['max_allowed'] or wire.MaxBlockHeadersPerMsg)
+            chain.chain_lock.r_unlock()
+            want_msg = wire.MsgHeaders(headers=list(test['headers'] or []))
+            self.assertEqual(msg.block_hashes(), want_msg.block_hashes())
+            got, want = io.BytesIO(), io.BytesIO()
+            msg.btc_encode(got, wire.ProtocolVersion, wire.BaseEncoding)
+            want_msg.btc_encode(want, wire.ProtocolVersion, wire.BaseEncoding)
+            self.assertEqual(got.getvalue(), want.getvalue())
+
             # Ensure the expected block hashes are located
             max_allowed = wire.MaxBlockHeadersPerMsg
             if test['max_allowed'] != 0:
@@ -31,6 +31,10 @@ class TestDifficulty(unittest.TestCase):
             self.assertEqual(big_to_compact(test['big']), test['compact'])
             self.assertEqual(compact_to_big(test['compact']), test['to_big'])
 
+    def test_compact_to_big_many(self):
+        compacts = [56885448, 0x1d00ffff, 67147926, 0x1d00ffff, 25231360, 56885448]
+        self.assertEqual(compact_to_big_many(compacts), [compact_to_big(c) for c in compacts])
+
     def test_calc_work(self):
         tests = [
             {"in": 10000000, 'out': 0},
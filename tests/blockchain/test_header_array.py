@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from blockchain.chain_view import *
+from tests.blockchain.test_chain_view import chained_nodes
+
+
+class TestHeaderArray(unittest.TestCase):
+    def check_view(self, view):
+        header_array = view.header_array
+        self.assertEqual(len(header_array), len(view.nodes))
+        want = b''.join(header_array_entry(node) for node in view.nodes)
+        self.assertEqual(header_array.entries(0, len(view.nodes)), want)
+        for height, node in enumerate(view.nodes):
+            self.assertEqual(header_array.header(height), node.header())
+
+    def check_reorgs(self, header_array):
+        # Construct a synthetic block chain with the following structure.
+        #     genesis -> 1 -> 2 -> ... -> 10 -> 11  -> 12
+        #                              \-> 8a -> 9a -> 10a -> 11a -> 12a -> 13a
+        branch0_nodes = chained_nodes(None, num_nodes=13)
+        branch1_nodes = chained_nodes(branch0_nodes[7], num_nodes=6)
+
+        view = ChainView.new_from_tip(branch0_nodes[-1], header_array=header_array)
+        self.check_view(view)
+
+        # Reorg to the longer side chain, then back to a shorter tip of the
+        # main chain and extend it again one node at a time.
+        view.set_tip(branch1_nodes[-1])
+        self.check_view(view)
+        self.assertEqual(header_array.header(8), branch1_nodes[0].header())
+
+        view.set_tip(branch0_nodes[9])
+        self.check_view(view)
+        for node in branch0_nodes[10:]:
+            view.set_tip(node)
+            self.check_view(view)
+
+        # Ranges are clamped to the headers held.
+        self.assertEqual(header_array.entries(11, 2000), header_array_entry(branch0_nodes[11]) +
+                         header_array_entry(branch0_nodes[12]))
+        self.assertEqual(header_array.entries(13, 1), b'')
+        self.assertIsNone(header_array.header(13))
+
+        view.set_tip(None)
+        self.assertEqual(len(header_array), 0)
+        self.assertEqual(header_array.entries(0, 1), b'')
+
+    def test_in_memory(self):
+        self.check_reorgs(HeaderArray())
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "headers")
+            header_array = HeaderArray(path)
+            try:
+                self.check_reorgs(header_array)
+            finally:
+                header_array.close()
+
+    def test_append(self):
+        nodes = chained_nodes(None, num_nodes=3)
+        header_array = HeaderArray()
+        header_array.append(nodes[0])
+        with self.assertRaises(ValueError):
+            header_array.append(nodes[2])
+        header_array.append(nodes[1])
+        self.assertEqual(header_array.entries(0, 2), header_array_entry(nodes[0]) + header_array_entry(nodes[1]))
+
+        with self.assertRaises(ValueError):
+            header_array.extend(b'\x00' * (headerArrayEntryLen - 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
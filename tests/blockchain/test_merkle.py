@@ -13,3 +13,18 @@ class TestMerkle(unittest.TestCase):
         calculated_merkle_root = merkles[-1]
         want_merkle = Block100000.header.merkle_root
         self.assertEqual(calculated_merkle_root, want_merkle)
+
+    # The store hashed a level at a time is the one built node by node.
+    def test_build_merkle_tree_store_levels(self):
+        txs = btcutil.Block(msg_block=Block100000).get_transactions()
+        for num_txs in range(1, 18):
+            transactions = [txs[i % len(txs)] for i in range(num_txs)]
+            next_pot = next_power_of_two(num_txs)
+            want = [tx.hash() for tx in transactions] + [None] * (2 * next_pot - 1 - num_txs)
+            offset = next_pot
+            for i in range(0, len(want) - 1, 2):
+                if want[i] is not None:
+                    want[offset] = hash_merkle_branches(want[i], want[i + 1] if want[i + 1] is not None else want[i])
+                offset += 1
+
+            self.assertEqual(build_merkle_tree_store(transactions, witness=False), want)
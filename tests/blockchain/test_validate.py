@@ -54,6 +54,28 @@ class TestValidate(unittest.TestCase):
         with self.assertRaises(RuleError):
             check_block_sanity(block, pow_limit, time_source)
 
+    def test_check_headers_proof_of_work(self):
+        pow_limit = chaincfg.MainNetParams.pow_limit
+        headers = [chaincfg.MainNetParams.genesis_block.header, chaincfg.TestNet3Params.genesis_block.header]
+        hashes = [header.block_hash() for header in headers]
+        check_headers_proof_of_work(headers, hashes, pow_limit, BFNone)
+
+        # The regression test genesis hash is higher than the main network target.
+        regtest_header = chaincfg.RegressionNetParams.genesis_block.header
+        hashes[1] = regtest_header.block_hash()
+        with self.assertRaises(RuleError):
+            check_headers_proof_of_work(headers, hashes, pow_limit, BFNone)
+        check_headers_proof_of_work(headers, hashes, pow_limit, BFNoPoWCheck)
+
+        # A target higher than the limit fails with or without the hash check.
+        headers[1] = regtest_header
+        with self.assertRaises(RuleError):
+            check_headers_proof_of_work(headers, hashes, pow_limit, BFNoPoWCheck)
+
+        # Every header must come with its hash.
+        with self.assertRaises(ValueError):
+            check_headers_proof_of_work(headers, hashes[:1], pow_limit, BFNone)
+
     # TestCheckSerializedHeight tests the checkSerializedHeight function with
     # various serialized heights and also does negative tests to ensure errors
     # and handled properly.
@@ -0,0 +1,80 @@
+import unittest
+import random
+from ecdsa import SECP256k1
+from btcec.secp256k1 import *
+
+
+def ecdsa_mult(k):
+    pt = k * SECP256k1.generator
+    return pt.x(), pt.y()
+
+
+class TestSecp256k1(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(0)
+        self.scalars = [1, 2, 3, 15, 16, 255, 256, curveN - 1, curveN - 2, curveLambda] + \
+                       [self.rand.getrandbits(256) % curveN for _ in range(10)]
+
+    def test_scalar_base_mult(self):
+        for k in self.scalars:
+            self.assertEqual(scalar_base_mult(k), ecdsa_mult(k), k)
+        self.assertIsNone(scalar_base_mult(0))
+        self.assertIsNone(scalar_base_mult(curveN))
+
+    def test_scalar_mult(self):
+        q = self.rand.getrandbits(256) % curveN
+        x, y = ecdsa_mult(q)
+        for k in self.scalars:
+            self.assertEqual(scalar_mult(k, x, y), ecdsa_mult(k * q % curveN), k)
+        self.assertIsNone(scalar_mult(curveN, x, y))
+
+    def test_endomorphism(self):
+        self.assertEqual(pow(curveBeta, 3, curveP), 1)
+        self.assertEqual(pow(curveLambda, 3, curveN), 1)
+        self.assertEqual(scalar_base_mult(curveLambda), (curveBeta * curveGx % curveP, curveGy))
+
+    def test_split_scalar(self):
+        for k in self.scalars:
+            k1, k2 = split_scalar(k)
+            self.assertEqual((k1 + k2 * curveLambda) % curveN, k)
+            self.assertLessEqual(abs(k1).bit_length(), 129)
+            self.assertLessEqual(abs(k2).bit_length(), 129)
+
+    def test_wnaf(self):
+        for k in self.scalars:
+            digits = wnaf(k, 5)
+            self.assertEqual(sum(d << i for i, d in enumerate(digits)), k)
+            for i, d in enumerate(digits):
+                if d:
+                    self.assertEqual(d & 1, 1)
+                    self.assertLess(abs(d), 16)
+                    self.assertFalse(any(digits[i + 1:i + 5]))
+
+    def test_double_scalar_mult(self):
+        q = self.rand.getrandbits(256) % curveN
+        x, y = ecdsa_mult(q)
+        tables = KeyTables(threshold=3)
+        for i in range(5):
+            u1 = self.rand.getrandbits(256) % curveN
+            u2 = self.rand.getrandbits(256) % curveN
+            want = ecdsa_mult((u1 + u2 * q) % curveN)
+            self.assertEqual(to_affine(double_scalar_mult(u1, u2, x, y, tables)), want)
+            self.assertEqual(to_affine(double_scalar_mult(u1, u2, x, y, None)), want)
+            self.assertEqual(len(tables), 1 if i >= 2 else 0)
+
+        # u1 * G + u2 * Q is the point at infinity when Q = -(u1 / u2) * G.
+        self.assertIsNone(double_scalar_mult(q, curveN - 1, x, y, None))
+
+    def test_key_tables_eviction(self):
+        tables = KeyTables(max_keys=2, threshold=1)
+        keys = [ecdsa_mult(k) for k in (2, 3, 4)]
+        for x, y in keys[:2]:
+            self.assertIsNotNone(tables.comb(x, y))
+        tables.comb(*keys[0])
+        tables.comb(*keys[2])
+        self.assertEqual(len(tables), 2)
+        self.assertIn(keys[0], tables._combs)
+        self.assertNotIn(keys[1], tables._combs)
+
+        tables.clear()
+        self.assertEqual(len(tables), 0)
@@ -0,0 +1,51 @@
+import unittest
+import hashlib
+import random
+import ecdsa.util
+import btcec
+
+
+class TestSignRFC6979(unittest.TestCase):
+    def test_nonce_rfc6979(self):
+        # https://bitcointalk.org/index.php?topic=285142.msg3299061#msg3299061
+        tests = [
+            (1, b"Satoshi Nakamoto", "8f8a276c19f4149656b280621e358cce24f5f52542772691ee69063b74f15d15"),
+            (1, b"All those moments will be lost in time, like tears in rain. Time to die...",
+             "38aa22d72376b4dbc472e06c3ba403ee0a394da63fc58d88686c611aba98d6b3"),
+            (btcec.curveN - 1, b"Satoshi Nakamoto", "33a19b60e25fb6f4435af53a3d42d493644827367e6453928554f43e49aa6f90"),
+        ]
+        for key, msg, want in tests:
+            nonce = btcec.nonce_rfc6979(key, hashlib.sha256(msg).digest())
+            self.assertEqual(nonce, int(want, 16), msg)
+
+    def test_sign_rfc6979(self):
+        # BIP0143 native P2WPKH example, second input.
+        key = int("619c335025c7f4012e556c2a58b2506e30b8511b53ade95ea316fd8c3286feb9", 16)
+        hash = bytes.fromhex("c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670")
+        sig = btcec.sign_rfc6979(key, hash)
+        self.assertEqual(sig.serialize().hex(),
+                         "304402203609e17b84f6a7d30c80bfa610b5b4542f32a8a0d5447a12fb1366d7f01cc44a0220573a"
+                         "954c4518331561406f90300e8f3358f51928d43c212a8caed02de67eebee")
+
+    def test_matches_ecdsa(self):
+        rand = random.Random(0)
+        for i in range(20):
+            key = rand.randrange(1, btcec.curveN)
+            hash = rand.getrandbits(256).to_bytes(32, 'big')
+            priv = btcec.PrivateKey.from_secret_exponent(key, curve=btcec.SECP256k1)
+            want = priv.sign_digest_deterministic(hash, hashfunc=hashlib.sha256,
+                                                  sigencode=ecdsa.util.sigencode_der_canonize)
+
+            sig = priv.sign_rfc6979(hash)
+            self.assertEqual(sig.serialize(), want, i)
+            self.assertLessEqual(sig.s, btcec.curveN >> 1)
+            self.assertEqual(btcec.parse_der_signature(want, btcec.s256()), sig)
+
+            pub_key = btcec.parse_pub_key(b'\x04' + priv.get_verifying_key().to_string(), btcec.s256())
+            self.assertTrue(sig.verify(hash, pub_key))
+
+    def test_serialize(self):
+        # A high S is serialized as its low S counterpart, and integers with
+        # their high bit set are padded.
+        sig = btcec.Signature(r=0x80, s=btcec.curveN - 1)
+        self.assertEqual(sig.serialize(), bytes([0x30, 0x07, 0x02, 0x02, 0x00, 0x80, 0x02, 0x01, 0x01]))
@@ -0,0 +1,129 @@
+import unittest
+import hashlib
+from unittest import mock
+import btcec
+import pyutil
+
+
+# sigVectors are (private key, message) pairs the signatures of the tests are
+# made from.
+sigVectors = [
+    (1, b''),
+    (2, b'abc'),
+    (0xdeadbeef, b'pybtcd'),
+    (btcec.SECP256k1.order - 1, b'\x00' * 100),
+]
+
+
+def make_vector(secret, msg):
+    priv = btcec.SigningKey.from_secret_exponent(secret, curve=btcec.SECP256k1)
+    hash = hashlib.sha256(hashlib.sha256(msg).digest()).digest()
+    sig_der = priv.sign_digest_deterministic(hash, hashfunc=hashlib.sha256,
+                                             sigencode=lambda r, s, order: (r, s))
+    pub_key = btcec.parse_pub_key(b'\x04' + priv.get_verifying_key().to_string(), btcec.s256())
+    return hash, btcec.Signature(*sig_der), pub_key
+
+
+def high_s(sig):
+    return btcec.Signature(sig.r, btcec.SECP256k1.order - sig.s)
+
+
+# der_encode serializes r and s as a DER signature, with the given padding
+# prepended to the encoding of s.
+def der_encode(r, s, s_padding=b''):
+    def encode_int(i, padding=b''):
+        b = i.to_bytes((i.bit_length() + 8) // 8, 'big')
+        b = padding + b
+        return bytes([0x02, len(b)]) + b
+
+    body = encode_int(r) + encode_int(s, s_padding)
+    return bytes([0x30, len(body)]) + body
+
+
+def available_verifiers():
+    verifiers = [btcec.EcdsaVerifier(), btcec.PythonVerifier(btcec.KeyTables(threshold=2))]
+    v = btcec.load_secp256k1_verifier()
+    if v is not None:
+        verifiers.append(v)
+    return verifiers
+
+
+class TestVerifier(unittest.TestCase):
+    def check_verifier(self, v):
+        other_key = make_vector(3, b'other')[2]
+        for secret, msg in sigVectors:
+            hash, sig, pub_key = make_vector(secret, msg)
+            self.assertTrue(v.verify(hash, sig, pub_key), (v, secret))
+            self.assertTrue(v.verify(hash, high_s(sig), pub_key), (v, secret))
+            self.assertFalse(v.verify(hash[:-1] + bytes([hash[-1] ^ 1]), sig, pub_key), (v, secret))
+            self.assertFalse(v.verify(hash, btcec.Signature(sig.r, sig.s ^ 1), pub_key), (v, secret))
+            self.assertFalse(v.verify(hash, sig, other_key), (v, secret))
+
+    def test_ecdsa(self):
+        self.check_verifier(btcec.EcdsaVerifier())
+
+    def test_python(self):
+        self.check_verifier(btcec.PythonVerifier(btcec.KeyTables()))
+
+        # With a comb precomputed for every key after its first use.
+        tables = btcec.KeyTables(threshold=1)
+        self.check_verifier(btcec.PythonVerifier(tables))
+        self.assertGreater(len(tables), 0)
+
+    def test_secp256k1(self):
+        v = btcec.load_secp256k1_verifier()
+        if v is None:
+            self.skipTest("libsecp256k1 is not available")
+        self.check_verifier(v)
+
+    def test_verifiers_agree(self):
+        verifiers = available_verifiers()
+        for secret, msg in sigVectors:
+            hash, sig, pub_key = make_vector(secret, msg)
+            for s in (sig, high_s(sig), btcec.Signature(sig.r, sig.s ^ 1)):
+                results = [v.verify(hash, s, pub_key) for v in verifiers]
+                self.assertEqual(len(set(results)), 1, (verifiers, results))
+
+    def test_strict_der(self):
+        hash, sig, pub_key = make_vector(2, b'abc')
+        parsed = btcec.parse_der_signature(der_encode(sig.r, sig.s), btcec.s256())
+        self.assertEqual(parsed, sig)
+        for v in available_verifiers():
+            self.assertTrue(v.verify(hash, parsed, pub_key))
+
+        # An excessively padded S is only accepted by the BER parser.
+        padded = der_encode(sig.r, sig.s, s_padding=b'\x00')
+        with self.assertRaises(btcec.SigSExcessivelyPaddedValueErr):
+            btcec.parse_der_signature(padded, btcec.s256())
+        self.assertEqual(btcec.parse_signature(padded, btcec.s256()), sig)
+
+    def test_use_verifier(self):
+        class RejectAll(btcec.Verifier):
+            name = "reject all"
+
+            def verify(self, hash, sig, pub_key):
+                return False
+
+        hash, sig, pub_key = make_vector(1, b'')
+        saved = btcec.active_verifier()
+        try:
+            btcec.use_verifier(RejectAll())
+            self.assertFalse(sig.verify(hash, pub_key))
+        finally:
+            btcec.use_verifier(saved)
+        self.assertTrue(sig.verify(hash, pub_key))
+
+    def test_verify_many(self):
+        checks = []
+        want = []
+        for secret, msg in sigVectors:
+            hash, sig, pub_key = make_vector(secret, msg)
+            checks += [(pub_key, hash, sig), (pub_key, hash, btcec.Signature(sig.r, sig.s ^ 1))]
+            want += [True, False]
+
+        self.assertEqual(btcec.verify_many([]), [])
+        self.assertEqual(btcec.verify_many(checks, workers=1), want)
+        with mock.patch.object(btcec.verifier, "verifyManyChunkSize", 2), \
+                mock.patch("pyutil.process_pool", wraps=pyutil.process_pool) as process_pool:
+            self.assertEqual(btcec.verify_many(checks, workers=2), want)
+            process_pool.assert_called_once_with(2)
@@ -0,0 +1,32 @@
+import blockchain
+import btcutil
+import wire
+from tests.wire.test_msg_block import blockOne
+from tests.wire.test_msg_tx import multiTx, multiWitnessTx
+
+# spendPubKeyHash is the public key hash paid to by spendTx.
+spendPubKeyHash = bytes(range(20))
+
+# spendSigData is the data pushed by the signature script of spendTx, along
+# with an OP_0 push.
+spendSigData = bytes(range(0x40, 0x40 + 71))
+
+# spendTx spends the first output of multiTx to a pay to pubkey hash output.
+spendTx = wire.MsgTx(
+    version=1,
+    tx_ins=[wire.TxIn(previous_out_point=wire.OutPoint(hash=multiTx.tx_hash(), index=0),
+                      signature_script=bytes([0x00, len(spendSigData)]) + spendSigData)],
+    tx_outs=[wire.TxOut(value=0x12a05f200, pk_script=bytes([0x76, 0xa9, 0x14]) + spendPubKeyHash +
+                                                     bytes([0x88, 0xac]))],
+)
+
+
+def make_block(transactions):
+    merkles = blockchain.build_merkle_tree_store([btcutil.Tx(tx) for tx in transactions], witness=False)
+    header = wire.BlockHeader(version=1, prev_block=blockOne.header.prev_block, merkle_root=merkles[-1],
+                              timestamp=blockOne.header.timestamp, bits=blockOne.header.bits, nonce=1)
+    return wire.MsgBlock(header=header, transactions=transactions)
+
+
+# testBlock holds a coinbase, multiTx, its spend and a witness transaction.
+testBlock = make_block([blockOne.transactions[0], multiTx, spendTx, multiWitnessTx])
@@ -0,0 +1,151 @@
+import io
+import random
+import unittest
+import btcutil
+import txscript
+import wire
+from btcutil.bloom import *
+from tests.btcutil.bloom.common import *
+
+
+def filter_load_bytes(f):
+    w = io.BytesIO()
+    f.get_msg_filter_load().btc_encode(w, wire.ProtocolVersion, wire.BaseEncoding)
+    return w.getvalue()
+
+
+class TestFilter(unittest.TestCase):
+    # TestFilterInsert ensures inserting data into the filter causes that data
+    # to be matched and the resulting serialized MsgFilterLoad is the expected
+    # value.
+    def test_filter_insert(self):
+        for tweak, want in ((0, "03614e9b050000000000000001"),
+                            (2147483649, "03ce4299050000000100008001")):
+            f = Filter.new_filter(3, tweak, 0.01, wire.BloomUpdateType.BloomUpdateAll)
+            tests = [
+                ("99108ad8ed9bb6274d3980bab5a85c048f0950c8", True),
+                ("19108ad8ed9bb6274d3980bab5a85c048f0950c8", False),
+                ("b5a2c786d9ef4658287ced5914b37a1b4aa32eee", True),
+                ("b9300670b4c5366e95b2699e8b18bc75e5f729c5", True),
+            ]
+            for hex_data, insert in tests:
+                data = bytes.fromhex(hex_data)
+                if insert:
+                    f.add(data)
+                self.assertEqual(f.matches(data), insert)
+
+            self.assertEqual(filter_load_bytes(f).hex(), want)
+
+    def test_filter_load(self):
+        msg = wire.MsgFilterLoad(filter=bytes(), hash_funcs=0, tweak=0,
+                                 flags=wire.BloomUpdateType.BloomUpdateNone)
+        f = Filter.load_filter(msg)
+        self.assertTrue(f.is_loaded())
+        self.assertFalse(f.matches(b'data'))
+
+        f.unload()
+        self.assertFalse(f.is_loaded())
+        f.add(b'data')
+        self.assertFalse(f.matches(b'data'))
+
+        f.reload(Filter.new_filter(10, 0, 0.000001, wire.BloomUpdateType.BloomUpdateNone).get_msg_filter_load())
+        self.assertTrue(f.is_loaded())
+        f.add(b'data')
+        self.assertTrue(f.matches(b'data'))
+
+    # The inlined MurmurHash3 of matches agrees with adding data to the filter
+    # for every length of data and every number of hash functions.
+    def test_matches(self):
+        rand = random.Random(7)
+        for hash_funcs in (1, 5, 11):
+            f = Filter(wire.MsgFilterLoad(filter=bytes(4096), hash_funcs=hash_funcs,
+                                          tweak=rand.getrandbits(32),
+                                          flags=wire.BloomUpdateType.BloomUpdateNone))
+            added = [bytes(rand.getrandbits(8) for _ in range(n)) for n in range(70)]
+            for data in added:
+                f.add(data)
+            for data in added:
+                self.assertTrue(f.matches(data))
+                self.assertTrue(f.matches(memoryview(data)))
+
+    def test_out_point(self):
+        f = Filter.new_filter(10, 0, 0.000001, wire.BloomUpdateType.BloomUpdateNone)
+        outpoint = wire.OutPoint(hash=multiTx.tx_hash(), index=1)
+        f.add_out_point(outpoint)
+        self.assertTrue(f.matches_out_point(outpoint))
+        self.assertFalse(f.matches_out_point(wire.OutPoint(hash=multiTx.tx_hash(), index=0)))
+        self.assertTrue(f.matches(multiTx.tx_hash().to_bytes() + bytes([1, 0, 0, 0])))
+
+    # TestFilterBloomMatch ensures the filter matches transactions by hash,
+    # output script pushes, spent outpoints and input script pushes.
+    def test_filter_bloom_match(self):
+        tx = btcutil.Tx(spendTx)
+        tests = [
+            ("txid", lambda f: f.add_hash(spendTx.tx_hash()), True),
+            ("output push", lambda f: f.add(spendPubKeyHash), True),
+            ("input push", lambda f: f.add(spendSigData), True),
+            ("spent outpoint", lambda f: f.add_out_point(spendTx.tx_ins[0].previous_out_point), True),
+            ("spent outpoint index", lambda f: f.add_out_point(
+                wire.OutPoint(hash=multiTx.tx_hash(), index=7)), False),
+            ("random data", lambda f: f.add(bytes(20)), False),
+        ]
+        for name, add, want in tests:
+            f = Filter.new_filter(10, 0, 0.000001, wire.BloomUpdateType.BloomUpdateAll)
+            add(f)
+            self.assertEqual(f.match_tx_and_update(tx), want, name)
+
+    # The update flags decide which outpoints of a matched output are added.
+    def test_filter_update(self):
+        pub_key = multiTx.tx_outs[0].pk_script[1:66]
+        tests = [
+            (wire.BloomUpdateType.BloomUpdateNone, False),
+            (wire.BloomUpdateType.BloomUpdateAll, True),
+            (wire.BloomUpdateType.BloomUpdateP2PubkeyOnly, True),
+        ]
+        for flags, want in tests:
+            f = Filter.new_filter(10, 0, 0.000001, flags)
+            f.add(pub_key)
+            self.assertTrue(f.match_tx_and_update(btcutil.Tx(multiTx)))
+            self.assertEqual(f.matches_out_point(wire.OutPoint(hash=multiTx.tx_hash(), index=0)), want)
+            self.assertEqual(f.matches_out_point(wire.OutPoint(hash=multiTx.tx_hash(), index=1)), want)
+
+            # The spending transaction matches through the added outpoint.
+            self.assertEqual(f.match_tx_and_update(btcutil.Tx(spendTx)), want)
+
+        # A pay to pubkey hash output is not added with BloomUpdateP2PubkeyOnly.
+        f = Filter.new_filter(10, 0, 0.000001, wire.BloomUpdateType.BloomUpdateP2PubkeyOnly)
+        f.add(spendPubKeyHash)
+        self.assertTrue(f.match_tx_and_update(btcutil.Tx(spendTx)))
+        self.assertFalse(f.matches_out_point(wire.OutPoint(hash=spendTx.tx_hash(), index=0)))
+
+    # Matching a block through its skim matches the same transactions, and
+    # updates the filter the same way, as matching its transactions one by one.
+    def test_match_block_and_update(self):
+        block = btcutil.Block(testBlock)
+        for add in (multiTx.tx_outs[0].pk_script[1:66], spendPubKeyHash, spendSigData,
+                    testBlock.transactions[0].tx_hash().to_bytes(), bytes(20)):
+            for flags in wire.BloomUpdateType:
+                f = Filter.new_filter(10, 0, 0.000001, flags)
+                f.add(add)
+                want_filter = Filter.load_filter(wire.MsgFilterLoad(
+                    filter=bytes(f.get_msg_filter_load().filter), hash_funcs=f.get_msg_filter_load().hash_funcs,
+                    tweak=0, flags=flags))
+
+                want = [i for i, tx in enumerate(block.get_transactions()) if want_filter.match_tx_and_update(tx)]
+                self.assertEqual(f.match_block_and_update(block), want)
+                self.assertEqual(f.get_msg_filter_load().filter, want_filter.get_msg_filter_load().filter)
+
+    # Scripts that fail to parse match nothing.
+    def test_malformed_script(self):
+        f = Filter.new_filter(10, 0, 0.000001, wire.BloomUpdateType.BloomUpdateAll)
+        f.add(spendPubKeyHash)
+        tx = wire.MsgTx(version=1)
+        tx.add_tx_in(wire.TxIn(previous_out_point=wire.OutPoint(hash=wire.Hash(), index=0)))
+        tx.add_tx_out(wire.TxOut(value=1, pk_script=bytes([0x14]) + spendPubKeyHash + bytes([0x4c])))
+        self.assertFalse(f.match_tx_and_update(btcutil.Tx(tx)))
+        with self.assertRaises(txscript.ScriptError):
+            txscript.pushed_data_slices(tx.tx_outs[0].pk_script)
+
+
+if __name__ == '__main__':
+    unittest.main()
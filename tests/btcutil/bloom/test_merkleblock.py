@@ -0,0 +1,82 @@
+import io
+import unittest
+import btcutil
+import wire
+from btcutil.bloom import *
+from tests.btcutil.bloom.common import *
+from tests.wire.test_msg_tx import multiTx
+
+
+class TestMerkleBlock(unittest.TestCase):
+    # check_merkle_block ensures the merkle block built for the given matches
+    # survives a round trip through the wire encoding and verifies to them.
+    def check_merkle_block(self, msg_block, matched):
+        block = btcutil.Block(msg_block)
+        f = Filter.new_filter(max(len(matched), 1), 0, 0.000001, wire.BloomUpdateType.BloomUpdateNone)
+        for tx_idx in matched:
+            f.add_hash(msg_block.transactions[tx_idx].tx_hash())
+
+        msg, matched_indices = new_merkle_block(block, f)
+        self.assertEqual(matched_indices, matched)
+        self.assertEqual(msg.header, msg_block.header)
+        self.assertEqual(msg.transactions, len(msg_block.transactions))
+
+        w = io.BytesIO()
+        msg.btc_encode(w, wire.ProtocolVersion, wire.BaseEncoding)
+        decoded = wire.MsgMerkleBlock()
+        decoded.btc_decode(io.BytesIO(w.getvalue()), wire.ProtocolVersion, wire.BaseEncoding)
+
+        hashes, indices = merkle_block_matches(decoded)
+        self.assertEqual(indices, matched)
+        self.assertEqual(hashes, [msg_block.transactions[i].tx_hash() for i in matched])
+        return decoded
+
+    def test_new_merkle_block(self):
+        for matched in ([], [0], [1], [2], [3], [0, 3], [1, 2], [0, 1, 2, 3]):
+            self.check_merkle_block(testBlock, matched)
+
+        # Blocks of one transaction and of an odd number of transactions.
+        self.check_merkle_block(make_block([multiTx]), [])
+        self.check_merkle_block(make_block([multiTx]), [0])
+        odd_block = make_block(testBlock.transactions[:3])
+        for matched in ([], [0], [2], [1, 2]):
+            self.check_merkle_block(odd_block, matched)
+
+    def test_merkle_block_matches_errors(self):
+        good = self.check_merkle_block(testBlock, [1, 2])
+
+        def modified(**kwargs):
+            fields = dict(header=good.header, transactions=good.transactions, hashes=list(good.hashes),
+                          flags=bytes(good.flags))
+            fields.update(kwargs)
+            return wire.MsgMerkleBlock(**fields)
+
+        other_header = wire.BlockHeader(version=1, merkle_root=good.hashes[0], timestamp=good.header.timestamp)
+        tests = [
+            ("no transactions", modified(transactions=0)),
+            ("too many transactions", modified(transactions=wire.maxTxPerBlock + 1)),
+            ("more hashes than transactions", modified(transactions=1)),
+            ("missing hash", modified(hashes=good.hashes[:-1])),
+            ("extra hash", modified(hashes=good.hashes + [good.hashes[0]])),
+            ("changed hash", modified(hashes=[good.hashes[1]] + good.hashes[1:])),
+            ("extra flags byte", modified(flags=bytes(good.flags) + bytes(1))),
+            ("missing flags", modified(flags=bytes())),
+            ("wrong merkle root", modified(header=other_header)),
+        ]
+        for name, msg in tests:
+            with self.assertRaises(MerkleBlockErr, msg=name):
+                merkle_block_matches(msg)
+
+        # A duplicated last transaction hashes to the same merkle root as the
+        # block without it (CVE-2012-2459), and is rejected.
+        dup_txs = testBlock.transactions[:3] + [testBlock.transactions[2]]
+        dup_block = make_block(dup_txs)
+        f = Filter.new_filter(1, 0, 0.000001, wire.BloomUpdateType.BloomUpdateNone)
+        f.add_hash(dup_txs[3].tx_hash())
+        msg, _ = new_merkle_block(btcutil.Block(dup_block), f)
+        with self.assertRaises(MerkleBlockErr):
+            merkle_block_matches(msg)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from btcutil.bloom import *
+
+
+class TestMurmurHash3(unittest.TestCase):
+    # TestMurmurHash3 ensure the MurmurHash3 function produces the correct hash
+    # when given various seeds and data.
+    def test_murmur_hash3(self):
+        tests = [
+            {"seed": 0x00000000, "data": bytes(), "out": 0x00000000},
+            {"seed": 0xfba4c795, "data": bytes(), "out": 0x6a396f08},
+            {"seed": 0xffffffff, "data": bytes(), "out": 0x81f16f39},
+            {"seed": 0x00000000, "data": bytes([0x00]), "out": 0x514e28b7},
+            {"seed": 0xfba4c795, "data": bytes([0x00]), "out": 0xea3f0b17},
+            {"seed": 0x00000000, "data": bytes([0xff]), "out": 0xfd6cf10d},
+            {"seed": 0x00000000, "data": bytes([0x00, 0x11]), "out": 0x16c6b7ab},
+            {"seed": 0x00000000, "data": bytes([0x00, 0x11, 0x22]), "out": 0x8eb51c3d},
+            {"seed": 0x00000000, "data": bytes([0x00, 0x11, 0x22, 0x33]), "out": 0xb4471bf8},
+            {"seed": 0x00000000, "data": bytes([0x00, 0x11, 0x22, 0x33, 0x44]), "out": 0xe2301fa8},
+            {"seed": 0x00000000, "data": bytes([0x00, 0x11, 0x22, 0x33, 0x44, 0x55]), "out": 0xfc2e4a15},
+            {"seed": 0x00000000, "data": bytes([0x00, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66]), "out": 0xb074502c},
+            {"seed": 0x00000000, "data": bytes([0x00, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77]),
+             "out": 0x8034d2a0},
+            {"seed": 0x00000000, "data": bytes([0x00, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77, 0x88]),
+             "out": 0xb4698def},
+        ]
+
+        for test in tests:
+            self.assertEqual(murmur_hash3(test['seed'], test['data']), test['out'])
+            self.assertEqual(murmur_hash3(test['seed'], memoryview(test['data'])), test['out'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import io
+import random
+import unittest
+import chaincfg
+import chainhash
+import wire
+from btcutil.gcs import *
+
+
+# naive_golomb_encode is a bit by bit Golomb-Rice encoder used as a
+# reference for golomb_encode.
+def naive_golomb_encode(values, p):
+    out = bytearray()
+    acc = 0
+    num_bits = 0
+
+    def write_bit(bit):
+        nonlocal acc, num_bits
+        acc = (acc << 1) | bit
+        num_bits += 1
+        if num_bits == 8:
+            out.append(acc)
+            acc = 0
+            num_bits = 0
+
+    last = 0
+    for value in values:
+        delta = value - last
+        last = value
+        for _ in range(delta >> p):
+            write_bit(1)
+        write_bit(0)
+        for i in reversed(range(p)):
+            write_bit((delta >> i) & 1)
+
+    if num_bits:
+        out.append(acc << (8 - num_bits))
+    return bytes(out)
+
+
+class TestGCS(unittest.TestCase):
+    def setUp(self):
+        rand = random.Random(1)
+        self.key = bytes(rand.getrandbits(8) for _ in range(KeySize))
+        self.contents = [bytes(rand.getrandbits(8) for _ in range(rand.randint(1, 40))) for _ in range(200)]
+
+    def test_golomb_coding(self):
+        rand = random.Random(2)
+        for p in (0, 1, 7, 19, 32):
+            values = sorted(rand.randrange(0, 500 << p) for _ in range(300))
+            encoded = golomb_encode(values, p)
+            self.assertEqual(encoded, naive_golomb_encode(values, p))
+            self.assertEqual(golomb_decode(encoded, len(values), p), values)
+
+        with self.assertRaises(MisserializedErr):
+            golomb_decode(golomb_encode([1, 2, 3], 19)[:-1], 3, 19)
+
+    def test_build_and_match(self):
+        f = Filter.build(DefaultP, DefaultM, self.key, self.contents)
+        self.assertEqual(f.n(), len(self.contents))
+        self.assertEqual(f.p(), DefaultP)
+
+        # Serialization round trips, with and without N.
+        f2 = Filter.from_n_bytes(DefaultP, DefaultM, f.n_bytes())
+        self.assertEqual(f2, f)
+        self.assertEqual(Filter.from_bytes(f.n(), DefaultP, DefaultM, f.bytes()), f)
+
+        for item in self.contents:
+            self.assertTrue(f2.match(self.key, item))
+        self.assertFalse(f2.match(self.key, b"nonexistent"))
+        self.assertTrue(f2.match_any(self.key, [b"nonexistent", self.contents[10]]))
+        self.assertFalse(f2.match_any(self.key, [b"nonexistent", b"absent"]))
+
+        # The key is part of the filter.
+        self.assertNotEqual(Filter.build(DefaultP, DefaultM, bytes(KeySize), self.contents).bytes(), f.bytes())
+
+        empty = Filter.build(DefaultP, DefaultM, self.key, [])
+        self.assertEqual(empty.n_bytes(), bytes([0x00]))
+        self.assertFalse(empty.match(self.key, self.contents[0]))
+
+    def test_errors(self):
+        with self.assertRaises(PTooBigErr):
+            Filter.build(MaxP + 1, DefaultM, self.key, self.contents)
+        with self.assertRaises(MisserializedErr):
+            Filter.from_n_bytes(DefaultP, DefaultM, b"")
+
+    def test_basic_filter(self):
+        # Block 0 test vector of BIP0158 (testnet3 genesis block).
+        block = chaincfg.TestNet3Params.genesis_block
+        f = build_basic_filter(block, [])
+        self.assertEqual(f.n_bytes().hex(), "019dfca8")
+        self.assertEqual(make_header_for_filter(f, chainhash.Hash()),
+                         chainhash.Hash("21584579b7eb08997773e5aeff3a7f932700042d0ed2a6129012b7d7ae81b750"))
+
+        w = io.BytesIO()
+        block.serialize(w)
+        self.assertEqual(build_basic_filter_from_skim(wire.skim_block(w.getvalue()), []), f)
+
+        # Empty and OP_RETURN output scripts are left out, spent scripts are
+        # included once.
+        self.assertEqual(basic_filter_items([b"", b"\x6a\x01\x02", b"\x51"], [b"\x52", b"", b"\x52"]),
+                         {b"\x51", b"\x52"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 from chainhash.hash import *
 
@@ -90,6 +91,21 @@ class TestHash(unittest.TestCase):
             Hash(c['bytes'])
             Hash(c['str'])
 
+    def test_init_bytes_like(self):
+        data = self.test_case[0]['bytes']
+        for b in (bytearray(data), memoryview(data), memoryview(b'\x00' + data)[1:]):
+            h = Hash(b)
+            self.assertIs(type(h), Hash)
+            self.assertEqual(h, data)
+
+        # Only a missing value gives the zero hash.
+        self.assertEqual(Hash(), bytes(HashSize))
+        for b in (bytes(), data[:-1], data + b'\x00', bytearray(HashSize + 1), memoryview(data)[1:]):
+            with self.assertRaises(ValueError):
+                Hash(b)
+        with self.assertRaises(TypeError):
+            Hash(HashSize)
+
     def test_to_bytes(self):
         for c in self.test_case:
             self.assertEqual(Hash(c['bytes']).to_bytes(), c['bytes'])
@@ -143,13 +159,34 @@ class TestHash(unittest.TestCase):
             self.assertEqual(Hash(c['bytes']).copy_bytes(), c['bytes'])
             # TOADD some modify behavior
 
-    def test_set_bytes(self):
+    def test_immutable(self):
         hash_0 = Hash(self.test_case[0]['bytes'])
         hash_1 = Hash(self.test_case[1]['bytes'])
 
         self.assertFalse(hash_0 == hash_1)
-        hash_0.set_bytes(hash_1.copy_bytes())
-        self.assertTrue(hash_0 == hash_1)
+        self.assertIs(hash_0.copy(), hash_0)
+        with self.assertRaises(AttributeError):
+            hash_0.data = hash_1.copy_bytes()
+        with self.assertRaises(TypeError):
+            hash_0[0] = 0
+
+    def test_dict_key(self):
+        hashes = {Hash(c['bytes']): i for i, c in enumerate(self.test_case)}
+        for i, c in enumerate(self.test_case):
+            self.assertEqual(hashes[Hash(c['str'])], i)
+
+        # A Hash is the bytes it holds.
+        self.assertEqual(Hash(self.test_case[0]['bytes']), self.test_case[0]['bytes'])
+        self.assertEqual(Hash(Hash(self.test_case[0]['bytes'])), Hash(self.test_case[0]['bytes']))
+        self.assertEqual(Hash(), bytes(HashSize))
+        self.assertIs(type(Hash(self.test_case[0]['bytes']).to_bytes()), bytes)
+
+    def test_pickle(self):
+        h = Hash(self.test_case[0]['bytes'])
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle.loads(pickle.dumps(h, protocol))
+            self.assertIs(type(unpickled), Hash)
+            self.assertEqual(unpickled, h)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,6 @@
 import unittest
+from unittest import mock
+import pyutil
 from chainhash.hashfuncs import *
 
 class TestHashFuncs(unittest.TestCase):
@@ -131,6 +133,41 @@ class TestDoubleHashFuncs(unittest.TestCase):
         for case in self.tests:
             self.assertEqual(repr(double_hash_h(case['in'].encode())), case['out'])
 
+    def test_double_hash_parts_h(self):
+        for case in self.tests:
+            b = case['in'].encode()
+            parts = [b[:3], memoryview(b)[3:10], b[10:]]
+            self.assertEqual(repr(double_hash_parts_h(parts)), case['out'])
+
+    def test_double_hash_many(self):
+        buffers = [case['in'].encode() for case in self.tests]
+        want = [double_hash_b(b) for b in buffers]
+        self.assertEqual(double_hash_many_b(buffers), want)
+        self.assertEqual(double_hash_many(buffers), [double_hash_h(b) for b in buffers])
+        self.assertEqual(double_hash_many_b([]), [])
+
+        # Spread over the thread pool for large buffers and the process pool
+        # for many small ones, in chunks of 4.
+        with mock.patch('pyutil.thread_pool', wraps=pyutil.thread_pool) as thread_pool, \
+                mock.patch('pyutil.process_pool', wraps=pyutil.process_pool) as process_pool:
+            with mock.patch('chainhash.hashfuncs.doubleHashManyChunkSize', 4), \
+                    mock.patch('chainhash.hashfuncs.hashlibGILReleaseSize', 1):
+                self.assertEqual(double_hash_many_b([memoryview(b) for b in buffers], workers=2), want)
+            thread_pool.assert_called_once_with(2)
+            process_pool.assert_not_called()
+
+            with mock.patch('chainhash.hashfuncs.doubleHashManyChunkSize', 4), \
+                    mock.patch('chainhash.hashfuncs.doubleHashManyProcessMin', 8):
+                self.assertEqual(double_hash_many_b([memoryview(b) for b in buffers], workers=2), want)
+            thread_pool.assert_called_once_with(2)
+            process_pool.assert_called_once_with(2)
+
+    def test_double_hash_pairs(self):
+        level = b''.join(double_hash_b(case['in'].encode()) for case in self.tests[:6])
+        want = b''.join(double_hash_b(level[i:i + 64]) for i in range(0, len(level), 64))
+        self.assertEqual(double_hash_pairs(level), want)
+        self.assertEqual(double_hash_pairs(bytearray(level)), want)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,53 @@
+import hashlib
+import random
+import unittest
+from chainhash.sha256 import *
+from chainhash.hashfuncs import double_hash_b
+
+
+def pure_sha256(msg: bytes) -> bytes:
+    state = sha256IV
+    full = len(msg) // sha256BlockSize * sha256BlockSize
+    for i in range(0, full, sha256BlockSize):
+        state = sha256_compress(state, msg[i:i + sha256BlockSize])
+    return sha256_finish(state, msg[full:], len(msg))
+
+
+class TestSha256(unittest.TestCase):
+    def test_vectors(self):
+        tests = [
+            (b"", "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"),
+            (b"abc", "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"),
+            (b"abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq",
+             "248d6a61d20638b8e5c026930c3e6039a33ce45964ff2167f6ecedd419db06c1"),
+            (b"abcdefghbcdefghicdefghijdefghijkefghijklfghijklmghijklmnhijklmnoijklmnopjklmnopqklmnopqrlmnopqrs"
+             b"mnopqrstnopqrstu",
+             "cf5b16a778af8380036ce59e7b0492370b249b11e8f07a51afac45037afee9d1"),
+        ]
+        for msg, want in tests:
+            self.assertEqual(pure_sha256(msg).hex(), want)
+
+    # The compression function agrees with hashlib on every padding boundary.
+    def test_compress(self):
+        rand = random.Random(5)
+        for msg_len in list(range(0, 130)) + [1000]:
+            msg = bytes(rand.getrandbits(8) for _ in range(msg_len))
+            self.assertEqual(pure_sha256(msg), hashlib.sha256(msg).digest())
+
+    def test_midstate(self):
+        rand = random.Random(6)
+        for _ in range(20):
+            header = bytes(rand.getrandbits(8) for _ in range(80))
+            m = midstate(header[:64])
+            self.assertEqual(m.state(), sha256_compress(sha256IV, header[:64]))
+            self.assertEqual(len(m.to_bytes()), 32)
+            self.assertEqual(finish(m, header[64:]), double_hash_b(header))
+            self.assertEqual(finish(m, memoryview(header)[64:]), double_hash_b(header))
+            self.assertEqual(sha256_finish(m.state(), header[64:], 80), hashlib.sha256(header).digest())
+
+        with self.assertRaises(ValueError):
+            midstate(bytes(63))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from chainhash.siphash import *
+
+
+class TestSipHash(unittest.TestCase):
+    def test_siphash24(self):
+        # Vectors from the SipHash reference implementation, keyed with the
+        # bytes 00..0f and hashing the messages 00, 00 01, ... of the given
+        # lengths.
+        k0 = int.from_bytes(bytes(range(8)), "little")
+        k1 = int.from_bytes(bytes(range(8, 16)), "little")
+        tests = [
+            (0, 0x726fdb47dd0e0e31),
+            (1, 0x74f839c593dc67fd),
+            (7, 0xab0200f58b01d137),
+            (8, 0x93f5f5799a932462),
+            (15, 0xa129ca6149be45e5),
+            (16, 0x3f2acc7f57c29bdb),
+        ]
+        for n, want in tests:
+            self.assertEqual(siphash24(k0, k1, bytes(range(n))), want, "length %d" % n)
+
+
+if __name__ == '__main__':
+    unittest.main()
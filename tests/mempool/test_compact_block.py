@@ -0,0 +1,124 @@
+import unittest
+from unittest import mock
+import wire
+import blockchain
+import btcutil
+from mempool.compact_block import *
+from mempool.mempool import TxPool, TxDesc
+from tests.wire.test_msg_block import blockOne
+from tests.wire.test_msg_tx import multiTx, multiWitnessTx
+
+
+# make_block returns a block spending nothing in particular, with the
+# coinbase of block one followed by num_txs distinct transactions and a
+# header committing to them.
+def make_block(num_txs: int) -> wire.MsgBlock:
+    txs = [blockOne.transactions[0], multiWitnessTx]
+    for i in range(num_txs - 1):
+        txs.append(wire.MsgTx(version=1, tx_ins=multiTx.tx_ins, tx_outs=multiTx.tx_outs, lock_time=i))
+
+    merkles = blockchain.build_merkle_tree_store([btcutil.Tx(tx) for tx in txs], witness=False)
+    header = wire.BlockHeader(version=1, prev_block=blockOne.header.prev_block, merkle_root=merkles[-1],
+                              timestamp=blockOne.header.timestamp, bits=blockOne.header.bits, nonce=1)
+    return wire.MsgBlock(header=header, transactions=txs)
+
+
+class TestCompactBlockReconstructor(unittest.TestCase):
+    def setUp(self):
+        self.msg_block = make_block(20)
+        self.cmpct = wire.MsgCmpctBlock.from_block(self.msg_block, nonce=7)
+
+    def test_reconstruct_from_pool(self):
+        # The whole block is in the mempool, along with unrelated transactions.
+        pool = self.msg_block.transactions[1:] + make_block(30).transactions[21:]
+        reconstructor = CompactBlockReconstructor(self.cmpct)
+        self.assertEqual(reconstructor.fill_from_pool(btcutil.Tx(tx) for tx in pool), [])
+        self.assertIsNone(reconstructor.get_block_txn())
+
+        block = reconstructor.block()
+        self.assertEqual(block.block_hash(), self.msg_block.block_hash())
+        self.assertEqual([tx.tx_hash() for tx in block.transactions], self.msg_block.tx_hashes())
+
+        stats = reconstructor.stats
+        self.assertEqual((stats.num_txs, stats.num_prefilled, stats.num_from_pool, stats.num_requested),
+                         (21, 1, 20, 0))
+        self.assertEqual(stats.hit_rate(), 1.0)
+        self.assertGreater(stats.elapsed, 0)
+
+    def test_reconstruct_with_block_txn(self):
+        missing = [1, 4, 5, 20]
+        pool = [tx for i, tx in enumerate(self.msg_block.transactions) if i not in missing]
+        reconstructor = CompactBlockReconstructor(self.cmpct)
+        self.assertEqual(reconstructor.fill_from_pool(pool), missing)
+
+        get_block_txn = reconstructor.get_block_txn()
+        self.assertEqual(get_block_txn, wire.MsgGetBlockTxn(block_hash=self.msg_block.block_hash(), indexes=missing))
+        with self.assertRaises(CompactBlockErr):
+            reconstructor.block()
+
+        # The peer answers with the requested transactions in order.
+        block_txn = wire.MsgBlockTxn(block_hash=get_block_txn.block_hash,
+                                     transactions=[self.msg_block.transactions[i] for i in get_block_txn.indexes])
+        with self.assertRaises(CompactBlockErr):
+            reconstructor.add_block_txn(wire.MsgBlockTxn(block_hash=get_block_txn.block_hash,
+                                                         transactions=block_txn.transactions[1:]))
+        reconstructor.add_block_txn(block_txn)
+
+        self.assertEqual(reconstructor.block().block_hash(), self.msg_block.block_hash())
+        self.assertEqual(reconstructor.stats.num_requested, 4)
+        self.assertEqual(reconstructor.stats.hit_rate(), 16 / 20)
+
+    def test_short_id_collision(self):
+        # Give an unrelated mempool transaction the short id of transaction 3
+        # of the block.
+        other = make_block(30).transactions[25]
+        tx3_hash = self.msg_block.transactions[3].witness_hash()
+        real_short_id = wire.short_id
+
+        def short_id(k0, k1, tx_hash):
+            return real_short_id(k0, k1, tx3_hash if tx_hash == other.witness_hash() else tx_hash)
+
+        pool = [tx for i, tx in enumerate(self.msg_block.transactions) if i != 3]
+        with mock.patch.object(wire, "short_id", short_id):
+            # Only the unrelated transaction is in the mempool: the wrong guess
+            # is caught by the merkle root check.
+            reconstructor = CompactBlockReconstructor(self.cmpct)
+            self.assertEqual(reconstructor.fill_from_pool(pool + [other]), [])
+            with self.assertRaises(CompactBlockErr):
+                reconstructor.block()
+
+            # Both transactions are in the mempool: neither is trusted and
+            # index 3 is requested.
+            reconstructor = CompactBlockReconstructor(self.cmpct)
+            self.assertEqual(reconstructor.fill_from_pool(pool + [self.msg_block.transactions[3], other]), [3])
+            self.assertEqual(reconstructor.stats.num_collisions, 1)
+            self.assertEqual(reconstructor.stats.num_from_pool, 19)
+
+    def test_duplicate_short_ids(self):
+        # Two transactions of the block with the same short id are both
+        # requested.
+        cmpct = wire.MsgCmpctBlock(header=self.cmpct.header, nonce=self.cmpct.nonce,
+                                   short_ids=[5, 6, 5], prefilled_txs=self.cmpct.prefilled_txs)
+        reconstructor = CompactBlockReconstructor(cmpct)
+        self.assertEqual(reconstructor.missing_indexes(), [1, 2, 3])
+        self.assertEqual(reconstructor.short_id_indexes, {6: 2})
+        self.assertEqual(reconstructor.collided, {1, 3})
+
+        bad = wire.MsgCmpctBlock(header=self.cmpct.header, short_ids=[1],
+                                 prefilled_txs=[wire.PrefilledTx(index=5, tx=multiTx)])
+        with self.assertRaises(CompactBlockErr):
+            CompactBlockReconstructor(bad)
+
+    def test_tx_pool(self):
+        pool = {}
+        for tx in self.msg_block.transactions[1:10]:
+            tx = btcutil.Tx(tx)
+            pool[tx.hash()] = TxDesc(tx=tx, added=0, height=1, fee=0, fee_per_kb=0)
+        tx_pool = TxPool(pool=pool)
+
+        reconstructor = CompactBlockReconstructor(self.cmpct)
+        self.assertEqual(tx_pool.fill_compact_block(reconstructor), list(range(10, 21)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+import concurrent.futures
+from pyutil import *
+
+
+class TestPool(unittest.TestCase):
+    def test_pools(self):
+        threads = thread_pool(2)
+        processes = process_pool(2)
+        self.assertIsInstance(threads, concurrent.futures.ThreadPoolExecutor)
+        self.assertIsInstance(processes, concurrent.futures.ProcessPoolExecutor)
+
+        # The pools are shared per kind and number of workers.
+        self.assertIs(thread_pool(2), threads)
+        self.assertIs(process_pool(2), processes)
+        self.assertIsNot(thread_pool(3), threads)
+        self.assertEqual(list(threads.map(abs, [-1, 2])), [1, 2])
+        self.assertEqual(list(processes.map(abs, [-1, 2])), [1, 2])
+
+        # The pools shut down at exit are started again when needed.
+        shutdown_pools()
+        for pool in (threads, processes):
+            with self.assertRaises(RuntimeError):
+                pool.submit(int)
+        self.assertIsNot(thread_pool(2), threads)
+        self.assertIsNot(process_pool(2), processes)
+        self.assertEqual(process_pool(2).submit(abs, -3).result(), 3)
+        shutdown_pools()
@@ -1,4 +1,6 @@
 import unittest
+import hashlib
+import ecdsa.util
 from txscript.engine import *
 from tests.txscript.test_reference import *
 
@@ -377,3 +379,103 @@ class TestCheckSignatureEncoding(unittest.TestCase):
             else:
                 with self.assertRaises(ScriptError):
                     vm.check_signature_encoding(test['sig'])
+
+
+class TestDeferredSigChecks(unittest.TestCase):
+    def setUp(self):
+        self.priv = btcec.SigningKey.from_secret_exponent(0x5eed, curve=btcec.SECP256k1)
+        point = self.priv.get_verifying_key().pubkey.point
+        self.pub_key = bytes([btcec.PubkeyCompressed | (point.y() & 1)]) + point.x().to_bytes(32, 'big')
+
+    # spend returns a transaction spending an output with the given public key
+    # script, with a signature of it (or of something else when valid is not
+    # set) as its signature script.
+    def spend(self, pk_script, valid):
+        tx = wire.MsgTx(version=1,
+                        tx_ins=[wire.TxIn(previous_out_point=wire.OutPoint(hash=chainhash.Hash(bytes(32)), index=0),
+                                          sequence=0xffffffff)],
+                        tx_outs=[wire.TxOut(value=1, pk_script=bytes([OP_TRUE]))],
+                        lock_time=0)
+        hash = calc_signature_hash(parse_script(pk_script), SigHashType.SigHashAll, tx, 0)
+        if not valid:
+            hash = hashlib.sha256(hash).digest()
+        sig = self.priv.sign_digest_deterministic(hash, hashfunc=hashlib.sha256,
+                                                  sigencode=ecdsa.util.sigencode_der) + b'\x01'
+        tx.tx_ins[0].signature_script = bytes([len(sig)]) + sig
+        return tx
+
+    # run_scripts executes the scripts and returns the error they fail with, or None.
+    def run_scripts(self, pk_script, tx, flags, defer):
+        vm = new_engine(pk_script, tx, 0, flags, None, None, 0, defer_sig_checks=defer)
+        try:
+            vm.execute()
+        except ScriptError as e:
+            return e, vm.deferred_checks
+
+        failed = verify_deferred_checks(vm.deferred_checks or [])
+        return (failed.error if failed else None), vm.deferred_checks
+
+    def test_deferred_sig_checks(self):
+        pk = bytes([len(self.pub_key)]) + self.pub_key
+        tests = [
+            # Final CHECKSIG, only its result is the final stack entry.
+            (pk + bytes([OP_CHECKSIG]), 0, 1),
+            # The result of CHECKSIG is used, so it can't be deferred.
+            (pk + bytes([OP_CHECKSIG, OP_NOT]), 0, 0),
+            (pk + bytes([OP_CHECKSIGVERIFY, OP_TRUE]), 0, 1),
+            # A failure after the deferred check, which comes first.
+            (pk + bytes([OP_CHECKSIGVERIFY, OP_RETURN]), 0, 1),
+            (pk + bytes([OP_CHECKSIG, OP_NOT]), ScriptVerifyNullFail, 1),
+            (pk + bytes([OP_CHECKSIG, OP_CHECKSIG]), ScriptVerifyNullFail, 1),
+        ]
+        for i, (pk_script, flags, num_deferred) in enumerate(tests):
+            for valid in (True, False):
+                tx = self.spend(pk_script, valid)
+                want, _ = self.run_scripts(pk_script, tx, flags, defer=False)
+                got, deferred = self.run_scripts(pk_script, tx, flags, defer=True)
+                self.assertEqual(got, want, (i, valid))
+                self.assertEqual(len(deferred), num_deferred, (i, valid))
+
+
+class TestPayToScriptHash(unittest.TestCase):
+    # The redeem script is the last push of the signature script, and runs
+    # over the pushes before it.
+    def test_redeem_script(self):
+        redeem_script = bytes([OP_ADD, OP_3, OP_EQUAL])
+        pk_script = pay_to_script_hash_script(btcec.hash160(redeem_script))
+        tests = [
+            (bytes([OP_1, OP_2, len(redeem_script)]) + redeem_script, None),
+            (bytes([OP_1, OP_1, len(redeem_script)]) + redeem_script, ErrorCode.ErrEvalFalse),
+            (bytes([OP_2, len(redeem_script)]) + redeem_script, ErrorCode.ErrInvalidStackOperation),
+        ]
+        for i, (sig_script, want) in enumerate(tests):
+            tx = wire.MsgTx(version=1,
+                            tx_ins=[wire.TxIn(previous_out_point=wire.OutPoint(hash=chainhash.Hash(bytes(32)), index=0),
+                                              signature_script=sig_script, sequence=0xffffffff)],
+                            tx_outs=[wire.TxOut(value=1, pk_script=bytes([OP_TRUE]))],
+                            lock_time=0)
+            vm = new_engine(pk_script, tx, 0, ScriptBip16, None, None, 0)
+            try:
+                vm.execute()
+                got = None
+            except ScriptError as e:
+                got = e.c
+            self.assertEqual(got, want, i)
+
+
+class TestStackAccess(unittest.TestCase):
+    # get_stack lists a stack bottom up, and set_stack replaces its contents,
+    # also when it is empty.
+    def test_get_set_stack(self):
+        stack = Stack()
+        set_stack(stack, [])
+        self.assertEqual(get_stack(stack), [])
+
+        set_stack(stack, [b'\x01', b'\x02', b'\x03'])
+        self.assertEqual(get_stack(stack), [b'\x01', b'\x02', b'\x03'])
+        self.assertEqual(stack.peek_byte_array(0), b'\x03')
+
+        set_stack(stack, [b'\x04'])
+        self.assertEqual(get_stack(stack), [b'\x04'])
+        set_stack(stack, [])
+        self.assertEqual(stack.depth(), 0)
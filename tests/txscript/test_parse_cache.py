@@ -0,0 +1,68 @@
+import unittest
+import threading
+import btcec
+from txscript.parse_cache import *
+
+
+def compressed_pub_key(secret):
+    x, y = btcec.scalar_base_mult(secret)
+    return bytes([btcec.PubkeyCompressed | (y & 1)]) + x.to_bytes(32, 'big')
+
+
+class TestParseCache(unittest.TestCase):
+    def test_parse(self):
+        cache = ParseCache(lambda raw: btcec.parse_pub_key(raw, btcec.s256()), 10)
+        raw = compressed_pub_key(7)
+        want = btcec.parse_pub_key(raw, btcec.s256())
+
+        self.assertEqual(cache.parse(raw), want)
+        self.assertEqual(cache.stats(), (0, 1))
+        self.assertIs(cache.parse(bytearray(raw)), cache.parse(raw))
+        self.assertEqual(cache.stats(), (2, 1))
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats(), (0, 0))
+
+    def test_parse_errors_not_cached(self):
+        cache = ParseCache(lambda raw: btcec.parse_der_signature(raw, btcec.s256()), 10)
+        for _ in range(2):
+            with self.assertRaises(btcec.SigMalformedTooShortErr):
+                cache.parse(b'\x30\x01')
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats(), (0, 2))
+
+    def test_eviction(self):
+        parsed = []
+
+        def parse(raw):
+            parsed.append(raw)
+            return raw[::-1]
+
+        cache = ParseCache(parse, 2)
+        for raw in (b'a1', b'b2', b'a1', b'c3', b'a1', b'b2'):
+            self.assertEqual(cache.parse(raw), raw[::-1])
+        self.assertEqual(parsed, [b'a1', b'b2', b'c3', b'b2'])
+        self.assertEqual(len(cache), 2)
+
+        cache = ParseCache(parse, 0)
+        cache.parse(b'a1')
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent(self):
+        cache = ParseCache(lambda raw: raw[::-1], 8)
+        keys = [bytes([i]) * 4 for i in range(16)]
+
+        def worker():
+            for _ in range(200):
+                for raw in keys:
+                    self.assertEqual(cache.parse(raw), raw[::-1])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        hits, misses = cache.stats()
+        self.assertEqual(hits + misses, 4 * 200 * len(keys))
+        self.assertLessEqual(len(cache), 8)
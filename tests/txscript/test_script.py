@@ -1,7 +1,9 @@
 import unittest
 import copy
+import random
 import wire
-from txscript.standard import ScriptClass
+import txscript
+from txscript.standard import ScriptClass, type_of_script, get_script_class
 from tests.txscript.test_script_num import hex_to_bytes
 from tests.txscript.test_reference import *
 
@@ -813,3 +815,90 @@ class TestIsUnspendable(unittest.TestCase):
 
         for test in tests:
             self.assertEqual(is_unspendabe(test['pkScript']), test['expected'])
+
+
+class TestPushedDataSlices(unittest.TestCase):
+    # The pushes found by walking the raw script are the data of the push
+    # opcodes parse_script returns, and both fail on the same malformed pushes.
+    def test_pushed_data_slices(self):
+        rand = random.Random(3)
+        push_ops = set(range(OP_0, OP_PUSHDATA4 + 1))
+        for _ in range(2000):
+            script = bytes(rand.choice((rand.getrandbits(8), rand.randint(0, OP_PUSHDATA4), OP_PUSHDATA1, 0x01,
+                                        0x00)) for _ in range(rand.randint(0, 40)))
+            try:
+                pops = parse_script(script)
+            except ScriptError:
+                with self.assertRaises(ScriptError):
+                    pushed_data_slices(script)
+                continue
+
+            want = [pop.data for pop in pops if pop.opcode.value in push_ops]
+            self.assertEqual(pushed_data_slices(script), want)
+            self.assertEqual([bytes(d) for d in pushed_data_slices(memoryview(script))], want)
+
+
+class TestParsedScript(unittest.TestCase):
+    def setUp(self):
+        txscript.scriptCache.clear()
+
+    # The facts of a parsed script are those worked out from the uncached
+    # parse, for well formed and malformed scripts alike.
+    def test_facts(self):
+        rand = random.Random(5)
+        scripts = [
+            must_parse_short_form("DUP HASH160 DATA_20 0x" + "01" * 20 + " EQUALVERIFY CHECKSIG"),
+            must_parse_short_form("HASH160 DATA_20 0x" + "02" * 20 + " EQUAL"),
+            must_parse_short_form("0 DATA_20 0x" + "03" * 20),
+            must_parse_short_form("16 DATA_32 0x" + "04" * 32),
+            must_parse_short_form("1 2 CHECKMULTISIG CHECKSIG"),
+            must_parse_short_form("RETURN DATA_4 0x01020304"),
+            must_parse_short_form("HASH160 DATA_20 0x" + "02" * 20 + " EQUAL PUSHDATA1 0x05 0x0102"),
+            bytes(),
+        ]
+        scripts += [bytes(rand.getrandbits(8) for _ in range(rand.randint(1, 30))) for _ in range(300)]
+
+        for script in scripts:
+            try:
+                pops = parse_script_template(script, opcode_array)
+                error = None
+            except ScriptError as e:
+                pops = e.extra_data
+                error = e
+
+            parsed = parsed_script(script)
+            self.assertEqual(parsed.pops, tuple(pops))
+            self.assertEqual(parsed.error, error)
+            self.assertEqual(parsed.is_push_only, error is None and is_push_only(pops))
+            self.assertEqual(parsed.is_pay_to_script_hash, error is None and is_script_hash(pops))
+            self.assertEqual(parsed.sig_op_count, get_sig_op_count_inner(pops, False))
+            self.assertEqual(parsed.precise_sig_op_count, get_sig_op_count_inner(pops, True))
+            if error is None and is_pops_witness_program(pops):
+                self.assertEqual(parsed.witness_version, as_small_int(pops[0].opcode))
+                self.assertEqual(parsed.witness_program, pops[1].data)
+            else:
+                self.assertIsNone(parsed.witness_version)
+                self.assertIsNone(parsed.witness_program)
+            want_class = ScriptClass.NonStandardTy if error is not None else type_of_script(pops)
+            self.assertEqual(get_script_class(script), want_class)
+
+            if error is None:
+                self.assertEqual(parse_script(script), tuple(pops))
+            else:
+                with self.assertRaises(ScriptError) as cm:
+                    parse_script(script)
+                self.assertEqual(cm.exception, error)
+                self.assertEqual(cm.exception.extra_data, pops)
+
+    def test_cache(self):
+        script = must_parse_short_form("DUP HASH160 DATA_20 0x" + "01" * 20 + " EQUALVERIFY CHECKSIG")
+        pops = parse_script(script)
+        self.assertIsInstance(pops, tuple)
+        self.assertIs(parse_script(bytearray(script)), pops)
+        self.assertIs(parse_script(memoryview(script)), pops)
+        self.assertEqual(txscript.scriptCache.stats(), (2, 1))
+
+        # Scripts larger than a standard signature script are not kept.
+        script = bytes([OP_1]) * (maxCachedScriptSize + 1)
+        self.assertIsNot(parsed_script(script), parsed_script(script))
+        self.assertEqual(len(txscript.scriptCache), 1)
@@ -0,0 +1,158 @@
+import unittest
+import hashlib
+from unittest import mock
+import ecdsa.util
+import btcec
+import chainhash
+import pyutil
+import wire
+import txscript
+from txscript import *
+
+
+def make_key(secret):
+    return btcec.PrivateKey.from_secret_exponent(secret, curve=btcec.SECP256k1)
+
+
+def pub_key_bytes(key, compress):
+    point = key.get_verifying_key().pubkey.point
+    if compress:
+        return bytes([btcec.PubkeyCompressed | (point.y() & 1)]) + point.x().to_bytes(32, 'big')
+    return b'\x04' + key.get_verifying_key().to_string()
+
+
+# make_items returns transactions spending, in turn, a P2PKH output of a
+# compressed key, a P2PKH output of an uncompressed key and a P2WPKH output,
+# along with what sign_tx_batch needs to sign them.
+def make_items(count):
+    items = []
+    for i in range(count):
+        inputs = []
+        tx = wire.MsgTx(version=1, tx_outs=[wire.TxOut(value=1000, pk_script=bytes([OP_TRUE]))])
+        for j in range(3):
+            key = make_key(i * 3 + j + 1)
+            if j == 2:
+                pk_script = pay_to_witness_pub_key_hash_script(btcec.hash160(pub_key_bytes(key, True)))
+            else:
+                pk_script = pay_to_pub_key_hash_script(btcec.hash160(pub_key_bytes(key, j == 0)))
+            inputs.append((pk_script, 5000 + j, key))
+            tx.tx_ins.append(wire.TxIn(previous_out_point=wire.OutPoint(
+                hash=chainhash.Hash(hashlib.sha256(bytes([i, j])).digest()), index=j)))
+        items.append((tx, inputs))
+    return items
+
+
+class TestSign(unittest.TestCase):
+    def check_signed(self, items):
+        flags = StandardVerifyFlags | ScriptVerifyWitness
+        for tx, inputs in items:
+            for idx, (pk_script, amount, _) in enumerate(inputs):
+                vm = new_engine(pk_script, tx, idx, flags, None, None, amount)
+                vm.execute()
+
+    def test_raw_tx_in_signature(self):
+        tx, inputs = make_items(1)[0]
+        pk_script, _, key = inputs[0]
+        hash = calc_signature_hash(parse_script(pk_script), SigHashType.SigHashAll, tx, 0)
+        want = key.sign_digest_deterministic(hash, hashfunc=hashlib.sha256,
+                                             sigencode=ecdsa.util.sigencode_der_canonize) + b'\x01'
+        self.assertEqual(raw_tx_in_signature(tx, 0, pk_script, SigHashType.SigHashAll, key), want)
+
+        pk_script, amount, key = inputs[2]
+        sig_hashes = TxSigHashes.from_msg_tx(tx)
+        hash = calc_witness_signature_hash(parse_script(pk_script), sig_hashes, SigHashType.SigHashAll,
+                                           tx, 2, amount)
+        want = key.sign_digest_deterministic(hash, hashfunc=hashlib.sha256,
+                                             sigencode=ecdsa.util.sigencode_der_canonize) + b'\x01'
+        got = raw_tx_in_witness_signature(tx, sig_hashes, 2, amount, pk_script, SigHashType.SigHashAll, key)
+        self.assertEqual(got, want)
+
+    # The signature hash of the second input of a transaction with two inputs
+    # and two outputs, for SigHashSingle.  The preimage is spelled out: the
+    # first input has its script emptied and its sequence zeroed, the first
+    # output is blanked to a value of -1 and no script, and the hash type is
+    # appended.
+    def test_calc_signature_hash_single(self):
+        pk_script = pay_to_pub_key_hash_script(bytes(20))
+        tx = wire.MsgTx(version=1, tx_ins=[
+            wire.TxIn(previous_out_point=wire.OutPoint(hash=chainhash.Hash(bytes(range(32))), index=1),
+                      sequence=0xfffffffe),
+            wire.TxIn(previous_out_point=wire.OutPoint(hash=chainhash.Hash(bytes(range(32, 64))), index=0),
+                      sequence=0xffffffff),
+        ], tx_outs=[
+            wire.TxOut(value=5000, pk_script=bytes([OP_TRUE])),
+            wire.TxOut(value=7000, pk_script=bytes([OP_TRUE, OP_DROP])),
+        ])
+        preimage = bytes.fromhex(
+            "01000000" "02" +
+            bytes(range(32)).hex() + "01000000" "00" "00000000" +
+            bytes(range(32, 64)).hex() + "00000000" "19" + pk_script.hex() + "ffffffff" +
+            "02" "ffffffffffffffff" "00" "581b000000000000" "02" "5175" +
+            "00000000" "03000000")
+        want = hashlib.sha256(hashlib.sha256(preimage).digest()).digest()
+        self.assertEqual(want.hex(), "e416aa4bb0cb1089281dfdfca86f96ef93250663096f8f98dde39f11e821d628")
+        self.assertEqual(calc_signature_hash(parse_script(pk_script), SigHashType.SigHashSingle, tx, 1), want)
+
+        # An input without a matching output signs the hash of 1.
+        tx.tx_outs = tx.tx_outs[:1]
+        self.assertEqual(calc_signature_hash(parse_script(pk_script), SigHashType.SigHashSingle, tx, 1),
+                         bytes([0x01]) + bytes(31))
+
+    def test_sign_tx_batch_single(self):
+        items = make_items(1)
+        tx, inputs = items[0]
+        tx.tx_outs = [wire.TxOut(value=1000 + i, pk_script=bytes([OP_TRUE])) for i in range(3)]
+        sign_tx_batch(items, hash_type=SigHashType.SigHashSingle, workers=1)
+        self.check_signed(items)
+
+        # The P2PKH signature is over the hash of the input and its own
+        # output only, so it still holds when the other outputs change.
+        pk_script, _, key = inputs[0]
+        sig = tx.tx_ins[0].signature_script[1:-34]
+        self.assertEqual(sig[-1], SigHashType.SigHashSingle.value)
+        tx_outs = tx.tx_outs
+        tx.tx_outs = [tx_outs[0], wire.TxOut(value=1, pk_script=bytes()), wire.TxOut(value=2, pk_script=bytes())]
+        hash = calc_signature_hash(parse_script(pk_script), SigHashType.SigHashSingle, tx, 0)
+        self.assertNotEqual(hash, bytes([0x01]) + bytes(31))
+        self.assertTrue(key.get_verifying_key().verify_digest(sig[:-1], hash, sigdecode=ecdsa.util.sigdecode_der))
+        new_engine(pk_script, tx, 0, StandardVerifyFlags, None, None, inputs[0][1]).execute()
+
+    def test_sign_tx_batch(self):
+        items = make_items(2)
+        sign_tx_batch(items, workers=1)
+        self.check_signed(items)
+
+        tx, inputs = items[0]
+        self.assertEqual(tx.tx_ins[0].signature_script,
+                         signature_script(tx, 0, inputs[0][0], SigHashType.SigHashAll, inputs[0][2], True))
+        self.assertEqual(tx.tx_ins[1].signature_script,
+                         signature_script(tx, 1, inputs[1][0], SigHashType.SigHashAll, inputs[1][2], False))
+        self.assertEqual(tx.tx_ins[2].signature_script, bytes())
+        self.assertEqual(tx.tx_ins[2].witness,
+                         witness_signature(tx, TxSigHashes.from_msg_tx(tx), 2, inputs[2][1], inputs[2][0],
+                                           SigHashType.SigHashAll, inputs[2][2], True))
+
+    def test_sign_tx_batch_workers(self):
+        items = make_items(4)
+        with mock.patch.object(txscript.sign, "signTxBatchChunkSize", 1), \
+                mock.patch("pyutil.process_pool", wraps=pyutil.process_pool) as process_pool:
+            sign_tx_batch(items, workers=2)
+        process_pool.assert_called_once_with(2)
+        self.check_signed(items)
+
+        want = make_items(4)
+        sign_tx_batch(want, workers=1)
+        for (tx, _), (want_tx, _) in zip(items, want):
+            for tx_in, want_tx_in in zip(tx.tx_ins, want_tx.tx_ins):
+                self.assertEqual(tx_in.signature_script, want_tx_in.signature_script)
+                self.assertEqual(list(tx_in.witness), list(want_tx_in.witness))
+
+    def test_sign_tx_batch_unsupported(self):
+        items = make_items(1)
+        tx, inputs = items[0]
+        key = inputs[0][2]
+        inputs[0] = (pay_to_script_hash_script(btcec.hash160(bytes([OP_TRUE]))), inputs[0][1], key)
+        with self.assertRaises(ScriptError) as cm:
+            sign_tx_batch(items, workers=1)
+        self.assertEqual(cm.exception.c, ErrorCode.ErrUnsupportedAddress)
+        self.assertEqual(tx.tx_ins[0].signature_script, bytes())
@@ -0,0 +1,286 @@
+import unittest
+import hashlib
+import ecdsa.util
+import btcec
+import chainhash
+import wire
+from txscript import *
+from tests.blockchain.common import load_blocks, load_utxo_view
+from tests.txscript.test_sign import make_key, pub_key_bytes
+
+# The flags the differential test runs every spend with: none, consensus
+# before and after segwit, and standard with and without some of its rules.
+flagSets = [
+    ScriptFlags(0),
+    ScriptBip16,
+    ScriptBip16 | ScriptVerifyWitness,
+    StandardVerifyFlags,
+    StandardVerifyFlags & ~(ScriptVerifyLowS | ScriptVerifyNullFail | ScriptVerifyCleanStack),
+    StandardVerifyFlags & ~(ScriptVerifyStrictEncoding | ScriptVerifyDERSignatures | ScriptVerifyMinimalData),
+]
+
+# The spends made of every template, each the valid one or one broken in some
+# way.
+singleSigMutations = ["valid", "anyonecanpay", "single", "none", "bad_sig", "hash_type", "high_s", "lax_der",
+                      "empty_sig", "wrong_key", "uncompressed", "non_minimal", "extra_item"]
+multiSigMutations = ["valid", "anyonecanpay", "bad_sig", "high_s", "empty_sig", "swapped", "dummy", "missing_sig",
+                     "extra_item", "wrong_script"]
+
+hashTypes = {
+    "anyonecanpay": SigHashType.SigHashAll | SigHashType.SigHashAnyOneCanPay,
+    "single": SigHashType.SigHashSingle,
+    "none": SigHashType.SigHashNone,
+}
+
+
+def der_encode(r, s):
+    def encode_int(i):
+        b = i.to_bytes((i.bit_length() + 8) // 8, 'big')
+        return bytes([0x02, len(b)]) + b
+
+    body = encode_int(r) + encode_int(s)
+    return bytes([0x30, len(body)]) + body
+
+
+# mutate_sig returns the signature sig, with its hash type, broken as
+# mutation says.
+def mutate_sig(sig, mutation):
+    parsed = btcec.parse_der_signature(sig[:-1], btcec.s256())
+    if mutation == "bad_sig":
+        return der_encode(parsed.r ^ 1, parsed.s) + sig[-1:]
+    if mutation == "hash_type":
+        return sig[:-1] + bytes([0x04])
+    if mutation == "high_s":
+        return der_encode(parsed.r, btcec.s256().order - parsed.s) + sig[-1:]
+    if mutation == "lax_der":
+        r = b'\x00' + parsed.r.to_bytes(33, 'big')
+        s = parsed.s.to_bytes((parsed.s.bit_length() + 8) // 8, 'big')
+        body = bytes([0x02, len(r)]) + r + bytes([0x02, len(s)]) + s
+        return bytes([0x30, len(body)]) + body + sig[-1:]
+    if mutation == "empty_sig":
+        return bytes()
+    return sig
+
+
+def make_tx():
+    tx = wire.MsgTx(version=1, tx_outs=[wire.TxOut(value=1000, pk_script=bytes([OP_TRUE])),
+                                        wire.TxOut(value=2000, pk_script=bytes([OP_TRUE]))])
+    for i in range(2):
+        tx.tx_ins.append(wire.TxIn(previous_out_point=wire.OutPoint(
+            hash=chainhash.Hash(hashlib.sha256(bytes([i])).digest()), index=i)))
+    return tx
+
+
+# make_single_sig_spend returns a transaction whose second input spends the
+# template, one of "p2pkh", "p2wpkh" and "p2sh-p2wpkh", broken as mutation
+# says, with the public key script and amount of the output it spends.
+def make_single_sig_spend(template, mutation):
+    key, other = make_key(7), make_key(8)
+    compress = mutation != "uncompressed"
+    pub_key = pub_key_bytes(key, compress)
+    amount = 50000
+    hash_type = hashTypes.get(mutation, SigHashType.SigHashAll)
+    tx = make_tx()
+    idx = 1
+
+    if template == "p2pkh":
+        pk_script = pay_to_pub_key_hash_script(btcec.hash160(pub_key))
+        sig = raw_tx_in_signature(tx, idx, pk_script, hash_type, key)
+    else:
+        redeem_script = pay_to_witness_pub_key_hash_script(btcec.hash160(pub_key))
+        pk_script = redeem_script
+        if template == "p2sh-p2wpkh":
+            pk_script = pay_to_script_hash_script(btcec.hash160(redeem_script))
+            tx.tx_ins[idx].signature_script = ScriptBuilder().add_data(redeem_script).script
+        sig = raw_tx_in_witness_signature(tx, TxSigHashes.from_msg_tx(tx), idx, amount, redeem_script,
+                                          hash_type, key)
+
+    sig = mutate_sig(sig, mutation)
+    if mutation == "wrong_key":
+        pub_key = pub_key_bytes(other, True)
+
+    stack = [sig, pub_key]
+    if mutation == "extra_item":
+        stack = [b'\x01'] + stack
+
+    if template == "p2pkh":
+        if mutation == "non_minimal":
+            tx.tx_ins[idx].signature_script = bytes([len(sig)]) + sig + \
+                                              bytes([OP_PUSHDATA1, len(pub_key)]) + pub_key
+        else:
+            builder = ScriptBuilder()
+            for item in stack:
+                builder.add_data(item)
+            tx.tx_ins[idx].signature_script = builder.script
+    else:
+        tx.tx_ins[idx].witness = wire.TxWitness(stack)
+
+    return tx, idx, pk_script, amount
+
+
+# make_multi_sig_spend returns a transaction whose second input spends a
+# 2-of-3 P2WSH multisig script, broken as mutation says, with the public key
+# script and amount of the output it spends.
+def make_multi_sig_spend(mutation):
+    keys = [make_key(11), make_key(12), make_key(13)]
+    builder = ScriptBuilder().add_int64(2)
+    for key in keys:
+        builder.add_data(pub_key_bytes(key, True))
+    witness_script = builder.add_int64(3).add_op(OP_CHECKMULTISIG).script
+    pk_script = pay_to_witness_script_hash_script(hashlib.sha256(witness_script).digest())
+    amount = 70000
+    hash_type = hashTypes.get(mutation, SigHashType.SigHashAll)
+    tx = make_tx()
+    idx = 1
+
+    sig_hashes = TxSigHashes.from_msg_tx(tx)
+    sigs = [raw_tx_in_witness_signature(tx, sig_hashes, idx, amount, witness_script, hash_type, key)
+            for key in (keys[0], keys[2])]
+    sigs[1] = mutate_sig(sigs[1], mutation)
+    if mutation == "swapped":
+        sigs.reverse()
+    elif mutation == "missing_sig":
+        sigs = sigs[:1]
+
+    dummy = b'\x01' if mutation == "dummy" else b''
+    stack = [dummy] + sigs + [witness_script]
+    if mutation == "extra_item":
+        stack = [b''] + stack
+    elif mutation == "wrong_script":
+        stack[-1] = witness_script[:-1] + bytes([OP_CHECKMULTISIGVERIFY])
+    tx.tx_ins[idx].witness = wire.TxWitness(stack)
+
+    return tx, idx, pk_script, amount
+
+
+def make_spends():
+    spends = []
+    for template in ("p2pkh", "p2wpkh", "p2sh-p2wpkh"):
+        for mutation in singleSigMutations:
+            spends.append(("%s/%s" % (template, mutation), make_single_sig_spend(template, mutation)))
+    for mutation in multiSigMutations:
+        spends.append(("p2wsh-multisig/%s" % mutation, make_multi_sig_spend(mutation)))
+    return spends
+
+
+# run_engine returns the outcome of running the engine over the input, the
+# error code it fails with or None, and the deferred checks it leaves.
+def run_engine(vm):
+    try:
+        vm.execute()
+        result = None
+    except ScriptError as e:
+        result = e.c
+    except Exception as e:
+        result = type(e)
+
+    deferred = [(check.error.c, check.fatal, check.verify()) for check in vm.deferred_checks or []]
+    return result, deferred
+
+
+class TestTemplateVerify(unittest.TestCase):
+    # Template verifiers accept and reject the same spends as the generic
+    # engine, with the same errors and deferred checks.
+    def test_differential(self):
+        taken = set()
+        for name, (tx, idx, pk_script, amount) in make_spends():
+            for flags in flagSets:
+                for defer in (False, True):
+                    try:
+                        vm = new_engine(pk_script, tx, idx, flags, None, None, amount, defer_sig_checks=defer)
+                    except ScriptError:
+                        continue
+                    generic = new_engine(pk_script, tx, idx, flags, None, None, amount, defer_sig_checks=defer)
+                    generic.template_verifier = None
+
+                    if vm.template_verifier is not None:
+                        probe = new_engine(pk_script, tx, idx, flags, None, None, amount)
+                        try:
+                            if probe.template_verifier(probe):
+                                taken.add(name)
+                        except ScriptError:
+                            pass
+
+                    msg = "%s with flags %s, deferred %s" % (name, flags, defer)
+                    self.assertEqual(run_engine(vm), run_engine(generic), msg)
+
+        # The valid spends of every template are accepted by its verifier.
+        for template in ("p2pkh", "p2wpkh", "p2sh-p2wpkh", "p2wsh-multisig"):
+            for mutation in ("valid", "anyonecanpay"):
+                self.assertIn("%s/%s" % (template, mutation), taken)
+
+    # The spends signed with each hash type are valid, whichever way they are
+    # verified.  The SigHashSingle signature of the P2PKH spend is also checked
+    # against a signature hash worked out here from its spelled out preimage,
+    # so a wrong signature hash can not be shared by the engine and the
+    # verifier.
+    def test_hash_types(self):
+        for template in ("p2pkh", "p2wpkh", "p2sh-p2wpkh"):
+            for mutation in ("valid", "anyonecanpay", "single", "none"):
+                tx, idx, pk_script, amount = make_single_sig_spend(template, mutation)
+                for template_verifier in (True, False):
+                    vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount)
+                    if not template_verifier:
+                        vm.template_verifier = None
+                    self.assertEqual(run_engine(vm), (None, []), (template, mutation, template_verifier))
+
+        tx, idx, pk_script, amount = make_single_sig_spend("p2pkh", "single")
+        sig, pub_key = [pop.data for pop in parse_script(tx.tx_ins[idx].signature_script)]
+        self.assertEqual(sig[-1], SigHashType.SigHashSingle.value)
+        preimage = bytes.fromhex("01000000" "02") + \
+            hashlib.sha256(bytes([0])).digest() + bytes.fromhex("00000000" "00" "00000000") + \
+            hashlib.sha256(bytes([1])).digest() + bytes.fromhex("01000000" "19") + pk_script + \
+            bytes.fromhex("ffffffff" "02" "ffffffffffffffff" "00" "d007000000000000" "01" "51" "00000000" "03000000")
+        hash = hashlib.sha256(hashlib.sha256(preimage).digest()).digest()
+        self.assertTrue(make_key(7).get_verifying_key().verify_digest(sig[:-1], hash,
+                                                                      sigdecode=ecdsa.util.sigdecode_der))
+
+    # Template verifiers accept the P2PKH inputs of a mainnet block as the
+    # generic engine does, under consensus and standard flags, the latter
+    # failing the high S signatures the block predates.
+    def test_block(self):
+        txs = load_blocks("277647.dat.bz2")[0].get_transactions()
+        view = load_utxo_view("277647.utxostore.bz2")
+        sig_cache = SigCache(max_entries=1000)
+        for tx in txs[1:40]:
+            msg_tx = tx.get_msg_tx()
+            for idx, tx_in in enumerate(msg_tx.tx_ins):
+                utxo = view.lookup_entry(tx_in.previous_out_point)
+                for flags in (ScriptBip16, StandardVerifyFlags):
+                    vm = new_engine(utxo.get_pk_script(), msg_tx, idx, flags, sig_cache, None, utxo.get_amount())
+                    self.assertIsNotNone(vm.template_verifier)
+                    generic = new_engine(utxo.get_pk_script(), msg_tx, idx, flags, sig_cache, None,
+                                         utxo.get_amount())
+                    generic.template_verifier = None
+                    self.assertEqual(run_engine(vm), run_engine(generic))
+
+    def test_template_verifier(self):
+        tx, idx, pk_script, amount = make_single_sig_spend("p2pkh", "valid")
+        vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount)
+        self.assertIs(vm.template_verifier, verify_pay_to_pub_key_hash)
+
+        tx, idx, pk_script, amount = make_single_sig_spend("p2wpkh", "valid")
+        vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount)
+        self.assertIs(vm.template_verifier, verify_pay_to_witness_pub_key_hash)
+
+        # Witness programs are not verified as such without the witness flag.
+        vm = new_engine(pk_script, tx, idx, ScriptBip16, None, None, amount)
+        self.assertIsNone(vm.template_verifier)
+
+        tx, idx, pk_script, amount = make_single_sig_spend("p2sh-p2wpkh", "valid")
+        vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount)
+        self.assertIs(vm.template_verifier, verify_nested_witness_pub_key_hash)
+
+        tx, idx, pk_script, amount = make_multi_sig_spend("valid")
+        vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount)
+        self.assertIs(vm.template_verifier, verify_witness_multi_sig)
+
+        # Other scripts run on the generic engine.
+        key = make_key(7)
+        pk_script = pay_to_pub_key_script(pub_key_bytes(key, True))
+        tx = make_tx()
+        tx.tx_ins[0].signature_script = ScriptBuilder().add_data(
+            raw_tx_in_signature(tx, 0, pk_script, SigHashType.SigHashAll, key)).script
+        vm = new_engine(pk_script, tx, 0, StandardVerifyFlags, None, None, 0)
+        self.assertIsNone(vm.template_verifier)
+        vm.execute()
@@ -0,0 +1,75 @@
+import unittest
+from txscript import *
+from tests.txscript.test_template_verify import make_single_sig_spend, make_multi_sig_spend
+
+
+class TestTrace(unittest.TestCase):
+    def test_trace(self):
+        tx, idx, pk_script, amount = make_single_sig_spend("p2pkh", "valid")
+        steps = []
+
+        def trace(step):
+            steps.append((step.script_idx, step.script_off, step.opcode.opcode.name, step.dstack, step.astack))
+            self.assertGreaterEqual(step.elapsed, 0)
+
+        # Traced scripts are executed even when a template verifier is set.
+        vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount, trace=trace)
+        self.assertIsNotNone(vm.template_verifier)
+        vm.execute()
+
+        sig, pub_key = [pop.data for pop in parse_script(tx.tx_ins[idx].signature_script)]
+        self.assertEqual([step[:3] for step in steps], [
+            (0, 0, "OP_DATA_%d" % len(sig)),
+            (0, 1, "OP_DATA_33"),
+            (1, 0, "OP_DUP"),
+            (1, 1, "OP_HASH160"),
+            (1, 2, "OP_DATA_20"),
+            (1, 3, "OP_EQUALVERIFY"),
+            (1, 4, "OP_CHECKSIG"),
+        ])
+        self.assertEqual(steps[2][3], [sig, pub_key, pub_key])
+        self.assertEqual(steps[-1][3], [b'\x01'])
+        self.assertEqual(steps[-1][4], [])
+
+        # The steps up to a failing one are traced.
+        tx, idx, pk_script, amount = make_single_sig_spend("p2pkh", "wrong_key")
+        steps = []
+        vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount, trace=trace)
+        with self.assertRaises(ScriptError) as cm:
+            vm.execute()
+        self.assertEqual(cm.exception.c, ErrorCode.ErrEqualVerify)
+        self.assertEqual([step[2] for step in steps][-1], "OP_DATA_20")
+
+    def test_log_trace(self):
+        tx, idx, pk_script, amount = make_single_sig_spend("p2pkh", "valid")
+        vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount, trace=log_trace)
+        with self.assertLogs("txscript.trace", level="DEBUG") as cm:
+            vm.execute()
+        self.assertEqual(len(cm.output), 7)
+        self.assertIn("stepping 01:0004: OP_CHECKSIG", cm.output[-1])
+
+    def test_opcode_profiler(self):
+        profiler = OpcodeProfiler()
+        for template in ("p2pkh", "p2wpkh"):
+            tx, idx, pk_script, amount = make_single_sig_spend(template, "valid")
+            vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount, trace=profiler)
+            vm.execute()
+        tx, idx, pk_script, amount = make_multi_sig_spend("valid")
+        vm = new_engine(pk_script, tx, idx, StandardVerifyFlags, None, None, amount, trace=profiler)
+        vm.execute()
+
+        self.assertEqual(profiler.opcodes["OP_CHECKSIG"].count, 2)
+        self.assertEqual(profiler.opcodes["OP_CHECKMULTISIG"].count, 1)
+        self.assertEqual(profiler.opcodes["OP_DUP"].count, 2)
+        self.assertEqual(profiler.script_classes[ScriptClass.PubKeyHashTy].count, 7)
+        # The witness program, then the P2PKH script it stands for.
+        self.assertEqual(profiler.script_classes[ScriptClass.WitnessV0PubKeyHashTy].count, 7)
+        # The witness program, then the pushes of the multisig script and
+        # OP_CHECKMULTISIG.
+        self.assertEqual(profiler.script_classes[ScriptClass.WitnessV0ScriptHashTy].count, 8)
+        self.assertGreater(profiler.opcodes["OP_CHECKSIG"].time, 0)
+        self.assertIn("OP_CHECKMULTISIG", profiler.report())
+
+        profiler.reset()
+        self.assertEqual(profiler.opcodes, {})
+        self.assertEqual(profiler.script_classes, {})
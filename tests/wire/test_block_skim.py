@@ -0,0 +1,75 @@
+import io
+import unittest
+from wire.block_skim import *
+from tests.wire.test_msg_block import blockOne, blockOneBytes, blockOneTxLocs
+from tests.wire.test_msg_tx import multiTx, multiWitnessTx
+
+
+class TestBlockSkim(unittest.TestCase):
+    def setUp(self):
+        # A block with a legacy and a witness transaction after the coinbase.
+        msg_block = MsgBlock(header=blockOne.header,
+                             transactions=[blockOne.transactions[0], multiTx, multiWitnessTx])
+        w = io.BytesIO()
+        msg_block.serialize(w)
+        self.msg_block = msg_block
+        self.block_bytes = w.getvalue()
+
+    def check_skim(self, skim, msg_block, block_bytes):
+        self.assertEqual(skim.block_hash(), msg_block.block_hash())
+        self.assertEqual(skim.num_txs(), len(msg_block.transactions))
+
+        decoded = MsgBlock()
+        tx_locs = decoded.deserialize_tx_loc(io.BytesIO(block_bytes))
+        self.assertEqual(skim.tx_locs(), tx_locs)
+
+        num_tx_ins = 0
+        num_tx_outs = 0
+        for tx_idx, msg_tx in enumerate(msg_block.transactions):
+            self.assertEqual(skim.tx_hash(tx_idx), msg_tx.tx_hash())
+            self.assertEqual(skim.tx_witness_hash(tx_idx), msg_tx.witness_hash())
+
+            prev_out_points = [skim.prev_out_point(i) for i in skim.tx_in_range(tx_idx)]
+            self.assertEqual(prev_out_points, [tx_in.previous_out_point for tx_in in msg_tx.tx_ins])
+            self.assertEqual([skim.in_script(i) for i in skim.tx_in_range(tx_idx)],
+                             [tx_in.signature_script for tx_in in msg_tx.tx_ins])
+
+            out_range = skim.tx_out_range(tx_idx)
+            self.assertEqual([skim.out_values[i] for i in out_range], [to.value for to in msg_tx.tx_outs])
+            self.assertEqual([skim.out_script(i) for i in out_range], [to.pk_script for to in msg_tx.tx_outs])
+
+            num_tx_ins += len(msg_tx.tx_ins)
+            num_tx_outs += len(msg_tx.tx_outs)
+
+        self.assertEqual(skim.num_tx_ins(), num_tx_ins)
+        self.assertEqual(skim.num_tx_outs(), num_tx_outs)
+
+    def test_skim_block(self):
+        skim = skim_block(blockOneBytes)
+        self.assertEqual(skim.tx_locs(), blockOneTxLocs)
+        self.check_skim(skim, blockOne, blockOneBytes)
+
+        self.check_skim(skim_block(self.block_bytes), self.msg_block, self.block_bytes)
+        self.check_skim(skim_block(memoryview(self.block_bytes)), self.msg_block, self.block_bytes)
+
+    def test_skim_block_errors(self):
+        # Every truncation of the block is reported as an unexpected EOF.
+        for i in range(0, len(self.block_bytes), 7):
+            with self.assertRaises(UnexpectedEOFMsgErr):
+                skim_block(self.block_bytes[:i])
+
+        # The witness flag after the marker must be 0x01.
+        bad_flag = bytearray(self.block_bytes)
+        tx_locs = skim_block(self.block_bytes).tx_locs()
+        bad_flag[tx_locs[2].tx_start + 5] = 0x02
+        with self.assertRaises(WitnessTxFlagByteMsgErr):
+            skim_block(bytes(bad_flag))
+
+        # Too many transactions.
+        too_many = self.block_bytes[:blockHeaderLen] + bytes([0xfe]) + (maxTxPerBlock + 1).to_bytes(4, "little")
+        with self.assertRaises(MaxTxPerBlockMsgErr):
+            skim_block(too_many)
+
+
+if __name__ == '__main__':
+    unittest.main()
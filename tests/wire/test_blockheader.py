@@ -186,3 +186,46 @@ class TestBlockHeaderSerialize(unittest.TestCase):
             bh = BlockHeader()
             bh.deserialize(s)
             self.assertEqual(bh, c['out'])
+
+    def test_layout_match_elements(self):
+        # The precompiled layout must decode and encode exactly like reading
+        # the header element by element.
+        for c in self.tests:
+            s = io.BytesIO(c['buf'])
+            bh = BlockHeader(version=read_element(s, "int32"),
+                             prev_block=read_element(s, "chainhash.Hash"),
+                             merkle_root=read_element(s, "chainhash.Hash"),
+                             timestamp=read_element(s, "uint32Time"),
+                             bits=read_element(s, "uint32"),
+                             nonce=read_element(s, "uint32"))
+            self.assertEqual(read_block_header(io.BytesIO(c['buf']), 0), bh)
+
+            s = io.BytesIO()
+            write_element(s, "int32", bh.version)
+            write_element(s, "chainhash.Hash", bh.prev_block)
+            write_element(s, "chainhash.Hash", bh.merkle_root)
+            write_element(s, "uint32Time", bh.timestamp)
+            write_element(s, "uint32", bh.bits)
+            write_element(s, "uint32", bh.nonce)
+            self.assertEqual(pack_block_header(bh), s.getvalue())
+
+    def test_hash_with_nonce(self):
+        bh = BlockHeader(version=1, prev_block=mainNetGenesisHash, merkle_root=mainNetGenesisMerkleRoot,
+                         timestamp=0x495fab29, bits=0x1d00ffff, nonce=0)
+        for nonce in (0, 1, 0x7c2bac1d, 0xffffffff):
+            want = BlockHeader(version=1, prev_block=mainNetGenesisHash, merkle_root=mainNetGenesisMerkleRoot,
+                               timestamp=0x495fab29, bits=0x1d00ffff, nonce=nonce).block_hash()
+            self.assertEqual(bh.hash_with_nonce(nonce), want)
+
+        # Changes to the fields covered by the midstate are picked up.
+        bh.nonce = 5
+        bh.timestamp += 1
+        self.assertEqual(bh.hash_with_nonce(5), bh.block_hash())
+        bh.merkle_root = mainNetGenesisHash
+        self.assertEqual(bh.hash_with_nonce(5), bh.block_hash())
+        bh.version = 2
+        self.assertEqual(bh.hash_with_nonce(5), bh.block_hash())
+
+        # Decoded headers too.
+        decoded = read_block_header(io.BytesIO(pack_block_header(bh)), 0)
+        self.assertEqual(decoded.hash_with_nonce(5), bh.block_hash())
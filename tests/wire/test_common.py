@@ -222,6 +222,161 @@ class TestElementWireErrors(unittest.TestCase):
                 self.assertEqual(type(e), c['write_err'])
 
 
+# reference_read_element and reference_write_element are the comparison chains
+# read_element and write_element dispatched through before the element codec
+# was keyed by type.  They are kept here so the codec can be checked against
+# them, element type by element type.
+def reference_read_element(s, element_type):
+    if element_type == "int32":
+        return read_variable_bytes_as_integer(s, 4, LittleEndian)
+    elif element_type == "uint32":
+        return read_variable_bytes_as_integer(s, 4, LittleEndian)
+    elif element_type == "int64":
+        return read_variable_bytes_as_integer(s, 8, LittleEndian)
+    elif element_type == "uint64":
+        return read_variable_bytes_as_integer(s, 8, LittleEndian)
+    elif element_type == "bool":
+        rv = read_variable_bytes_as_integer(s, 1)
+        if rv == 0x00:
+            return False
+        else:
+            return True
+    elif element_type == "uint32Time":
+        return read_variable_bytes_as_integer(s, 4, LittleEndian)
+    elif element_type == "int64Time":
+        return read_variable_bytes_as_integer(s, 8, LittleEndian)
+    elif element_type == "[4]byte":
+        return read_variable_bytes(s, 4)
+    elif element_type == "[CommandSize]uint8":
+        return read_variable_bytes(s, CommandSize)
+    elif element_type == "[16]byte":
+        return read_variable_bytes(s, 16)
+    elif element_type == "chainhash.Hash":
+        return Hash(read_variable_bytes(s, HashSize))
+    elif element_type == "ServiceFlag":
+        return ServiceFlag.from_int(read_variable_bytes_as_integer(s, 8, LittleEndian))
+    elif element_type == "services":
+        return Services(ServiceFlag.from_int(read_variable_bytes_as_integer(s, 8, LittleEndian)))
+    elif element_type == "InvType":
+        return InvType.from_int(read_variable_bytes_as_integer(s, 4, LittleEndian))
+    elif element_type == "BitcoinNet":
+        return BitcoinNet.from_int(read_variable_bytes_as_integer(s, 4, LittleEndian))
+    elif element_type == "BloomUpdateType":
+        return BloomUpdateType(read_variable_bytes_as_integer(s, 1, LittleEndian))
+    elif element_type == "RejectCode":
+        return RejectCode.from_int(read_variable_bytes_as_integer(s, 1, LittleEndian))
+    else:
+        return s.read()
+
+
+def reference_write_element(s, element_type, element):
+    if element_type == "int32":
+        write_variable_bytes_from_integer(s, 4, element, LittleEndian)
+    elif element_type == "uint32":
+        write_variable_bytes_from_integer(s, 4, element, LittleEndian)
+    elif element_type == "int64":
+        write_variable_bytes_from_integer(s, 8, element, LittleEndian)
+    elif element_type == "uint64":
+        write_variable_bytes_from_integer(s, 8, element, LittleEndian)
+    elif element_type == "bool":
+        if element:
+            write_variable_bytes_from_integer(s, 1, 0x01)
+        else:
+            write_variable_bytes_from_integer(s, 1, 0x00)
+    elif element_type == "uint32Time":
+        write_variable_bytes_from_integer(s, 4, element, LittleEndian)
+    elif element_type == "int64Time":
+        write_variable_bytes_from_integer(s, 8, element, LittleEndian)
+    elif element_type == "[4]byte":
+        s.write(element)
+    elif element_type == "[CommandSize]uint8":
+        s.write(element)
+    elif element_type == "[16]byte":
+        s.write(element)
+    elif element_type == "chainhash.Hash":
+        s.write(element.to_bytes())
+    elif element_type == "ServiceFlag":
+        write_variable_bytes_from_integer(s, 8, element.value[0], LittleEndian)
+    elif element_type == "services":
+        write_variable_bytes_from_integer(s, 8, element.value, LittleEndian)
+    elif element_type == "InvType":
+        write_variable_bytes_from_integer(s, 4, element.value[0], LittleEndian)
+    elif element_type == "BitcoinNet":
+        write_variable_bytes_from_integer(s, 4, element.value[0], LittleEndian)
+    elif element_type == "BloomUpdateType":
+        write_variable_bytes_from_integer(s, 1, element.value, LittleEndian)
+    elif element_type == "RejectCode":
+        write_variable_bytes_from_integer(s, 1, element.value[0], LittleEndian)
+    else:
+        s.write(element)
+
+
+# elementCodecTests holds, for each element type the comparison chain
+# supported, values covering its range.
+elementCodecTests = {
+    "int32": [0, 1, 256, MaxInt32, MaxUint32],
+    "uint32": [0, 1, 256, MaxUint32],
+    "int64": [0, 1, 65536, MaxUint32 + 1, MaxInt64, MaxUint64],
+    "uint64": [0, 1, 4294967296, MaxUint64],
+    "bool": [False, True],
+    "uint32Time": [0, 0x495fab29, MaxUint32],
+    "int64Time": [0, 0x495fab29, MaxUint64],
+    "[4]byte": [bytes(4), bytes([0x01, 0x02, 0x03, 0x04])],
+    "[CommandSize]uint8": [bytes(CommandSize), b'version'.ljust(CommandSize, b'\x00')],
+    "[16]byte": [bytes(16), bytes(range(1, 17))],
+    "chainhash.Hash": [Hash(), mainNetGenesisHash],
+    "ServiceFlag": list(ServiceFlag),
+    "services": [Services(ServiceFlag.SFNodeNetwork), Services(ServiceFlag.SFNodeWitness)],
+    "InvType": list(InvType),
+    "BitcoinNet": list(BitcoinNet),
+    "BloomUpdateType": list(BloomUpdateType),
+    "RejectCode": list(RejectCode),
+}
+
+
+class TestElementCodecReference(unittest.TestCase):
+    def test_write_element(self):
+        for element_type, values in elementCodecTests.items():
+            for value in values:
+                want = io.BytesIO()
+                reference_write_element(want, element_type, value)
+                got = io.BytesIO()
+                write_element(got, element_type, value)
+                self.assertEqual(got.getvalue(), want.getvalue(), (element_type, value))
+
+    def test_read_element(self):
+        for element_type, values in elementCodecTests.items():
+            for value in values:
+                buf = io.BytesIO()
+                reference_write_element(buf, element_type, value)
+                buf = buf.getvalue() + b'\xff'
+
+                want_s = io.BytesIO(buf)
+                want = reference_read_element(want_s, element_type)
+                got_s = io.BytesIO(buf)
+                got = read_element(got_s, element_type)
+                self.assertEqual(type(got), type(want), (element_type, value))
+                self.assertEqual(got, want, (element_type, value))
+                self.assertEqual(got_s.tell(), want_s.tell(), (element_type, value))
+
+    # The comparison chain decoded a truncated integer from the bytes there
+    # were, the codec raises instead.
+    def test_read_element_short(self):
+        for element_type in ("int32", "uint32", "int64", "uint64", "uint32Time", "int64Time"):
+            with self.assertRaises(struct.error):
+                read_element(io.BytesIO(bytes([0x01])), element_type)
+            self.assertEqual(reference_read_element(io.BytesIO(bytes([0x01])), element_type), 1)
+
+    # Types neither supports are read and written as raw bytes by both.
+    def test_unknown_element(self):
+        self.assertEqual(read_element(io.BytesIO(b'\x01\x02'), "unknown"),
+                         reference_read_element(io.BytesIO(b'\x01\x02'), "unknown"))
+        want, got = io.BytesIO(), io.BytesIO()
+        reference_write_element(want, "unknown", b'\x01\x02')
+        write_element(got, "unknown", b'\x01\x02')
+        self.assertEqual(got.getvalue(), want.getvalue())
+
+
 class TestVarIntWire(unittest.TestCase):
     def setUp(self):
         self.pver = ProtocolVersion
@@ -712,6 +867,18 @@ class TestVarBytesOverflowErrors(unittest.TestCase):
                 self.assertEqual(type(e), c['err'])
 
 
+class TestEnumFromInt(unittest.TestCase):
+    def test_from_int(self):
+        for enum_type in (BitcoinNet, ServiceFlag, InvType, RejectCode):
+            for member in enum_type:
+                self.assertIs(enum_type.from_int(member.value[0]), member)
+
+    def test_from_int_unknown(self):
+        for enum_type in (BitcoinNet, ServiceFlag, InvType, RejectCode):
+            with self.assertRaises(ValueError):
+                enum_type.from_int(0x7fffffff)
+
+
 class TestRandomUint64(unittest.TestCase):
     def setUp(self):
         self.tries = 1 << 8
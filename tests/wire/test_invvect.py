@@ -191,3 +191,24 @@ class TestInvVectWire(unittest.TestCase):
             s = io.BytesIO()
             write_inv_vect(s, c['pver'], c['in'])
             self.assertEqual(s.getvalue(), c['buf'])
+
+    def test_inv_list(self):
+        ivs = [c['out'] for c in self.tests]
+        ivs.append(InvVect(inv_type=InvType.InvTypeWitnessTx, hash=Hash(bytes(range(32)))))
+        buf = b''.join([c['buf'] for c in self.tests]) + \
+              bytes([0x01, 0x00, 0x00, 0x40]) + bytes(range(32))
+
+        inv_list = read_inv_list(io.BytesIO(buf), ProtocolVersion, len(ivs))
+        self.assertEqual(len(inv_list), len(ivs))
+        self.assertEqual(list(inv_list), ivs)
+        self.assertEqual(inv_list[-1], ivs[-1])
+        self.assertEqual(inv_list, InvList(ivs))
+        self.assertEqual(inv_list.hashes_of_type(InvType.InvTypeWitnessTx), [ivs[-1].hash])
+
+        s = io.BytesIO()
+        write_inv_list(s, ProtocolVersion, inv_list)
+        self.assertEqual(s.getvalue(), buf)
+
+        # Unknown inventory types are rejected.
+        with self.assertRaises(ValueError):
+            read_inv_list(io.BytesIO(bytes([0x05, 0, 0, 0]) + bytes(32)), ProtocolVersion, 1)
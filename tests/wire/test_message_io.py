@@ -0,0 +1,162 @@
+import asyncio
+import ipaddress
+import socket
+import unittest
+from chainhash.hashfuncs import double_hash_b
+from wire import *
+from tests.wire.test_msg_tx import multiTx, multiWitnessTx
+
+
+def run_with_socket_pair(fn):
+    """Run coroutine fn(reader, writer) with streams connected to each other through a local socket pair."""
+
+    async def main():
+        rsock, wsock = socket.socketpair()
+        # Keep both ends of each connection referenced, a collected writer
+        # closes its transport.
+        reader, rwriter = await asyncio.open_connection(sock=rsock)
+        wreader, writer = await asyncio.open_connection(sock=wsock)
+        try:
+            return await fn(reader, writer)
+        finally:
+            writer.close()
+            rwriter.close()
+
+    return asyncio.run(main())
+
+
+class TestMessageIO(unittest.TestCase):
+    def setUp(self):
+        self.pver = ProtocolVersion
+        self.net = BitcoinNet.MainNet
+        you = NetAddress(services=ServiceFlag.SFNodeNetwork, ip=ipaddress.ip_address("192.168.0.1"),
+                         port=8333, timestamp=0)
+        me = NetAddress(services=ServiceFlag.SFNodeNetwork, ip=ipaddress.ip_address("127.0.0.1"),
+                        port=8333, timestamp=0)
+
+        msg_inv = MsgInv()
+        msg_inv.add_inv_vect(InvVect(InvType.InvTypeTx, multiTx.tx_hash()))
+
+        self.msgs = [
+            MsgVersion(addr_you=you, addr_me=me, nonce=123123, last_block=234234, timestamp=0x495fab29),
+            MsgVerAck(),
+            MsgGetAddr(),
+            MsgPing(nonce=123123),
+            MsgPong(nonce=123123),
+            msg_inv,
+            MsgTx(version=1, tx_ins=multiTx.tx_ins, tx_outs=multiTx.tx_outs, lock_time=multiTx.lock_time),
+            MsgBlock(header=BlockHeader(version=1, bits=0x1d00ffff, nonce=1, timestamp=0x495fab29),
+                     transactions=[multiTx]),
+            MsgSendHeaders(),
+            MsgFeeFilter(min_fee=123123),
+            MsgSendCmpct(announce=True, version=CmpctBlockVersionWtxid),
+            MsgCmpctBlock.from_block(MsgBlock(header=BlockHeader(version=1, bits=0x1d00ffff, nonce=1,
+                                                                 timestamp=0x495fab29),
+                                              transactions=[multiTx, multiTx]), nonce=123123),
+            MsgGetBlockTxn(block_hash=multiTx.tx_hash(), indexes=[1, 3]),
+            MsgBlockTxn(block_hash=multiTx.tx_hash(), transactions=[multiTx]),
+            MsgGetCFilters(start_height=1, stop_hash=multiTx.tx_hash()),
+            MsgCFilter(block_hash=multiTx.tx_hash(), data=bytes([0x01, 0x9d, 0xfc, 0xa8])),
+            MsgGetCFHeaders(start_height=1, stop_hash=multiTx.tx_hash()),
+            MsgCFHeaders(stop_hash=multiTx.tx_hash(), filter_hashes=[multiTx.tx_hash()]),
+            MsgGetCFCheckpt(stop_hash=multiTx.tx_hash()),
+            MsgCFCheckpt(stop_hash=multiTx.tx_hash(), filter_headers=[multiTx.tx_hash()]),
+        ]
+
+    def test_read_write_message(self):
+        async def write_all(writer):
+            for msg in self.msgs:
+                await write_message(writer, msg, self.pver, self.net)
+
+        async def roundtrip(reader, writer):
+            write_task = asyncio.ensure_future(write_all(writer))
+            results = [await read_message(reader, self.pver, self.net) for _ in self.msgs]
+            await write_task
+            return results
+
+        results = run_with_socket_pair(roundtrip)
+        for msg, (got, payload) in zip(self.msgs, results):
+            self.assertIs(type(got), type(msg))
+            self.assertEqual(got, msg)
+            self.assertEqual(encode_message(msg, self.pver, self.net)[1], payload)
+
+    def test_witness_encoding(self):
+        async def roundtrip(reader, writer):
+            await write_message(writer, multiWitnessTx, self.pver, self.net, WitnessEncoding)
+            return await read_message(reader, self.pver, self.net, WitnessEncoding)
+
+        got, _ = run_with_socket_pair(roundtrip)
+        self.assertEqual(got, multiWitnessTx)
+        self.assertEqual(got.witness_hash(), multiWitnessTx.witness_hash())
+
+    def test_read_message_errors(self):
+        ping = MsgPing(nonce=1)
+        header, payload = encode_message(ping, self.pver, self.net)
+        bad_checksum = header[:20] + bytes(4)
+        unknown_command = header[:4] + b"bogus".ljust(CommandSize, b"\x00") + header[16:]
+        too_long = header[:16] + (1 << 20).to_bytes(4, "little") + header[20:]
+        over_max = header[:16] + (MaxMessagePayload + 1).to_bytes(4, "little") + header[20:]
+
+        # Well framed messages whose payload does not decode.
+        def framed(msg, payload):
+            header, _ = encode_message(msg, self.pver, self.net)
+            return header[:16] + len(payload).to_bytes(4, "little") + double_hash_b(payload)[:4] + payload
+
+        truncated_ping = framed(ping, payload[:4])
+        _, tx_payload = encode_message(multiTx, self.pver, self.net)
+        truncated_tx = framed(multiTx, tx_payload[:len(tx_payload) // 2])
+
+        tests = [
+            # Wrong network, the payload is discarded.
+            (encode_message(ping, self.pver, BitcoinNet.TestNet3)[0] + payload, MessageNetworkMismatchMsgErr),
+            (unknown_command + payload, UnknownMessageMsgErr),
+            (bad_checksum + payload, MessageChecksumMsgErr),
+            (truncated_ping, MessageErr),
+            (truncated_tx, MessageErr),
+            # Larger than a ping can be, the payload is discarded.
+            (too_long + bytes(1 << 20), MessagePayloadTooLargeMsgErr),
+        ]
+
+        async def write_all(writer):
+            for buf, _ in tests:
+                writer.write(buf)
+                # Each bad message is followed by a valid one, which must still be
+                # read correctly.
+                await write_message(writer, ping, self.pver, self.net)
+            writer.write(over_max)
+            await writer.drain()
+
+        async def read_all(reader, writer):
+            # Write concurrently, the discarded payloads don't fit in the
+            # socket buffers.
+            write_task = asyncio.ensure_future(write_all(writer))
+            errs = []
+            for _ in tests:
+                try:
+                    await read_message(reader, self.pver, self.net)
+                except MessageErr as e:
+                    errs.append(type(e))
+                msg, _ = await read_message(reader, self.pver, self.net)
+                self.assertEqual(msg, ping)
+
+            try:
+                await read_message(reader, self.pver, self.net)
+            except MessageErr as e:
+                errs.append(type(e))
+            await write_task
+            return errs
+
+        errs = run_with_socket_pair(read_all)
+        self.assertEqual(errs, [err for _, err in tests] + [MessagePayloadTooLargeMsgErr])
+
+    def test_make_empty_message(self):
+        for command in messageTypes:
+            self.assertEqual(make_empty_message(command).command(), command)
+            self.assertEqual(make_empty_message(str(command)).command(), command)
+
+        with self.assertRaises(UnknownMessageMsgErr):
+            make_empty_message("bogus")
+
+
+if __name__ == '__main__':
+    unittest.main()
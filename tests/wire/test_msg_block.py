@@ -1,3 +1,4 @@
+import tempfile
 import unittest
 from wire.msg_block import *
 from tests.utils import *
@@ -500,6 +501,16 @@ class TesMsgtBlock(unittest.TestCase):
             except Exception as e:
                 self.assertEqual(type(e), c['err'])
 
+    def test_deserialize_buffer(self):
+        for c in self.serialize_tests:
+            msg = MsgBlock()
+            msg.deserialize_buffer(c['buf'])
+            self.assertEqual(msg, c['out'])
+            self.assertEqual(msg.block_hash(), c['out'].block_hash())
+
+            msg.materialize()
+            self.assertEqual(msg, c['out'])
+
     def test_deserialize_tx_loc(self):
         # Right conditions
         for c in self.serialize_tests:
@@ -528,6 +539,71 @@ class TesMsgtBlock(unittest.TestCase):
             except Exception as e:
                 self.assertEqual(type(e), c['err'])
 
+    def test_block_stream_decoder(self):
+        msg_block = MsgBlock(header=blockOne.header,
+                             transactions=[blockOne.transactions[0].copy() for _ in range(3)])
+        w = io.BytesIO()
+        msg_block.serialize(w)
+        buf = w.getvalue()
+        tx_locs = MsgBlock().deserialize_tx_loc(io.BytesIO(buf))
+
+        # A block record inside a flat file, after the network and length.
+        with tempfile.TemporaryFile() as f:
+            f.write(bytes(8) + buf + bytes(4))
+            f.seek(8)
+            decoder = BlockStreamDecoder(f)
+            self.assertEqual(decoder.header, msg_block.header)
+            self.assertEqual(decoder.tx_count, 3)
+            for i, (index, msg_tx, tx_loc) in enumerate(decoder):
+                self.assertEqual(index, i)
+                self.assertEqual(msg_tx, msg_block.transactions[i])
+                self.assertEqual(tx_loc, tx_locs[i])
+            self.assertEqual(f.tell(), 8 + len(buf))
+
+        # A stream that can't tell its position, truncated after the first
+        # transaction: it is yielded before the rest of the block is read.
+        class ReadOnly:
+            def __init__(self, b):
+                self.r = io.BytesIO(b)
+
+            def read(self, size=-1):
+                return self.r.read(size)
+
+        decoder = BlockStreamDecoder(ReadOnly(buf[:tx_locs[1].tx_start + 10]))
+        index, msg_tx, tx_loc = next(decoder)
+        self.assertEqual(msg_tx, msg_block.transactions[0])
+        self.assertEqual(tx_loc, tx_locs[0])
+        with self.assertRaises(Exception):
+            next(decoder)
+
+    def test_cached_serialize_size(self):
+        msg = MsgBlock(header=blockOne.header, transactions=[blockOne.transactions[0].copy()])
+        self.assertEqual(msg.serialize_size(), len(blockOneBytes))
+        self.assertEqual(msg.serialize_size_stripped(), len(blockOneBytes))
+
+        msg.add_transaction(blockOne.transactions[0].copy())
+        tx_len = len(blockOneBytes) - blockHeaderLen - 1
+        self.assertEqual(msg.serialize_size(), len(blockOneBytes) + tx_len)
+
+        msg.transactions[1].tx_ins[0].witness = TxWitness([bytes(32)])
+        self.assertEqual(msg.serialize_size_stripped(), len(blockOneBytes) + tx_len)
+        self.assertEqual(msg.serialize_size(), len(blockOneBytes) + tx_len + 2 + 34)
+
+        # Modifying a transaction of another block leaves the sizes cached.
+        sizes = msg._sizes()
+        other = MsgBlock(header=blockOne.header, transactions=[blockOne.transactions[0].copy()])
+        other.serialize_size()
+        other.transactions[0].tx_ins[0].sequence = 1
+        self.assertIs(msg._sizes(), sizes)
+
+        # Replacing a transaction in place, or modifying the new one, is seen.
+        msg.transactions[1] = blockOne.transactions[0].copy()
+        self.assertEqual(msg.serialize_size(), len(blockOneBytes) + tx_len)
+        msg.transactions[1].tx_outs[0].pk_script = bytes(100)
+        self.assertEqual(msg.serialize_size(), len(blockOneBytes) + tx_len + 100 - 67)
+        del msg.transactions[1]
+        self.assertEqual(msg.serialize_size(), len(blockOneBytes))
+
     def test_serialize_size(self):
         #  Block with no transactions.
         noTxBlock = MsgBlock(header=blockOne.header)
@@ -0,0 +1,45 @@
+import unittest
+from wire.msg_blocktxn import *
+from tests.utils import *
+from tests.wire.test_msg_block import blockOne
+from tests.wire.test_msg_tx import multiTx, multiWitnessTx
+
+
+class TestMsgBlockTxn(unittest.TestCase):
+    def setUp(self):
+        self.msg = MsgBlockTxn(block_hash=blockOne.block_hash(), transactions=[multiTx, multiWitnessTx])
+
+    def test_command(self):
+        msg = MsgBlockTxn()
+        self.assertEqual(str(msg.command()), "blocktxn")
+
+    def test_max_payload_length(self):
+        msg = MsgBlockTxn()
+        self.assertEqual(msg.max_payload_length(ProtocolVersion), MaxBlockPayload)
+
+    def test_btc_encode_decode(self):
+        for enc in (BaseEncoding, WitnessEncoding):
+            s = io.BytesIO()
+            self.msg.btc_encode(s, ProtocolVersion, enc)
+            buf = s.getvalue()
+            self.assertEqual(buf[:HashSize], blockOne.block_hash().to_bytes())
+            self.assertEqual(buf[HashSize], 2)
+
+            msg = MsgBlockTxn()
+            msg.btc_decode(io.BytesIO(buf), ProtocolVersion, enc)
+            self.assertEqual(msg.block_hash, self.msg.block_hash)
+            self.assertEqual([tx.tx_hash() for tx in msg.transactions], [multiTx.tx_hash(), multiWitnessTx.tx_hash()])
+
+            for max in range(0, len(buf), 13):
+                with self.assertRaises(FixedBytesUnexpectedEOFErr):
+                    MsgBlockTxn().btc_decode(FixedBytesReader(max, buf), ProtocolVersion, enc)
+                with self.assertRaises(FixedBytesShortWriteErr):
+                    self.msg.btc_encode(FixedBytesWriter(max), ProtocolVersion, enc)
+
+        too_many = blockOne.block_hash().to_bytes() + bytes([0xfe]) + (maxTxPerBlock + 1).to_bytes(4, "little")
+        with self.assertRaises(MaxCmpctBlockTxsMsgErr):
+            MsgBlockTxn().btc_decode(io.BytesIO(too_many), ProtocolVersion, WitnessEncoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from wire.msg_cfcheckpt import *
+from tests.utils import *
+
+
+class TestMsgCFCheckpt(unittest.TestCase):
+    def setUp(self):
+        self.msg = MsgCFCheckpt(filter_type=GCSFilterRegular, stop_hash=Hash("000000000933ea01ad0ee984209779baaec3ced90fa3f408719526f8d77f4943"),
+                                filter_headers=[Hash(bytes([i]) * 32) for i in range(2)])
+        self.buf = bytes([0x00]) + self.msg.stop_hash.to_bytes() + bytes([0x02]) + bytes(32) + bytes([1]) * 32
+
+    def test_command(self):
+        msg = MsgCFCheckpt()
+        self.assertEqual(str(msg.command()), "cfcheckpt")
+
+    def test_max_payload_length(self):
+        msg = MsgCFCheckpt()
+        self.assertEqual(msg.max_payload_length(ProtocolVersion), MaxMessagePayload)
+
+    def test_btc_encode(self):
+        s = io.BytesIO()
+        self.msg.btc_encode(s, ProtocolVersion, BaseEncoding)
+        self.assertEqual(s.getvalue(), self.buf)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesShortWriteErr):
+                self.msg.btc_encode(FixedBytesWriter(max), ProtocolVersion, BaseEncoding)
+
+    def test_btc_decode(self):
+        msg = MsgCFCheckpt()
+        msg.btc_decode(io.BytesIO(self.buf), ProtocolVersion, BaseEncoding)
+        self.assertEqual(msg, self.msg)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesUnexpectedEOFErr):
+                MsgCFCheckpt().btc_decode(FixedBytesReader(max, self.buf), ProtocolVersion, BaseEncoding)
+
+    def test_too_many_headers(self):
+        buf = bytes(1 + HashSize) + bytes([0xfe]) + (maxCFHeadersLen + 1).to_bytes(4, "little")
+        with self.assertRaises(MaxCFHeadersMsgErr):
+            MsgCFCheckpt().btc_decode(io.BytesIO(buf), ProtocolVersion, BaseEncoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
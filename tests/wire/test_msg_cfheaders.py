@@ -0,0 +1,57 @@
+import unittest
+from wire.msg_cfheaders import *
+from tests.utils import *
+
+
+class TestMsgCFHeaders(unittest.TestCase):
+    def setUp(self):
+        self.msg = MsgCFHeaders(filter_type=GCSFilterRegular, stop_hash=Hash("000000000933ea01ad0ee984209779baaec3ced90fa3f408719526f8d77f4943"),
+                                prev_filter_header=Hash(bytes(range(32))),
+                                filter_hashes=[Hash(bytes([i]) * 32) for i in range(3)])
+        self.buf = bytes([0x00]) + self.msg.stop_hash.to_bytes() + bytes(range(32)) + bytes([0x03]) + \
+                   bytes(32) + bytes([1]) * 32 + bytes([2]) * 32
+
+    def test_command(self):
+        msg = MsgCFHeaders()
+        self.assertEqual(str(msg.command()), "cfheaders")
+
+    def test_max_payload_length(self):
+        msg = MsgCFHeaders()
+        self.assertEqual(msg.max_payload_length(ProtocolVersion), 1 + 32 + 32 + 9 + 32 * 2000)
+
+    def test_btc_encode(self):
+        s = io.BytesIO()
+        self.msg.btc_encode(s, ProtocolVersion, BaseEncoding)
+        self.assertEqual(s.getvalue(), self.buf)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesShortWriteErr):
+                self.msg.btc_encode(FixedBytesWriter(max), ProtocolVersion, BaseEncoding)
+
+    def test_btc_decode(self):
+        msg = MsgCFHeaders()
+        msg.btc_decode(io.BytesIO(self.buf), ProtocolVersion, BaseEncoding)
+        self.assertEqual(msg, self.msg)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesUnexpectedEOFErr):
+                MsgCFHeaders().btc_decode(FixedBytesReader(max, self.buf), ProtocolVersion, BaseEncoding)
+
+    def test_too_many_headers(self):
+        msg = MsgCFHeaders()
+        for _ in range(MaxCFHeadersPerMsg):
+            msg.add_cf_hash(Hash())
+        with self.assertRaises(MaxCFHeadersMsgErr):
+            msg.add_cf_hash(Hash())
+
+        msg.filter_hashes.append(Hash())
+        with self.assertRaises(MaxCFHeadersMsgErr):
+            msg.btc_encode(io.BytesIO(), ProtocolVersion, BaseEncoding)
+
+        buf = bytes(1 + 2 * HashSize) + bytes([0xfd]) + (MaxCFHeadersPerMsg + 1).to_bytes(2, "little")
+        with self.assertRaises(MaxCFHeadersMsgErr):
+            MsgCFHeaders().btc_decode(io.BytesIO(buf), ProtocolVersion, BaseEncoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
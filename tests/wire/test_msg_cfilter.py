@@ -0,0 +1,49 @@
+import unittest
+from wire.msg_cfilter import *
+from tests.utils import *
+
+
+class TestMsgCFilter(unittest.TestCase):
+    def setUp(self):
+        self.msg = MsgCFilter(filter_type=GCSFilterRegular, block_hash=Hash("000000000933ea01ad0ee984209779baaec3ced90fa3f408719526f8d77f4943"),
+                              data=bytes([0x01, 0x9d, 0xfc, 0xa8]))
+        self.buf = bytes([0x00]) + self.msg.block_hash.to_bytes() + bytes([0x04, 0x01, 0x9d, 0xfc, 0xa8])
+
+    def test_command(self):
+        msg = MsgCFilter()
+        self.assertEqual(str(msg.command()), "cfilter")
+
+    def test_max_payload_length(self):
+        msg = MsgCFilter()
+        self.assertEqual(msg.max_payload_length(ProtocolVersion), 1 + 32 + 9 + 256 * 1024)
+
+    def test_btc_encode(self):
+        s = io.BytesIO()
+        self.msg.btc_encode(s, ProtocolVersion, BaseEncoding)
+        self.assertEqual(s.getvalue(), self.buf)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesShortWriteErr):
+                self.msg.btc_encode(FixedBytesWriter(max), ProtocolVersion, BaseEncoding)
+
+    def test_btc_decode(self):
+        msg = MsgCFilter()
+        msg.btc_decode(io.BytesIO(self.buf), ProtocolVersion, BaseEncoding)
+        self.assertEqual(msg, self.msg)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesUnexpectedEOFErr):
+                MsgCFilter().btc_decode(FixedBytesReader(max, self.buf), ProtocolVersion, BaseEncoding)
+
+    def test_data_too_large(self):
+        msg = MsgCFilter(data=bytes(MaxCFilterDataSize + 1))
+        with self.assertRaises(BytesTooLargeErr):
+            msg.btc_encode(io.BytesIO(), ProtocolVersion, BaseEncoding)
+
+        buf = bytes(HashSize + 1) + bytes([0xfe]) + (MaxCFilterDataSize + 1).to_bytes(4, "little")
+        with self.assertRaises(BytesTooLargeErr):
+            MsgCFilter().btc_decode(io.BytesIO(buf), ProtocolVersion, BaseEncoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from wire.msg_cmpctblock import *
+from tests.utils import *
+from tests.wire.test_msg_block import blockOne
+from tests.wire.test_msg_tx import multiTx, multiWitnessTx
+
+
+class TestMsgCmpctBlock(unittest.TestCase):
+    def setUp(self):
+        self.msg_block = MsgBlock(header=blockOne.header,
+                                  transactions=[blockOne.transactions[0], multiTx, multiWitnessTx])
+        self.nonce = 0x0102030405060708
+
+    def test_command(self):
+        msg = MsgCmpctBlock()
+        self.assertEqual(str(msg.command()), "cmpctblock")
+
+    def test_max_payload_length(self):
+        msg = MsgCmpctBlock()
+        self.assertEqual(msg.max_payload_length(ProtocolVersion), MaxBlockPayload)
+
+    def test_short_id(self):
+        k0, k1 = short_id_keys(self.msg_block.header, self.nonce)
+        digest = hashlib.sha256(pack_block_header(self.msg_block.header) +
+                                bytes([0x08, 0x07, 0x06, 0x05, 0x04, 0x03, 0x02, 0x01])).digest()
+        self.assertEqual(k0.to_bytes(8, "little"), digest[:8])
+        self.assertEqual(k1.to_bytes(8, "little"), digest[8:16])
+
+        tx_hash = multiWitnessTx.witness_hash()
+        sid = short_id(k0, k1, tx_hash)
+        self.assertEqual(sid, siphash24(k0, k1, tx_hash.to_bytes()) & 0xffffffffffff)
+        self.assertLess(sid, 1 << 48)
+
+    def test_from_block(self):
+        msg = MsgCmpctBlock.from_block(self.msg_block, self.nonce)
+        k0, k1 = msg.short_id_keys()
+        self.assertEqual(msg.block_hash(), self.msg_block.block_hash())
+        self.assertEqual(msg.total_txs(), 3)
+        self.assertEqual(msg.prefilled_txs, [PrefilledTx(index=0, tx=self.msg_block.transactions[0])])
+        self.assertEqual(msg.short_ids, [short_id(k0, k1, multiTx.witness_hash()),
+                                         short_id(k0, k1, multiWitnessTx.witness_hash())])
+
+        # Version 1 short ids use txids, which differ for witness transactions.
+        msg = MsgCmpctBlock.from_block(self.msg_block, self.nonce, prefill=[1], use_wtxid=False)
+        self.assertEqual([p.index for p in msg.prefilled_txs], [0, 1])
+        self.assertEqual(msg.short_ids, [short_id(k0, k1, multiWitnessTx.tx_hash())])
+
+    def test_btc_encode_decode(self):
+        msg = MsgCmpctBlock.from_block(self.msg_block, self.nonce, prefill=[2])
+
+        s = io.BytesIO()
+        msg.btc_encode(s, ProtocolVersion, WitnessEncoding)
+        buf = s.getvalue()
+
+        # Header, nonce, one short id and two prefilled transactions at the
+        # differential indexes 0 and 1 (index 2).
+        pos = blockHeaderLen
+        self.assertEqual(buf[pos:pos + 8], self.nonce.to_bytes(8, "little"))
+        pos += 8
+        self.assertEqual(buf[pos], 1)
+        self.assertEqual(buf[pos + 1:pos + 7], msg.short_ids[0].to_bytes(6, "little"))
+        pos += 7
+        self.assertEqual(buf[pos:pos + 2], bytes([0x02, 0x00]))
+        coinbase_len = self.msg_block.transactions[0].serialize_size()
+        self.assertEqual(buf[pos + 2 + coinbase_len], 0x01)
+
+        got = MsgCmpctBlock()
+        got.btc_decode(io.BytesIO(buf), ProtocolVersion, WitnessEncoding)
+        self.assertEqual(got, msg)
+        self.assertEqual(got.prefilled_txs[1].tx.witness_hash(), multiWitnessTx.witness_hash())
+
+        # Every truncation of the message fails.
+        for max in range(0, len(buf), 11):
+            with self.assertRaises(FixedBytesUnexpectedEOFErr):
+                MsgCmpctBlock().btc_decode(FixedBytesReader(max, buf), ProtocolVersion, WitnessEncoding)
+            with self.assertRaises(FixedBytesShortWriteErr):
+                msg.btc_encode(FixedBytesWriter(max), ProtocolVersion, WitnessEncoding)
+
+    def test_btc_errors(self):
+        header = pack_block_header(self.msg_block.header) + bytes(8)
+
+        # Too many short ids.
+        buf = header + bytes([0xfe]) + (maxTxPerBlock + 1).to_bytes(4, "little")
+        with self.assertRaises(MaxCmpctBlockTxsMsgErr):
+            MsgCmpctBlock().btc_decode(io.BytesIO(buf), ProtocolVersion, WitnessEncoding)
+
+        # Prefilled index past 16 bits.
+        buf = header + bytes([0x00, 0x01, 0xfe]) + (MaxUint16 + 1).to_bytes(4, "little")
+        with self.assertRaises(CmpctBlockIndexOverflowMsgErr):
+            MsgCmpctBlock().btc_decode(io.BytesIO(buf), ProtocolVersion, WitnessEncoding)
+
+        # Prefilled indexes must be strictly increasing.
+        msg = MsgCmpctBlock(header=self.msg_block.header,
+                            prefilled_txs=[PrefilledTx(index=1, tx=multiTx), PrefilledTx(index=1, tx=multiTx)])
+        with self.assertRaises(CmpctBlockIndexOverflowMsgErr):
+            msg.btc_encode(io.BytesIO(), ProtocolVersion, WitnessEncoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from wire.msg_getblocktxn import *
+from tests.utils import *
+from tests.wire.test_msg_block import blockOne
+
+
+class TestMsgGetBlockTxn(unittest.TestCase):
+    def setUp(self):
+        self.block_hash = blockOne.block_hash()
+        self.msg = MsgGetBlockTxn(block_hash=self.block_hash, indexes=[1, 2, 5, 300])
+        # Differential indexes 1, 0, 2 and 294.
+        self.buf = self.block_hash.to_bytes() + bytes([0x04, 0x01, 0x00, 0x02, 0xfd, 0x26, 0x01])
+
+    def test_command(self):
+        msg = MsgGetBlockTxn()
+        self.assertEqual(str(msg.command()), "getblocktxn")
+
+    def test_max_payload_length(self):
+        msg = MsgGetBlockTxn()
+        self.assertEqual(msg.max_payload_length(ProtocolVersion), HashSize + MaxVarIntPayload + maxTxPerBlock * 3)
+
+    def test_btc_encode(self):
+        s = io.BytesIO()
+        self.msg.btc_encode(s, ProtocolVersion, BaseEncoding)
+        self.assertEqual(s.getvalue(), self.buf)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesShortWriteErr):
+                self.msg.btc_encode(FixedBytesWriter(max), ProtocolVersion, BaseEncoding)
+
+        for indexes in ([2, 1], [MaxUint16 + 1]):
+            with self.assertRaises(CmpctBlockIndexOverflowMsgErr):
+                MsgGetBlockTxn(indexes=indexes).btc_encode(io.BytesIO(), ProtocolVersion, BaseEncoding)
+
+    def test_btc_decode(self):
+        msg = MsgGetBlockTxn()
+        msg.btc_decode(io.BytesIO(self.buf), ProtocolVersion, BaseEncoding)
+        self.assertEqual(msg, self.msg)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesUnexpectedEOFErr):
+                MsgGetBlockTxn().btc_decode(FixedBytesReader(max, self.buf), ProtocolVersion, BaseEncoding)
+
+        too_many = self.block_hash.to_bytes() + bytes([0xfe]) + (maxTxPerBlock + 1).to_bytes(4, "little")
+        with self.assertRaises(MaxCmpctBlockTxsMsgErr):
+            MsgGetBlockTxn().btc_decode(io.BytesIO(too_many), ProtocolVersion, BaseEncoding)
+
+        overflow = self.block_hash.to_bytes() + bytes([0x02, 0xfd, 0xff, 0xff, 0x00])
+        with self.assertRaises(CmpctBlockIndexOverflowMsgErr):
+            MsgGetBlockTxn().btc_decode(io.BytesIO(overflow), ProtocolVersion, BaseEncoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
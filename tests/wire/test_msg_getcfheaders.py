@@ -0,0 +1,40 @@
+import unittest
+from wire.msg_getcfheaders import *
+from tests.utils import *
+
+
+class TestMsgGetCFHeaders(unittest.TestCase):
+    def setUp(self):
+        self.msg = MsgGetCFHeaders(filter_type=GCSFilterRegular, start_height=1000,
+                                   stop_hash=Hash("000000000933ea01ad0ee984209779baaec3ced90fa3f408719526f8d77f4943"))
+        self.buf = bytes([0x00, 0xe8, 0x03, 0x00, 0x00]) + self.msg.stop_hash.to_bytes()
+
+    def test_command(self):
+        msg = MsgGetCFHeaders()
+        self.assertEqual(str(msg.command()), "getcfheaders")
+
+    def test_max_payload_length(self):
+        msg = MsgGetCFHeaders()
+        self.assertEqual(msg.max_payload_length(ProtocolVersion), 37)
+
+    def test_btc_encode(self):
+        s = io.BytesIO()
+        self.msg.btc_encode(s, ProtocolVersion, BaseEncoding)
+        self.assertEqual(s.getvalue(), self.buf)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesShortWriteErr):
+                self.msg.btc_encode(FixedBytesWriter(max), ProtocolVersion, BaseEncoding)
+
+    def test_btc_decode(self):
+        msg = MsgGetCFHeaders()
+        msg.btc_decode(io.BytesIO(self.buf), ProtocolVersion, BaseEncoding)
+        self.assertEqual(msg, self.msg)
+
+        for max in range(len(self.buf)):
+            with self.assertRaises(FixedBytesUnexpectedEOFErr):
+                MsgGetCFHeaders().btc_decode(FixedBytesReader(max, self.buf), ProtocolVersion, BaseEncoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -228,6 +228,31 @@ class TestMsgHeaders(unittest.TestCase):
                 except Exception as e:
                     self.assertEqual(type(e), c['write_err'])
 
+    def test_block_hashes(self):
+        msg = MsgHeaders()
+        for i in range(10):
+            msg.add_block_header(BlockHeader(version=1, prev_block=mainNetGenesisHash,
+                                             merkle_root=blockOneHeader.merkle_root,
+                                             timestamp=blockOneHeader.timestamp, bits=0x1d00ffff, nonce=i))
+        want = [bh.block_hash() for bh in msg.headers]
+        self.assertEqual(msg.block_hashes(), want)
+
+        # Hashes of decoded headers come from the decoded bytes.
+        s = io.BytesIO()
+        msg.btc_encode(s, self.pver, BaseEncoding)
+        decoded = MsgHeaders()
+        decoded.btc_decode(io.BytesIO(s.getvalue()), self.pver, BaseEncoding)
+        self.assertIsNotNone(decoded.raw_entries)
+        self.assertEqual(decoded.block_hashes(), want)
+        self.assertEqual(decoded, msg)
+
+        # Once accessed, the headers are hashed as they are, modified or not.
+        decoded.headers[0].nonce = 99
+        self.assertEqual(decoded.block_hashes()[0], decoded.headers[0].block_hash())
+        self.assertNotEqual(decoded.block_hashes()[0], want[0])
+        self.assertEqual(blockOneHeader.block_hash(),
+                         Hash("00000000839a8e6886ab5951d76f411475428afc90947ee320161bbf18eb6048"))
+
     def test_btc_decode(self):
         # Right condition
         for c in self.wire_tests:
@@ -244,3 +269,33 @@ class TestMsgHeaders(unittest.TestCase):
                 msg.btc_decode(s, c['pver'], c['enc'])
             except Exception as e:
                 self.assertEqual(type(e), c['read_err'])
+
+    def test_from_entries(self):
+        msg = MsgHeaders()
+        for i in range(3):
+            msg.add_block_header(BlockHeader(version=1, prev_block=mainNetGenesisHash,
+                                             merkle_root=blockOneHeader.merkle_root,
+                                             timestamp=blockOneHeader.timestamp, bits=0x1d00ffff, nonce=i))
+        s = io.BytesIO()
+        msg.btc_encode(s, self.pver, BaseEncoding)
+        encoded = s.getvalue()
+
+        # The entries are encoded as they are and decoded on demand.
+        from_entries = MsgHeaders.from_entries(encoded[1:])
+        s = io.BytesIO()
+        from_entries.btc_encode(s, self.pver, BaseEncoding)
+        self.assertEqual(s.getvalue(), encoded)
+        self.assertEqual(from_entries.block_hashes(), msg.block_hashes())
+        self.assertEqual(from_entries, msg)
+
+        # Changing the headers drops the entries.
+        from_entries.headers = from_entries.headers[:1]
+        self.assertIsNone(from_entries.raw_entries)
+        s = io.BytesIO()
+        from_entries.btc_encode(s, self.pver, BaseEncoding)
+        self.assertEqual(s.getvalue(), bytes([0x01]) + encoded[1:1 + headersEntryLen])
+
+        with self.assertRaises(MessageErr):
+            MsgHeaders.from_entries(encoded[1:-1])
+        with self.assertRaises(MaxBlockHeadersPerMsgMsgErr):
+            MsgHeaders.from_entries(bytes(headersEntryLen * (MaxBlockHeadersPerMsg + 1)))
@@ -0,0 +1,54 @@
+import unittest
+from wire.msg_sendcmpct import *
+from tests.utils import *
+
+
+class TestMsgSendCmpct(unittest.TestCase):
+    def setUp(self):
+        self.wire_tests = [
+            # High bandwidth, version 2.
+            {
+                "in": MsgSendCmpct(announce=True, version=CmpctBlockVersionWtxid),
+                "buf": bytes([0x01, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]),
+            },
+
+            # Low bandwidth, version 1.
+            {
+                "in": MsgSendCmpct(announce=False, version=CmpctBlockVersionTxid),
+                "buf": bytes([0x00, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]),
+            },
+        ]
+
+    def test_command(self):
+        msg = MsgSendCmpct()
+        self.assertEqual(str(msg.command()), "sendcmpct")
+
+    def test_max_payload_length(self):
+        msg = MsgSendCmpct()
+        self.assertEqual(msg.max_payload_length(ProtocolVersion), 9)
+
+    def test_btc_encode(self):
+        for c in self.wire_tests:
+            s = io.BytesIO()
+            c['in'].btc_encode(s, ProtocolVersion, BaseEncoding)
+            self.assertEqual(s.getvalue(), c['buf'])
+
+        # Every truncated write fails.
+        for max in range(9):
+            with self.assertRaises(FixedBytesShortWriteErr):
+                MsgSendCmpct(announce=True).btc_encode(FixedBytesWriter(max), ProtocolVersion, BaseEncoding)
+
+    def test_btc_decode(self):
+        for c in self.wire_tests:
+            msg = MsgSendCmpct()
+            msg.btc_decode(io.BytesIO(c['buf']), ProtocolVersion, BaseEncoding)
+            self.assertEqual(msg, c['in'])
+
+        for max in range(9):
+            with self.assertRaises(FixedBytesUnexpectedEOFErr):
+                MsgSendCmpct().btc_decode(FixedBytesReader(max, self.wire_tests[0]['buf']), ProtocolVersion,
+                                          BaseEncoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
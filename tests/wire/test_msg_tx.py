@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 from tests.utils import *
 from wire.msg_tx import *
@@ -262,6 +264,24 @@ class TestOutPoint(unittest.TestCase):
         prev_out_copy.index = 2
         self.assertNotEqual(prev_out_copy, prev_out)
 
+    def test_hash_key(self):
+        prev_hash = Hash(self.hashStr)
+        prev_out = OutPoint(hash=prev_hash, index=1)
+        entries = {prev_out: 1}
+        self.assertEqual(entries[OutPoint(hash=Hash(self.hashStr), index=1)], 1)
+        self.assertNotIn(OutPoint(hash=prev_hash, index=2), entries)
+
+        # The key follows the fields.
+        prev_out.index = 2
+        self.assertEqual(hash(prev_out), hash(OutPoint(hash=prev_hash, index=2)))
+        prev_out.hash = Hash()
+        self.assertEqual(prev_out, OutPoint(hash=Hash(), index=2))
+
+        self.assertFalse(hasattr(prev_out, '__dict__'))
+        self.assertEqual(OutPoint.__slots__, ('hash', 'index'))
+        self.assertEqual(pickle.loads(pickle.dumps(prev_out)), prev_out)
+        self.assertEqual(copy.deepcopy(prev_out), prev_out)
+
 
 class TestTxWitness(unittest.TestCase):
     def test_copy(self):
@@ -494,6 +514,185 @@ class TestTx(unittest.TestCase):
         self.assertEqual(msg.tx_hash(), wantHashTxid)
         self.assertEqual(msg.witness_hash(), wantHashWTxid)
 
+        # The same hashes computed from the decoded bytes.
+        s = io.BytesIO()
+        msg.serialize(s)
+        decoded = MsgTx()
+        decoded.deserialize_buffer(s.getvalue())
+        self.assertEqual(decoded.decoded_tx_hash(), wantHashTxid)
+        self.assertEqual(decoded.decoded_witness_hash(), wantHashWTxid)
+
+    def test_decoded_hashes(self):
+        for msg in (multiTx, multiWitnessTx):
+            s = io.BytesIO()
+            msg.serialize(s)
+
+            # Not decoded from a buffer, nothing recorded.
+            decoded = MsgTx()
+            decoded.deserialize(io.BytesIO(s.getvalue()))
+            self.assertIsNone(decoded.decoded_tx_hash())
+            self.assertIsNone(decoded.decoded_witness_hash())
+
+            decoded = MsgTx()
+            decoded.deserialize_buffer(s.getvalue())
+            self.assertEqual(decoded.decoded_tx_hash(), msg.tx_hash())
+            self.assertEqual(decoded.decoded_witness_hash(), msg.witness_hash())
+
+            # Mutating through the api drops the recorded spans.
+            decoded.add_tx_out(TxOut(value=1, pk_script=bytes([0x51])))
+            self.assertIsNone(decoded.decoded_tx_hash())
+
+    def test_decoded_hashes_modified(self):
+        def decode(msg):
+            s = io.BytesIO()
+            msg.serialize(s)
+            decoded = MsgTx()
+            decoded.deserialize_buffer(s.getvalue())
+            return decoded
+
+        modifications = [
+            lambda tx: setattr(tx.tx_ins[0], 'sequence', 1),
+            lambda tx: setattr(tx.tx_ins[0], 'signature_script', bytes([0x51])),
+            lambda tx: setattr(tx.tx_ins[0], 'previous_out_point', OutPoint(hash=Hash(), index=7)),
+            lambda tx: tx.tx_outs.__setitem__(0, TxOut(value=1, pk_script=bytes([0x51]))),
+            lambda tx: setattr(tx.tx_outs[0], 'value', 1),
+            lambda tx: setattr(tx, 'lock_time', tx.lock_time + 1),
+            lambda tx: setattr(tx, 'version', tx.version + 1),
+            lambda tx: tx.tx_ins.pop(),
+        ]
+        for msg in (multiTx, multiWitnessTx):
+            for modify in modifications:
+                tx, other = decode(msg), decode(msg)
+
+                # Modifying another transaction leaves the spans alone.
+                modify(other)
+                self.assertIsNone(other.decoded_tx_hash())
+                self.assertEqual(tx.decoded_tx_hash(), msg.tx_hash())
+                self.assertEqual(tx.decoded_witness_hash(), msg.witness_hash())
+
+                modify(tx)
+                self.assertIsNone(tx.decoded_tx_hash())
+                self.assertIsNone(tx.decoded_witness_hash())
+                self.assertEqual(tx.tx_hash(), tx.copy().tx_hash())
+
+    def test_cached_sizes(self):
+        def uncached(msg):
+            s = io.BytesIO()
+            msg._encode(s, 0, WitnessEncoding)
+            return s.getvalue()
+
+        for msg in (multiTx, multiWitnessTx):
+            s = io.BytesIO()
+            msg.serialize(s)
+            decoded = MsgTx()
+            decoded.deserialize_buffer(s.getvalue())
+
+            for tx in (msg.copy(), decoded):
+                self.assertEqual(tx.serialize_size(), len(uncached(tx)))
+                self.assertIs(tx._sizes(), tx._sizes())
+
+                # Every kind of modification is picked up.
+                tx.tx_ins[0].signature_script = bytes(300)
+                self.assertEqual(tx.serialize_size(), len(uncached(tx)))
+                tx.tx_ins[0].witness = TxWitness([bytes(3)])
+                self.assertTrue(tx.has_witness())
+                self.assertEqual(tx.serialize_size(), len(uncached(tx)))
+                tx.tx_outs[0].pk_script = bytes(10)
+                self.assertEqual(tx.pk_script_locs(), tx.copy().pk_script_locs())
+                tx.add_tx_in(TxIn(previous_out_point=OutPoint(hash=Hash(), index=0)))
+                self.assertEqual(tx.serialize_size(), len(uncached(tx)))
+                tx.tx_outs = []
+                self.assertEqual(tx.serialize_size(), len(uncached(tx)))
+                tx.lock_time = 1
+
+                s = io.BytesIO()
+                tx.serialize(s)
+                self.assertEqual(s.getvalue(), uncached(tx))
+                self.assertEqual(tx.tx_hash(), tx.copy().tx_hash())
+                self.assertEqual(tx.witness_hash(), double_hash_h(uncached(tx)))
+
+    def test_cached_sizes_per_tx(self):
+        s = io.BytesIO()
+        multiWitnessTx.serialize(s)
+        tx = MsgTx()
+        tx.deserialize_buffer(s.getvalue())
+        other = multiWitnessTx.copy()
+        sizes = tx._sizes()
+        other.serialize_size()
+
+        # Modifying another transaction leaves the cache alone.
+        other.tx_ins[0].sequence = 1
+        other.tx_ins[0].previous_out_point = OutPoint(hash=Hash(), index=7)
+        other.tx_outs[0].value = 1
+        other.add_tx_out(TxOut(value=1, pk_script=bytes([0x51])))
+        self.assertIs(tx._sizes(), sizes)
+        self.assertIsNotNone(tx.decoded_tx_hash())
+
+        # Outputs shared with a transaction built from this one, as signature
+        # hashing does, invalidate both when modified.
+        tx = multiTx.copy()
+        shared = MsgTx(version=tx.version, tx_ins=[], tx_outs=tx.tx_outs)
+        sizes = (tx.serialize_size(), shared.serialize_size())
+        hashes = (tx.tx_hash(), shared.tx_hash())
+        tx.tx_outs[0].pk_script = bytes(100)
+        for got, size, tx_hash in zip((tx, shared), sizes, hashes):
+            self.assertEqual(got.serialize_size(), size + 100 - len(multiTx.tx_outs[0].pk_script))
+            self.assertNotEqual(got.tx_hash(), tx_hash)
+            self.assertEqual(got.tx_hash(), got.copy().tx_hash())
+
+        # Once that transaction is gone they still invalidate this one.
+        del shared
+        tx_hash = tx.tx_hash()
+        tx.tx_outs[0].value += 1
+        self.assertNotEqual(tx.tx_hash(), tx_hash)
+
+    # The input and output lists can be modified like lists, the sizes and
+    # hashes follow.
+    def test_cached_sizes_list_changes(self):
+        changes = [
+            lambda tx: tx.tx_outs.__setitem__(0, TxOut(value=7, pk_script=bytes(90))),
+            lambda tx: tx.tx_outs.__setitem__(slice(0, 1), [TxOut(value=7, pk_script=bytes(90))]),
+            lambda tx: tx.tx_outs.append(TxOut(value=7, pk_script=bytes(90))),
+            lambda tx: tx.tx_outs.extend([TxOut(value=7, pk_script=bytes(90))]),
+            lambda tx: tx.tx_outs.insert(0, TxOut(value=7, pk_script=bytes(90))),
+            lambda tx: tx.tx_outs.__iadd__([TxOut(value=7, pk_script=bytes(90))]),
+            lambda tx: tx.tx_outs.__delitem__(0),
+            lambda tx: tx.tx_outs.pop(),
+            lambda tx: tx.tx_outs.remove(tx.tx_outs[0]),
+            lambda tx: tx.tx_outs.reverse(),
+            lambda tx: tx.tx_outs.clear(),
+            lambda tx: tx.tx_ins.__setitem__(0, TxIn(previous_out_point=OutPoint(hash=Hash(), index=3))),
+            lambda tx: tx.tx_ins.pop(0),
+        ]
+        for i, change in enumerate(changes):
+            tx = multiTx.copy()
+            tx.tx_outs.append(TxOut(value=1, pk_script=bytes([0x51])))
+            size, tx_hash = tx.serialize_size(), tx.tx_hash()
+            change(tx)
+            self.assertNotEqual(tx.tx_hash(), tx_hash, i)
+            self.assertEqual(tx.tx_hash(), tx.copy().tx_hash(), i)
+            self.assertEqual(tx.serialize_size(), tx.copy().serialize_size(), i)
+
+            # A new output is tracked like the others.
+            if len(tx.tx_outs) > 0:
+                tx_hash = tx.tx_hash()
+                tx.tx_outs[0].value += 1
+                self.assertNotEqual(tx.tx_hash(), tx_hash, i)
+
+        # The lists assigned are copied, and slices are plain lists.
+        tx = multiTx.copy()
+        tx_outs = [TxOut(value=1, pk_script=bytes([0x51]))]
+        tx.tx_outs = tx_outs
+        self.assertIsNot(tx.tx_outs, tx_outs)
+        self.assertIs(type(tx.tx_outs[:1]), list)
+
+        # Copies keep tracking their own lists.
+        for other in (pickle.loads(pickle.dumps(tx)), copy.deepcopy(tx)):
+            tx_hash = other.tx_hash()
+            other.tx_outs[0] = TxOut(value=2, pk_script=bytes([0x51]))
+            self.assertNotEqual(other.tx_hash(), tx_hash)
+            self.assertEqual(other.tx_hash(), other.copy().tx_hash())
+
 
 class TestTxWire(unittest.TestCase):
     def setUp(self):
@@ -752,6 +951,34 @@ class TestTxSerialize(unittest.TestCase):
                 msg.deserialize_no_witness(s)
             self.assertEqual(msg, c['out'])
 
+    def test_deserialize_buffer(self):
+        for c in self.tests:
+            msg = MsgTx()
+            if c['witness']:
+                msg.deserialize_buffer(c['buf'])
+            else:
+                msg.deserialize_no_witness(BufferReader(c['buf']))
+            self.assertEqual(msg, c['out'])
+
+            # Scripts are views into the buffer until materialized.
+            for tx_out in msg.tx_outs:
+                self.assertIsInstance(tx_out.pk_script, memoryview)
+
+            s = io.BytesIO()
+            msg.serialize(s)
+            self.assertEqual(s.getvalue(), c['buf'])
+
+            self.assertEqual(pickle.loads(pickle.dumps(msg)), c['out'])
+
+            msg.materialize()
+            self.assertEqual(msg, c['out'])
+            for tx_in in msg.tx_ins:
+                self.assertIs(type(tx_in.signature_script), bytes)
+                for item in tx_in.witness:
+                    self.assertIs(type(item), bytes)
+            for tx_out in msg.tx_outs:
+                self.assertIs(type(tx_out.pk_script), bytes)
+
     def test_pk_script_locs(self):
         for c in self.tests:
             pkScriptLocs = c['in'].pk_script_locs()
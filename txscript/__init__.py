@@ -1,5 +1,8 @@
 from .script import *
 from .script_flag import *
 from .sig_cache import *
+from .parse_cache import *
+from .trace import *
 from .engine import *
+from .sign import *
 
@@ -1,12 +1,14 @@
-import copy
 import logging
 import hashlib
+import time
 import wire
 import btcec
 from .stack import *
 from .sig_cache import *
 from .hash_cache import *
 from .standard import *
+from .template_verify import *
+from .trace import *
 from .script_flag import *
 
 _logger = logging.getLogger(__name__)
@@ -24,7 +26,8 @@ class Engine:
     def __init__(self, scripts=None, script_idx=None, script_off=None, last_code_sep=None,
                  dstack=None, astack=None, tx=None, tx_idx=None, cond_stack=None, num_ops=None,
                  flags=None, sig_cache=None, hash_cache=None, bip16=None, saved_first_stack=None,
-                 witness_version=None, witness_program=None, inptut_amount=None):
+                 witness_version=None, witness_program=None, input_amount=None, deferred_checks=None,
+                 template_verifier=None, trace=None):
         """
 
         :param [][]parsedOpcode scripts:
@@ -44,7 +47,10 @@ class Engine:
         :param [][]byte saved_first_stack:
         :param int witness_version:
         :param []byte witness_program:
-        :param int64 inptut_amount:
+        :param int64 input_amount:
+        :param []DeferredSigCheck deferred_checks:
+        :param func(Engine) bool template_verifier:
+        :param func(TraceStep) trace:
         """
         self.scripts = scripts or []
         self.script_idx = script_idx or 0
@@ -58,12 +64,25 @@ class Engine:
         self.num_ops = num_ops or 0
         self.flags = flags or ScriptFlags(0)
         self.sig_cache = sig_cache or SigCache()
-        self.hash_cache = hash_cache or HashCache()
+        self.hash_cache = hash_cache
         self.bip16 = bip16 or False
         self.saved_first_stack = saved_first_stack or []
         self.witness_version = witness_version or 0
         self.witness_program = witness_program or bytes()
-        self.inptut_amount = inptut_amount or 0
+        self.input_amount = input_amount or 0
+
+        # deferred_checks collects the signature checks assumed valid in
+        # deferred verification mode, and is None in the default immediate
+        # mode.
+        self.deferred_checks = deferred_checks
+
+        # template_verifier is the verifier tried before running the scripts
+        # when they are those of a standard template, see template_verify.
+        self.template_verifier = template_verifier
+
+        # trace is the hook called after every step of the engine, see
+        # trace.  Tracing executes the scripts even of standard templates.
+        self.trace = trace
 
     # has_flag returns whether the script engine instance has the passed flag set.
     def has_flag(self, flags: ScriptFlags) -> bool:
@@ -373,29 +392,104 @@ class Engine:
 
         return False
 
+    # is_final_opcode returns whether the opcode being executed is the last one
+    # of the last script, after which no further script is pulled in.
+    def is_final_opcode(self) -> bool:
+        if self.script_idx != len(self.scripts) - 1 or self.script_off < len(self.scripts[self.script_idx]):
+            return False
+        if self.bip16 and self.script_idx <= 1:
+            return False
+        if self.witness_program and (self.script_idx == 1 or (self.script_idx == 2 and self.bip16)):
+            return False
+        return True
+
+    # defer_sig_check records the check of sig over sig_hash by pub_key for
+    # later verification when the engine is in deferred verification mode, and
+    # returns whether it did.
+    #
+    # Only checks whose failure would fail the script no matter what it does
+    # with the result are deferred, so that assuming them valid gives the same
+    # outcome as verifying them right away:
+    #   - with ScriptVerifyNullFail and a non-empty signature, which fails
+    #     with ErrNullFail
+    #   - for OP_CHECKSIGVERIFY, which fails with ErrCheckSigVerify
+    #   - for the last opcode of the last script, whose result is the final
+    #     stack entry, which fails with ErrEvalFalse if the script otherwise
+    #     succeeds
+    #
+    # final tells whether pop is the final opcode, when it is not the one
+    # being executed.
+    def defer_sig_check(self, pop, sig_hash, sig, pub_key, sig_bytes, final=None) -> bool:
+        if self.deferred_checks is None:
+            return False
+
+        if self.has_flag(ScriptVerifyNullFail) and len(sig_bytes) > 0:
+            error = ScriptError(ErrorCode.ErrNullFail, desc="signature not empty on failed checksig")
+            fatal = True
+        elif pop.opcode.value == OP_CHECKSIGVERIFY:
+            error = ScriptError(ErrorCode.ErrCheckSigVerify, desc="%s failed" % pop.opcode.name)
+            fatal = True
+        elif self.is_final_opcode() if final is None else final:
+            error = ScriptError(ErrorCode.ErrEvalFalse, desc="false stack entry at end of script execution")
+            fatal = False
+        else:
+            return False
+
+        self.deferred_checks.append(DeferredSigCheck(pub_key, sig_hash, sig, error, fatal))
+        return True
+
+    # verify_fatal_deferred_checks verifies the deferred checks whose failure
+    # would have stopped the script where they were made, and raises the error
+    # of the first one that fails.  It is called when a script fails, as such
+    # a check failing comes before the later failure.
+    def verify_fatal_deferred_checks(self):
+        for check in self.deferred_checks or []:
+            if check.fatal and not check.verify():
+                raise check.error
+
     # Execute will execute all scripts in the script engine and return either nil
     # for successful validation or an error if one occurred.
+    #
+    # In deferred verification mode, the checks left in deferred_checks once
+    # it returns must still be verified, see verify_deferred_checks, for the
+    # scripts to be valid.
+    #
+    # Scripts of a standard template are checked by its template verifier
+    # first, and only run when it can not tell they are valid, unless they
+    # are traced.
     def execute(self):
-        done = False
-        while not done:
-            # Do some log # TOCHANGE I think I can use better solution here
+        if self.template_verifier is not None and self.trace is None:
             try:
-                dis = self.disasm_pc()
-                _logger.info("stepping %s" % (dis))
-            except Exception as e:
-                _logger.info("stepping (%s)" % (e))
+                if self.template_verifier(self):
+                    return
+            except Exception:
+                # The generic engine reports the failure.
+                pass
 
-            done = self.step()
+        try:
+            return self._execute()
+        except Exception:
+            self.verify_fatal_deferred_checks()
+            raise
 
-            # Do some log  # TOCHANGE I think I can use better solution here
-            dstr = ""
-            astr = ""
-            if self.dstack.depth() != 0:
-                dstr = "Stack:\n" + str(self.dstack)
-            if self.astack.depth() != 0:
-                astr = "Atack:\n" + str(self.astack)
+    def _execute(self):
+        if self.trace is not None:
+            return self._execute_traced()
 
-            _logger.info("%s" % (dstr + astr))
+        done = False
+        while not done:
+            done = self.step()
+        return self.check_error_condition(final_script=True)
+
+    # _execute_traced executes the scripts as _execute does, calling the trace
+    # hook after every step.
+    def _execute_traced(self):
+        done = False
+        while not done:
+            script_idx, script_off = self.script_idx, self.script_off
+            start = time.perf_counter()
+            done = self.step()
+            self.trace(TraceStep(self, script_idx, script_off, time.perf_counter() - start))
         return self.check_error_condition(final_script=True)
 
     # subScript returns the script since the last OP_CODESEPARATOR.
@@ -409,7 +503,7 @@ class Engine:
             return
 
         sig_hash_type = hash_type & (~SigHashType.SigHashAnyOneCanPay.value)
-        if sig_hash_type < SigHashType.SigHashAll.value or sig_hash_type > ~SigHashType.SigHashSingle.value:
+        if sig_hash_type < SigHashType.SigHashAll.value or sig_hash_type > SigHashType.SigHashSingle.value:
             desc = "invalid hash type %s" % hash_type
             raise ScriptError(ErrorCode.ErrInvalidSigHashType, desc=desc)
         return
@@ -665,20 +759,31 @@ class Engine:
 
 # getStack returns the contents of stack as a byte array bottom up
 def get_stack(stack):
-    return list(reversed(copy.deepcopy(stack.stk)))
+    return list(stack.stk)
 
 
 def set_stack(stack, data):
-    stack.dropN(stack.depth())
+    # dropN refuses to drop nothing, which is all there is to drop when the
+    # stack is empty.
+    if stack.depth() > 0:
+        stack.dropN(stack.depth())
     for each in data:
-        stack.push_byte_array(each)
+        stack.push_byte_array(bytes(each))
     return
 
 
 # NewEngine returns a new script engine for the provided public key script,
 # transaction, and input index.  The flags modify the behavior of the script
 # engine according to the description provided by each flag.
-def new_engine(script_pub_key, tx, tx_idx, flags, sig_cache, hash_cache, input_amount):
+#
+# When defer_sig_checks is set, the engine runs in deferred verification mode:
+# signature checks are collected in vm.deferred_checks instead of being
+# verified during execution, where possible.
+#
+# When trace is set, it is called after every step the engine executes with
+# the TraceStep describing it, see log_trace and OpcodeProfiler.
+def new_engine(script_pub_key, tx, tx_idx, flags, sig_cache, hash_cache, input_amount, defer_sig_checks=False,
+               trace=None):
     """
 
     :param script_pub_key:
@@ -688,6 +793,8 @@ def new_engine(script_pub_key, tx, tx_idx, flags, sig_cache, hash_cache, input_a
     :param sig_cache:
     :param hash_cache:
     :param input_amount:
+    :param bool defer_sig_checks:
+    :param func(TraceStep) trace:
     :return:
     """
 
@@ -709,7 +816,9 @@ def new_engine(script_pub_key, tx, tx_idx, flags, sig_cache, hash_cache, input_a
     vm = Engine(flags=flags,
                 sig_cache=sig_cache,
                 hash_cache=hash_cache,
-                inptut_amount=input_amount)
+                input_amount=input_amount,
+                deferred_checks=[] if defer_sig_checks else None,
+                trace=trace)
 
     # The clean stack flag (ScriptVerifyCleanStack) is not allowed without
     # either the pay-to-script-hash (P2SH) evaluation (ScriptBip16)
@@ -775,7 +884,7 @@ def new_engine(script_pub_key, tx, tx_idx, flags, sig_cache, hash_cache, input_a
             raise ScriptError(ErrorCode.ErrInvalidFlags, desc=desc)
 
         wit_program = None
-        if is_pops_witness_program(scripts[1]):
+        if is_pops_witness_program(vm.scripts[1]):
             # The scriptSig must be *empty* for all native witness
             # programs, otherwise we introduce malleability.
             if len(script_sig) != 0:
@@ -809,4 +918,24 @@ def new_engine(script_pub_key, tx, tx_idx, flags, sig_cache, hash_cache, input_a
 
     vm.tx = tx
     vm.tx_idx = tx_idx
+
+    # Inputs spending a standard template are verified by straight-line code
+    # rather than by running their scripts when possible.
+    vm.template_verifier = template_verifier(vm, script_pub_key)
     return vm
+
+
+# VerifyDeferredChecks verifies the signature checks deferred by engines in
+# one batch, spread over the workers (all the CPUs by default), and returns
+# the first one that fails, or None when they are all valid.  The valid
+# signatures are added to sig_cache if one is given.
+def verify_deferred_checks(checks, sig_cache=None, workers=None):
+    results = btcec.verify_many([(check.pub_key, check.sig_hash, check.sig) for check in checks], workers)
+    for check, valid in zip(checks, results):
+        if not valid:
+            return check
+
+    if sig_cache is not None:
+        for check in checks:
+            sig_cache.add(check.sig_hash, check.sig, check.pub_key)
+    return None
@@ -5,6 +5,7 @@ from .utils import *
 from .script_flag import *
 from .stack import *
 from .hash_cache import *
+from .parse_cache import pubKeyCache, derSigCache
 from enum import Enum, IntEnum
 
 # These constants are the values of the official opcodes used on the btc wiki,
@@ -416,38 +417,44 @@ class ParsedOpcode:
         opcode = self.opcode.value
 
         # check zero length data pushed with OP_0
-        if data_len == 0 and opcode != OP_0:
-            desc = "zero length data push is encoded with opcode %s instead of OP_0" % self.opcode.name
-            raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
+        if data_len == 0:
+            if opcode != OP_0:
+                desc = "zero length data push is encoded with opcode %s instead of OP_0" % self.opcode.name
+                raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
 
         # check one length data with value 1-16  pushed with OP_1-OP_16
-        if data_len == 1 and 1 <= data[0] <= 16 and opcode != (OP_1 + data[0] - 1):
-            desc = "data push of the value %d encoded with opcode %s instead of OP_%d" % (
-                data[0], self.opcode.name, data[0])
-            raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
+        elif data_len == 1 and 1 <= data[0] <= 16:
+            if opcode != (OP_1 + data[0] - 1):
+                desc = "data push of the value %d encoded with opcode %s instead of OP_%d" % (
+                    data[0], self.opcode.name, data[0])
+                raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
 
         # check -1 pushed with OP_1NEGATE
-        if data_len == 1 and data[0] == 0x81 and opcode != OP_1NEGATE:
-            desc = "data push of the value -1 encoded with opcode %s instead of OP_1NEGATE" % (self.opcode.name)
-            raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
+        elif data_len == 1 and data[0] == 0x81:
+            if opcode != OP_1NEGATE:
+                desc = "data push of the value -1 encoded with opcode %s instead of OP_1NEGATE" % (self.opcode.name)
+                raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
 
         # check data_len below 75 pushed with direct push
-        if data_len <= 75 and int(opcode) != data_len:
-            desc = "data push of %d bytes encoded with opcode %s instead of OP_DATA_%d" % (
-                data_len, self.opcode.name, data_len)
-            raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
+        elif data_len <= 75:
+            if int(opcode) != data_len:
+                desc = "data push of %d bytes encoded with opcode %s instead of OP_DATA_%d" % (
+                    data_len, self.opcode.name, data_len)
+                raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
 
         # check data_len below 255 pushed with OP_PUSHDATA1
-        if data_len <= 255 and opcode != OP_PUSHDATA1:
-            desc = "data push of %d bytes encoded with opcode %s instead of OP_PUSHDATA1" % (
-                data_len, self.opcode.name)
-            raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
+        elif data_len <= 255:
+            if opcode != OP_PUSHDATA1:
+                desc = "data push of %d bytes encoded with opcode %s instead of OP_PUSHDATA1" % (
+                    data_len, self.opcode.name)
+                raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
 
         # check data_len below 65535 pushed with OP_PUSHDATA2
-        if data_len <= 65535 and opcode != OP_PUSHDATA2:
-            desc = "data push of %d bytes encoded with opcode %s instead of OP_PUSHDATA2" % (
-                data_len, self.opcode.name)
-            raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
+        elif data_len <= 65535:
+            if opcode != OP_PUSHDATA2:
+                desc = "data push of %d bytes encoded with opcode %s instead of OP_PUSHDATA2" % (
+                    data_len, self.opcode.name)
+                raise ScriptError(ErrorCode.ErrMinimalData, desc=desc)
 
     # print returns a human-readable string representation of the opcode for use
     # in script disassembly.
@@ -698,8 +705,8 @@ def calc_witness_signature_hash(sub_script, sig_hashes, hash_type, tx, idx, amt)
     tx_in = tx.tx_ins[idx]
 
     # Next, write the outpoint being spent.
-    wire.write_element(sig_hash, "chainhash.Hash", tx_in.previsous_out_point.hash)
-    wire.write_element(sig_hash, "uint32", tx_in.previsous_out_point.index)
+    wire.write_element(sig_hash, "chainhash.Hash", tx_in.previous_out_point.hash)
+    wire.write_element(sig_hash, "uint32", tx_in.previous_out_point.index)
 
     if is_witness_pub_key_hash(sub_script):
         # The script code for a p2wkh is a length prefix varint for
@@ -803,7 +810,7 @@ def calc_signature_hash(script, hash_type, tx, idx):  # TODO refactor the func n
     # cleverly construct transactions which can steal those coins provided
     # they can reuse signatures.
     if hash_type & sigHashMask == SigHashType.SigHashSingle and \
-                    idx < len(tx.tx_outs):
+                    idx >= len(tx.tx_outs):
         hash = chainhash.Hash(bytes([0x01]) + bytes(chainhash.HashSize - 1))
         return hash
 
@@ -811,41 +818,42 @@ def calc_signature_hash(script, hash_type, tx, idx):  # TODO refactor the func n
     script = remove_opcode(script, OP_CODESEPARATOR)
 
     # Make a shallow copy of the transaction, zeroing out the script for
-    # all inputs that are not currently being processed.
-    tx_copy = shadow_copy_tx(tx)
-    for i in range(len(tx_copy.tx_ins)):
+    # all inputs that are not currently being processed.  The modified inputs
+    # and outputs are built new instead of being changed in place on a copy,
+    # which would change those of tx and drop its cached sizes and encodings.
+    v = hash_type & sigHashMask
+    zero_sequences = v in (SigHashType.SigHashNone, SigHashType.SigHashSingle)
+    tx_ins = []
+    for i, tx_in in enumerate(tx.tx_ins):
         if i == idx:
             # UnparseScript cannot fail here because removeOpcode
             # above only returns a valid script.
             sig_script = unparse_script_no_error(script)
-            tx_copy.tx_ins[idx].signature_script = sig_script
+            tx_ins.append(wire.TxIn(previous_out_point=tx_in.previous_out_point,
+                                    signature_script=sig_script,
+                                    sequence=tx_in.sequence))
         else:
-            tx_copy.tx_ins[i].signature_script = bytes()
+            # Sequence on all other inputs is 0 for SigHashNone and
+            # SigHashSingle.
+            tx_ins.append(wire.TxIn(previous_out_point=tx_in.previous_out_point,
+                                    sequence=0 if zero_sequences else tx_in.sequence))
 
-    v = hash_type & sigHashMask
     if v == SigHashType.SigHashNone:
-        tx_copy.tx_outs = tx_copy.tx_outs[0:0]
-        for i in range(len(tx_copy.tx_ins)):
-            if i != idx:
-                tx_copy.tx_ins[i].sequence = 0
+        tx_outs = []
     elif v == SigHashType.SigHashSingle:
         # Resize output array to up to and including requested index.
-        tx_copy.tx_outs = tx_copy.tx_outs[:idx + 1]
+        tx_outs = tx.tx_outs[:idx + 1]
 
         # All but current output get zeroed out.
         for i in range(idx):
-            tx_copy.tx_outs[i].value = -1
-            tx_copy.tx_outs[i].pk_script = bytes()
-
-        # Sequence on all other inputs is 0, too.
-        for i in range(len(tx_copy.tx_ins)):
-            if i != idx:
-                tx_copy.tx_ins[i].sequence = 0
-    elif v in (SigHashType.SigHashOld, SigHashType.SigHashAll):
-        pass
+            tx_outs[i] = wire.TxOut(value=-1, pk_script=bytes())
+    else:
+        tx_outs = list(tx.tx_outs)
 
     if hash_type & SigHashType.SigHashAnyOneCanPay != 0:
-        tx_copy.tx_ins = tx_copy.tx_ins[idx:idx + 1]
+        tx_ins = tx_ins[idx:idx + 1]
+
+    tx_copy = wire.MsgTx(version=tx.version, tx_ins=tx_ins, tx_outs=tx_outs, lock_time=tx.lock_time)
 
     # The final hash is the double sha256 of both the serialized modified
     # transaction and the hash type (encoded as a 4-byte little-endian
@@ -1774,6 +1782,33 @@ class SigHashType(IntEnum):
     # def __or__(self, other):
     #     return self.value & other
 
+# DeferredSigCheck is a signature check an engine in deferred verification
+# mode has assumed valid, to be verified later along with others.  error is
+# the error the script fails with when the signature turns out invalid.
+# When fatal is not set, the error only stands if the script otherwise
+# succeeded: the check is the last opcode of the script and its result is only
+# the final stack entry.
+class DeferredSigCheck:
+    def __init__(self, pub_key, sig_hash, sig, error, fatal):
+        """
+
+        :param btcec.PublicKey pub_key:
+        :param chainhash.Hash sig_hash:
+        :param btcec.Signature sig:
+        :param ScriptError error:
+        :param bool fatal:
+        """
+        self.pub_key = pub_key
+        self.sig_hash = sig_hash
+        self.sig = sig
+        self.error = error
+        self.fatal = fatal
+
+    # verify verifies the signature now.
+    def verify(self) -> bool:
+        return self.sig.verify(self.sig_hash, self.pub_key)
+
+
 # opcodeCheckSig treats the top 2 items on the stack as a public key and a
 # signature and replaces them with a bool which indicates if the signature was
 # successfully verified.
@@ -1811,7 +1846,7 @@ def opcodeCheckSig(pop, vm):
     # the data stack.  This is required because the more general script
     # validation consensus rules do not have the new strict encoding
     # requirements enabled by the flags.
-    hash_type = SigHashType(full_sig_bytes[-1])
+    hash_type = full_sig_bytes[-1]
     sig_bytes = full_sig_bytes[:-1]
 
     vm.check_hash_type_encoding(hash_type)
@@ -1829,7 +1864,7 @@ def opcodeCheckSig(pop, vm):
             sig_hashes = TxSigHashes.from_msg_tx(vm.tx)
 
         hash = calc_witness_signature_hash(sub_script, sig_hashes, hash_type,
-                                           vm.tx, vm.tx_idx, vm.input_amout)
+                                           vm.tx, vm.tx_idx, vm.input_amount)
     else:
         # Remove the signature since there is no way for a signature
         # to sign itself.
@@ -1837,14 +1872,14 @@ def opcodeCheckSig(pop, vm):
         hash = calc_signature_hash(sub_script, hash_type, vm.tx, vm.tx_idx)
 
     try:
-        pub_key = btcec.parse_pub_key(pk_bytes, btcec.s256())
+        pub_key = pubKeyCache.parse(pk_bytes)
     except Exception:
         vm.dstack.push_bool(False)
         return
 
     try:
         if vm.has_flag(ScriptVerifyStrictEncoding) or vm.has_flag(ScriptVerifyDERSignatures):
-            signature = btcec.parse_der_signature(sig_bytes, btcec.s256())
+            signature = derSigCache.parse(sig_bytes)
         else:
             signature = btcec.parse_signature(sig_bytes, btcec.s256())
     except Exception as e:
@@ -1852,14 +1887,20 @@ def opcodeCheckSig(pop, vm):
         vm.dstack.push_bool(False)
         return
 
-    if vm.sig_cache:
-        sig_hash = chainhash.Hash(hash)
-        valid = vm.sig_cache.exists(sig_hash, signature, pub_key)
-        if not valid and signature.verify(hash, pub_key):
+    sig_hash = chainhash.Hash(hash)
+    if vm.sig_cache and vm.sig_cache.exists(sig_hash, signature, pub_key):
+        valid = True
+    elif vm.defer_sig_check(pop, sig_hash, signature, pub_key, sig_bytes):
+        # The signature is verified later along with others, and assumed
+        # valid until then.  Deferred checks are only the ones whose failure
+        # fails the script whatever it does with the result.
+        valid = True
+    elif signature.verify(hash, pub_key):
+        if vm.sig_cache:
             vm.sig_cache.add(sig_hash, signature, pub_key)
-            valid = True
+        valid = True
     else:
-        valid = signature.verify(hash, pub_key)
+        valid = False
 
     if not valid and vm.has_flag(ScriptVerifyNullFail) and len(sig_bytes) > 0:
         desc = "signature not empty on failed checksig"
@@ -1974,7 +2015,7 @@ def opcodeCheckMultiSig(pop, vm):
     # no way for a signature to sign itself.
     if not vm.is_witness_version_active(version=0):
         for sig_info in signatures:
-            script = remove_opcode_by_data(script, sig_info)
+            script = remove_opcode_by_data(script, sig_info.signature)
 
     success = True
     num_pub_keys += 1
@@ -2002,17 +2043,17 @@ def opcodeCheckMultiSig(pop, vm):
             continue
 
         # Split the signature into hash type and signature components.
-        hash_type = SigHashType(raw_sig[-1])
+        hash_type = raw_sig[-1]
         signature = raw_sig[:-1]
 
         # Only parse and check the signature encoding once.
         if not sig_info.parsed:
             vm.check_hash_type_encoding(hash_type)
-            vm.check_signatire_encoding(signature)
+            vm.check_signature_encoding(signature)
 
             try:
                 if vm.has_flag(ScriptVerifyStrictEncoding) or vm.has_flag(ScriptVerifyDERSignatures):
-                    parsed_sig = btcec.parse_der_signature(signature, btcec.s256())
+                    parsed_sig = derSigCache.parse(signature)
                 else:
                     parsed_sig = btcec.parse_signature(signature, btcec.s256())
             except:
@@ -2032,7 +2073,7 @@ def opcodeCheckMultiSig(pop, vm):
         vm.check_pub_key_encoding(pub_key)
         # parse pub key
         try:
-            parsed_pub_key = btcec.parse_pub_key(pub_key, btcec.s256())
+            parsed_pub_key = pubKeyCache.parse(pub_key)
         except:
             continue
 
@@ -2044,7 +2085,7 @@ def opcodeCheckMultiSig(pop, vm):
                 sig_hashes = TxSigHashes.from_msg_tx(vm.tx)
 
             hash = calc_witness_signature_hash(script, sig_hashes, hash_type,
-                                               vm.tx, vm.tx_idx, vm.input_amout)
+                                               vm.tx, vm.tx_idx, vm.input_amount)
         else:
             # Remove the signature since there is no way for a signature
             # to sign itself.
@@ -2054,7 +2095,7 @@ def opcodeCheckMultiSig(pop, vm):
             sig_hash = chainhash.Hash(hash)
             valid = vm.sig_cache.exists(sig_hash, parsed_sig, parsed_pub_key)
             if not valid and parsed_sig.verify(hash, parsed_pub_key):
-                vm.sig_cache.add(sig_hash, parsed_sig, pub_key)
+                vm.sig_cache.add(sig_hash, parsed_sig, parsed_pub_key)
                 valid = True
         else:
             valid = parsed_sig.verify(hash, parsed_pub_key)
@@ -2064,9 +2105,9 @@ def opcodeCheckMultiSig(pop, vm):
             signature_idx += 1
             num_signatures -= 1
 
-    if not success and vm.hash_flag(ScriptVerifyNullFail):
+    if not success and vm.has_flag(ScriptVerifyNullFail):
         for sig in signatures:
-            if len(sig.signatire) > 0:
+            if len(sig.signature) > 0:
                 msg = "not all signatures empty on failed checkmultisig"
                 raise ScriptError(ErrorCode.ErrNullFail, msg)
 
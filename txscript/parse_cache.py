@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+import btcec
+
+# defaultPubKeyCacheEntries is the number of parsed public keys kept by
+# pubKeyCache.
+defaultPubKeyCacheEntries = 10000
+
+# defaultSigCacheEntries is the number of strictly parsed signatures kept by
+# derSigCache.
+defaultSigCacheEntries = 10000
+
+
+# ParseCache is a bounded cache of the results of a parse function keyed by
+# the raw bytes parsed, evicting the least recently used entry when full.
+# Public keys and signatures are parsed again each time a script checks them,
+# and parsing a public key validates its point, which is far more expensive
+# than a lookup when the same key shows up many times in a block.
+#
+# Only successful parses are cached, so an invalid encoding raises the parse
+# error every time, just as without the cache.
+#
+# NOTE: This type is safe for concurrent access.
+class ParseCache:
+    def __init__(self, parse, max_entries):
+        """
+
+        :param func(bytes) parse:
+        :param int max_entries:
+        """
+        self.parse_func = parse
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Parse returns the parsed form of raw, from the cache when it has been
+    # parsed before.
+    def parse(self, raw):
+        if type(raw) is not bytes:
+            raw = bytes(raw)
+
+        with self.lock:
+            parsed = self._entries.get(raw)
+            if parsed is not None:
+                self._entries.move_to_end(raw)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+
+        parsed = self.parse_func(raw)
+
+        with self.lock:
+            if self.max_entries > 0:
+                self._entries[raw] = parsed
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return parsed
+
+    # Stats returns the number of hits and misses of the cache.
+    def stats(self):
+        return self.hits, self.misses
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# pubKeyCache is the cache of the public keys parsed by the signature checking
+# opcodes.
+pubKeyCache = ParseCache(lambda raw: btcec.parse_pub_key(raw, btcec.s256()),
+                         defaultPubKeyCacheEntries)
+
+# derSigCache is the cache of the signatures the signature checking opcodes
+# parse with strict DER encoding.
+derSigCache = ParseCache(lambda raw: btcec.parse_der_signature(raw, btcec.s256()),
+                         defaultSigCacheEntries)
@@ -1,4 +1,5 @@
 from .opcode import *
+from .parse_cache import ParseCache
 
 
 # Bip16Activation is the timestamp where BIP0016 is valid to use in the
@@ -29,11 +30,8 @@ def is_small_int(op) -> bool:
 
 
 def is_pay_to_witness_pub_key_hash(script) -> bool:
-    try:
-        pops = parse_script(script)
-    except ScriptError:
-        return False
-    return is_witness_pub_key_hash(pops)
+    parsed = parsed_script(script)
+    return parsed.error is None and is_witness_pub_key_hash(parsed.pops)
 
 
 # --------
@@ -50,11 +48,7 @@ def is_script_hash(pops) -> bool:
 # IsPayToScriptHash returns true if the script is in the standard
 # pay-to-script-hash (P2SH) format, false otherwise.
 def is_pay_to_script_hash(script) -> bool:
-    try:
-        pops = parse_script(script)
-    except ScriptError:
-        return False
-    return is_script_hash(pops)
+    return parsed_script(script).is_pay_to_script_hash
 
 
 # --------
@@ -68,11 +62,8 @@ def is_witness_script_hash(pops) -> bool:
 # IsPayToWitnessScriptHash returns true if the is in the standard
 # pay-to-witness-script-hash (P2WSH) format, false otherwise.
 def is_pay_to_witness_script_hash(script) -> bool:
-    try:
-        pops = parse_script(script)
-    except ScriptError:
-        return False
-    return is_witness_script_hash(pops)
+    parsed = parsed_script(script)
+    return parsed.error is None and is_witness_script_hash(parsed.pops)
 
 
 # --------
@@ -93,11 +84,7 @@ def is_push_only(pops) -> bool:
 #
 # False will be returned when the script does not parse
 def is_push_only_script(script: bytes) -> bool:
-    try:
-        pops = parse_script(script)
-    except ScriptError:
-        return False
-    return is_push_only(pops)
+    return parsed_script(script).is_push_only
 
 
 # IsWitnessProgram returns true if the passed script is a valid witness
@@ -105,15 +92,7 @@ def is_push_only_script(script: bytes) -> bool:
 # witness program must be a small integer (from 0-16), followed by 2-40 bytes
 # of pushed data.
 def is_script_witness_program(script: bytes) -> bool:
-    # The length of the script must be between 4 and 42 bytes. The
-    # smallest program is the witness version, followed by a data push of
-    # 2 bytes.  The largest allowed witness program has a data push of
-    # 40-bytes.
-    if len(script) < 4 or len(script) > 42:
-        return False
-
-    pops = parse_script(script)
-    return is_pops_witness_program(pops)
+    return parsed_script(script).witness_program is not None
 
 
 # isWitnessProgram returns true if the passed script is a witness program, and
@@ -132,18 +111,16 @@ def is_pops_witness_program(pops):
 # ExtractWitnessProgramInfo attempts to extract the witness program version,
 # as well as the witness program itself from the passed script.
 def extract_witness_program_info(script: bytes):
-    pops = parse_script(script)
+    parsed = parsed_script(script)
 
     # If at this point, the scripts doesn't resemble a witness program,
     # then we'll exit early as there isn't a valid version or program to
     # extract.
-    if not is_pops_witness_program(pops):
+    if parsed.witness_program is None:
         # desc = "script is not a witness program, unable to extract version or witness program"
         raise NotWitnessProgramError
 
-    witness_version = as_small_int(pops[0].opcode)
-    witness_program = pops[1].data
-    return witness_version, witness_program
+    return parsed.witness_version, parsed.witness_program
 
 
 # asSmallInt returns the passed opcode, which must be true according to
@@ -180,8 +157,7 @@ def get_sig_op_count_inner(pops, precise) -> int:
 # If the script fails to parse, then the count up to the point of failure is
 # returned.
 def get_sig_op_count(script: bytes):
-    pops = parse_script_no_err(script)
-    return get_sig_op_count_inner(pops, False)
+    return parsed_script(script).sig_op_count
 
 
 # GetPreciseSigOpCount returns the number of signature operations in
@@ -190,24 +166,24 @@ def get_sig_op_count(script: bytes):
 # operations in the transaction.  If the script fails to parse, then the count
 # up to the point of failure is returned.
 def get_precise_sig_op_count(script_sig, script_pub_key, bip16):
-    pops = parse_script_no_err(script_pub_key)
+    parsed = parsed_script(script_pub_key)
 
     # Treat non P2SH transactions as normal.
-    if not (bip16 and is_script_hash(pops)):
-        return get_sig_op_count_inner(pops, precise=True)
+    if not (bip16 and is_script_hash(parsed.pops)):
+        return parsed.precise_sig_op_count
 
     # The public key script is a pay-to-script-hash, so parse the signature
     # script to get the final item.  Scripts that fail to fully parse count
     # as 0 signature operations.
-    try:
-        sig_pops = parse_script(script_sig)
-    except ScriptError:
+    parsed_sig = parsed_script(script_sig)
+    if parsed_sig.error is not None:
         return 0
 
     # The signature script must only push data to the stack for P2SH to be
     # a valid pair, so the signature operation count is 0 when that is not
     # the case.
-    if (not is_push_only(sig_pops)) or len(sig_pops) == 0:
+    sig_pops = parsed_sig.pops
+    if (not parsed_sig.is_push_only) or len(sig_pops) == 0:
         return 0
 
     # The P2SH script is the last item the signature script pushes to the
@@ -220,8 +196,7 @@ def get_precise_sig_op_count(script_sig, script_pub_key, bip16):
     # returns the parsed-up-to-error list of pops and the consensus rules
     # dictate signature operations are counted up to the first parse
     # failure.
-    sh_pops = parse_script_no_err(sh_script)
-    return get_sig_op_count_inner(sh_pops, precise=True)
+    return parsed_script(sh_script).precise_sig_op_count
 
 
 def get_witness_sig_op_count(sig_script, pk_script, witness) -> int:
@@ -233,12 +208,11 @@ def get_witness_sig_op_count(sig_script, pk_script, witness) -> int:
     # Next, we'll check the sigScript to see if this is a nested p2sh
     # witness program. This is a case wherein the sigScript is actually a
     # datapush of a p2wsh witness program.
-    try:
-        sig_pops = parse_script(sig_script)
-    except:
+    parsed_sig = parsed_script(sig_script)
+    if parsed_sig.error is not None:
         return 0
 
-    if is_pay_to_script_hash(pk_script) and is_push_only(sig_pops) and is_script_witness_program(sig_script[1:]):
+    if is_pay_to_script_hash(pk_script) and parsed_sig.is_push_only and is_script_witness_program(sig_script[1:]):
         return _get_witness_sig_op_count(sig_script[1:], witness)
 
     return 0
@@ -261,8 +235,7 @@ def _get_witness_sig_op_count(pk_script, witness) -> int:
             return 1
         elif len(witness_program) == payToWitnessScriptHashDataSize and len(witness) > 0:
             witness_script = witness[-1]
-            pops = parse_script_no_err(witness_script)
-            return get_sig_op_count_inner(pops, precise=True)
+            return parsed_script(witness_script).precise_sig_op_count
 
     return 0
 
@@ -281,6 +254,11 @@ def parse_script_template(script, opcodes):
     :return:
     """
 
+    # Scripts decoded with wire.BufferReader are views into the block buffer,
+    # parse an owned copy so the data pushes are plain bytes.
+    if type(script) is memoryview:
+        script = bytes(script)
+
     return_script = []
 
     i = 0
@@ -332,25 +310,179 @@ def parse_script_template(script, opcodes):
     return return_script
 
 
+# defaultScriptCacheEntries is the number of parsed scripts kept by
+# scriptCache.
+defaultScriptCacheEntries = 10000
+
+# maxCachedScriptSize is the size of the largest script kept by scriptCache,
+# the largest standard signature script.  Larger scripts are parsed every
+# time so a few of them can not take up the memory of the whole cache.
+maxCachedScriptSize = 1650
+
+
+# ParsedScript is a script parsed once along with the facts derived from its
+# opcodes that the standardness checks, signature operation counting and the
+# script engine ask for.  Each fact is computed the first time it is asked
+# for and kept with the script.
+#
+# pops are the parsed opcodes, up to the first parse failure when the script
+# is malformed, in which case error is the ScriptError parse_script raises.
+# ParsedScripts are shared by every caller through scriptCache, so pops is a
+# tuple, and neither it nor its opcodes may be modified.
+class ParsedScript:
+    __slots__ = ('script', 'pops', 'error', 'script_class', '_is_push_only', '_sig_op_count',
+                 '_precise_sig_op_count', '_witness_program_info')
+
+    def __init__(self, script):
+        """
+
+        :param bytes script:
+        """
+        self.script = script
+        self.error = None
+        try:
+            pops = parse_script_template(script, opcode_array)
+        except ScriptError as e:
+            pops = e.extra_data
+            self.error = ScriptError(c=e.c, desc=e.desc)
+        self.pops = tuple(pops)
+
+        # script_class is set by get_script_class the first time the script
+        # is classified.
+        self.script_class = None
+        self._is_push_only = None
+        self._sig_op_count = None
+        self._precise_sig_op_count = None
+        self._witness_program_info = None
+
+    # is_push_only returns whether the script parses and only pushes data.
+    @property
+    def is_push_only(self) -> bool:
+        if self._is_push_only is None:
+            self._is_push_only = self.error is None and is_push_only(self.pops)
+        return self._is_push_only
+
+    # is_pay_to_script_hash returns whether the script parses and is a
+    # pay-to-script-hash script.
+    @property
+    def is_pay_to_script_hash(self) -> bool:
+        return self.error is None and is_script_hash(self.pops)
+
+    # sig_op_count returns the number of signature operations of
+    # get_sig_op_count, counted up to the first parse failure.
+    @property
+    def sig_op_count(self) -> int:
+        if self._sig_op_count is None:
+            self._sig_op_count = get_sig_op_count_inner(self.pops, False)
+        return self._sig_op_count
+
+    # precise_sig_op_count returns the number of signature operations with
+    # multisig ops counted by their number of public keys, counted up to the
+    # first parse failure.
+    @property
+    def precise_sig_op_count(self) -> int:
+        if self._precise_sig_op_count is None:
+            self._precise_sig_op_count = get_sig_op_count_inner(self.pops, True)
+        return self._precise_sig_op_count
+
+    def _witness_info(self):
+        if self._witness_program_info is None:
+            # The length of the script must be between 4 and 42 bytes. The
+            # smallest program is the witness version, followed by a data
+            # push of 2 bytes.  The largest allowed witness program has a
+            # data push of 40-bytes.
+            if self.error is None and 4 <= len(self.script) <= 42 and is_pops_witness_program(self.pops):
+                self._witness_program_info = (as_small_int(self.pops[0].opcode), self.pops[1].data)
+            else:
+                self._witness_program_info = (None, None)
+        return self._witness_program_info
+
+    # witness_version returns the version of the witness program the script
+    # is, or None when it is not one.
+    @property
+    def witness_version(self):
+        return self._witness_info()[0]
+
+    # witness_program returns the program of the witness program the script
+    # is, or None when it is not one.
+    @property
+    def witness_program(self):
+        return self._witness_info()[1]
+
+
+# scriptCache is the cache of the scripts parsed by parse_script and the
+# helpers that inspect scripts, keyed by the script bytes.  Output scripts
+# are looked at many times over: by the standardness checks and signature
+# operation counting when their transaction is accepted, then again by the
+# engine and the counting when they are spent.
+scriptCache = ParseCache(ParsedScript, defaultScriptCacheEntries)
+
+
+# parsed_script returns the ParsedScript of script, from scriptCache unless
+# the script is too large to be kept.
+def parsed_script(script) -> ParsedScript:
+    if len(script) > maxCachedScriptSize:
+        return ParsedScript(bytes(script))
+    return scriptCache.parse(script)
+
+
 def parse_script_no_err(script):
-    try:
-        pops = parse_script_template(script, opcode_array)
-    except ScriptError as e:
-        pops = e.extra_data
-    return pops
+    return parsed_script(script).pops
 
 
+# parse_script returns the parsed opcodes of script as a tuple shared with the
+# other callers parsing the same script, which must not be modified.
 def parse_script(script):
-    return parse_script_template(script, opcode_array)
+    parsed = parsed_script(script)
+    if parsed.error is not None:
+        raise ScriptError(c=parsed.error.c, desc=parsed.error.desc, extra_data=list(parsed.pops))
+    return parsed.pops
+
+
+# pushedDataSlices returns the data pushed by every push opcode of the script,
+# OP_0 included, as slices of the script (views when it is a memoryview).  It
+# walks the raw script bytes without building a ParsedOpcode per opcode, for
+# callers that only want the pushes, such as bloom filter matching.  A
+# malformed push raises the same ErrMalformedPush parse_script does.
+def pushed_data_slices(script):
+    data = []
+    script_len = len(script)
+    i = 0
+    while i < script_len:
+        op = script[i]
+        if op <= OP_DATA_75:
+            start = i + 1
+            end = start + op
+        elif op == OP_PUSHDATA1:
+            start = i + 2
+            end = start + script[i + 1] if start <= script_len else start
+        elif op == OP_PUSHDATA2:
+            start = i + 3
+            end = start + int.from_bytes(script[i + 1:start], "little") if start <= script_len else start
+        elif op == OP_PUSHDATA4:
+            start = i + 5
+            end = start + int.from_bytes(script[i + 1:start], "little") if start <= script_len else start
+        else:
+            i += 1
+            continue
+
+        if start > script_len or end > script_len:
+            desc = "opcode {} pushes {} bytes, but script only has {} remaining".format(
+                opcode_array[op].name, end - start, script_len - i - 1)
+            raise ScriptError(c=ErrorCode.ErrMalformedPush, desc=desc)
+
+        data.append(script[start:end])
+        i = end
+
+    return data
 
 
 # IsUnspendable returns whether the passed public key script is unspendable, or
 # guaranteed to fail at execution.  This allows inputs to be pruned instantly
 # when entering the UTXO set.
 def is_unspendabe(pk_script) -> bool:
-    try:
-        pops = parse_script(pk_script)
-    except ScriptError:
+    parsed = parsed_script(pk_script)
+    if parsed.error is not None:
         return True
 
-    return len(pops) > 0 and pops[0].opcode.value == OP_RETURN
+    return len(parsed.pops) > 0 and parsed.pops[0].opcode.value == OP_RETURN
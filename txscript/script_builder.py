@@ -89,10 +89,10 @@ class ScriptBuilder:
     # AddOp pushes the passed opcode to the end of the script.  The script will not
     # be modified if pushing the opcode would cause the script to exceed the
     # maximum allowed script engine size.
-    def add_op(self, opcode: bytes()):
+    def add_op(self, opcode):
         """
 
-        :param byte opcode:
+        :param bytes|int opcode:
         :return:
         """
         # if self.err:
@@ -104,7 +104,10 @@ class ScriptBuilder:
             # self.err = ErrScriptNotCanonical(msg)
             # return self
 
+        if type(opcode) is int:
+            opcode = bytes([opcode])
         self.script += opcode
+        return self
 
     # AddOps pushes the passed opcode to the end of the script.  The script will not
     # be modified if pushing the opcode would cause the script to exceed the
@@ -125,6 +128,7 @@ class ScriptBuilder:
             # return self
 
         self.script += opcodes
+        return self
 
     # _add_data is the internal function that actually pushes the passed data to the
     # end of the script.  It automatically chooses canonical opcodes depending on
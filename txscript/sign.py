@@ -0,0 +1,116 @@
+import os
+import pyutil
+from .standard import *
+
+# signTxBatchChunkSize is the number of transactions signed per task when
+# sign_tx_batch spreads the work over a process pool.
+signTxBatchChunkSize = 16
+
+
+def _serialize_pub_key(priv_key, compress: bool) -> bytes:
+    point = priv_key.get_verifying_key().pubkey.point
+    x = point.x().to_bytes(32, 'big')
+    if compress:
+        return bytes([btcec.PubkeyCompressed | (point.y() & 1)]) + x
+    return bytes([btcec.PubkeyUncompressed]) + x + point.y().to_bytes(32, 'big')
+
+
+# RawTxInWitnessSignature returns the serialized ECDA signature for the input
+# idx of the given transaction, with the hashType appended to it. This
+# function is identical to RawTxInSignature, however the signature generated
+# signs a new sighash digest defined in BIP0143.
+def raw_tx_in_witness_signature(tx, sig_hashes, idx, amt, sub_script, hash_type, key) -> bytes:
+    hash = calc_witness_signature_hash(parse_script(sub_script), sig_hashes, hash_type, tx, idx, amt)
+    signature = btcec.sign_rfc6979(key.privkey.secret_multiplier, hash)
+    return signature.serialize() + bytes([hash_type])
+
+
+# WitnessSignature creates an input witness stack for tx to spend BTC sent
+# from a previous output to the owner of privKey using the p2wkh script
+# template. The passed transaction must contain all the inputs and outputs as
+# dictated by the passed hashType. The signature generated observes the new
+# transaction digest algorithm defined within BIP0143.
+def witness_signature(tx, sig_hashes, idx, amt, sub_script, hash_type, priv_key, compress) -> wire.TxWitness:
+    sig = raw_tx_in_witness_signature(tx, sig_hashes, idx, amt, sub_script, hash_type, priv_key)
+
+    # A witness script is actually a stack, so we return an array of byte
+    # slices here, rather than a single byte slice.
+    return wire.TxWitness([sig, _serialize_pub_key(priv_key, compress)])
+
+
+# RawTxInSignature returns the serialized ECDSA signature for the input idx of
+# the given transaction, with hashType appended to it.
+def raw_tx_in_signature(tx, idx, sub_script, hash_type, key) -> bytes:
+    hash = calc_signature_hash(parse_script(sub_script), hash_type, tx, idx)
+    signature = btcec.sign_rfc6979(key.privkey.secret_multiplier, hash)
+    return signature.serialize() + bytes([hash_type])
+
+
+# SignatureScript creates an input signature script for tx to spend BTC sent
+# from a previous output to the owner of privKey. tx must include all
+# transaction inputs and outputs, however txin scripts are allowed to be filled
+# or empty. The returned script is calculated to be used as the idx'th txin
+# sigscript for tx. subscript is the PkScript of the previous output being used
+# as the idx'th input. privKey is serialized in either a compressed or
+# uncompressed format based on compress. This format must match the same format
+# used to generate the payment address, or the script validation will fail.
+def signature_script(tx, idx, sub_script, hash_type, priv_key, compress) -> bytes:
+    sig = raw_tx_in_signature(tx, idx, sub_script, hash_type, priv_key)
+    pk_data = _serialize_pub_key(priv_key, compress)
+    return ScriptBuilder().add_data(sig).add_data(pk_data).script
+
+
+# _sign_tx returns the signature script and witness of each input of tx, which
+# spend the P2PKH or P2WPKH outputs given by inputs, a list of (pk_script,
+# amount, priv_key).  Whether a P2PKH public key is compressed is found from
+# the key hash of its script.  Any other script raises ErrUnsupportedAddress.
+def _sign_tx(tx, inputs, hash_type):
+    sig_hashes = None
+    results = []
+    for idx, (pk_script, amount, priv_key) in enumerate(inputs):
+        script_class = get_script_class(pk_script)
+        if script_class == ScriptClass.WitnessV0PubKeyHashTy:
+            if sig_hashes is None:
+                sig_hashes = TxSigHashes.from_msg_tx(tx)
+            witness = witness_signature(tx, sig_hashes, idx, amount, pk_script, hash_type, priv_key, True)
+            results.append((bytes(), witness))
+        elif script_class == ScriptClass.PubKeyHashTy:
+            compressed = _serialize_pub_key(priv_key, True)
+            compress = pk_script[3:23] == btcec.hash160(compressed)
+            sig_script = signature_script(tx, idx, pk_script, hash_type, priv_key, compress)
+            results.append((sig_script, wire.TxWitness()))
+        else:
+            desc = "unable to sign input %d spending a %s script" % (idx, script_class)
+            raise ScriptError(ErrorCode.ErrUnsupportedAddress, desc=desc)
+    return results
+
+
+def _sign_tx_chunk(chunk, hash_type):
+    return [_sign_tx(tx, inputs, hash_type) for tx, inputs in chunk]
+
+
+# sign_tx_batch signs every input of many transactions spending P2PKH and
+# P2WPKH outputs, setting their signature scripts and witnesses in place.
+# items is a list of (tx, inputs) where inputs gives (pk_script, amount,
+# priv_key) for each input of tx, in order.
+#
+# The signatures are the deterministic ones of raw_tx_in_signature and
+# raw_tx_in_witness_signature.  The transactions are signed in chunks over a
+# pool of worker processes (as many as the CPUs by default) when there are
+# enough of them for every worker to get some, and in place otherwise.
+def sign_tx_batch(items, hash_type=SigHashType.SigHashAll, workers: int = None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers < 2 or len(items) < 2 * signTxBatchChunkSize:
+        results = _sign_tx_chunk(items, hash_type)
+    else:
+        chunks = [items[i:i + signTxBatchChunkSize] for i in range(0, len(items), signTxBatchChunkSize)]
+        pool = pyutil.process_pool(workers)
+        results = [r for rs in pool.map(_sign_tx_chunk, chunks, [hash_type] * len(chunks)) for r in rs]
+
+    for (tx, _), tx_results in zip(items, results):
+        for tx_in, (sig_script, witness) in zip(tx.tx_ins, tx_results):
+            tx_in.signature_script = sig_script
+            tx_in.witness = witness
+    return
@@ -136,12 +136,22 @@ def type_of_script(pops) -> ScriptClass:
     return ScriptClass.NonStandardTy
 
 
+# GetScriptClass returns the class of the script passed.
+#
+# NonStandardTy will be returned when the script does not parse.
 def get_script_class(script: bytes):
-    try:
-        pops = parse_script(script)
-        return type_of_script(pops)
-    except:
-        return ScriptClass.NonStandardTy
+    return _parsed_script_class(parsed_script(script))
+
+
+# _parsed_script_class returns the class of a parsed script, which is worked
+# out the first time it is asked for and kept with it.
+def _parsed_script_class(parsed: ParsedScript) -> ScriptClass:
+    if parsed.script_class is None:
+        if parsed.error is not None:
+            parsed.script_class = ScriptClass.NonStandardTy
+        else:
+            parsed.script_class = type_of_script(parsed.pops)
+    return parsed.script_class
 
 
 def get_expected_inputs(pops, klass: ScriptClass):
@@ -378,18 +388,7 @@ def multi_sig_script(pub_keys, nrequired):
 # PushedData returns an array of byte slices containing any pushed data found
 # in the passed script.  This includes OP_0, but not OP_1 - OP_16.
 def pushed_data(script: bytes):
-    pops = parse_script(script)
-
-    data = []
-    for pop in pops:
-        if pop.data:
-            data.append(pop.data)
-        elif pop.opcode.value == OP_0:
-            data.append(bytes())
-        else:
-            pass
-
-    return data
+    return [bytes(data) for data in pushed_data_slices(script)]
 
 
 # ExtractPkScriptAddrs returns the type of script, addresses and required
@@ -400,12 +399,12 @@ def extract_pk_script_addrs(pk_script, chain_params):
     addrs = []
     required_sigs = 0
 
-    try:
-        pops = parse_script(pk_script)
-    except ScriptError:
+    parsed = parsed_script(pk_script)
+    if parsed.error is not None:
         return ScriptClass.NonStandardTy, [], 0
 
-    script_class = type_of_script(pops)
+    pops = parsed.pops
+    script_class = _parsed_script_class(parsed)
 
     if script_class == ScriptClass.PubKeyHashTy:
         # A pay-to-pubkey-hash script is of the form:
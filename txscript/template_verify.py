@@ -0,0 +1,246 @@
+import hashlib
+import btcec
+import chainhash
+from .standard import *
+
+# The template verifiers check inputs spending the standard script templates,
+# P2PKH, P2WPKH, P2SH-P2WPKH and P2WSH multisig, with straight-line code
+# doing the checks the engine does when it runs the scripts of the template:
+# the limits and minimal encoding of the pushes, the key or script hash, the
+# strict encoding of the signatures and public keys, the signature hash and
+# the signature itself.  This skips the opcode dispatch, stack operations and
+# script number conversions of the generic engine, which is most of the cost
+# of an input whose signature is in the signature cache.
+#
+# A verifier returns True only when every check passes, that is when the
+# engine would succeed.  When it returns False or raises, which includes any
+# script error, the input is run by the generic engine instead, so the errors
+# reported are always the engine's own.  Signatures verified or deferred by a
+# verifier are added to the signature cache, and to the deferred checks of the
+# engine, as the engine does.
+
+
+# _check_pushes returns whether the push opcodes of pops pass the checks the
+# engine makes when it executes them: they are not reserved, their data is
+# not too big, and they are minimal when the engine requires it.
+def _check_pushes(vm, pops) -> bool:
+    for pop in pops:
+        value = pop.opcode.value
+        if value > OP_16 or value == OP_RESERVED or len(pop.data) > MaxScriptElementSize:
+            return False
+        if vm.dstack.verify_minimal_data and value <= OP_PUSHDATA4:
+            pop.check_minimal_data_push()
+    return True
+
+
+# _witness_sig_hashes returns the midstate sighashes of the transaction for
+# BIP0143 signature hashes.
+def _witness_sig_hashes(vm):
+    if vm.hash_cache:
+        return vm.hash_cache
+    return TxSigHashes.from_msg_tx(vm.tx)
+
+
+# _parse_signature parses a signature without its hash type, strictly when
+# the engine requires DER signatures.
+def _parse_signature(vm, sig_bytes):
+    if vm.has_flag(ScriptVerifyStrictEncoding) or vm.has_flag(ScriptVerifyDERSignatures):
+        return derSigCache.parse(sig_bytes)
+    return btcec.parse_signature(sig_bytes, btcec.s256())
+
+
+# _check_sig makes the checks of opcodeCheckSig, executing pop, the final
+# OP_CHECKSIG of sub_script, over the signature full_sig_bytes and public key
+# pk_bytes, and returns whether the signature is valid.  Its verification is
+# deferred when the engine defers the checks of final opcodes.
+def _check_sig(vm, pop, full_sig_bytes, pk_bytes, sub_script) -> bool:
+    if len(full_sig_bytes) < 1:
+        return False
+
+    hash_type = full_sig_bytes[-1]
+    sig_bytes = full_sig_bytes[:-1]
+    vm.check_hash_type_encoding(hash_type)
+    vm.check_signature_encoding(sig_bytes)
+    vm.check_pub_key_encoding(pk_bytes)
+
+    if vm.is_witness_version_active(version=0):
+        hash = calc_witness_signature_hash(sub_script, _witness_sig_hashes(vm), hash_type,
+                                           vm.tx, vm.tx_idx, vm.input_amount)
+    else:
+        sub_script = remove_opcode_by_data(sub_script, full_sig_bytes)
+        hash = calc_signature_hash(sub_script, hash_type, vm.tx, vm.tx_idx)
+
+    pub_key = pubKeyCache.parse(pk_bytes)
+    signature = _parse_signature(vm, sig_bytes)
+
+    sig_hash = chainhash.Hash(hash)
+    if vm.sig_cache and vm.sig_cache.exists(sig_hash, signature, pub_key):
+        return True
+    if vm.defer_sig_check(pop, sig_hash, signature, pub_key, sig_bytes, final=True):
+        return True
+    if signature.verify(hash, pub_key):
+        if vm.sig_cache:
+            vm.sig_cache.add(sig_hash, signature, pub_key)
+        return True
+    return False
+
+
+# _verify_witness_pub_key_hash verifies the witness of an input spending a
+# version 0 witness program of a public key hash, which runs as the P2PKH
+# script of the key hash with the witness as its stack.
+def _verify_witness_pub_key_hash(vm) -> bool:
+    witness = vm.tx.tx_ins[vm.tx_idx].witness
+    if len(witness) != 2:
+        return False
+
+    sig, pk = witness[0], witness[1]
+    if len(sig) > MaxScriptElementSize or len(pk) > MaxScriptElementSize:
+        return False
+
+    if btcec.hash160(pk) != vm.witness_program:
+        return False
+
+    pk_pops = parse_script(pay_to_pub_key_hash_script(vm.witness_program))
+    return _check_sig(vm, pk_pops[4], sig, pk, pk_pops)
+
+
+# verify_pay_to_pub_key_hash verifies an input spending a P2PKH script:
+#   <sig> <pubkey> | OP_DUP OP_HASH160 <hash> OP_EQUALVERIFY OP_CHECKSIG
+def verify_pay_to_pub_key_hash(vm) -> bool:
+    sig_pops, pk_pops = vm.scripts[0], vm.scripts[1]
+    if len(sig_pops) != 2 or any(pop.opcode.value > OP_PUSHDATA4 for pop in sig_pops) or \
+            not _check_pushes(vm, sig_pops):
+        return False
+
+    sig, pk = sig_pops[0].data, sig_pops[1].data
+    if btcec.hash160(pk) != pk_pops[2].data:
+        return False
+
+    return _check_sig(vm, pk_pops[4], sig, pk, pk_pops)
+
+
+# verify_pay_to_witness_pub_key_hash verifies an input spending a P2WPKH
+# script:
+#   witness: <sig> <pubkey> | OP_0 <hash>
+def verify_pay_to_witness_pub_key_hash(vm) -> bool:
+    return _verify_witness_pub_key_hash(vm)
+
+
+# verify_nested_witness_pub_key_hash verifies an input spending a P2WPKH
+# script nested in a P2SH one:
+#   witness: <sig> <pubkey> | <OP_0 <hash>> | OP_HASH160 <script hash> OP_EQUAL
+def verify_nested_witness_pub_key_hash(vm) -> bool:
+    # The engine made sure the signature script is a single canonical push
+    # of the witness program.
+    redeem_script = vm.scripts[0][0].data
+    if btcec.hash160(redeem_script) != vm.scripts[1][1].data:
+        return False
+
+    return _verify_witness_pub_key_hash(vm)
+
+
+# verify_witness_multi_sig verifies an input spending a P2WSH script whose
+# witness script is a standard multisig script:
+#   witness: <> <sig> ... <m <pubkey> ... n OP_CHECKMULTISIG> | OP_0 <hash>
+def verify_witness_multi_sig(vm) -> bool:
+    witness = vm.tx.tx_ins[vm.tx_idx].witness
+    if len(witness) == 0:
+        return False
+
+    witness_script = witness[-1]
+    if len(witness_script) > MaxScriptSize or hashlib.sha256(witness_script).digest() != vm.witness_program:
+        return False
+
+    stack = witness[:-1]
+    if any(len(item) > MaxScriptElementSize for item in stack):
+        return False
+
+    pops = parse_script(witness_script)
+    if not _check_pushes(vm, pops[:-1]):
+        return False
+
+    # The dummy and the signatures must be all that is on the stack, for it
+    # to be clean once OP_CHECKMULTISIG has replaced them with its result.
+    num_signatures = as_small_int(pops[0].opcode)
+    num_pub_keys = as_small_int(pops[-2].opcode)
+    if num_signatures > num_pub_keys or len(stack) != num_signatures + 1:
+        return False
+
+    if vm.has_flag(ScriptStrictMultiSig) and len(stack[0]) != 0:
+        return False
+
+    # The keys and signatures in the order opcodeCheckMultiSig pops them.
+    pub_keys = [pop.data for pop in reversed(pops[1:-2])]
+    signatures = list(reversed(stack[1:]))
+    parsed_signatures = {}
+    sig_hashes = _witness_sig_hashes(vm)
+
+    # Match the signatures to the keys as opcodeCheckMultiSig does.
+    signature_idx = 0
+    for pub_key_idx, pk_bytes in enumerate(pub_keys):
+        if num_signatures - signature_idx == 0:
+            return True
+        if num_signatures - signature_idx > num_pub_keys - pub_key_idx:
+            return False
+
+        raw_sig = signatures[signature_idx]
+        if len(raw_sig) == 0:
+            continue
+
+        hash_type = raw_sig[-1]
+        if signature_idx not in parsed_signatures:
+            vm.check_hash_type_encoding(hash_type)
+            vm.check_signature_encoding(raw_sig[:-1])
+            try:
+                parsed_signatures[signature_idx] = _parse_signature(vm, raw_sig[:-1])
+            except Exception:
+                parsed_signatures[signature_idx] = None
+        signature = parsed_signatures[signature_idx]
+        if signature is None:
+            continue
+
+        vm.check_pub_key_encoding(pk_bytes)
+        try:
+            pub_key = pubKeyCache.parse(pk_bytes)
+        except Exception:
+            continue
+
+        hash = calc_witness_signature_hash(pops, sig_hashes, hash_type, vm.tx, vm.tx_idx, vm.input_amount)
+        if vm.sig_cache:
+            sig_hash = chainhash.Hash(hash)
+            valid = vm.sig_cache.exists(sig_hash, signature, pub_key)
+            if not valid and signature.verify(hash, pub_key):
+                vm.sig_cache.add(sig_hash, signature, pub_key)
+                valid = True
+        else:
+            valid = signature.verify(hash, pub_key)
+
+        if valid:
+            signature_idx += 1
+
+    return signature_idx == num_signatures
+
+
+# template_verifier returns the verifier of the standard template the input
+# the engine vm is set up to run spends, or None when it is not one and the
+# generic engine must run it.
+def template_verifier(vm, script_pub_key):
+    script_class = get_script_class(script_pub_key)
+    if script_class == ScriptClass.PubKeyHashTy:
+        return verify_pay_to_pub_key_hash
+
+    if not vm.is_witness_version_active(version=0):
+        return None
+
+    if script_class == ScriptClass.WitnessV0PubKeyHashTy:
+        return verify_pay_to_witness_pub_key_hash
+
+    if script_class == ScriptClass.ScriptHashTy and len(vm.witness_program) == payToWitnessPubKeyHashDataSize:
+        return verify_nested_witness_pub_key_hash
+
+    if script_class == ScriptClass.WitnessV0ScriptHashTy:
+        witness = vm.tx.tx_ins[vm.tx_idx].witness
+        if len(witness) > 0 and get_script_class(witness[-1]) == ScriptClass.MultiSigTy:
+            return verify_witness_multi_sig
+
+    return None
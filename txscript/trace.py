@@ -0,0 +1,129 @@
+import logging
+from .standard import *
+
+_logger = logging.getLogger(__name__)
+
+
+# TraceStep describes a step of the script engine to a trace hook: the
+# program counter of the opcode executed, the opcode and the time executing
+# it took.  The stacks are those left by the step, copied out of the engine
+# only when asked for.
+class TraceStep:
+    __slots__ = ('vm', 'script_idx', 'script_off', 'elapsed')
+
+    def __init__(self, vm, script_idx, script_off, elapsed):
+        """
+
+        :param Engine vm:
+        :param int script_idx:
+        :param int script_off:
+        :param float elapsed: seconds
+        """
+        self.vm = vm
+        self.script_idx = script_idx
+        self.script_off = script_off
+        self.elapsed = elapsed
+
+    @property
+    def opcode(self):
+        return self.vm.scripts[self.script_idx][self.script_off]
+
+    @property
+    def dstack(self):
+        return self.vm.get_stack()
+
+    @property
+    def astack(self):
+        return self.vm.get_alt_stack()
+
+    def disasm(self) -> str:
+        return self.vm.disasm(self.script_idx, self.script_off)
+
+
+# log_trace is a trace hook logging every step of the engine at debug level,
+# with the stacks it leaves.
+def log_trace(step: TraceStep):
+    if not _logger.isEnabledFor(logging.DEBUG):
+        return
+
+    dstr = ""
+    astr = ""
+    if step.vm.dstack.depth() != 0:
+        dstr = "Stack:\n" + str(step.vm.dstack)
+    if step.vm.astack.depth() != 0:
+        astr = "Atack:\n" + str(step.vm.astack)
+    _logger.debug("stepping %s\n%s" % (step.disasm(), dstr + astr))
+
+
+# OpcodeProfile is the number of times something was executed and the time
+# spent executing it.
+class OpcodeProfile:
+    __slots__ = ('count', 'time')
+
+    def __init__(self, count=None, time=None):
+        """
+
+        :param int count:
+        :param float time: seconds
+        """
+        self.count = count or 0
+        self.time = time or 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.time += elapsed
+
+
+# OpcodeProfiler is a trace hook counting the opcodes the engine executes and
+# the time they take, by opcode and by the class of the public key script
+# of the input being verified.  Pass it as the trace of the engines to
+# profile:
+#
+#   profiler = OpcodeProfiler()
+#   vm = new_engine(..., trace=profiler)
+#   vm.execute()
+#   print(profiler.report())
+class OpcodeProfiler:
+    def __init__(self):
+        # opcodes maps the name of an opcode to its profile.
+        self.opcodes = {}
+
+        # script_classes maps a ScriptClass to the profile of the opcodes
+        # executed verifying inputs spending scripts of the class.
+        self.script_classes = {}
+
+        # The engine of the last step and the class of its public key script.
+        self._vm = None
+        self._script_class = None
+
+    def __call__(self, step: TraceStep):
+        if step.vm is not self._vm:
+            self._vm = step.vm
+            self._script_class = type_of_script(step.vm.scripts[1])
+
+        name = step.opcode.opcode.name
+        profile = self.opcodes.get(name)
+        if profile is None:
+            profile = self.opcodes[name] = OpcodeProfile()
+        profile.add(step.elapsed)
+
+        profile = self.script_classes.get(self._script_class)
+        if profile is None:
+            profile = self.script_classes[self._script_class] = OpcodeProfile()
+        profile.add(step.elapsed)
+
+    def reset(self):
+        self.opcodes = {}
+        self.script_classes = {}
+        self._vm = None
+        self._script_class = None
+
+    # report returns the profiles as a table, most time consuming first.
+    def report(self) -> str:
+        lines = []
+        for title, profiles in (("opcode", self.opcodes), ("script class", self.script_classes)):
+            lines.append("%-24s %10s %12s %10s" % (title, "count", "total ms", "us/op"))
+            for key, profile in sorted(profiles.items(), key=lambda item: item[1].time, reverse=True):
+                lines.append("%-24s %10d %12.3f %10.2f" % (key, profile.count, profile.time * 1e3,
+                                                          profile.time / profile.count * 1e6))
+        return "\n".join(lines)
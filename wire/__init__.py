@@ -1,17 +1,28 @@
+from .block_skim import *
 from .blockheader import *
 from .common import *
 from .error import *
 from .invvect import *
 from .message import *
+from .message_io import *
 from .msg_addr import *
 from .msg_alert import *
 from .msg_block import *
+from .msg_cfcheckpt import *
+from .msg_cfheaders import *
+from .msg_cfilter import *
+from .msg_blocktxn import *
+from .msg_cmpctblock import *
 from .msg_feefilter import *
 from .msg_filteradd import *
 from .msg_filterclear import *
 from .msg_filterload import *
 from .msg_getaddr import *
 from .msg_getblocks import *
+from .msg_getblocktxn import *
+from .msg_getcfcheckpt import *
+from .msg_getcfheaders import *
+from .msg_getcfilters import *
 from .msg_getdata import *
 from .msg_getheaders import *
 from .msg_headers import *
@@ -22,6 +33,7 @@ from .msg_notfound import *
 from .msg_ping import *
 from .msg_pong import *
 from .msg_reject import *
+from .msg_sendcmpct import *
 from .msg_sendheaders import *
 from .msg_tx import *
 from .msg_verack import *
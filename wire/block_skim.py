@@ -0,0 +1,213 @@
+import array
+import hashlib
+import struct
+from .common import _uint16, _uint32, _uint64
+from .msg_block import *
+
+# skimHeaderLen is the length of the block header in front of the
+# transaction count of a serialized block.
+skimHeaderLen = blockHeaderLen
+
+
+# BlockSkim is the result of skim_block: the parts of a serialized block that
+# indexers and the utxo view need (txids, wtxids, spent outpoints and output
+# scripts) laid out in flat arrays, without building a MsgBlock.
+#
+# Transaction i owns the inputs tx_in_starts[i]:tx_in_starts[i+1] and the
+# outputs tx_out_starts[i]:tx_out_starts[i+1].  Hashes are stored 32 bytes per
+# entry in txids, wtxids and prev_hashes; input and output scripts are kept as
+# offset and length into buf.
+class BlockSkim:
+    def __init__(self, buf):
+        self.buf = memoryview(buf)
+        self.header = bytes(self.buf[:skimHeaderLen])
+
+        # Per transaction.
+        self.txids = bytearray()
+        self.wtxids = bytearray()
+        self.tx_offsets = array.array('I')
+        self.tx_lens = array.array('I')
+        self.tx_in_starts = array.array('I', [0])
+        self.tx_out_starts = array.array('I', [0])
+
+        # Per input.
+        self.prev_hashes = bytearray()
+        self.prev_indexes = array.array('I')
+        self.in_script_offsets = array.array('I')
+        self.in_script_lens = array.array('I')
+
+        # Per output.
+        self.out_values = array.array('Q')
+        self.out_script_offsets = array.array('I')
+        self.out_script_lens = array.array('I')
+
+    def num_txs(self):
+        return len(self.tx_offsets)
+
+    def num_tx_ins(self):
+        return len(self.prev_indexes)
+
+    def num_tx_outs(self):
+        return len(self.out_values)
+
+    def block_hash(self):
+        return double_hash_h(self.header)
+
+    def tx_hash(self, tx_idx):
+        return Hash(bytes(self.txids[tx_idx * HashSize:(tx_idx + 1) * HashSize]))
+
+    def tx_witness_hash(self, tx_idx):
+        return Hash(bytes(self.wtxids[tx_idx * HashSize:(tx_idx + 1) * HashSize]))
+
+    def tx_loc(self, tx_idx):
+        return TxLoc(tx_start=self.tx_offsets[tx_idx], tx_len=self.tx_lens[tx_idx])
+
+    def tx_locs(self):
+        return [TxLoc(tx_start=start, tx_len=length) for start, length in zip(self.tx_offsets, self.tx_lens)]
+
+    def tx_in_range(self, tx_idx):
+        return range(self.tx_in_starts[tx_idx], self.tx_in_starts[tx_idx + 1])
+
+    def tx_out_range(self, tx_idx):
+        return range(self.tx_out_starts[tx_idx], self.tx_out_starts[tx_idx + 1])
+
+    def prev_out_point(self, in_idx):
+        return OutPoint(hash=Hash(bytes(self.prev_hashes[in_idx * HashSize:(in_idx + 1) * HashSize])),
+                        index=self.prev_indexes[in_idx])
+
+    # in_script returns a view of the signature script of the input, in buf.
+    def in_script(self, in_idx):
+        offset = self.in_script_offsets[in_idx]
+        return self.buf[offset:offset + self.in_script_lens[in_idx]]
+
+    # out_script returns a view of the public key script of the output, in buf.
+    def out_script(self, out_idx):
+        offset = self.out_script_offsets[out_idx]
+        return self.buf[offset:offset + self.out_script_lens[out_idx]]
+
+
+# _skim_var_int reads a variable length integer at pos of buf and returns it along
+# with the position after it, with the same canonical encoding rules as
+# read_var_int.
+def _skim_var_int(buf, pos):
+    discriminant = buf[pos]
+    if discriminant < 0xfd:
+        return discriminant, pos + 1
+
+    if discriminant == 0xfd:
+        rv = _uint16.unpack_from(buf, pos + 1)[0]
+        min, pos = 0xfd, pos + 3
+    elif discriminant == 0xfe:
+        rv = _uint32.unpack_from(buf, pos + 1)[0]
+        min, pos = 0x10000, pos + 5
+    else:
+        rv = _uint64.unpack_from(buf, pos + 1)[0]
+        min, pos = 0x100000000, pos + 9
+
+    if rv < min:
+        raise NonCanonicalVarIntErr()
+    return rv, pos
+
+
+def _skim_tx(skim, buf, pos):
+    buf_len = len(buf)
+    start = pos
+    pos += 4
+
+    count, pos = _skim_var_int(buf, pos)
+    has_witness = False
+    if count == 0:
+        if buf[pos] != 0x01:
+            raise WitnessTxFlagByteMsgErr
+        has_witness = True
+        count, pos = _skim_var_int(buf, pos + 1)
+
+    if count > maxTxInPerMessage:
+        raise MaxTxInPerMessageMsgErr
+
+    prev_hashes = skim.prev_hashes
+    prev_indexes = skim.prev_indexes
+    in_script_offsets = skim.in_script_offsets
+    in_script_lens = skim.in_script_lens
+    for _ in range(count):
+        prev_hashes += buf[pos:pos + HashSize]
+        prev_indexes.append(_uint32.unpack_from(buf, pos + HashSize)[0])
+        script_len, pos = _skim_var_int(buf, pos + HashSize + 4)
+        if script_len > MaxMessagePayload:
+            raise ReadScriptTooLongMsgErr("transaction input signature script")
+        in_script_offsets.append(pos)
+        in_script_lens.append(script_len)
+        pos += script_len + 4
+    num_ins = count
+
+    count, pos = _skim_var_int(buf, pos)
+    if count > maxTxOutPerMessage:
+        raise MaxTxOutPerMessageMsgErr
+
+    out_values = skim.out_values
+    out_script_offsets = skim.out_script_offsets
+    out_script_lens = skim.out_script_lens
+    for _ in range(count):
+        out_values.append(_uint64.unpack_from(buf, pos)[0])
+        script_len, pos = _skim_var_int(buf, pos + 8)
+        if script_len > MaxMessagePayload:
+            raise ReadScriptTooLongMsgErr("transaction output public key script")
+        out_script_offsets.append(pos)
+        out_script_lens.append(script_len)
+        pos += script_len
+    outs_end = pos
+
+    if has_witness:
+        for _ in range(num_ins):
+            count, pos = _skim_var_int(buf, pos)
+            if count > maxWitnessItemsPerInput:
+                raise MaxWitnessItemsPerInputMsgErr
+            for _ in range(count):
+                item_len, pos = _skim_var_int(buf, pos)
+                if item_len > maxWitnessItemSize:
+                    raise ReadScriptTooLongMsgErr("script witness item")
+                pos += item_len
+
+    pos += 4
+    if pos > buf_len:
+        raise UnexpectedEOFMsgErr
+
+    if has_witness:
+        h = hashlib.sha256(buf[start:start + 4])
+        h.update(buf[start + 6:outs_end])
+        h.update(buf[pos - 4:pos])
+        txid = hashlib.sha256(h.digest()).digest()
+        wtxid = double_hash_b(buf[start:pos])
+    else:
+        txid = wtxid = double_hash_b(buf[start:pos])
+
+    skim.txids += txid
+    skim.wtxids += wtxid
+    skim.tx_offsets.append(start)
+    skim.tx_lens.append(pos - start)
+    skim.tx_in_starts.append(len(prev_indexes))
+    skim.tx_out_starts.append(len(out_values))
+    return pos
+
+
+# SkimBlock scans a serialized block (with witness data) in a single pass and
+# returns a BlockSkim holding its txids, wtxids, spent outpoints and output
+# scripts.  It applies the same limits as MsgBlock.deserialize, but builds no
+# per transaction, input or output objects.
+def skim_block(buf) -> BlockSkim:
+    skim = BlockSkim(buf)
+    buf = skim.buf
+    if len(buf) < skimHeaderLen:
+        raise UnexpectedEOFMsgErr
+
+    try:
+        tx_count, pos = _skim_var_int(buf, skimHeaderLen)
+        if tx_count > maxTxPerBlock:
+            raise MaxTxPerBlockMsgErr
+
+        for _ in range(tx_count):
+            pos = _skim_tx(skim, buf, pos)
+    except (IndexError, struct.error):
+        raise UnexpectedEOFMsgErr
+
+    return skim
@@ -1,7 +1,9 @@
 import io
+import struct
 import time
 import pyutil
 from chainhash.hashfuncs import *
+from chainhash.sha256 import sha256BlockSize, midstate, finish
 from .common import *
 
 # MaxBlockHeaderPayload is the maximum number of bytes a block header can be.
@@ -13,10 +15,24 @@ MaxBlockHeaderPayload = 16 + (HashSize * 2)
 # header.
 blockHeaderLen = 80
 
+# blockHeaderLayout is the precompiled layout of a serialized block header:
+# version, prev_block, merkle_root, timestamp, bits and nonce.
+blockHeaderLayout = struct.Struct("<I32s32sIII")
+
+# blockHeaderTailLayout is the precompiled layout of the last 16 bytes of a
+# serialized block header, after the 64 bytes SHA-256 block its midstate is
+# computed from: the end of merkle_root, timestamp, bits and nonce.
+blockHeaderTailLayout = struct.Struct("<4sIII")
+
 
 # BlockHeader defines information about a block and is used in the bitcoin
 # block (MsgBlock) and headers (MsgHeaders) messages.
 class BlockHeader:
+    # The key (version, prev_block and merkle_root) and SHA-256 midstate of
+    # the first 64 bytes of the serialized header, cached by hash_with_nonce.
+    _midstate_key = None
+    _midstate = None
+
     def __init__(self, version=None, prev_block=None, merkle_root=None, timestamp=None, bits=None, nonce=None):
         """
 
@@ -60,9 +76,23 @@ class BlockHeader:
 
         # Encode the header and double sha256 everything prior to the number of
         # transactions.
-        s = io.BytesIO()
-        write_block_header(s, pver=0, bh=self)
-        return double_hash_h(s.getvalue())
+        return double_hash_h(pack_block_header(self))
+
+    def hash_with_nonce(self, nonce: int) -> Hash:
+        """HashWithNonce computes the block identifier hash of the header with the
+        given nonce in place of its own.
+
+        The SHA-256 midstate of the first 64 bytes of the header, which only
+        depend on the version, previous block and merkle root, is computed once
+        and reused while those stay the same, so trying nonces (or timestamps)
+        only hashes the last 16 bytes."""
+        key = (self.version, self.prev_block, self.merkle_root)
+        if key != self._midstate_key:
+            self._midstate = midstate(pack_block_header(self)[:sha256BlockSize])
+            self._midstate_key = key
+
+        return Hash(finish(self._midstate, blockHeaderTailLayout.pack(
+            self.merkle_root[28:], self.timestamp, self.bits, nonce)))
 
     def btc_encode(self, s, pver, enc):
         write_block_header(s, pver, self)
@@ -71,48 +101,39 @@ class BlockHeader:
     # TOCHECK this btc_decode use return value , not change self structure
     # Also ,this class doesn't inherit class `Message`
     def btc_decode(self, s, pver, enc):
-        self.version = read_element(s, "int32")
-        self.prev_block = read_element(s, "chainhash.Hash")
-        self.merkle_root = read_element(s, "chainhash.Hash")
-        self.timestamp = read_element(s, "uint32Time")
-        self.bits = read_element(s, "uint32")
-        self.nonce = read_element(s, "uint32")
+        self._unpack(s.read(blockHeaderLen))
         return
 
+    def _unpack(self, buf):
+        version, prev_block, merkle_root, timestamp, bits, nonce = blockHeaderLayout.unpack(buf)
+        self.version = version
+        self.prev_block = Hash(prev_block)
+        self.merkle_root = Hash(merkle_root)
+        self.timestamp = timestamp
+        self.bits = bits
+        self.nonce = nonce
+
     def serialize(self, s):
         write_block_header(s, 0, self)
         return
 
     def deserialize(self, s):
-        self.version = read_element(s, "int32")
-        self.prev_block = read_element(s, "chainhash.Hash")
-        self.merkle_root = read_element(s, "chainhash.Hash")
-        self.timestamp = read_element(s, "uint32Time")
-        self.bits = read_element(s, "uint32")
-        self.nonce = read_element(s, "uint32")
+        self._unpack(s.read(blockHeaderLen))
         return
 
 
 def read_block_header(s, pver):
-    version = read_element(s, "int32")
-    prev_block = read_element(s, "chainhash.Hash")
-    merkle_root = read_element(s, "chainhash.Hash")
-    timestamp = read_element(s, "uint32Time")
-    bits = read_element(s, "uint32")
-    nonce = read_element(s, "uint32")
-    return BlockHeader(version=version,
-                       prev_block=prev_block,
-                       merkle_root=merkle_root,
-                       timestamp=timestamp,
-                       bits=bits,
-                       nonce=nonce)
+    bh = BlockHeader.__new__(BlockHeader)
+    bh._unpack(s.read(blockHeaderLen))
+    return bh
+
+
+def pack_block_header(bh: BlockHeader) -> bytes:
+    """Return the 80 bytes serialized form of the block header."""
+    return blockHeaderLayout.pack(bh.version, bh.prev_block.to_bytes(), bh.merkle_root.to_bytes(),
+                                  bh.timestamp, bh.bits, bh.nonce)
 
 
 def write_block_header(s, pver, bh: BlockHeader):
-    write_element(s, "int32", bh.version)
-    write_element(s, "chainhash.Hash", bh.prev_block)
-    write_element(s, "chainhash.Hash", bh.merkle_root)
-    write_element(s, "uint32Time", bh.timestamp)
-    write_element(s, "uint32", bh.bits)
-    write_element(s, "uint32", bh.nonce)
+    s.write(pack_block_header(bh))
     return
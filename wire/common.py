@@ -1,5 +1,6 @@
 import logging
 import random
+import struct
 from .message import *
 from .error import *
 
@@ -8,10 +9,6 @@ _logger = logging.Logger(__name__)
 # MaxVarIntPayload is the maximum payload size for a variable length integer.
 MaxVarIntPayload = 9
 
-# TOADD add the fast dispatch. see origin binaryFreeList
-
-
-
 BigEndian = "big"
 LittleEndian = "little"
 
@@ -47,6 +44,104 @@ def write_variable_bytes_from_integer(s, bytes_len, val, byteorder=LittleEndian)
     s.write(val.to_bytes(bytes_len, byteorder=byteorder))  # TOCHECK
 
 
+# Precompiled little-endian layouts for the fixed size elements.  Decoding
+# goes through a dict of reader/writer functions keyed by element type instead
+# of comparing the type string against every supported type in turn.
+_uint8 = struct.Struct("<B")
+_uint16 = struct.Struct("<H")
+_uint32 = struct.Struct("<I")
+_uint64 = struct.Struct("<Q")
+
+
+def _read_uint8(s):
+    return _uint8.unpack(s.read(1))[0]
+
+
+def _read_uint16(s):
+    return _uint16.unpack(s.read(2))[0]
+
+
+def _read_uint32(s):
+    return _uint32.unpack(s.read(4))[0]
+
+
+def _read_uint64(s):
+    return _uint64.unpack(s.read(8))[0]
+
+
+def _read_bool(s):
+    return _read_uint8(s) != 0x00
+
+
+def _read_hash(s):
+    return Hash(bytes(s.read(HashSize)))
+
+
+def _write_uint8(s, element):
+    s.write(_uint8.pack(element))
+
+
+def _write_uint32(s, element):
+    s.write(_uint32.pack(element))
+
+
+def _write_uint64(s, element):
+    s.write(_uint64.pack(element))
+
+
+def _write_bool(s, element):
+    s.write(b'\x01' if element else b'\x00')
+
+
+def _write_raw(s, element):
+    s.write(element)
+
+
+# Notice, the time types are not like origin, they are just int, not the type timestamp
+# Notice, int32 and int64 are read as unsigned, same as the int.from_bytes the codec used before.
+_element_readers = {
+    "uint8": _read_uint8,
+    "int32": _read_uint32,
+    "uint32": _read_uint32,
+    "int64": _read_uint64,
+    "uint64": _read_uint64,
+    "bool": _read_bool,
+    "uint32Time": _read_uint32,
+    "int64Time": _read_uint64,
+    "[4]byte": lambda s: s.read(4),  # TOCHANGE, this is a golang mark, maybe more common?
+    "[CommandSize]uint8": lambda s: s.read(CommandSize),
+    "[16]byte": lambda s: s.read(16),
+    "chainhash.Hash": _read_hash,
+    "ServiceFlag": lambda s: ServiceFlag.from_int(_read_uint64(s)),
+    "services": lambda s: Services(ServiceFlag.from_int(_read_uint64(s))),
+    "InvType": lambda s: InvType.from_int(_read_uint32(s)),
+    "BitcoinNet": lambda s: BitcoinNet.from_int(_read_uint32(s)),
+    "BloomUpdateType": lambda s: BloomUpdateType(_read_uint8(s)),
+    "RejectCode": lambda s: RejectCode.from_int(_read_uint8(s)),
+}
+
+_element_writers = {
+    "uint8": _write_uint8,
+    "int32": _write_uint32,
+    "uint32": _write_uint32,
+    "int64": _write_uint64,
+    "uint64": _write_uint64,
+    "bool": _write_bool,
+    "uint32Time": _write_uint32,
+    "int64Time": _write_uint64,
+    "[4]byte": _write_raw,
+    "[CommandSize]uint8": _write_raw,
+    "[16]byte": _write_raw,
+    "chainhash.Hash": lambda s, element: s.write(element.to_bytes()),
+    "ServiceFlag": lambda s, element: _write_uint64(s, element.value[0]),
+    "services": lambda s, element: _write_uint64(s, element.value),
+    "InvType": lambda s, element: _write_uint32(s, element.value[0]),
+    "BitcoinNet": lambda s, element: _write_uint32(s, element.value[0]),
+    "BloomUpdateType": lambda s, element: _write_uint8(s, element.value),
+    "RejectCode": lambda s, element: _write_uint8(s, element.value[0]),
+}
+
+
 def read_element(s, element_type):
     # The origin method accepts element,and dispatch how to read by the type of element,
     # after that, it change the value of element passed as params
@@ -59,116 +154,20 @@ def read_element(s, element_type):
     # Notice, the return value is not exactly the same as element_type required,
     # since python is weak typed
     # So, the next operation after read_element may also need it's element_type
-
-    if element_type == "int32":
-        return read_variable_bytes_as_integer(s, 4, LittleEndian)
-    elif element_type == "uint32":
-        return read_variable_bytes_as_integer(s, 4, LittleEndian)
-    elif element_type == "int64":
-        return read_variable_bytes_as_integer(s, 8, LittleEndian)
-    elif element_type == "uint64":
-        return read_variable_bytes_as_integer(s, 8, LittleEndian)
-    elif element_type == "bool":
-        rv = read_variable_bytes_as_integer(s, 1)
-        if rv == 0x00:
-            return False
-        else:
-            return True
-    elif element_type == "uint32Time":
-        # Notice, here don't like origin, I just return the int, not the type timestamp
-        return read_variable_bytes_as_integer(s, 4, LittleEndian)
-    elif element_type == "int64Time":
-        # Notice, here don't like origin, I just return the int, not the type timestamp
-        return read_variable_bytes_as_integer(s, 8, LittleEndian)
-    elif element_type == "[4]byte":  # TOCHANGE, this is a golang mark, maybe more common?
-        return read_variable_bytes(s, 4)
-    elif element_type == "[CommandSize]uint8":  # TOCHANGE, this is a golang mark, maybe more common?
-        return read_variable_bytes(s, CommandSize)
-    elif element_type == "[16]byte":
-        return read_variable_bytes(s, 16)
-    # elif element_type == "ipv6":
-    #     b = read_variable_bytes(s, 16)
-    #     # convert to ipaddress.ipv6
-    #     return ipaddress.ip_address(b)
-    elif element_type == "chainhash.Hash":
-        return Hash(read_variable_bytes(s, HashSize))
-    elif element_type == "ServiceFlag":
-        return ServiceFlag.from_int(read_variable_bytes_as_integer(s, 8, LittleEndian))
-    elif element_type == "services":
-        return Services(ServiceFlag.from_int(read_variable_bytes_as_integer(s, 8, LittleEndian)))
-    elif element_type == "InvType":
-        return InvType.from_int(read_variable_bytes_as_integer(s, 4, LittleEndian))
-    elif element_type == "BitcoinNet":
-        return BitcoinNet.from_int(read_variable_bytes_as_integer(s, 4, LittleEndian))
-
-    elif element_type == "BloomUpdateType":
-        return BloomUpdateType(read_variable_bytes_as_integer(s, 1, LittleEndian))
-
-    elif element_type == "RejectCode":
-        return RejectCode.from_int(read_variable_bytes_as_integer(s, 1, LittleEndian))
-    else:
+    reader = _element_readers.get(element_type)
+    if reader is None:
         _logger.info("Notice,in read_element, I don't know what to do here.")
         return s.read()
-
-
-# def read_elements(s, elements):
-#     pass
+    return reader(s)
 
 
 def write_element(s, element_type, element):
-    if element_type == "int32":
-        write_variable_bytes_from_integer(s, 4, element, LittleEndian)
-    elif element_type == "uint32":
-        write_variable_bytes_from_integer(s, 4, element, LittleEndian)
-    elif element_type == "int64":
-        write_variable_bytes_from_integer(s, 8, element, LittleEndian)
-    elif element_type == "uint64":
-        write_variable_bytes_from_integer(s, 8, element, LittleEndian)
-    elif element_type == "bool":
-        if element:
-            write_variable_bytes_from_integer(s, 1, 0x01)
-        else:
-            write_variable_bytes_from_integer(s, 1, 0x00)
-    elif element_type == "uint32Time":
-        # Notice, here don't like origin, I just return the int, not the type timestamp
-        return write_variable_bytes_from_integer(s, 4, element, LittleEndian)
-    elif element_type == "int64Time":
-        # Notice, here don't like origin, I just return the int, not the type timestamp
-        return write_variable_bytes_from_integer(s, 8, element, LittleEndian)
-
-    elif element_type == "[4]byte":  # TOCHANGE, this is a golang mark, maybe more common?
-        s.write(element)
-    elif element_type == "[CommandSize]uint8":  # TOCHANGE, this is a golang mark, maybe more common?
-        s.write(element)
-    elif element_type == "[16]byte":
-        s.write(element)
-    # elif element_type == "ipv6":
-    #     # convert ipv6 -> 16 bytes
-    #     s.write(element.packed)
-    elif element_type == "chainhash.Hash":
-        s.write(element.to_bytes())
-    elif element_type == "ServiceFlag":
-        write_variable_bytes_from_integer(s, 8, element.value[0], LittleEndian)
-    elif element_type == "services":
-        write_variable_bytes_from_integer(s, 8, element.value, LittleEndian)
-    elif element_type == "InvType":
-        write_variable_bytes_from_integer(s, 4, element.value[0], LittleEndian)
-    elif element_type == "BitcoinNet":
-        write_variable_bytes_from_integer(s, 4, element.value[0], LittleEndian)
-
-    elif element_type == "BloomUpdateType":
-        write_variable_bytes_from_integer(s, 1, element.value, LittleEndian)
-
-    elif element_type == "RejectCode":
-        write_variable_bytes_from_integer(s, 1, element.value[0], LittleEndian)
-
-    else:
+    writer = _element_writers.get(element_type)
+    if writer is None:
         _logger.info("Notice, in write_element I don't know what to do here.")
         return s.write(element)
-
-
-# def write_elements(s, *elements):
-#     pass
+    writer(s, element)
+    return
 
 
 def read_var_int(s, pver):
@@ -177,17 +176,17 @@ def read_var_int(s, pver):
 
     # Depends on first byte
     if discriminant == 0xff:
-        rv = read_variable_bytes_as_integer(s, 8)
+        rv = _read_uint64(s)
         min = 0x100000000
         if rv < min:
             raise NonCanonicalVarIntErr()
     elif discriminant == 0xfe:
-        rv = read_variable_bytes_as_integer(s, 4)
+        rv = _read_uint32(s)
         min = 0x10000
         if rv < min:
             raise NonCanonicalVarIntErr()
     elif discriminant == 0xfd:
-        rv = read_variable_bytes_as_integer(s, 2)
+        rv = _read_uint16(s)
         min = 0xfd
         if rv < min:
             raise NonCanonicalVarIntErr()
@@ -199,16 +198,13 @@ def read_var_int(s, pver):
 
 def write_var_int(s, pver, val):
     if val < 0xfd:
-        write_variable_bytes_from_integer(s, 1, val)
+        s.write(_uint8.pack(val))
     elif val <= MaxUint16:
-        write_variable_bytes_from_integer(s, 1, 0xfd)
-        write_variable_bytes_from_integer(s, 2, val)
+        s.write(b'\xfd' + _uint16.pack(val))
     elif val <= MaxUint32:
-        write_variable_bytes_from_integer(s, 1, 0xfe)
-        write_variable_bytes_from_integer(s, 4, val)
+        s.write(b'\xfe' + _uint32.pack(val))
     else:
-        write_variable_bytes_from_integer(s, 1, 0xff)
-        write_variable_bytes_from_integer(s, 8, val)
+        s.write(b'\xff' + _uint64.pack(val))
     return
 
 
@@ -232,7 +228,7 @@ def read_var_string(s, pver):
         raise MessageLengthTooLongErr
 
     buf = s.read(count)  # TOCHECK if here we can read count of bytes
-    return buf.decode()
+    return bytes(buf).decode()
 
 
 def write_var_string(s, pver, string):
@@ -257,6 +253,41 @@ def write_var_bytes(s, pver, some_bytes):
     return
 
 
+# BufferReader is a read only stream over an in-memory buffer.  Unlike
+# io.BytesIO, read returns memoryview slices of the buffer instead of copies,
+# so decoding a message through it keeps the variable length fields (scripts,
+# witness items) as views into the original bytes.  Callers that need owned
+# bytes convert them with bytes().
+class BufferReader:
+    def __init__(self, buf):
+        self._buf = memoryview(buf)
+        self._pos = 0
+
+    def read(self, size=-1):
+        start = self._pos
+        if size is None or size < 0:
+            end = len(self._buf)
+        else:
+            end = min(start + size, len(self._buf))
+        self._pos = end
+        return self._buf[start:end]
+
+    def seek(self, offset, whence=0):
+        if whence == 0:
+            self._pos = offset
+        elif whence == 1:
+            self._pos += offset
+        else:
+            self._pos = len(self._buf) + offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def getvalue(self):
+        return self._buf
+
+
 def random_uint64():
     # TOCHECK, since int has no type in python, leave a note here and decide what to do next
     return random.getrandbits(64)
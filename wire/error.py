@@ -107,3 +107,39 @@ class BelowSendHeadersVersionMsgErr(MessageErr):
 
 class AlertSerializedPayloadEmptyMsgErr(MessageErr):
     pass
+
+
+class MessageHeaderErr(MessageErr):
+    pass
+
+
+class MessagePayloadTooLargeMsgErr(MessageErr):
+    pass
+
+
+class MessageNetworkMismatchMsgErr(MessageErr):
+    pass
+
+
+class UnknownMessageMsgErr(MessageErr):
+    pass
+
+
+class MessageChecksumMsgErr(MessageErr):
+    pass
+
+
+class UnexpectedEOFMsgErr(MessageErr):
+    pass
+
+
+class MaxCmpctBlockTxsMsgErr(MessageErr):
+    pass
+
+
+class CmpctBlockIndexOverflowMsgErr(MessageErr):
+    pass
+
+
+class MaxCFHeadersMsgErr(MessageErr):
+    pass
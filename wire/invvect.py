@@ -1,5 +1,14 @@
+import array
+import struct
+import sys
 from .common import *
 
+# invVectLayout is the precompiled layout of an inventory vector: type and hash.
+invVectLayout = struct.Struct("<I32s")
+
+# invVectWords is the number of 32-bit words in an encoded inventory vector.
+invVectWords = maxInvVectPayload // 4
+
 
 class InvVect:
     def __init__(self, inv_type, hash):
@@ -13,11 +22,110 @@ class InvVect:
 
 
 def read_inv_vect(s, pver):
-    inv_type = InvType.from_int(read_element(s, "uint32"))
-    hash = read_element(s, "chainhash.Hash")
-    return InvVect(inv_type=inv_type, hash=hash)
+    inv_type, hash = invVectLayout.unpack(s.read(maxInvVectPayload))
+    return InvVect(inv_type=InvType.from_int(inv_type), hash=Hash(hash))
 
 
 def write_inv_vect(s, pver, iv):
-    write_element(s, "uint32", iv.inv_type.value[0])
-    write_element(s, "chainhash.Hash", iv.hash)
+    s.write(invVectLayout.pack(iv.inv_type.value[0], iv.hash.to_bytes()))
+
+
+# InvList is a packed list of inventory vectors: an array of the inventory
+# types and one buffer holding the 32 byte hashes back to back.  It is what
+# inv, getdata and notfound messages decode into, and it can be used wherever
+# a list of InvVect is expected: indexing and iterating it build the InvVect
+# entries lazily.
+class InvList:
+    def __init__(self, inv_list=None):
+        self.types = array.array('I')
+        self.hashes = bytearray()
+        for iv in inv_list or []:
+            self.append(iv)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return InvVect(inv_type=InvType.from_int(self.types[i]), hash=self.hash_at(i))
+
+    def __iter__(self):
+        for i in range(len(self.types)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if type(other) is InvList:
+            return self.types == other.types and self.hashes == other.hashes
+        return list(self) == other
+
+    def append(self, iv):
+        self.add(iv.inv_type, iv.hash)
+
+    def add(self, inv_type, hash):
+        self.types.append(inv_type.value[0])
+        self.hashes += hash.to_bytes()
+
+    def hash_at(self, i):
+        if i < 0:
+            i += len(self.types)
+        return Hash(bytes(self.hashes[i * HashSize:(i + 1) * HashSize]))
+
+    # hashes_of_type returns the hashes of all entries with the given inventory
+    # type, in order.
+    def hashes_of_type(self, inv_type):
+        t = inv_type.value[0]
+        hashes = self.hashes
+        return [Hash(bytes(hashes[i * HashSize:(i + 1) * HashSize]))
+                for i, entry_type in enumerate(self.types) if entry_type == t]
+
+
+# readInvList reads count inventory vectors in one read and splits them into
+# the type array and hash buffer of an InvList.
+def read_inv_list(s, pver, count) -> InvList:
+    inv_list = InvList()
+    size = count * maxInvVectPayload
+    data = s.read(size)
+    if len(data) != size:
+        raise struct.error("unpack requires a buffer of %d bytes" % size)
+
+    mv = memoryview(data)
+    if sys.byteorder == "little":
+        # Copy the type column and the eight hash word columns with strided
+        # memoryview slices.
+        words = mv.cast('I')
+        inv_list.types = array.array('I', words[::invVectWords])
+        inv_list.hashes = bytearray(count * HashSize)
+        hash_words = memoryview(inv_list.hashes).cast('I')
+        for j in range(invVectWords - 1):
+            hash_words[j::invVectWords - 1] = words[1 + j::invVectWords]
+    else:
+        inv_list.types = array.array('I', [t for t, _ in invVectLayout.iter_unpack(mv)])
+        inv_list.hashes = bytearray(b''.join([mv[o:o + HashSize] for o in range(4, size, maxInvVectPayload)]))
+
+    # Unknown inventory types are rejected the same way as read_inv_vect.
+    for t in set(inv_list.types):
+        InvType.from_int(t)
+    return inv_list
+
+
+# writeInvList writes the entries of an InvList (or a list of InvVect).
+def write_inv_list(s, pver, inv_list):
+    if type(inv_list) is not InvList:
+        for iv in inv_list:
+            write_inv_vect(s, pver, iv)
+        return
+
+    hashes = inv_list.hashes
+    if sys.byteorder == "little":
+        buf = bytearray(len(inv_list.types) * maxInvVectPayload)
+        words = memoryview(buf).cast('I')
+        words[::invVectWords] = memoryview(inv_list.types)
+        hash_words = memoryview(hashes).cast('I')
+        for j in range(invVectWords - 1):
+            words[1 + j::invVectWords] = hash_words[j::invVectWords - 1]
+        s.write(buf)
+        return
+
+    s.write(b''.join([invVectLayout.pack(t, hashes[i * HashSize:(i + 1) * HashSize])
+                      for i, t in enumerate(inv_list.types)]))
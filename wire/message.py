@@ -49,6 +49,10 @@ class Commands(Enum):
     CmdCFilter = "cfilter"
     CmdCFHeaders = "cfheaders"
     CmdCFCheckpt = "cfcheckpt"
+    CmdSendCmpct = "sendcmpct"
+    CmdCmpctBlock = "cmpctblock"
+    CmdGetBlockTxn = "getblocktxn"
+    CmdBlockTxn = "blocktxn"
 
     def __str__(self):
         return self.value
@@ -114,10 +118,13 @@ class RejectCode(Enum):
 
     @classmethod
     def from_int(cls, i):
-        for flagService in cls:
-            if flagService.value[0] == i:
-                return flagService
-        raise ValueError(cls.__name__ + ' has no value matching "' + str(i) + '"')
+        try:
+            return _reject_code_by_int[i]
+        except KeyError:
+            raise ValueError(cls.__name__ + ' has no value matching "' + str(i) + '"')
+
+
+_reject_code_by_int = {member.value[0]: member for member in RejectCode}
 
 
 class BloomUpdateType(Enum):
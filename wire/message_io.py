@@ -0,0 +1,229 @@
+import asyncio
+import io
+import struct
+from chainhash.hashfuncs import double_hash_b
+from .msg_addr import *
+from .msg_alert import *
+from .msg_block import *
+from .msg_cfcheckpt import *
+from .msg_cfheaders import *
+from .msg_cfilter import *
+from .msg_blocktxn import *
+from .msg_cmpctblock import *
+from .msg_feefilter import *
+from .msg_filteradd import *
+from .msg_filterclear import *
+from .msg_filterload import *
+from .msg_getaddr import *
+from .msg_getblocks import *
+from .msg_getblocktxn import *
+from .msg_getcfcheckpt import *
+from .msg_getcfheaders import *
+from .msg_getcfilters import *
+from .msg_getdata import *
+from .msg_getheaders import *
+from .msg_headers import *
+from .msg_inv import *
+from .msg_mempool import *
+from .msg_merkleblock import *
+from .msg_notfound import *
+from .msg_ping import *
+from .msg_pong import *
+from .msg_reject import *
+from .msg_sendcmpct import *
+from .msg_sendheaders import *
+from .msg_tx import *
+from .msg_verack import *
+from .msg_version import *
+
+# MessageHeaderSize is the number of bytes in a bitcoin message header.
+# Bitcoin network (magic) 4 bytes + command 12 bytes + payload length 4 bytes +
+# checksum 4 bytes.
+MessageHeaderSize = 24
+
+# messageHeaderLayout is the precompiled layout of a message header.
+messageHeaderLayout = struct.Struct("<I12sI4s")
+
+# discardChunkSize is how many bytes are read at a time when the payload of a
+# rejected message is discarded.
+discardChunkSize = 1 << 16
+
+# messageTypes maps the command of every message this package knows about to a
+# function making an empty message of that type.  register_message_type mirrors
+# it into _message_types_by_raw_command, keyed by the zero padded command bytes
+# as they appear in the message header, so reading a message never has to decode
+# the command to look up its type.
+messageTypes = {
+    Commands.CmdVersion: lambda: MsgVersion(addr_you=None),
+    Commands.CmdVerAck: MsgVerAck,
+    Commands.CmdGetAddr: MsgGetAddr,
+    Commands.CmdAddr: MsgAddr,
+    Commands.CmdGetBlocks: MsgGetBlocks,
+    Commands.CmdBlock: MsgBlock,
+    Commands.CmdInv: MsgInv,
+    Commands.CmdGetData: MsgGetData,
+    Commands.CmdNotFound: MsgNotFound,
+    Commands.CmdTx: MsgTx,
+    Commands.CmdPing: MsgPing,
+    Commands.CmdPong: MsgPong,
+    Commands.CmdGetHeaders: MsgGetHeaders,
+    Commands.CmdHeaders: MsgHeaders,
+    Commands.CmdAlert: MsgAlert,
+    Commands.CmdMemPool: MsgMemPool,
+    Commands.CmdFilterAdd: MsgFilterAdd,
+    Commands.CmdFilterClear: MsgFilterClear,
+    Commands.CmdFilterLoad: MsgFilterLoad,
+    Commands.CmdMerkleBlock: MsgMerkleBlock,
+    Commands.CmdReject: MsgReject,
+    Commands.CmdSendHeaders: MsgSendHeaders,
+    Commands.CmdFeeFilter: MsgFeeFilter,
+    Commands.CmdSendCmpct: MsgSendCmpct,
+    Commands.CmdCmpctBlock: MsgCmpctBlock,
+    Commands.CmdGetBlockTxn: MsgGetBlockTxn,
+    Commands.CmdBlockTxn: MsgBlockTxn,
+    Commands.CmdGetCFilters: MsgGetCFilters,
+    Commands.CmdGetCFHeaders: MsgGetCFHeaders,
+    Commands.CmdGetCFCheckpt: MsgGetCFCheckpt,
+    Commands.CmdCFilter: MsgCFilter,
+    Commands.CmdCFHeaders: MsgCFHeaders,
+    Commands.CmdCFCheckpt: MsgCFCheckpt,
+}
+
+_message_types_by_raw_command = {}
+
+
+def _raw_command(command) -> bytes:
+    return str(command).encode().ljust(CommandSize, b'\x00')
+
+
+def register_message_type(command, make_message):
+    """Add a message type to the dispatch table used by read_message."""
+    messageTypes[command] = make_message
+    _message_types_by_raw_command[_raw_command(command)] = make_message
+
+
+for _command, _make_message in list(messageTypes.items()):
+    register_message_type(_command, _make_message)
+
+
+# make_empty_message creates a message of the appropriate concrete type based
+# on the command.
+def make_empty_message(command) -> Message:
+    if type(command) is not bytes:
+        command = _raw_command(command)
+    make_message = _message_types_by_raw_command.get(command)
+    if make_message is None:
+        raise UnknownMessageMsgErr("unhandled command [{}]".format(command.rstrip(b'\x00')))
+    return make_message()
+
+
+def read_message_header(buf) -> MessageHeader:
+    magic, command, length, checksum = messageHeaderLayout.unpack(buf)
+    try:
+        net = BitcoinNet.from_int(magic)
+    except ValueError:
+        net = magic
+    return MessageHeader(magic=net, command=command.rstrip(b'\x00').decode(errors="replace"),
+                         length=length, checksum=checksum)
+
+
+# encode_message returns the header and payload of msg framed for the given
+# network, ready to be written to a stream.
+def encode_message(msg: Message, pver, btc_net: BitcoinNet, message_encoding=BaseEncoding):
+    raw_command = _raw_command(msg.command())
+    if len(raw_command) > CommandSize:
+        raise MessageHeaderErr("command [{}] is too long [max {}]".format(msg.command(), CommandSize))
+
+    s = io.BytesIO()
+    msg.btc_encode(s, pver, message_encoding)
+    payload = s.getvalue()
+
+    # Enforce maximum overall message payload.
+    if len(payload) > MaxMessagePayload:
+        raise MessagePayloadTooLargeMsgErr(
+            "message payload is too large - encoded {} bytes, but maximum message payload is {} bytes".format(
+                len(payload), MaxMessagePayload))
+
+    # Enforce maximum message payload based on the message type.
+    mpl = msg.max_payload_length(pver)
+    if len(payload) > mpl:
+        raise MessagePayloadTooLargeMsgErr(
+            "message payload is too large - encoded {} bytes, but maximum message payload size for "
+            "messages of type [{}] is {}.".format(len(payload), msg.command(), mpl))
+
+    header = messageHeaderLayout.pack(btc_net.value[0], raw_command, len(payload), double_hash_b(payload)[:4])
+    return header, payload
+
+
+async def write_message(writer: asyncio.StreamWriter, msg: Message, pver, btc_net: BitcoinNet,
+                        message_encoding=BaseEncoding):
+    """Frame msg and write header and payload to writer with a single writelines call."""
+    writer.writelines(encode_message(msg, pver, btc_net, message_encoding))
+    await writer.drain()
+
+
+async def _discard_input(reader: asyncio.StreamReader, n: int):
+    while n > 0:
+        chunk = await reader.read(min(n, discardChunkSize))
+        if not chunk:
+            return
+        n -= len(chunk)
+
+
+async def read_message(reader: asyncio.StreamReader, pver, btc_net: BitcoinNet, message_encoding=BaseEncoding):
+    """Read, validate and decode the next message from reader.
+
+    The payload length is checked against the limits of the message type before
+    the payload is buffered, and the payload of a message that is rejected after
+    its header was read is discarded, so the reader stays positioned on the
+    next message.
+
+    :return: the decoded message and its raw payload
+    """
+    header_bytes = await reader.readexactly(MessageHeaderSize)
+    magic, raw_command, length, checksum = messageHeaderLayout.unpack(header_bytes)
+
+    # Enforce maximum message payload.
+    if length > MaxMessagePayload:
+        raise MessagePayloadTooLargeMsgErr(
+            "message payload is too large - header indicates {} bytes, but max message payload is {} bytes.".format(
+                length, MaxMessagePayload))
+
+    # Check for messages from the wrong bitcoin network.
+    if magic != btc_net.value[0]:
+        await _discard_input(reader, length)
+        raise MessageNetworkMismatchMsgErr("message from other network [{:#x}]".format(magic))
+
+    # Create struct of appropriate message type based on the command.
+    make_message = _message_types_by_raw_command.get(raw_command)
+    if make_message is None:
+        await _discard_input(reader, length)
+        raise UnknownMessageMsgErr("received unknown command [{}]".format(raw_command.rstrip(b'\x00')))
+    msg = make_message()
+
+    # Check for maximum length based on the message type as a malicious client
+    # could otherwise create a well-formed header and set the length to max
+    # numbers in order to exhaust the machine's memory.
+    mpl = msg.max_payload_length(pver)
+    if length > mpl:
+        await _discard_input(reader, length)
+        raise MessagePayloadTooLargeMsgErr(
+            "payload exceeds max length - header indicates {} bytes, but max payload size for messages of "
+            "type [{}] is {}.".format(length, msg.command(), mpl))
+
+    payload = await reader.readexactly(length)
+
+    # Test checksum.
+    if double_hash_b(payload)[:4] != checksum:
+        raise MessageChecksumMsgErr("payload checksum failed - header indicates {}, but actual checksum is {}.".format(
+            checksum.hex(), double_hash_b(payload)[:4].hex()))
+
+    # Unmarshal message.  The payload is only referenced by this message, so it
+    # is decoded without copying (see BufferReader).  A payload that is
+    # truncated or corrupt fails deep in the decoder, which is reported as a
+    # MessageErr like every other bad message.
+    try:
+        msg.btc_decode(BufferReader(payload), pver, message_encoding)
+    except (struct.error, ValueError, IndexError, EOFError) as e:
+        raise MessageErr("failed to decode payload of [{}] message: {}".format(msg.command(), e)) from e
+    return msg, payload
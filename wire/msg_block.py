@@ -1,5 +1,6 @@
 from .blockheader import *
 from .msg_tx import *
+from .msg_tx import _TxList
 
 # defaultTransactionAlloc is the default size used for the backing array
 # for transactions.  The transaction array will dynamically grow as needed, but
@@ -32,6 +33,15 @@ class TxLoc:
         return self.tx_start == other.tx_start and self.tx_len == other.tx_len
 
 
+# _BlockTxList is the transaction list of a block, see _TxList.  The revisions
+# of its transactions are owned by the revision of the block.
+class _BlockTxList(_TxList):
+    __slots__ = ()
+
+    def _adopt(self, tx):
+        self._revision.adopt(tx._revision)
+
+
 class MsgBlock(Message):
     def __init__(self, header=None, transactions=None):
         """
@@ -40,7 +50,25 @@ class MsgBlock(Message):
         :param [] transactions:
         """
         self.header = header or BlockHeader()
-        self.transactions = transactions or []
+
+        # The modifications made to the transactions of the block, see
+        # TxRevision.
+        self._revision = TxRevision()
+        self._transactions = _BlockTxList(self._revision, transactions or [])
+
+        # (revision, stripped size, size) as of the last size computation.
+        self.size_cache = None
+
+    # Replacing the transaction list, changing its items or modifying them
+    # bumps the revision of the block.  The list assigned is copied.
+    @property
+    def transactions(self):
+        return self._transactions
+
+    @transactions.setter
+    def transactions(self, transactions):
+        self._transactions = _BlockTxList(self._revision, transactions)
+        self._revision.bump()
 
     def __eq__(self, other):
         if self.header == other.header and len(self.transactions) == len(other.transactions):
@@ -72,27 +100,31 @@ class MsgBlock(Message):
         self.btc_decode(s, pver=0, message_encoding=BaseEncoding)
         return
 
+    # DeserializeBuffer decodes a block the same as Deserialize, but from an
+    # in-memory buffer (bytes or memoryview) without copying the scripts and
+    # witness items of its transactions.  See MsgTx.deserialize_buffer.
+    def deserialize_buffer(self, buf):
+        self.deserialize(BufferReader(buf))
+        return
+
+    # materialize replaces all the buffer views held by the transactions of the
+    # block with owned bytes.
+    def materialize(self):
+        for tx in self.transactions:
+            tx.materialize()
+        return
+
     def deserialize_tx_loc(self, s):
         # At the current time, there is no difference between the wire encoding
         # at protocol version 0 and the stable long-term storage format.  As
         # a result, make use of existing wire protocol functions.
-        self.header = read_block_header(s, pver=0)
-
-        tx_count = read_var_int(s, pver=0)
-        if tx_count > maxTxPerBlock:
-            raise MaxTxPerBlockMsgErr
+        decoder = BlockStreamDecoder(s)
+        self.header = decoder.header
 
         tx_loc_lst = []
-        for _ in range(tx_count):
-            tx_start = s.tell()
-
-            msg_tx = MsgTx()
-            msg_tx.deserialize(s)
+        for _, msg_tx, tx_loc in decoder:
             self.add_transaction(msg_tx)
-
-            tx_len = s.tell() - tx_start
-
-            tx_loc_lst.append(TxLoc(tx_start=tx_start, tx_len=tx_len))
+            tx_loc_lst.append(tx_loc)
         return tx_loc_lst
 
     def btc_encode(self, s, pver, message_encoding):
@@ -124,24 +156,33 @@ class MsgBlock(Message):
         return
 
     # SerializeSize returns the number of bytes it would take to serialize the
-    # block, factoring in any witness data within transaction.
+    # block, factoring in any witness data within transaction.  Like the
+    # transaction sizes, the block sizes are cached until a transaction is
+    # modified (see TxRevision) or the transaction list changes.
     def serialize_size(self):
-        # Block header bytes + Serialized varint size for the number of
-        # transactions.
-        n = blockHeaderLen + var_int_serialize_size(len(self.transactions))
-
-        for tx in self.transactions:
-            n += tx.serialize_size()
-        return n
+        return self._sizes()[2]
 
     def serialize_size_stripped(self):
+        return self._sizes()[1]
+
+    def _sizes(self):
+        c = self.size_cache
+        if c is not None and c[0] == self._revision.value:
+            return c
+
         # Block header bytes + Serialized varint size for the number of
         # transactions.
         n = blockHeaderLen + var_int_serialize_size(len(self.transactions))
-
+        base_size = n
+        size = n
         for tx in self.transactions:
-            n += tx.serialize_size_stripped()
-        return n
+            self._revision.adopt(tx._revision)
+            base_size += tx.serialize_size_stripped()
+            size += tx.serialize_size()
+
+        c = (self._revision.value, base_size, size)
+        self.size_cache = c
+        return c
 
     # BlockHash computes the block identifier hash for this block.
     def block_hash(self) -> Hash():
@@ -167,3 +208,66 @@ class MsgBlock(Message):
     def clear_transactions(self):
         self.transactions = []
         return
+
+
+# BlockStreamDecoder decodes a serialized block one transaction at a time.  The
+# header and transaction count are read when it is created; iterating it then
+# reads and yields (index, MsgTx, TxLoc) for each transaction as soon as it has
+# been parsed, so callers can start working on a block before the rest of it
+# has arrived and never need to hold more than one transaction.
+#
+# s can be any readable stream (a socket file, a BufferReader or a block file
+# positioned at the start of the block); TxLoc offsets are relative to the
+# position of s when the decoder was created.
+class BlockStreamDecoder:
+    def __init__(self, s, pver=0, message_encoding=WitnessEncoding):
+        try:
+            s.tell()
+        except (AttributeError, OSError):
+            s = _CountingReader(s)
+
+        self.s = s
+        self.pver = pver
+        self.message_encoding = message_encoding
+        self.block_start = s.tell()
+
+        self.header = read_block_header(s, pver)
+
+        self.tx_count = read_var_int(s, pver)
+        if self.tx_count > maxTxPerBlock:
+            raise MaxTxPerBlockMsgErr
+
+        # index is the index of the next transaction to decode.
+        self.index = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.index >= self.tx_count:
+            raise StopIteration
+
+        tx_start = self.s.tell()
+        msg_tx = MsgTx()
+        msg_tx.btc_decode(self.s, self.pver, self.message_encoding)
+        tx_loc = TxLoc(tx_start=tx_start - self.block_start, tx_len=self.s.tell() - tx_start)
+
+        index = self.index
+        self.index += 1
+        return index, msg_tx, tx_loc
+
+
+# _CountingReader gives streams that can't tell their position, such as socket
+# files, the tell BlockStreamDecoder needs for the transaction locations.
+class _CountingReader:
+    def __init__(self, s):
+        self.s = s
+        self.pos = 0
+
+    def read(self, size=-1):
+        b = self.s.read(size)
+        self.pos += len(b)
+        return b
+
+    def tell(self):
+        return self.pos
@@ -0,0 +1,48 @@
+from .msg_cmpctblock import *
+
+
+# MsgBlockTxn implements the Message interface and represents a bitcoin
+# blocktxn message.  It answers a getblocktxn message with the requested
+# transactions of a block, in the order of their indexes.
+#
+# This message was defined by BIP0152.
+class MsgBlockTxn(Message):
+    def __init__(self, block_hash=None, transactions=None):
+        self.block_hash = block_hash or Hash()
+        self.transactions = transactions or []
+
+    def __eq__(self, other):
+        return type(other) is MsgBlockTxn and \
+               self.block_hash == other.block_hash and \
+               self.transactions == other.transactions
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.block_hash = read_element(s, "chainhash.Hash")
+
+        count = read_var_int(s, pver)
+        if count > maxTxPerBlock:
+            raise MaxCmpctBlockTxsMsgErr
+
+        self.transactions = []
+        for _ in range(count):
+            tx = MsgTx()
+            tx.btc_decode(s, pver, message_encoding)
+            self.transactions.append(tx)
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        count = len(self.transactions)
+        if count > maxTxPerBlock:
+            raise MaxCmpctBlockTxsMsgErr
+
+        write_element(s, "chainhash.Hash", self.block_hash)
+        write_var_int(s, pver, count)
+        for tx in self.transactions:
+            tx.btc_encode(s, pver, message_encoding)
+        return
+
+    def command(self) -> str:
+        return Commands.CmdBlockTxn
+
+    def max_payload_length(self, pver: int) -> int:
+        return MaxBlockPayload
@@ -0,0 +1,58 @@
+from .msg_cfheaders import *
+
+# CFCheckptInterval is the gap (in number of blocks) between each filter
+# header checkpoint.
+CFCheckptInterval = 1000
+
+# maxCFHeadersLen is the max number of filter headers we will attempt to
+# decode.
+maxCFHeadersLen = 100000
+
+
+# MsgCFCheckpt implements the Message interface and represents a bitcoin
+# cfcheckpt message.  It is used to deliver committed filter header information
+# in response to a getcfcheckpt message (MsgGetCFCheckpt). See MsgGetCFCheckpt
+# for details on requesting the headers.
+class MsgCFCheckpt(Message):
+    def __init__(self, filter_type=GCSFilterRegular, stop_hash=None, filter_headers=None):
+        self.filter_type = filter_type
+        self.stop_hash = stop_hash or Hash()
+        self.filter_headers = filter_headers or []
+
+    def __eq__(self, other):
+        return type(other) is MsgCFCheckpt and \
+               self.filter_type == other.filter_type and \
+               self.stop_hash == other.stop_hash and \
+               self.filter_headers == other.filter_headers
+
+    # AddCFHeader adds a new committed filter header to the message.
+    def add_cf_header(self, header: Hash):
+        self.filter_headers.append(header)
+        return
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.filter_type = read_element(s, "uint8")
+        self.stop_hash = read_element(s, "chainhash.Hash")
+
+        # Refuse to decode an insane number of cfheaders.
+        count = read_var_int(s, pver)
+        if count > maxCFHeadersLen:
+            raise MaxCFHeadersMsgErr("too many committed filter headers for message [count {}, max {}]".format(
+                count, maxCFHeadersLen))
+        self.filter_headers = read_hash_list(s, count)
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        write_element(s, "uint8", self.filter_type)
+        write_element(s, "chainhash.Hash", self.stop_hash)
+        write_var_int(s, pver, len(self.filter_headers))
+        write_hash_list(s, self.filter_headers)
+        return
+
+    def command(self) -> str:
+        return Commands.CmdCFCheckpt
+
+    def max_payload_length(self, pver: int) -> int:
+        # Message size depends on the blockchain height, so return general limit
+        # for all messages.
+        return MaxMessagePayload
@@ -0,0 +1,84 @@
+from .msg_cfilter import *
+
+# MaxCFHeaderPayload is the maximum byte size of a committed filter header.
+MaxCFHeaderPayload = HashSize
+
+# MaxCFHeadersPerMsg is the maximum number of committed filter headers that
+# can be in a single bitcoin cfheaders message.
+MaxCFHeadersPerMsg = 2000
+
+
+# read_hash_list reads count hashes laid out back to back with a single read.
+def read_hash_list(s, count) -> [Hash]:
+    size = count * HashSize
+    data = s.read(size)
+    if len(data) != size:
+        raise struct.error("unpack requires a buffer of %d bytes" % size)
+    return [Hash(bytes(data[o:o + HashSize])) for o in range(0, size, HashSize)]
+
+
+# write_hash_list writes the hashes back to back with a single write.
+def write_hash_list(s, hashes):
+    s.write(b''.join([h.to_bytes() for h in hashes]))
+    return
+
+
+# MsgCFHeaders implements the Message interface and represents a bitcoin
+# cfheaders message.  It is used to deliver committed filter header information
+# in response to a getcfheaders message (MsgGetCFHeaders). The maximum number
+# of committed filter headers per message is currently 2000. See
+# MsgGetCFHeaders for details on requesting the headers.
+class MsgCFHeaders(Message):
+    def __init__(self, filter_type=GCSFilterRegular, stop_hash=None, prev_filter_header=None, filter_hashes=None):
+        self.filter_type = filter_type
+        self.stop_hash = stop_hash or Hash()
+        self.prev_filter_header = prev_filter_header or Hash()
+        self.filter_hashes = filter_hashes or []
+
+    def __eq__(self, other):
+        return type(other) is MsgCFHeaders and \
+               self.filter_type == other.filter_type and \
+               self.stop_hash == other.stop_hash and \
+               self.prev_filter_header == other.prev_filter_header and \
+               self.filter_hashes == other.filter_hashes
+
+    # AddCFHash adds a new filter hash to the message.
+    def add_cf_hash(self, hash: Hash):
+        if len(self.filter_hashes) + 1 > MaxCFHeadersPerMsg:
+            raise MaxCFHeadersMsgErr("too many block headers in message [max {}]".format(MaxCFHeadersPerMsg))
+        self.filter_hashes.append(hash)
+        return
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.filter_type = read_element(s, "uint8")
+        self.stop_hash = read_element(s, "chainhash.Hash")
+        self.prev_filter_header = read_element(s, "chainhash.Hash")
+
+        # Limit to max committed filter headers per message.
+        count = read_var_int(s, pver)
+        if count > MaxCFHeadersPerMsg:
+            raise MaxCFHeadersMsgErr("too many committed filter headers for message [count {}, max {}]".format(
+                count, MaxCFHeadersPerMsg))
+        self.filter_hashes = read_hash_list(s, count)
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        count = len(self.filter_hashes)
+        if count > MaxCFHeadersPerMsg:
+            raise MaxCFHeadersMsgErr("too many committed filter headers for message [count {}, max {}]".format(
+                count, MaxCFHeadersPerMsg))
+
+        write_element(s, "uint8", self.filter_type)
+        write_element(s, "chainhash.Hash", self.stop_hash)
+        write_element(s, "chainhash.Hash", self.prev_filter_header)
+        write_var_int(s, pver, count)
+        write_hash_list(s, self.filter_hashes)
+        return
+
+    def command(self) -> str:
+        return Commands.CmdCFHeaders
+
+    def max_payload_length(self, pver: int) -> int:
+        # Hash size + filter type + prev filter header + num headers (varInt) +
+        # (header size * max headers).
+        return 1 + HashSize + HashSize + MaxVarIntPayload + (MaxCFHeaderPayload * MaxCFHeadersPerMsg)
@@ -0,0 +1,49 @@
+from .common import *
+
+# FilterType is used to represent a filter type, a uint8 on the wire.
+#
+# GCSFilterRegular is the regular filter type, the basic filter of BIP0158.
+GCSFilterRegular = 0
+
+# MaxCFilterDataSize is the maximum byte size of a committed filter.
+# The maximum size is currently defined as 256KiB.
+MaxCFilterDataSize = 256 * 1024
+
+
+# MsgCFilter implements the Message interface and represents a bitcoin cfilter
+# message. It is used to deliver a committed filter in response to a
+# getcfilters (MsgGetCFilters) message.
+class MsgCFilter(Message):
+    def __init__(self, filter_type=GCSFilterRegular, block_hash=None, data=None):
+        self.filter_type = filter_type
+        self.block_hash = block_hash or Hash()
+        self.data = data or bytes()
+
+    def __eq__(self, other):
+        return type(other) is MsgCFilter and \
+               self.filter_type == other.filter_type and \
+               self.block_hash == other.block_hash and \
+               self.data == other.data
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.filter_type = read_element(s, "uint8")
+        self.block_hash = read_element(s, "chainhash.Hash")
+        self.data = read_var_bytes(s, pver, MaxCFilterDataSize, "cfilter data")
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        if len(self.data) > MaxCFilterDataSize:
+            raise BytesTooLargeErr("cfilter size too large for message [size {}, max {}]".format(
+                len(self.data), MaxCFilterDataSize))
+
+        write_element(s, "uint8", self.filter_type)
+        write_element(s, "chainhash.Hash", self.block_hash)
+        write_var_bytes(s, pver, self.data)
+        return
+
+    def command(self) -> str:
+        return Commands.CmdCFilter
+
+    def max_payload_length(self, pver: int) -> int:
+        # Filter type + block hash + max var int size + max filter data size.
+        return 1 + HashSize + MaxVarIntPayload + MaxCFilterDataSize
@@ -0,0 +1,187 @@
+import hashlib
+from chainhash.siphash import siphash24
+from .msg_block import *
+
+# ShortIdLen is the number of bytes of a BIP0152 short transaction id.
+ShortIdLen = 6
+
+# shortIdMask keeps the low 48 bits of the SipHash of a transaction id.
+shortIdMask = (1 << (ShortIdLen * 8)) - 1
+
+# maxCmpctBlockTxIndex is the largest transaction index a compact block
+# message may refer to.  Indexes are differentially encoded as var ints, but
+# BIP0152 nodes reject any that does not fit in 16 bits.
+maxCmpctBlockTxIndex = MaxUint16
+
+
+# PrefilledTx is a transaction a compact block carries in full (at least the
+# coinbase), along with its index in the block.
+class PrefilledTx:
+    def __init__(self, index=0, tx=None):
+        self.index = index
+        self.tx = tx or MsgTx()
+
+    def __eq__(self, other):
+        return type(other) is PrefilledTx and \
+               self.index == other.index and \
+               self.tx == other.tx
+
+    def __repr__(self):
+        return "PrefilledTx(index={}, tx={})".format(self.index, self.tx.tx_hash())
+
+
+# read_short_ids reads count 6 byte short transaction ids.
+def read_short_ids(s, count) -> [int]:
+    size = count * ShortIdLen
+    data = s.read(size)
+    if len(data) != size:
+        raise struct.error("unpack requires a buffer of %d bytes" % size)
+    return [int.from_bytes(data[o:o + ShortIdLen], "little") for o in range(0, size, ShortIdLen)]
+
+
+# write_short_ids writes the short transaction ids in a single write.
+def write_short_ids(s, short_ids):
+    s.write(b''.join([short_id.to_bytes(ShortIdLen, "little") for short_id in short_ids]))
+    return
+
+
+# read_diff_indexes reads count differentially encoded indexes: every var int
+# is the distance to the previous index minus one.
+def read_diff_indexes(s, pver, count) -> [int]:
+    indexes = []
+    last = -1
+    for _ in range(count):
+        last += read_var_int(s, pver) + 1
+        if last > maxCmpctBlockTxIndex:
+            raise CmpctBlockIndexOverflowMsgErr
+        indexes.append(last)
+    return indexes
+
+
+# write_diff_indexes writes strictly increasing indexes with differential
+# encoding.
+def write_diff_indexes(s, pver, indexes):
+    last = -1
+    for index in indexes:
+        if index <= last or index > maxCmpctBlockTxIndex:
+            raise CmpctBlockIndexOverflowMsgErr
+        write_var_int(s, pver, index - last - 1)
+        last = index
+    return
+
+
+# short_id_keys returns the two SipHash keys of the short transaction ids of a
+# compact block: the first and second 8 bytes, little endian, of the single
+# SHA256 of the serialized header followed by the nonce.
+def short_id_keys(header: BlockHeader, nonce: int) -> (int, int):
+    digest = hashlib.sha256(pack_block_header(header) + nonce.to_bytes(8, "little")).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:16], "little")
+
+
+# short_id returns the 6 byte short id of a transaction given its txid (or
+# wtxid for version 2 compact blocks).
+def short_id(k0: int, k1: int, tx_hash: Hash) -> int:
+    return siphash24(k0, k1, tx_hash.to_bytes()) & shortIdMask
+
+
+# MsgCmpctBlock implements the Message interface and represents a bitcoin
+# cmpctblock message.  It announces a block as its header, the short ids of the
+# transactions the receiver most likely already has in its mempool and the
+# remaining transactions in full.
+#
+# This message was defined by BIP0152.
+class MsgCmpctBlock(Message):
+    def __init__(self, header=None, nonce=0, short_ids=None, prefilled_txs=None):
+        self.header = header or BlockHeader()
+        self.nonce = nonce
+        self.short_ids = short_ids or []
+        self.prefilled_txs = prefilled_txs or []
+
+    def __eq__(self, other):
+        return type(other) is MsgCmpctBlock and \
+               self.header == other.header and \
+               self.nonce == other.nonce and \
+               self.short_ids == other.short_ids and \
+               self.prefilled_txs == other.prefilled_txs
+
+    # from_block makes the compact block of a block, prefilling the
+    # transactions at the given indexes (the coinbase is always prefilled).
+    # Short ids are computed from wtxids when use_wtxid is set, as required by
+    # version 2 compact blocks.
+    @classmethod
+    def from_block(cls, msg_block, nonce, prefill=(), use_wtxid=True):
+        prefill = set(prefill)
+        prefill.add(0)
+        k0, k1 = short_id_keys(msg_block.header, nonce)
+
+        short_ids = []
+        prefilled_txs = []
+        for i, tx in enumerate(msg_block.transactions):
+            if i in prefill:
+                prefilled_txs.append(PrefilledTx(index=i, tx=tx))
+            else:
+                tx_hash = tx.witness_hash() if use_wtxid else tx.tx_hash()
+                short_ids.append(short_id(k0, k1, tx_hash))
+
+        return cls(header=msg_block.header, nonce=nonce, short_ids=short_ids, prefilled_txs=prefilled_txs)
+
+    def block_hash(self):
+        return self.header.block_hash()
+
+    def short_id_keys(self) -> (int, int):
+        return short_id_keys(self.header, self.nonce)
+
+    # total_txs returns the number of transactions of the block.
+    def total_txs(self):
+        return len(self.short_ids) + len(self.prefilled_txs)
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.header = read_block_header(s, pver)
+        self.nonce = read_element(s, "uint64")
+
+        count = read_var_int(s, pver)
+        if count > maxTxPerBlock:
+            raise MaxCmpctBlockTxsMsgErr
+        self.short_ids = read_short_ids(s, count)
+
+        count = read_var_int(s, pver)
+        if count + len(self.short_ids) > maxTxPerBlock:
+            raise MaxCmpctBlockTxsMsgErr
+
+        self.prefilled_txs = []
+        last = -1
+        for _ in range(count):
+            last += read_var_int(s, pver) + 1
+            if last > maxCmpctBlockTxIndex:
+                raise CmpctBlockIndexOverflowMsgErr
+            tx = MsgTx()
+            tx.btc_decode(s, pver, message_encoding)
+            self.prefilled_txs.append(PrefilledTx(index=last, tx=tx))
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        if self.total_txs() > maxTxPerBlock:
+            raise MaxCmpctBlockTxsMsgErr
+
+        write_block_header(s, pver, self.header)
+        write_element(s, "uint64", self.nonce)
+
+        write_var_int(s, pver, len(self.short_ids))
+        write_short_ids(s, self.short_ids)
+
+        write_var_int(s, pver, len(self.prefilled_txs))
+        last = -1
+        for prefilled in self.prefilled_txs:
+            if prefilled.index <= last or prefilled.index > maxCmpctBlockTxIndex:
+                raise CmpctBlockIndexOverflowMsgErr
+            write_var_int(s, pver, prefilled.index - last - 1)
+            prefilled.tx.btc_encode(s, pver, message_encoding)
+            last = prefilled.index
+        return
+
+    def command(self) -> str:
+        return Commands.CmdCmpctBlock
+
+    def max_payload_length(self, pver: int) -> int:
+        # A compact block is never larger than the block it announces.
+        return MaxBlockPayload
@@ -0,0 +1,43 @@
+from .msg_cmpctblock import *
+
+
+# MsgGetBlockTxn implements the Message interface and represents a bitcoin
+# getblocktxn message.  It is used to request the transactions of a compact
+# block that could not be found in the mempool, by their index in the block.
+#
+# This message was defined by BIP0152.
+class MsgGetBlockTxn(Message):
+    def __init__(self, block_hash=None, indexes=None):
+        self.block_hash = block_hash or Hash()
+        self.indexes = indexes or []
+
+    def __eq__(self, other):
+        return type(other) is MsgGetBlockTxn and \
+               self.block_hash == other.block_hash and \
+               self.indexes == other.indexes
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.block_hash = read_element(s, "chainhash.Hash")
+
+        count = read_var_int(s, pver)
+        if count > maxTxPerBlock:
+            raise MaxCmpctBlockTxsMsgErr
+        self.indexes = read_diff_indexes(s, pver, count)
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        count = len(self.indexes)
+        if count > maxTxPerBlock:
+            raise MaxCmpctBlockTxsMsgErr
+
+        write_element(s, "chainhash.Hash", self.block_hash)
+        write_var_int(s, pver, count)
+        write_diff_indexes(s, pver, self.indexes)
+        return
+
+    def command(self) -> str:
+        return Commands.CmdGetBlockTxn
+
+    def max_payload_length(self, pver: int) -> int:
+        # Block hash + index count + at most 3 bytes per differential index.
+        return HashSize + MaxVarIntPayload + maxTxPerBlock * 3
@@ -0,0 +1,32 @@
+from .msg_cfilter import *
+
+
+# MsgGetCFCheckpt is a request for filter headers at evenly spaced intervals
+# throughout the blockchain history. It allows to set the FilterType field to
+# get headers in the chain of basic (0x00) or extended (0x01) headers.
+class MsgGetCFCheckpt(Message):
+    def __init__(self, filter_type=GCSFilterRegular, stop_hash=None):
+        self.filter_type = filter_type
+        self.stop_hash = stop_hash or Hash()
+
+    def __eq__(self, other):
+        return type(other) is MsgGetCFCheckpt and \
+               self.filter_type == other.filter_type and \
+               self.stop_hash == other.stop_hash
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.filter_type = read_element(s, "uint8")
+        self.stop_hash = read_element(s, "chainhash.Hash")
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        write_element(s, "uint8", self.filter_type)
+        write_element(s, "chainhash.Hash", self.stop_hash)
+        return
+
+    def command(self) -> str:
+        return Commands.CmdGetCFCheckpt
+
+    def max_payload_length(self, pver: int) -> int:
+        # Filter type + block hash
+        return 1 + HashSize
@@ -0,0 +1,40 @@
+from .msg_cfilter import *
+
+# MaxGetCFiltersReqRange the maximum number of filters that may be requested in
+# a getcfilters message.
+MaxGetCFiltersReqRange = 1000
+
+
+# MsgGetCFilters implements the Message interface and represents a bitcoin
+# getcfilters message. It is used to request committed filters for a range of
+# blocks.
+class MsgGetCFilters(Message):
+    def __init__(self, filter_type=GCSFilterRegular, start_height=0, stop_hash=None):
+        self.filter_type = filter_type
+        self.start_height = start_height
+        self.stop_hash = stop_hash or Hash()
+
+    def __eq__(self, other):
+        return type(other) is MsgGetCFilters and \
+               self.filter_type == other.filter_type and \
+               self.start_height == other.start_height and \
+               self.stop_hash == other.stop_hash
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.filter_type = read_element(s, "uint8")
+        self.start_height = read_element(s, "uint32")
+        self.stop_hash = read_element(s, "chainhash.Hash")
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        write_element(s, "uint8", self.filter_type)
+        write_element(s, "uint32", self.start_height)
+        write_element(s, "chainhash.Hash", self.stop_hash)
+        return
+
+    def command(self) -> str:
+        return Commands.CmdGetCFilters
+
+    def max_payload_length(self, pver: int) -> int:
+        # Filter type + uint32 + block hash
+        return 1 + 4 + HashSize
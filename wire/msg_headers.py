@@ -5,10 +5,53 @@ from .msg_tx import *
 # a single bitcoin headers message.
 MaxBlockHeadersPerMsg = 2000
 
+# headersEntryLen is the size of one entry of a headers message: the 80 bytes
+# block header followed by the transaction count, which is always a single 0
+# byte.
+headersEntryLen = blockHeaderLen + 1
+
+# headersEntryLayout is the precompiled layout of one entry of a headers
+# message, used to decode all the entries in a single pass over the payload.
+headersEntryLayout = struct.Struct("<I32s32sIIIB")
+
 
 class MsgHeaders(Message):
     def __init__(self, headers=None):
-        self.headers = headers or []
+        self._headers = headers or []
+
+        # The contiguous entries the headers were decoded from, kept so
+        # block_hashes can hash them without encoding the headers again.
+        self.raw_entries = None
+
+    # from_entries returns a headers message made of already serialized
+    # entries, headersEntryLen bytes each.  The entries are written out as they
+    # are when the message is encoded and only decoded into block headers when
+    # headers is accessed, so a reply built from stored entries costs a single
+    # copy.
+    @classmethod
+    def from_entries(cls, raw_entries):
+        if len(raw_entries) % headersEntryLen != 0:
+            raise MessageErr("headers entries length %d is not a multiple of %d" %
+                             (len(raw_entries), headersEntryLen))
+        if len(raw_entries) // headersEntryLen > MaxBlockHeadersPerMsg:
+            raise MaxBlockHeadersPerMsgMsgErr
+
+        msg = cls()
+        msg._headers = None
+        msg.raw_entries = bytes(raw_entries)
+        return msg
+
+    @property
+    def headers(self):
+        if self._headers is None:
+            self._headers = [_block_header_from_entry(entry)
+                             for entry in headersEntryLayout.iter_unpack(self.raw_entries)]
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers):
+        self._headers = headers
+        self.raw_entries = None
 
     def __eq__(self, other):
         if len(self.headers) == len(other.headers):
@@ -28,6 +71,19 @@ class MsgHeaders(Message):
         if count > MaxBlockHeadersPerMsg:
             raise MaxBlockHeadersPerMsgMsgErr
 
+        # All the entries are read at once and decoded in bulk.  When any of
+        # them doesn't have the expected single 0 byte transaction count, decode
+        # them again one by one to raise the same error the slow path does.
+        self.raw_entries = None
+        raw_entries = s.read(count * headersEntryLen)
+        if len(raw_entries) == count * headersEntryLen and \
+                raw_entries[blockHeaderLen::headersEntryLen] == bytes(count):
+            self._headers = None
+            self.raw_entries = raw_entries
+            return
+        s = io.BytesIO(raw_entries)
+        self._headers = []
+
         for _ in range(count):
             bh = read_block_header(s, pver)
 
@@ -41,6 +97,13 @@ class MsgHeaders(Message):
         return
 
     def btc_encode(self, s, pver, message_encoding):
+        # Entries that were never decoded into headers are written out as
+        # they are.
+        if self._headers is None:
+            write_var_int(s, pver, len(self.raw_entries) // headersEntryLen)
+            s.write(self.raw_entries)
+            return
+
         count = len(self.headers)
         if count > MaxBlockHeadersPerMsg:
             raise MaxBlockHeadersPerMsgMsgErr
@@ -73,4 +136,25 @@ class MsgHeaders(Message):
             raise MaxBlockHeadersPerMsgMsgErr
 
         self.headers.append(bh)
+        self.raw_entries = None
         return
+
+    # block_hashes returns the hash of every header of the message.  Until the
+    # headers are accessed, the hashes are computed from the received bytes
+    # directly; once they are, the headers may have been modified and are
+    # hashed instead.
+    def block_hashes(self):
+        if self._headers is not None:
+            return [bh.block_hash() for bh in self._headers]
+
+        view = memoryview(self.raw_entries)
+        return [double_hash_h(view[offset:offset + blockHeaderLen])
+                for offset in range(0, len(view), headersEntryLen)]
+
+
+def _block_header_from_entry(entry):
+    bh = BlockHeader.__new__(BlockHeader)
+    bh.version, prev_block, merkle_root, bh.timestamp, bh.bits, bh.nonce, _ = entry
+    bh.prev_block = Hash(prev_block)
+    bh.merkle_root = Hash(merkle_root)
+    return bh
@@ -9,9 +9,7 @@ class MsgNotFound(Message):
         count = read_var_int(s, pver)
         if count > MaxInvPerMsg:
             raise MessageExceedMaxInvPerMsgErr
-        for _ in range(count):
-            iv = read_inv_vect(s, pver)
-            self.add_inv_vect(iv)
+        self.inv_list = read_inv_list(s, pver, count)
         return
 
     def btc_encode(self, s, pver, message_encoding):
@@ -21,8 +19,7 @@ class MsgNotFound(Message):
 
         write_var_int(s, pver, count)
 
-        for iv in self.inv_list:
-            write_inv_vect(s, pver, iv)
+        write_inv_list(s, pver, self.inv_list)
         return
 
     def command(self) -> str:
@@ -0,0 +1,41 @@
+from .common import *
+
+# CmpctBlockVersionTxid and CmpctBlockVersionWtxid are the compact block
+# versions defined by BIP0152.  Version 1 short ids are computed from txids,
+# version 2 short ids from wtxids and its transactions carry witness data.
+CmpctBlockVersionTxid = 1
+CmpctBlockVersionWtxid = 2
+
+
+# MsgSendCmpct implements the Message interface and represents a bitcoin
+# sendcmpct message.  It is used by a peer to announce it supports compact
+# blocks of the given version and whether it wants new blocks to be announced
+# with cmpctblock messages (high bandwidth mode) instead of inv or headers.
+#
+# This message was defined by BIP0152.
+class MsgSendCmpct(Message):
+    def __init__(self, announce=False, version=CmpctBlockVersionWtxid):
+        self.announce = announce
+        self.version = version
+
+    def __eq__(self, other):
+        return type(other) is MsgSendCmpct and \
+               self.announce == other.announce and \
+               self.version == other.version
+
+    def btc_decode(self, s, pver, message_encoding):
+        self.announce = read_element(s, "bool")
+        self.version = read_element(s, "uint64")
+        return
+
+    def btc_encode(self, s, pver, message_encoding):
+        write_element(s, "bool", self.announce)
+        write_element(s, "uint64", self.version)
+        return
+
+    def command(self) -> str:
+        return Commands.CmdSendCmpct
+
+    def max_payload_length(self, pver: int) -> int:
+        # Announce flag 1 byte + version 8 bytes.
+        return 9
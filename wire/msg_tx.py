@@ -1,4 +1,6 @@
 import io
+import struct
+import weakref
 from .common import *
 from chainhash.hashfuncs import *
 
@@ -88,8 +90,175 @@ MaxBlockPayload = 4000000
 # payload + min output payload.
 minTxPayload = 10
 
-
+# Precompiled layouts of the fixed size parts of a transaction.
+# outPointLayout is the previous outpoint hash and index.
+outPointLayout = struct.Struct("<32sI")
+
+# txOutValueLayout is the value of a transaction output.  It is signed, as in
+# btcd, so the outputs blanked to -1 by SigHashSingle can be serialized.
+txOutValueLayout = struct.Struct("<q")
+
+# uint32Layout is used for version, sequence and lock_time.
+uint32Layout = struct.Struct("<I")
+
+
+# TxRevision counts the modifications made to a transaction: to its fields and
+# to its input and output lists, and in place to the inputs and outputs it
+# holds.  The sizes and encodings MsgTx caches, and what it
+# remembers of its decoded bytes, are valid while its revision doesn't change,
+# so modifying a transaction leaves those of the others alone.  The revisions
+# of the transactions of a block are owned by the revision of the block, which
+# is bumped with theirs.
+#
+# Inputs and outputs keep weak references to the revisions of the
+# transactions holding them, which they are added to when they are put in the
+# input or output list of a transaction, decoded into it or have its sizes
+# computed.  An object held by several transactions (signature hashing builds
+# transactions sharing the outputs of the one being signed) bumps the
+# revisions of all of them.  Outpoints are values, see OutPoint.
+class TxRevision:
+    __slots__ = ('value', 'ref', '_owner', '__weakref__')
+
+    def __init__(self):
+        self.value = 0
+        self.ref = weakref.ref(self)
+        self._owner = None
+
+    def bump(self):
+        self.value += 1
+        _changed(self)
+
+    # A copy starts afresh, owning nothing and owned by nothing.
+    def __reduce__(self):
+        return TxRevision, ()
+
+    # adopt adds this revision to the owners of obj.  obj._owner is None, the
+    # weak reference to its only owner or a tuple of them, the dead ones
+    # dropped as owners are added.
+    def adopt(self, obj):
+        ref = self.ref
+        owner = obj._owner
+        if owner is None or owner is ref:
+            obj._owner = ref
+        elif type(owner) is not tuple:
+            obj._owner = ref if owner() is None else (owner, ref)
+        elif not any(r is ref for r in owner):
+            obj._owner = tuple(r for r in owner if r() is not None) + (ref,)
+
+
+# _changed bumps the revisions of the owners of obj.
+def _changed(obj):
+    owner = obj._owner
+    if owner is None:
+        return
+    if type(owner) is tuple:
+        for ref in owner:
+            revision = ref()
+            if revision is not None:
+                revision.bump()
+        return
+    revision = owner()
+    if revision is not None:
+        revision.bump()
+
+
+# _TxList is the input or output list of a transaction.  Changing its items
+# adds the revision of the transaction to the owners of the new ones and bumps
+# it, so the list can be modified like any other.  Slices and copies of it are
+# plain lists.
+class _TxList(list):
+    __slots__ = ('_revision',)
+
+    def __init__(self, revision, items=()):
+        super(_TxList, self).__init__(items)
+        self._revision = revision
+        for item in self:
+            self._adopt(item)
+
+    def _adopt(self, item):
+        self._revision.adopt(item)
+
+    def _modified(self, items=()):
+        for item in items:
+            self._adopt(item)
+        self._revision.bump()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            super(_TxList, self).__setitem__(index, value)
+            self._modified(value)
+        else:
+            super(_TxList, self).__setitem__(index, value)
+            self._modified((value,))
+
+    def __delitem__(self, index):
+        super(_TxList, self).__delitem__(index)
+        self._modified()
+
+    def __iadd__(self, items):
+        items = list(items)
+        super(_TxList, self).extend(items)
+        self._modified(items)
+        return self
+
+    def __imul__(self, n):
+        super(_TxList, self).__imul__(n)
+        self._modified()
+        return self
+
+    def append(self, item):
+        super(_TxList, self).append(item)
+        self._modified((item,))
+
+    def extend(self, items):
+        items = list(items)
+        super(_TxList, self).extend(items)
+        self._modified(items)
+
+    def insert(self, index, item):
+        super(_TxList, self).insert(index, item)
+        self._modified((item,))
+
+    def pop(self, index=-1):
+        item = super(_TxList, self).pop(index)
+        self._modified()
+        return item
+
+    def remove(self, item):
+        super(_TxList, self).remove(item)
+        self._modified()
+
+    def clear(self):
+        super(_TxList, self).clear()
+        self._modified()
+
+    def reverse(self):
+        super(_TxList, self).reverse()
+        self._modified()
+
+    def sort(self, *args, **kwargs):
+        super(_TxList, self).sort(*args, **kwargs)
+        self._modified()
+
+    def __reduce__(self):
+        return type(self), (self._revision, list(self))
+
+
+# OutPoint defines a bitcoin data type that is used to track previous
+# transaction outputs.
+#
+# Outpoints are the keys of the utxo view, the mempool outpoint index and the
+# orphan index, so there can be millions of them alive at once.  They use
+# __slots__ and nothing else: their dict hash is that of (hash, index), and the
+# chainhash.Hash, a bytes object, caches its own.
+#
+# An outpoint is a value: the transaction holding it sees a new outpoint set
+# on one of its inputs, not one changed in place (as a dict doesn't see a key
+# changed in place).
 class OutPoint:
+    __slots__ = ('hash', 'index')
+
     def __init__(self, hash: Hash, index: int):
         """
 
@@ -105,14 +274,22 @@ class OutPoint:
     def copy(self):
         return OutPoint(hash=self.hash, index=self.index)
 
+    def __getstate__(self):
+        return self.hash, self.index
+
+    def __setstate__(self, state):
+        self.hash, self.index = state
+
     def __eq__(self, other):
-        return self.hash == other.hash and self.index == other.index
+        return self.index == other.index and self.hash == other.hash
 
     def __hash__(self):
-        return hash(self.hash.to_bytes() + self.index.to_bytes(4, "little"))
+        return hash((self.hash, self.index))
 
 
 class TxIn:
+    __slots__ = ('_previous_out_point', '_signature_script', '_witness', '_sequence', '_owner')
+
     def __init__(self, previous_out_point, signature_script=None, witness=None, sequence=MaxTxInSequenceNum):
         """
 
@@ -121,10 +298,49 @@ class TxIn:
         :param TxWitness witness:
         :param uint32 sequence:
         """
-        self.previous_out_point = previous_out_point
-        self.signature_script = signature_script or bytes()
-        self.witness = witness or TxWitness()  # TOCHECK , I can't find this in bitcoin protocol wiki
-        self.sequence = sequence
+        self._previous_out_point = previous_out_point
+        self._signature_script = signature_script or bytes()
+        self._witness = witness or TxWitness()  # TOCHECK , I can't find this in bitcoin protocol wiki
+        self._sequence = sequence
+        self._owner = None
+
+    # The fields are properties so that modifying an input in place bumps the
+    # revision of the transaction owning it (see TxRevision).
+    @property
+    def previous_out_point(self):
+        return self._previous_out_point
+
+    @previous_out_point.setter
+    def previous_out_point(self, previous_out_point):
+        self._previous_out_point = previous_out_point
+        _changed(self)
+
+    @property
+    def signature_script(self):
+        return self._signature_script
+
+    @signature_script.setter
+    def signature_script(self, signature_script):
+        self._signature_script = signature_script
+        _changed(self)
+
+    @property
+    def witness(self):
+        return self._witness
+
+    @witness.setter
+    def witness(self, witness):
+        self._witness = witness
+        _changed(self)
+
+    @property
+    def sequence(self):
+        return self._sequence
+
+    @sequence.setter
+    def sequence(self, sequence):
+        self._sequence = sequence
+        _changed(self)
 
     def serialize_size(self):
         # Outpoint Hash 32 bytes + Outpoint Index 4 bytes  -> outpoint
@@ -132,25 +348,40 @@ class TxIn:
         # + Sequence 4 bytes -> sequence
 
         # TOCHECK why not count self.witness?
-        return 40 + var_int_serialize_size(len(self.signature_script)) + len(self.signature_script)
+        return 40 + var_int_serialize_size(len(self._signature_script)) + len(self._signature_script)
 
     def copy(self):
-        return TxIn(previous_out_point=self.previous_out_point.copy(),
-                    signature_script=self.signature_script[:],
-                    witness=self.witness.copy(),
-                    sequence=self.sequence)
+        return TxIn(previous_out_point=self._previous_out_point.copy(),
+                    signature_script=bytes(self._signature_script),
+                    witness=self._witness.copy(),
+                    sequence=self._sequence)
+
+    # materialize replaces the signature script and witness items with owned
+    # bytes when they are views into a decode buffer.
+    def materialize(self):
+        self._signature_script = bytes(self._signature_script)
+        self._witness.materialize()
+
+    # memoryview can't be pickled or deep copied, hand out owned bytes instead.
+    def __getstate__(self):
+        return None, {'_previous_out_point': self._previous_out_point,
+                      '_signature_script': bytes(self._signature_script),
+                      '_witness': self._witness,
+                      '_sequence': self._sequence,
+                      '_owner': None}
 
     def __eq__(self, other):
-        return self.previous_out_point == other.previous_out_point and \
-               self.previous_out_point == other.previous_out_point and \
-               self.signature_script == other.signature_script and \
-               self.witness == other.witness and \
-               self.sequence == other.sequence
+        return self._previous_out_point == other.previous_out_point and \
+               self._signature_script == other.signature_script and \
+               self._witness == other.witness and \
+               self._sequence == other.sequence
 
 
 # TxWitness : a txwitness is a list of witness for one tx input
 # it's format:  varint + [(varint + bytes), ...]
 class TxWitness:
+    __slots__ = ('_data',)
+
     def __init__(self, data=None):
         """data is a list of list of bytes
         :param [][]byte uint32 data:
@@ -167,9 +398,15 @@ class TxWitness:
     def copy(self):
         new_data = []
         for d in self._data:
-            new_data.append(d[:])
+            new_data.append(bytes(d))
         return TxWitness(data=new_data)
 
+    def materialize(self):
+        self._data = [bytes(d) for d in self._data]
+
+    def __getstate__(self):
+        return None, {'_data': [bytes(d) for d in self._data]}
+
     def __len__(self):
         return len(self._data)
 
@@ -184,27 +421,73 @@ class TxWitness:
 
 
 class TxOut:
+    __slots__ = ('_value', '_pk_script', '_owner')
+
     def __init__(self, value, pk_script):
         """
 
         :param int64 value:
         :param []byte pk_script:
         """
-        self.value = value
-        self.pk_script = pk_script
+        self._value = value
+        self._pk_script = pk_script
+        self._owner = None
+
+    # The fields are properties so that modifying an output in place bumps the
+    # revision of the transaction owning it (see TxRevision).
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        _changed(self)
+
+    @property
+    def pk_script(self):
+        return self._pk_script
+
+    @pk_script.setter
+    def pk_script(self, pk_script):
+        self._pk_script = pk_script
+        _changed(self)
 
     def serialize_size(self):
         # Value 8 bytes + serialized varint size for the length of PkScript +
         # PkScript bytes.
-        return 8 + var_int_serialize_size(len(self.pk_script)) + len(self.pk_script)
+        return 8 + var_int_serialize_size(len(self._pk_script)) + len(self._pk_script)
 
     def copy(self):
-        return TxOut(value=self.value,
-                     pk_script=self.pk_script[:])
+        return TxOut(value=self._value,
+                     pk_script=bytes(self._pk_script))
+
+    def materialize(self):
+        self._pk_script = bytes(self._pk_script)
+
+    def __getstate__(self):
+        return None, {'_value': self._value, '_pk_script': bytes(self._pk_script), '_owner': None}
 
     def __eq__(self, other):
-        return self.value == other.value and \
-               self.pk_script == other.pk_script
+        return self._value == other.value and \
+               self._pk_script == other.pk_script
+
+
+# txCache holds what MsgTx caches about itself: the serialized sizes, whether
+# it has witness data, the public key script offsets and the two encodings.
+# It is valid while the state of the transaction, its revision, version, lock
+# time and number of inputs and outputs, is the one it was computed with.
+class _TxCache:
+    __slots__ = ('state', 'base_size', 'size', 'has_witness', 'pk_script_locs', 'witness_bytes', 'base_bytes')
+
+    def __init__(self, msg_tx):
+        self.state = msg_tx._state()
+        self.pk_script_locs = None
+        self.witness_bytes = None
+        self.base_bytes = None
+
+    def is_valid(self, msg_tx):
+        return self.state == msg_tx._state()
 
 
 class MsgTx(Message):
@@ -217,13 +500,57 @@ class MsgTx(Message):
         :param uint32 lock_time:w
         """
         self.version = version or 0
-        self.tx_ins = tx_ins or []
-        self.tx_outs = tx_outs or []
         self.lock_time = lock_time or 0
 
+        # The modifications made to the transaction, see TxRevision.
+        self._revision = TxRevision()
+        self._tx_ins = _TxList(self._revision, tx_ins or [])
+        self._tx_outs = _TxList(self._revision, tx_outs or [])
+
+        # Views of the buffer the transaction was decoded from, recorded when
+        # decoding through a BufferReader: the whole encoding and the parts of
+        # it without the witness marker, flag and witness data.  They let
+        # decoded_tx_hash and decoded_witness_hash hash the original bytes
+        # instead of serializing the transaction again.  decoded_state is
+        # what they were recorded with, see _state.
+        self.decoded_bytes = None
+        self.decoded_no_witness_spans = None
+        self.decoded_state = None
+
+        # Sizes and encodings computed so far, see _TxCache.
+        self._cache = None
+
+    # The input and output lists are _TxLists: replacing them, changing their
+    # items or modifying the items in place bumps the revision.  The lists
+    # assigned are copied.
+    @property
+    def tx_ins(self):
+        return self._tx_ins
+
+    @tx_ins.setter
+    def tx_ins(self, tx_ins):
+        self._tx_ins = _TxList(self._revision, tx_ins)
+        self._revision.bump()
+
+    @property
+    def tx_outs(self):
+        return self._tx_outs
+
+    @tx_outs.setter
+    def tx_outs(self, tx_outs):
+        self._tx_outs = _TxList(self._revision, tx_outs)
+        self._revision.bump()
+
     def btc_decode(self, s, pver, message_encoding):
+        # Only a BufferReader can hand out the decoded bytes without copying.
+        buf = s.getvalue() if type(s) is BufferReader else None
+        start = s.tell() if buf is not None else 0
+        self.decoded_bytes = None
+        self.decoded_no_witness_spans = None
+        self._cache = None
+
         # read version
-        self.version = read_element(s, "uint32")
+        self.version = uint32Layout.unpack(s.read(4))[0]
 
         count = read_var_int(s, pver)
 
@@ -241,9 +568,14 @@ class MsgTx(Message):
             raise MaxTxInPerMessageMsgErr
 
         # read tx_inputs
-        self.tx_ins = []
+        revision = self._revision
+        tx_ins = []
         for i in range(count):
-            self.tx_ins.append(read_tx_in(s, pver, self.version))
+            tx_in = read_tx_in(s, pver, self.version)
+            tx_in._owner = revision.ref
+            tx_ins.append(tx_in)
+        self._tx_ins = _TxList(revision)
+        list.extend(self._tx_ins, tx_ins)
 
         # check tx_outputs count
         count = read_var_int(s, pver)
@@ -251,24 +583,47 @@ class MsgTx(Message):
             raise MaxTxOutPerMessageMsgErr
 
         # read tx_outputs
-        self.tx_outs = []
+        tx_outs = []
         for i in range(count):
-            self.tx_outs.append(read_tx_out(s, pver, self.version))
+            tx_out = read_tx_out(s, pver, self.version)
+            tx_out._owner = revision.ref
+            tx_outs.append(tx_out)
+        self._tx_outs = _TxList(revision)
+        list.extend(self._tx_outs, tx_outs)
+
+        outs_end = s.tell() if buf is not None else 0
 
         # read tx_witness
         if flag != b'' and message_encoding == WitnessEncoding:
-            for i in range(len(self.tx_ins)):
-                self.tx_ins[i].witness = read_tx_witness(s, pver, self.version)
+            for tx_in in self._tx_ins:
+                tx_in._witness = read_tx_witness(s, pver, self.version)
 
         # read lock_time
-        self.lock_time = read_element(s, "uint32")
+        self.lock_time = uint32Layout.unpack(s.read(4))[0]
+
+        if buf is not None:
+            end = s.tell()
+            self.decoded_state = self._state()
+            self.decoded_bytes = buf[start:end]
+            if flag != b'':
+                # version + tx_ins and tx_outs after the marker and flag + lock_time
+                self.decoded_no_witness_spans = [buf[start:start + 4], buf[start + 6:outs_end], buf[end - 4:end]]
+            else:
+                self.decoded_no_witness_spans = [self.decoded_bytes]
 
         # TOCHECK there are many optimize in the origin, consider need here.
         return
 
     def btc_encode(self, s, pver, message_encoding):
+        # The encoding doesn't depend on the protocol version, so the cached
+        # encodings can be used for the wire as well.
+        s.write(self._encoded(message_encoding == WitnessEncoding))
+        return
+
+    # _encode writes the transaction without going through the cached encodings.
+    def _encode(self, s, pver, message_encoding):
         # write version
-        write_element(s, "uint32", self.version)
+        s.write(uint32Layout.pack(self.version))
 
         do_witness = message_encoding == WitnessEncoding and self.has_witness()
 
@@ -298,7 +653,7 @@ class MsgTx(Message):
                 write_tx_witness(s, pver, self.version, tx_in.witness)
 
         # write lock time
-        write_element(s, "uint32", self.lock_time)
+        s.write(uint32Layout.pack(self.lock_time))
         return
 
     def command(self) -> str:
@@ -308,24 +663,117 @@ class MsgTx(Message):
         return MaxBlockPayload
 
     def add_tx_in(self, ti):
-        self.tx_ins.append(ti)
+        self._tx_ins.append(ti)
 
     def add_tx_out(self, to):
-        self.tx_outs.append(to)
+        self._tx_outs.append(to)
+
+    # clear_decoded_bytes drops the recorded decode spans and the cached sizes
+    # and encodings.  Modifying the transaction does this implicitly (see
+    # TxRevision), so it is only needed to release them.
+    def clear_decoded_bytes(self):
+        self.decoded_bytes = None
+        self.decoded_no_witness_spans = None
+        self._cache = None
 
     # TxHash generates the Hash for the transaction.
     def tx_hash(self):
-        s = io.BytesIO()
-        self.serialize_no_witness(s)
-        return double_hash_h(s.getvalue())  # TOCHECK why hint str here
+        return double_hash_h(self._encoded(False))
 
     def witness_hash(self):
         if self.has_witness():
-            s = io.BytesIO()
-            self.serialize(s)
-            return double_hash_h(s.getvalue())  # TOCHECK why hint str here
+            return double_hash_h(self._encoded(True))
         return self.tx_hash()
 
+    # decoded_tx_hash returns the transaction hash computed from the bytes the
+    # transaction was decoded from, or None when they were not recorded.
+    def decoded_tx_hash(self):
+        if not self._has_decoded_bytes():
+            return None
+        return double_hash_parts_h(self.decoded_no_witness_spans)
+
+    # decoded_witness_hash is the witness hash counterpart of decoded_tx_hash.
+    def decoded_witness_hash(self):
+        if not self._has_decoded_bytes():
+            return None
+        if self.has_witness():
+            return double_hash_h(self.decoded_bytes)
+        return self.decoded_tx_hash()
+
+    # _has_decoded_bytes returns whether the decoded bytes were recorded and
+    # still encode the transaction: it was not modified since, through the api
+    # or in the inputs and outputs it owns, and its version, lock time and
+    # number of inputs and outputs are those decoded.
+    def _has_decoded_bytes(self):
+        return self.decoded_bytes is not None and self.decoded_state == self._state()
+
+    def _state(self):
+        return self._revision.value, self.version, self.lock_time, len(self._tx_ins), len(self._tx_outs)
+
+    # _sizes returns the valid _TxCache of the transaction, computing the sizes
+    # when the cached ones are missing or out of date.
+    def _sizes(self):
+        c = self._cache
+        if c is not None and c.is_valid(self):
+            return c
+
+        c = _TxCache(self)
+
+        # The inputs and outputs the sizes are computed from must tell the
+        # transaction when they are modified.
+        revision = self._revision
+
+        # Version 4 bytes + LockTime 4 bytes + Serialized varint size for the
+        # number of transaction inputs and outputs.
+        n = 8 + var_int_serialize_size(len(self._tx_ins)) + var_int_serialize_size(len(self._tx_outs))
+        has_witness = False
+        witness_size = 0
+        for tx_in in self._tx_ins:
+            revision.adopt(tx_in)
+            n += tx_in.serialize_size()
+            if len(tx_in.witness) != 0:
+                has_witness = True
+        for tx_out in self._tx_outs:
+            revision.adopt(tx_out)
+            n += tx_out.serialize_size()
+
+        if has_witness:
+            # count marker + flag
+            witness_size = 2
+            for tx_in in self._tx_ins:
+                witness_size += tx_in.witness.serialize_size()
+
+        c.base_size = n
+        c.size = n + witness_size
+        c.has_witness = has_witness
+        self._cache = c
+        return c
+
+    # _encoded returns the serialized transaction, with witness data when
+    # witness is true and the transaction has any.  The encoding is cached;
+    # a transaction decoded from a buffer reuses the decoded bytes.
+    def _encoded(self, witness: bool):
+        c = self._sizes()
+        if witness and c.has_witness:
+            if c.witness_bytes is None:
+                if self._has_decoded_bytes():
+                    c.witness_bytes = self.decoded_bytes
+                else:
+                    s = io.BytesIO()
+                    self._encode(s, 0, WitnessEncoding)
+                    c.witness_bytes = s.getvalue()
+            return c.witness_bytes
+
+        if c.base_bytes is None:
+            if self._has_decoded_bytes():
+                spans = self.decoded_no_witness_spans
+                c.base_bytes = spans[0] if len(spans) == 1 else b''.join(spans)
+            else:
+                s = io.BytesIO()
+                self._encode(s, 0, BaseEncoding)
+                c.base_bytes = s.getvalue()
+        return c.base_bytes
+
     def copy(self):
 
         # copy tx_ins
@@ -364,13 +812,35 @@ class MsgTx(Message):
     def deserialize_no_witness(self, s):
         return self.btc_decode(s, pver=0, message_encoding=BaseEncoding)
 
+    # DeserializeBuffer decodes a transaction the same as Deserialize, but from an
+    # in-memory buffer (bytes or memoryview) without copying: the scripts and
+    # witness items of the decoded transaction are memoryview slices of buf.
+    # Call materialize to replace them with owned bytes.
+    def deserialize_buffer(self, buf):
+        return self.deserialize(BufferReader(buf))
+
+    # materialize replaces all the buffer views held by the transaction with
+    # owned bytes, so the transaction no longer keeps the decode buffer alive.
+    def materialize(self):
+        for tx_in in self.tx_ins:
+            tx_in.materialize()
+        for tx_out in self.tx_outs:
+            tx_out.materialize()
+        self.clear_decoded_bytes()
+
+    # The decode spans are views and can't be pickled, the receiver falls back
+    # to serializing for the hashes.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['decoded_bytes'] = None
+        state['decoded_no_witness_spans'] = None
+        state['_cache'] = None
+        return state
+
     # HasWitness returns false if none of the inputs within the transaction
     # contain witness data, true false otherwise.
     def has_witness(self):
-        for tx_in in self.tx_ins:
-            if len(tx_in.witness) != 0:
-                return True
-        return False
+        return self._sizes().has_witness
 
     # Serialize encodes the transaction to w using a format that suitable for
     # long-term storage such as a database while respecting the Version field in
@@ -392,42 +862,26 @@ class MsgTx(Message):
         # serialized according to the new serialization structure defined in
         # BIP0144.
 
-        return self.btc_encode(s, pver=0, message_encoding=WitnessEncoding)
+        s.write(self._encoded(True))
+        return
 
     # SerializeNoWitness encodes the transaction to w in an identical manner to
     # Serialize, however even if the source transaction has inputs with witness
     # data, the old serialization format will still be used.
     def serialize_no_witness(self, s):
-        return self.btc_encode(s, pver=0, message_encoding=BaseEncoding)
+        s.write(self._encoded(False))
+        return
 
     # baseSize returns the serialized size of the transaction without accounting
     # for any witness data.
     def base_size(self):
-        # Version 4 bytes + LockTime 4 bytes + Serialized varint size for the
-        # number of transaction inputs and outputs.
-
-        n = 8 + var_int_serialize_size(len(self.tx_ins)) + var_int_serialize_size(len(self.tx_outs))
-
-        for tx_in in self.tx_ins:
-            n += tx_in.serialize_size()
-
-        for tx_out in self.tx_outs:
-            n += tx_out.serialize_size()
-        return n
+        return self._sizes().base_size
 
     # SerializeSize returns the number of bytes it would take to serialize the
-    # the transaction.
+    # the transaction.  The size is cached until the transaction is modified
+    # (see TxRevision).
     def serialize_size(self):
-        n = self.base_size()
-
-        if self.has_witness():
-
-            # count marker + flag
-            n += 2
-
-            for tx_in in self.tx_ins:
-                n += tx_in.witness.serialize_size()
-        return n
+        return self._sizes().size
 
     # SerializeSizeStripped returns the number of bytes it would take to serialize
     # the transaction, excluding any included witness data.
@@ -439,6 +893,12 @@ class MsgTx(Message):
     # length of each script by using len on the script available via the
     # appropriate transaction output entry.
     def pk_script_locs(self):
+        c = self._sizes()
+        if c.pk_script_locs is None:
+            c.pk_script_locs = self._pk_script_locs()
+        return list(c.pk_script_locs)
+
+    def _pk_script_locs(self):
         if len(self.tx_outs) == 0:
             return []
 
@@ -484,21 +944,19 @@ class MsgTx(Message):
 
 
 def read_out_point(s, pver, version):
-    hash = read_element(s, "chainhash.Hash")
-    index = read_element(s, "uint32")
-    return OutPoint(hash=hash, index=index)
+    hash, index = outPointLayout.unpack(s.read(36))
+    return OutPoint(hash=Hash(hash), index=index)
 
 
 def write_out_point(s, pver, version, op: OutPoint):
-    write_element(s, "chainhash.Hash", op.hash)
-    write_element(s, "uint32", op.index)
+    s.write(outPointLayout.pack(op.hash, op.index))
     return
 
 
 def read_tx_in(s, pver, version):
     previous_out_point = read_out_point(s, pver, version)
     signature_script = read_script(s, pver, MaxMessagePayload, "transaction input signature script")
-    sequence = read_element(s, "uint32")
+    sequence = uint32Layout.unpack(s.read(4))[0]
 
     return TxIn(previous_out_point=previous_out_point,
                 signature_script=signature_script,
@@ -508,18 +966,18 @@ def read_tx_in(s, pver, version):
 def write_tx_in(s, pver, version, ti: TxIn):
     write_out_point(s, pver, version, ti.previous_out_point)
     write_script(s, pver, ti.signature_script)
-    write_element(s, "uint32", ti.sequence)
+    s.write(uint32Layout.pack(ti.sequence))
     return
 
 
 def read_tx_out(s, pver, version):
-    value = read_element(s, "int64")
+    value = txOutValueLayout.unpack(s.read(8))[0]
     pk_script = read_script(s, pver, MaxMessagePayload, "transaction output public key script")
     return TxOut(value=value, pk_script=pk_script)
 
 
 def write_tx_out(s, pver, version, to: TxOut):
-    write_element(s, "int64", to.value)
+    s.write(txOutValueLayout.pack(to.value))
     write_script(s, pver, to.pk_script)
     return
 
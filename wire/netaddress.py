@@ -1,8 +1,15 @@
 # Refer to https://en.bitcoin.it/wiki/Protocol_documentation#Network_address
 import pyutil
 import ipaddress
+import struct
 from .common import *
 
+# Precompiled layouts of an encoded NetAddress.  The port is encoded in
+# network byte order (big endian), so it has its own layout.
+netAddressLayout = struct.Struct("<Q16s")
+netAddressTimeLayout = struct.Struct("<IQ16s")
+netAddressPortLayout = struct.Struct(">H")
+
 
 # import ipaddress
 
@@ -89,16 +96,19 @@ def max_netaddress_payload(pver: int) -> int:
 # like version do not include the timestamp.
 def read_netaddress(s, pver, ts):
     if ts and pver >= NetAddressTimeVersion:
-        timestamp = read_element(s, "uint32Time")
+        layout = netAddressTimeLayout
+        buf = s.read(layout.size + 2)
+        timestamp, services, ip = layout.unpack_from(buf)
     else:
+        layout = netAddressLayout
+        buf = s.read(layout.size + 2)
         timestamp = 0
-    services = read_element(s, "services")
-    ip = read_element(s, "[16]byte")
+        services, ip = layout.unpack_from(buf)
+    services = Services(ServiceFlag.from_int(services))
     if ip:
         ip = ipaddress.ip_address(ip)
 
-    # port = read_variable_bytes_as_integer(s, 8, BigEndian)
-    port = read_variable_bytes_as_integer(s, 2, BigEndian)
+    port = netAddressPortLayout.unpack_from(buf, layout.size)[0]
     return NetAddress(services=services,
                       ip=ip,
                       port=port,
@@ -109,17 +119,16 @@ def read_netaddress(s, pver, ts):
 # version and whether or not the timestamp is included per ts.  Some messages
 # like version do not include the timestamp.
 def write_netaddress(s, pver, na, ts):
-    if ts and pver >= NetAddressTimeVersion:
-        write_element(s, "uint32", na.timestamp)
-
-    write_element(s, "services", na.services)
-
     # Ensure to always write 16 bytes even if the ip is nil.
-    ip = bytearray(16)
+    ip = bytes(16)
     # refer to https://stackoverflow.com/questions/19750929/converting-ipv4-address-to-a-hex-ipv6-address-in-python
     if na.ip:
         ip = na.ip.packed
-    write_element(s, "[16]byte", ip)
 
-    write_variable_bytes_from_integer(s, 2, na.port, BigEndian)
+    if ts and pver >= NetAddressTimeVersion:
+        s.write(netAddressTimeLayout.pack(na.timestamp, na.services.value, ip))
+    else:
+        s.write(netAddressLayout.pack(na.services.value, ip))
+
+    s.write(netAddressPortLayout.pack(na.port))
     return
@@ -66,10 +66,10 @@ class BitcoinNet(Enum):
 
     @classmethod
     def from_int(cls, i):
-        for flagService in cls:
-            if flagService.value[0] == i:
-                return flagService
-        raise ValueError(cls.__name__ + ' has no value matching "' + str(i) + '"')
+        try:
+            return _bitcoin_net_by_int[i]
+        except KeyError:
+            raise ValueError(cls.__name__ + ' has no value matching "' + str(i) + '"')
 
     def to_bytes_as_uint32(self, byteorder):
         return self.value[0].to_bytes(4, byteorder=byteorder)
@@ -78,6 +78,11 @@ class BitcoinNet(Enum):
         return self.value[0]
 
 
+# Lookup tables used by from_int, so decoding an enum is a dict lookup
+# instead of a scan over all the members.
+_bitcoin_net_by_int = {member.value[0]: member for member in BitcoinNet}
+
+
 # Enumerations support iteration, in definition order
 # TODO Change this
 class ServiceFlag(Enum):
@@ -118,10 +123,13 @@ class ServiceFlag(Enum):
 
     @classmethod
     def from_int(cls, i):
-        for flagService in cls:
-            if flagService.value[0] == i:
-                return flagService
-        raise ValueError(cls.__name__ + ' has no value matching "' + str(i) + '"')
+        try:
+            return _service_flag_by_int[i]
+        except KeyError:
+            raise ValueError(cls.__name__ + ' has no value matching "' + str(i) + '"')
+
+
+_service_flag_by_int = {member.value[0]: member for member in ServiceFlag}
 
 
 class Services:
@@ -190,10 +198,10 @@ class InvType(Enum):
 
     @classmethod
     def from_int(cls, i):
-        for flagService in cls:
-            if flagService.value[0] == i:
-                return flagService
-        raise ValueError(cls.__name__ + ' has no value matching "' + str(i) + '"')
+        try:
+            return _inv_type_by_int[i]
+        except KeyError:
+            raise ValueError(cls.__name__ + ' has no value matching "' + str(i) + '"')
 
     def __eq__(self, other):
         if type(other) is InvType:
@@ -205,3 +213,5 @@ class InvType(Enum):
         else:
             return False
 
+
+_inv_type_by_int = {member.value[0]: member for member in InvType}